@@ -2,8 +2,9 @@
 import copy
 import json
 import math
+from collections import OrderedDict
 import tiktoken
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List
 import logging
 
 from config.schema import clamp_compact_target_ratio
@@ -11,6 +12,84 @@ from sdk.hooks import BeforeCompactContext, PluginHookDispatcher, PluginHookEven
 
 logger = logging.getLogger(__name__)
 
+MESSAGE_TOKEN_OVERHEAD = 4
+MIN_LEDGER_ENTRIES = 1024
+
+
+class MessageTokenLedger:
+    """按消息缓存 token 计数，并为正在追踪的历史列表维护增量总数。
+
+    每条消息只在第一次出现（或顶层字段被替换）时编码一次；缓存以消息对象身份为键，
+    并保存顶层字段值的引用用于校验。追踪的历史列表记下每个位置的顶层字段快照，
+    已计入的前缀逐条比对无误（不编码，只比较引用）且只在尾部追加时走增量路径；
+    删除、插入、替换中间消息或改写旧消息的字段都会退回到一次基于缓存的全量对账
+    （不重新编码未变化的消息）。
+    """
+
+    def __init__(self, count_message: Callable[[Dict[str, Any]], int]):
+        self._count_message = count_message
+        self._entries: OrderedDict[int, tuple[Dict[str, Any], tuple, int]] = OrderedDict()
+        self._tracked: List[Dict[str, Any]] | None = None
+        self._tracked_items: List[tuple] = []
+        self._tracked_total = 0
+        self.encoded_messages = 0
+
+    def message_tokens(self, message: Dict[str, Any]) -> int:
+        """返回单条消息的 token 数（含每条消息的固定开销），命中缓存时不重新编码。"""
+        key = id(message)
+        entry = self._entries.get(key)
+        if entry is not None and self._entry_matches(entry, message):
+            self._entries.move_to_end(key)
+            return entry[2]
+        tokens = self._count_message(message) + MESSAGE_TOKEN_OVERHEAD
+        self.encoded_messages += 1
+        self._entries[key] = (message, tuple(message.items()), tokens)
+        self._entries.move_to_end(key)
+        self._evict()
+        return tokens
+
+    @staticmethod
+    def _entry_matches(entry: tuple[Dict[str, Any], tuple, int], message: Dict[str, Any]) -> bool:
+        # Tuple equality short-circuits on identical values, so unchanged messages are cheap.
+        return entry[0] is message and entry[1] == tuple(message.items())
+
+    def total(self, messages: List[Dict[str, Any]], *, track: bool = False) -> int:
+        """计算消息列表总 token 数；``track=True`` 时把该列表作为增量追踪对象。"""
+        if messages is self._tracked and self._prefix_unchanged(messages):
+            for message in messages[len(self._tracked_items):]:
+                self._tracked_total += self.message_tokens(message)
+                self._tracked_items.append(tuple(message.items()))
+            return self._tracked_total
+
+        total = sum(self.message_tokens(message) for message in messages)
+        if track:
+            self._tracked = messages
+            self._tracked_total = total
+            self._tracked_items = [tuple(message.items()) for message in messages]
+        return total
+
+    def invalidate(self) -> None:
+        """丢弃所有缓存；历史中的旧消息被原地深层修改后调用。"""
+        self._entries.clear()
+        self._tracked = None
+        self._tracked_items = []
+        self._tracked_total = 0
+
+    def _prefix_unchanged(self, messages: List[Dict[str, Any]]) -> bool:
+        # Tuple equality short-circuits on identical values, so this costs one
+        # reference comparison per field rather than any re-encoding.
+        length = len(self._tracked_items)
+        if len(messages) < length:
+            return False
+        return [tuple(message.items()) for message in messages[:length]] == self._tracked_items
+
+    def _evict(self) -> None:
+        # LRU bound: live history plus request-local copies of it stay resident.
+        limit = max(MIN_LEDGER_ENTRIES, 4 * len(self._tracked_items))
+        while len(self._entries) > limit:
+            self._entries.popitem(last=False)
+
+
 class CompactManager:
     """管理记忆压缩的类"""
 
@@ -48,6 +127,7 @@ class CompactManager:
         self.compact_summary_max_tokens = max(128, int(compact_summary_max_tokens))
         self.hook_dispatcher = hook_dispatcher
         self.num_tokens = 0
+        self.token_ledger = MessageTokenLedger(self._count_message_tokens)
 
         # 尝试使用tiktoken进行token计数
         try:
@@ -88,12 +168,12 @@ class CompactManager:
         except Exception:
             return str(message)
 
+    def _count_message_tokens(self, message: Dict[str, Any]) -> int:
+        return self.count_text_tokens(self._message_token_text(message))
+
     def count_tokens(self, messages: List[Dict[str, Any]]) -> int:
-        """计算消息列表的token数量"""
-        total_tokens = 0
-        for message in messages:
-            total_tokens += self.count_text_tokens(self._message_token_text(message)) + 4
-        return total_tokens
+        """计算消息列表的token数量（逐条缓存，只编码新出现或被替换的消息）"""
+        return self.token_ledger.total(messages)
 
     def increase_token_count(self, new_messages: List[Dict[str, Any]], token_usage: int = 0):
         """增加当前token计数"""
@@ -106,10 +186,10 @@ class CompactManager:
     def needs_compaction(self, messages: List[Dict[str, Any]], token_usage: int = 0) -> bool:
         """检查是否需要压缩记忆"""
         if self.max_tokens <= 0:
-            self.num_tokens = self.count_tokens(messages)
+            self.num_tokens = self.token_ledger.total(messages, track=True)
             return False
-        # 每次按完整消息重算，避免增量统计在工具调用和历史替换后漂移。
-        self.num_tokens = token_usage if token_usage > 0 else self.count_tokens(messages)
+        # 由 ledger 追踪当前历史：追加只编码新消息，删除/替换后按缓存对账，避免增量统计漂移。
+        self.num_tokens = token_usage if token_usage > 0 else self.token_ledger.total(messages, track=True)
         token_count = self.num_tokens
         threshold_tokens = self.max_tokens * self.compact_threshold
 
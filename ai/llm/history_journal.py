@@ -0,0 +1,488 @@
+"""Append-only storage for chat history files.
+
+``active.json`` stays a valid JSON array so bridge readers, downloads and
+branch reconciliation can keep using ``json.load``, but it is written with one
+compact message per line::
+
+    [
+    {"role": "user", "content": "..."},
+    {"role": "assistant", "content": "..."}
+    ]
+
+A sidecar ``.idx`` file stores the byte offset of every message line. New
+messages are appended in place before the closing bracket, and the last N
+messages can be read by seeking instead of parsing the whole file.
+
+The ``.tmp`` journal written while chatting keeps its ``{...},\\n`` line
+format. It is fsynced in batches and folded into the base file on load, on
+save and periodically while appending. Files written by older versions
+(``indent=4``) or by other writers no longer match the index and are migrated
+by the next full load or compaction.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from array import array
+from pathlib import Path
+from typing import Any, Sequence
+
+INDEX_SUFFIX = ".idx"
+JOURNAL_SUFFIX = ".tmp"
+
+# 日志 fsync 批量策略：每 N 条或每隔 T 秒落盘一次
+JOURNAL_FSYNC_EVERY = 16
+JOURNAL_FSYNC_INTERVAL = 2.0
+# 进程内追加达到该条数后把日志合并进正式文件
+JOURNAL_COMPACT_EVERY = 256
+
+_OPEN = b"[\n"
+_SEPARATOR = b",\n"
+_CLOSE = b"\n]\n"
+_EMPTY = b"[\n]\n"
+
+# magic, version, base size, base mtime_ns, message count
+_INDEX_HEADER = struct.Struct("<4sIQqQ")
+_INDEX_MAGIC = b"CHIX"
+_INDEX_VERSION = 1
+
+_lock = threading.RLock()
+_journal_state: dict[str, "_JournalSyncState"] = {}
+
+
+class _JournalSyncState:
+    __slots__ = ("unsynced", "last_sync", "appended")
+
+    def __init__(self) -> None:
+        self.unsynced = 0
+        self.last_sync = float("-inf")
+        self.appended = 0
+
+
+def encode_message(message: Any) -> bytes:
+    """单条消息的紧凑 JSON 行（不含换行）。"""
+    return json.dumps(message, ensure_ascii=False).encode("utf-8")
+
+
+def append_journal_line(journal_path: Path, message: Any) -> int:
+    """追加一条 ``{...},\\n`` 日志行，按批次 fsync。
+
+    返回本进程向该日志追加的条数，调用方据此决定是否触发合并。调用方负责
+    串行化同一日志的写入。
+    """
+    line = json.dumps(message, ensure_ascii=False) + ",\n"
+    key = str(journal_path)
+    state = _journal_state.setdefault(key, _JournalSyncState())
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write(line)
+        state.unsynced += 1
+        now = time.monotonic()
+        if (
+            state.unsynced >= JOURNAL_FSYNC_EVERY
+            or now - state.last_sync >= JOURNAL_FSYNC_INTERVAL
+        ):
+            f.flush()
+            os.fsync(f.fileno())
+            state.unsynced = 0
+            state.last_sync = now
+    state.appended += 1
+    return state.appended
+
+
+def forget_journal(journal_path: Path) -> None:
+    _journal_state.pop(str(journal_path), None)
+
+
+def _journal_overlap(tail: Sequence[Any], pending: Sequence[Any]) -> int:
+    """正式文件末尾与日志开头重叠的条数（合并中途崩溃后会出现重叠）。"""
+    for size in range(min(len(tail), len(pending)), 0, -1):
+        if list(tail[-size:]) == list(pending[:size]):
+            return size
+    return 0
+
+
+def _offsets_to_bytes(offsets: array) -> bytes:
+    if sys.byteorder == "big":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def _offsets_from_bytes(raw: bytes) -> array:
+    offsets = array("Q")
+    offsets.frombytes(raw)
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets
+
+
+def _fsync_replace(target: Path, data: bytes) -> None:
+    temporary = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temporary, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, target)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+class HistoryJournal:
+    """One chat history file plus its offset index and ``.tmp`` journal."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.index_path = Path(str(self.path) + INDEX_SUFFIX)
+        self.journal_path = Path(str(self.path) + JOURNAL_SUFFIX)
+        # 最近一次持久化的消息（浅层 items 快照），用于判断保存时能否只追加
+        self._persisted: list[tuple[Any, ...]] | None = None
+
+    # ------------------------------------------------------------------
+    # Offset index
+    # ------------------------------------------------------------------
+
+    def _read_header(self) -> tuple[int, int, int] | None:
+        try:
+            with open(self.index_path, "rb") as f:
+                raw = f.read(_INDEX_HEADER.size)
+        except OSError:
+            return None
+        if len(raw) != _INDEX_HEADER.size:
+            return None
+        magic, version, size, mtime_ns, count = _INDEX_HEADER.unpack(raw)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+            return None
+        return size, mtime_ns, count
+
+    def _write_index(self, offsets: array, stat: os.stat_result) -> None:
+        header = _INDEX_HEADER.pack(
+            _INDEX_MAGIC, _INDEX_VERSION, stat.st_size, stat.st_mtime_ns, len(offsets)
+        )
+        _fsync_replace(self.index_path, header + _offsets_to_bytes(offsets))
+
+    def _extend_index(self, count: int, offsets: array, stat: os.stat_result) -> None:
+        # 先写偏移量再写头部：中途崩溃时头部仍指向旧的文件大小，下次会重建索引
+        with open(self.index_path, "r+b") as f:
+            f.seek(_INDEX_HEADER.size + count * 8)
+            f.write(_offsets_to_bytes(offsets))
+            f.truncate()
+            f.seek(0)
+            f.write(
+                _INDEX_HEADER.pack(
+                    _INDEX_MAGIC,
+                    _INDEX_VERSION,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    count + len(offsets),
+                )
+            )
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_offsets(self, start: int, stop: int) -> array:
+        with open(self.index_path, "rb") as f:
+            f.seek(_INDEX_HEADER.size + start * 8)
+            raw = f.read((stop - start) * 8)
+        if len(raw) != (stop - start) * 8:
+            raise ValueError(f"history index is truncated: {self.index_path}")
+        return _offsets_from_bytes(raw)
+
+    def _scan_offsets(self, data: bytes) -> array | None:
+        """逐行扫描按行格式写入的正式文件；旧格式（缩进 JSON 等）返回 None。"""
+        if data == _EMPTY:
+            return array("Q")
+        if not data.startswith(_OPEN) or not data.endswith(_CLOSE):
+            return None
+        offsets = array("Q")
+        position = len(_OPEN)
+        end = len(data) - len(_CLOSE)
+        while True:
+            newline = data.find(b"\n", position, end)
+            line_end = end if newline < 0 else newline
+            first = data[position:position + 1]
+            if not first or first.isspace():
+                return None
+            if newline >= 0 and data[line_end - 1:line_end] != b",":
+                return None
+            offsets.append(position)
+            if newline < 0:
+                return offsets
+            position = newline + 1
+
+    def ensure_index(self) -> tuple[int, int] | None:
+        """返回 ``(message_count, base_size)``；正式文件不是行格式时返回 None。"""
+        with _lock:
+            try:
+                stat = self.path.stat()
+            except OSError:
+                return None
+            header = self._read_header()
+            if header is not None:
+                size, mtime_ns, count = header
+                if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                    return count, size
+            data = self.path.read_bytes()
+            offsets = self._scan_offsets(data)
+            if offsets is None:
+                return None
+            self._write_index(offsets, stat)
+            return len(offsets), stat.st_size
+
+    # ------------------------------------------------------------------
+    # Base file
+    # ------------------------------------------------------------------
+
+    def write_all(self, messages: Sequence[Any]) -> None:
+        """以行格式原子重写正式文件并重建索引。"""
+        lines = [encode_message(message) for message in messages]
+        offsets = array("Q")
+        if lines:
+            position = len(_OPEN)
+            for line in lines:
+                offsets.append(position)
+                position += len(line) + len(_SEPARATOR)
+            data = _OPEN + _SEPARATOR.join(lines) + _CLOSE
+        else:
+            data = _EMPTY
+        with _lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _fsync_replace(self.path, data)
+            self._write_index(offsets, self.path.stat())
+
+    def _append_in_place(self, messages: Sequence[Any], count: int, size: int) -> None:
+        if not messages:
+            return
+        if count:
+            position = size - len(_CLOSE)
+            prefix = _SEPARATOR
+        else:
+            position = len(_OPEN)
+            prefix = b""
+        offsets = array("Q")
+        chunks = [prefix]
+        cursor = position + len(prefix)
+        for number, message in enumerate(messages):
+            line = encode_message(message)
+            if number:
+                chunks.append(_SEPARATOR)
+                cursor += len(_SEPARATOR)
+            offsets.append(cursor)
+            chunks.append(line)
+            cursor += len(line)
+        chunks.append(_CLOSE)
+        with open(self.path, "r+b") as f:
+            f.seek(position)
+            f.write(b"".join(chunks))
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        self._extend_index(count, offsets, self.path.stat())
+
+    def append(self, messages: Sequence[Any]) -> None:
+        """把消息追加到正式文件；旧格式文件会先迁移为行格式。"""
+        if not messages:
+            return
+        with _lock:
+            index = self.ensure_index()
+            if index is not None:
+                self._append_in_place(messages, *index)
+            else:
+                self.write_all(self.read_all() + list(messages))
+            self._persisted = None
+
+    def _recover_torn_append(self, data: bytes) -> list[Any] | None:
+        """原地追加中途崩溃时，截回索引记录的最后一个完整版本。"""
+        header = self._read_header()
+        if header is None:
+            return None
+        size, _mtime_ns, count = header
+        if len(data) < size:
+            return None
+        candidate = data[:size - len(_CLOSE)] + _CLOSE if count else _EMPTY
+        try:
+            messages = json.loads(candidate)
+        except ValueError:
+            return None
+        if not isinstance(messages, list) or len(messages) != count:
+            return None
+        with open(self.path, "r+b") as f:
+            f.write(candidate)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_index(self._scan_offsets(candidate) or array("Q"), self.path.stat())
+        return messages
+
+    def read_all(self) -> list[Any]:
+        """完整读取正式文件，缺失时返回空列表；无法解析时抛出 ValueError。"""
+        with _lock:
+            try:
+                data = self.path.read_bytes()
+            except FileNotFoundError:
+                return []
+            try:
+                messages = json.loads(data)
+            except ValueError:
+                messages = self._recover_torn_append(data)
+                if messages is None:
+                    raise
+            if not isinstance(messages, list):
+                raise ValueError(f"chat history is not a JSON list: {self.path}")
+            return messages
+
+    def read_range(self, start: int, stop: int | None = None) -> list[Any]:
+        """按索引读取 ``messages[start:stop]``，只解析被请求的行。"""
+        with _lock:
+            index = self.ensure_index()
+            if index is None:
+                return self.read_all()[start:stop]
+            count, size = index
+            start, stop, _step = slice(start, stop).indices(count)
+            if start >= stop:
+                return []
+            offsets = self._read_offsets(start, stop)
+            end = size - len(_CLOSE)
+            if stop < count:
+                end = self._read_offsets(stop, stop + 1)[0] - len(_SEPARATOR)
+            with open(self.path, "rb") as f:
+                f.seek(offsets[0])
+                raw = f.read(end - offsets[0])
+            base = offsets[0]
+            bounds = [offset - base for offset in offsets] + [len(raw) + len(_SEPARATOR)]
+            return [
+                json.loads(raw[bounds[i]:bounds[i + 1] - len(_SEPARATOR)])
+                for i in range(len(offsets))
+            ]
+
+    def read_tail(self, limit: int) -> list[Any]:
+        """读取最后 ``limit`` 条消息。"""
+        if limit <= 0:
+            return []
+        return self.read_range(-limit)
+
+    def message_count(self) -> int:
+        index = self.ensure_index()
+        if index is not None:
+            return index[0]
+        return len(self.read_all())
+
+    def is_present(self) -> bool:
+        """正式文件存在且是 JSON 列表（行格式文件只需校验索引）。"""
+        if not self.path.is_file():
+            return False
+        try:
+            if self.ensure_index() is not None:
+                return True
+            self.read_all()
+            return True
+        except (OSError, ValueError):
+            return False
+
+    # ------------------------------------------------------------------
+    # Save / load
+    # ------------------------------------------------------------------
+
+    def remember(self, messages: Sequence[Any]) -> None:
+        self._persisted = [
+            tuple(message.items()) if isinstance(message, dict) else (message,)
+            for message in messages
+        ]
+
+    def _persisted_prefix(self, messages: Sequence[Any]) -> int:
+        persisted = self._persisted or []
+        limit = min(len(persisted), len(messages))
+        for position in range(limit):
+            message = messages[position]
+            items = tuple(message.items()) if isinstance(message, dict) else (message,)
+            if items != persisted[position]:
+                return position
+        return limit
+
+    def save(self, messages: Sequence[Any]) -> bool:
+        """保存完整历史；与上次持久化内容前缀一致时只追加新增消息。
+
+        返回 True 表示走了追加路径。比较的是消息顶层字段，原地修改嵌套
+        content 列表的调用方需要先调用 :meth:`invalidate`。
+        """
+        with _lock:
+            persisted = self._persisted
+            index = self.ensure_index() if persisted is not None else None
+            if (
+                index is not None
+                and index[0] == len(persisted)
+                and self._persisted_prefix(messages) == len(persisted)
+            ):
+                self._append_in_place(messages[len(persisted):], *index)
+                self.remember(messages)
+                return True
+            self.write_all(messages)
+            self.remember(messages)
+            return False
+
+    def invalidate(self) -> None:
+        self._persisted = None
+
+    def read_journal(self) -> list[Any]:
+        """读取 ``.tmp`` 日志；末尾未写完的半行会被丢弃。"""
+        try:
+            raw = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        lines = raw.split(b"\n")
+        torn = lines.pop() if lines else b""
+        messages = []
+        for line in lines:
+            line = line.strip().rstrip(b",")
+            if line:
+                messages.append(json.loads(line))
+        torn = torn.strip().rstrip(b",")
+        if torn:
+            try:
+                messages.append(json.loads(torn))
+            except ValueError:
+                pass
+        return messages
+
+    def compact(self) -> int:
+        """把 ``.tmp`` 日志合并进正式文件并删除日志，返回新增的消息条数。
+
+        日志损坏时抛出异常并保留日志文件。
+        """
+        with _lock:
+            if not self.journal_path.exists() or self.journal_path.stat().st_size == 0:
+                return 0
+            pending = self.read_journal()
+            if pending:
+                index = self.ensure_index()
+                if index is not None:
+                    tail = self.read_tail(len(pending))
+                    pending = pending[_journal_overlap(tail, pending):]
+                    self._append_in_place(pending, *index)
+                else:
+                    try:
+                        messages = self.read_all()
+                    except ValueError as e:
+                        print(f"加载正式聊天记录失败: {e}")
+                        messages = []
+                    pending = pending[_journal_overlap(messages[-len(pending):], pending):]
+                    self.write_all(messages + pending)
+                self._persisted = None
+            self.journal_path.unlink(missing_ok=True)
+            forget_journal(self.journal_path)
+            return len(pending)
+
+    def load(self) -> list[Any]:
+        """读取完整历史；旧格式文件读取成功后就地迁移为行格式。"""
+        with _lock:
+            messages = self.read_all()
+            if self.path.exists() and self.ensure_index() is None:
+                self.write_all(messages)
+            self.remember(messages)
+            return messages
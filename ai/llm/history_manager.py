@@ -4,12 +4,62 @@ from pathlib import Path
 import json
 import re
 import threading
-
-from core.sprite.chat_history_text import _repair_json_string, parse_assistant_dialog_content
+from dataclasses import dataclass
+
+from ai.llm.history_journal import (
+    JOURNAL_COMPACT_EVERY,
+    HistoryJournal,
+    append_journal_line,
+    forget_journal,
+)
+from ai.vision.message_content import externalize_embedded_images
+from core.sprite.chat_history_text import (
+    _repair_json_string,
+    parse_assistant_dialog_cached,
+    parse_assistant_dialog_content,
+)
 
 # 模块级写锁，保证临时文件写入的线程安全
 _tmp_write_lock = threading.Lock()
 
+# 分页加载时每页的消息条数
+HISTORY_PAGE_SIZE = 50
+
+_ROW_STYLE = "line-height: 135%; letter-spacing: 2px; color:white;"
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    """一页历史：``messages[start:end]`` 及其渲染出的 UI 历史行。"""
+
+    rows: list[str]
+    messages: list[Any]
+    start: int
+    end: int
+    total: int
+
+    @property
+    def has_more(self) -> bool:
+        return self.start > 0
+
+
+def render_message_rows(message) -> list[str]:
+    """单条消息渲染出的 UI 历史行；非 user/assistant 消息没有对应行。"""
+    if message["role"] == 'user':
+        display_content = message.get("display_content") or message.get("content", "")
+        return [f"<p style='{_ROW_STYLE}'><b style='color:white;'>你</b>: {display_content}</p>"]
+    if message['role'] != 'assistant':
+        return []
+    content = message.get('content', '')
+    if not content:
+        return []
+    return [
+        f"<p style='{_ROW_STYLE}'>"
+        f"<b style='color:white;'>{item['character_name']}</b>: "
+        f"{item['speech']}</p>"
+        for item in parse_assistant_dialog_cached(content)
+    ]
+
 
 class HistoryManager:
     _instance: Optional['HistoryManager'] = None
@@ -23,24 +73,36 @@ class HistoryManager:
     def __init__(self, chat_history):
         self.chat_history = chat_history
         self._write_lock = threading.Lock()
+        self._journals: dict[str, HistoryJournal] = {}
 
     @staticmethod
     def _tmp_path(history_file: str) -> Path:
         """正式文件路径 → 临时文件路径 (xxx.json → xxx.json.tmp)"""
         return Path(str(history_file) + ".tmp")
 
+    def _journal(self, history_file: str) -> HistoryJournal:
+        key = str(history_file)
+        journal = self._journals.get(key)
+        if journal is None:
+            journal = self._journals[key] = HistoryJournal(key)
+        return journal
+
     @staticmethod
     def append_message_to_tmp(history_file: str, message: dict) -> None:
-        """增量追加单条消息到临时文件，线程安全。"""
+        """增量追加单条消息到临时文件，线程安全。
+
+        fsync 按批次进行；每追加 ``JOURNAL_COMPACT_EVERY`` 条就把临时文件
+        合并进正式文件，避免长会话崩溃后一次性重放过多记录。
+        """
         if not history_file:
             return
         tmp = HistoryManager._tmp_path(history_file)
         try:
             tmp.parent.mkdir(parents=True, exist_ok=True)
-            line = json.dumps(message, ensure_ascii=False) + ",\n"
             with _tmp_write_lock:
-                with open(tmp, "a", encoding="utf-8") as f:
-                    f.write(line)
+                appended = append_journal_line(tmp, message)
+                if appended >= JOURNAL_COMPACT_EVERY:
+                    HistoryJournal(history_file).compact()
         except Exception:
             pass  # 增量保存失败不应影响聊天
 
@@ -49,7 +111,8 @@ class HistoryManager:
 
     def save_chat_history(self, file_path, history):
         """
-        正常关闭：用传入的完整内存数据全量写入正式文件。
+        正常关闭：用传入的完整内存数据写入正式文件。
+        与上次加载/保存的内容前缀一致时只追加新增消息，否则按行格式全量重写。
         返回 True 表示成功，False 表示失败。
         """
         if not file_path:
@@ -57,9 +120,7 @@ class HistoryManager:
             return True
         history_path = Path(file_path)
         try:
-            history_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(history_path, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=4)
+            self._journal(file_path).save(history)
             print(f"聊天记录已保存到 {history_path}")
             return True
         except Exception as e:
@@ -73,11 +134,12 @@ class HistoryManager:
             return
         tmp = HistoryManager._tmp_path(history_file)
         tmp.unlink(missing_ok=True)
+        forget_journal(tmp)
 
     def load_chat_history(self, file_path):
         """
-        启动时加载：先加载正式 .json，如果有 .tmp 则将其内容追加合并，
-        写回 .json 后删除 .tmp，最后加载合并后的完整文件。
+        启动时加载：先把 .tmp 中未保存的消息追加合并进正式 .json 并删除 .tmp，
+        再加载合并后的完整文件。旧的缩进格式文件会在加载后迁移为行格式。
         """
         if not file_path:
             print("没有提供历史文件名，跳过加载。")
@@ -86,69 +148,80 @@ class HistoryManager:
         messages = []
         history_path = Path(file_path)
         tmp = self._tmp_path(file_path)
+        journal = self._journal(file_path)
+
+        # 1. 如果有 .tmp，把其中未保存的消息追加到正式文件
+        if tmp.exists() and tmp.stat().st_size > 0:
+            print("检测到未保存的临时聊天记录，正在合并...")
+            try:
+                if journal.compact():
+                    print(f"临时记录已合并保存到 {history_path}")
+            except Exception as e:
+                print(f"合并临时聊天记录失败: {e}")
 
-        # 1. 先加载正式 .json（完整历史）
+        # 2. 加载正式 .json（完整历史）
         if history_path.exists():
             try:
-                with open(history_path, 'r', encoding='utf-8') as f:
-                    messages = json.load(f)
+                messages = journal.load()
+                # 旧记录把图片 base64 内嵌在消息里；转存到图片 blob 仓库后立即重写，
+                # 之后的增量保存和加载都只处理摘要
+                if externalize_embedded_images(messages):
+                    journal.write_all(messages)
+                    journal.remember(messages)
                 print(f"聊天记录已从 {history_path} 加载。")
             except Exception as e:
                 print(f"加载正式聊天记录失败: {e}")
                 messages = []
 
-        # 2. 如果有 .tmp，合并其中未保存的消息
-        if tmp.exists() and tmp.stat().st_size > 0:
-            print("检测到未保存的临时聊天记录，正在合并...")
-            try:
-                with open(tmp, 'r', encoding='utf-8') as f:
-                    raw = f.read().strip()
-                if raw:
-                    raw = raw.rstrip(",\n\r")
-                    tmp_messages = json.loads("[" + raw + "]")
-                    # 简单去重：如果 messages 最后一条与 tmp_messages 第一条相同，跳过 tmp 的第一条
-                    if messages and tmp_messages:
-                        if messages[-1] == tmp_messages[0]:
-                            tmp_messages = tmp_messages[1:]
-                    if tmp_messages:
-                        messages.extend(tmp_messages)
-                        # 写回 .json 完成保存
-                        history_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(history_path, 'w', encoding='utf-8') as f:
-                            json.dump(messages, f, ensure_ascii=False, indent=4)
-                        print(f"临时记录已合并保存到 {history_path}")
-                    # 删除 .tmp
-                    tmp.unlink(missing_ok=True)
-            except Exception as e:
-                print(f"合并临时聊天记录失败: {e}")
-
-        # 3. 重建 UI 聊天历史
+        # 3. 重建 UI 聊天历史（assistant 对话解析走共享缓存）
         self.chat_history.clear()
         try:
             for message in messages:
-                if message["role"] == 'user':
-                    display_content = message.get("display_content") or message.get("content", "")
-                    self.chat_history.append(
-                        f"<p style='line-height: 135%; letter-spacing: 2px; color:white;'>"
-                        f"<b style='color:white;'>你</b>: {display_content}</p>"
-                    )
-                if message['role'] == 'assistant':
-                    content = message.get('content', '')
-                    if not content:
-                        continue
-                    dialog = parse_assistant_dialog_content(content)
-                    if not dialog:
-                        continue
-                    for item in dialog:
-                        self.chat_history.append(
-                            f"<p style='line-height: 135%; letter-spacing: 2px; color:white;'>"
-                            f"<b style='color:white;'>{item['character_name']}</b>: "
-                            f"{item['speech']}</p>"
-                        )
+                self.chat_history.extend(render_message_rows(message))
         except Exception as e:
             print("显示聊天历史失败", e)
         return messages
 
+    @staticmethod
+    def _render_page(read_window, total, before, limit) -> HistoryPage:
+        end = total if before is None else max(0, min(int(before), total))
+        start = max(0, end - max(1, int(limit)))
+        window = list(read_window(start, end))
+        rows: list[str] = []
+        for message in window:
+            rows.extend(render_message_rows(message))
+        return HistoryPage(rows=rows, messages=window, start=start, end=end, total=total)
+
+    def history_page(self, messages, *, before=None, limit=HISTORY_PAGE_SIZE) -> HistoryPage:
+        """只渲染 ``messages[before - limit:before]`` 这一窗口的 UI 历史行。
+
+        ``before`` 为 None 时取末尾一页；前端向上滚动时把上一页的 ``start``
+        作为新的 ``before`` 传入。
+        """
+        return self._render_page(
+            lambda start, end: messages[start:end], len(messages), before, limit
+        )
+
+    def load_history_page(self, file_path, *, before=None, limit=HISTORY_PAGE_SIZE) -> HistoryPage:
+        """从历史文件按页读取；行格式文件只解析窗口内的消息。"""
+        if not file_path:
+            return HistoryPage(rows=[], messages=[], start=0, end=0, total=0)
+        journal = self._journal(file_path)
+        return self._render_page(journal.read_range, journal.message_count(), before, limit)
+
+    def load_recent_messages(self, file_path, limit):
+        """借助偏移索引只读取最后 ``limit`` 条消息，不解析整个文件。"""
+        if not file_path:
+            return []
+        return self._journal(file_path).read_tail(int(limit))
+
+    @staticmethod
+    def history_file_present(file_path) -> bool:
+        """正式文件存在且是 JSON 列表；空列表表示已清空，同样视为存在。"""
+        if not file_path:
+            return False
+        return HistoryJournal(file_path).is_present()
+
     def copy_chat_history_to_clipboard(self):
         """Deprecated native-UI hook.
 
@@ -161,9 +234,9 @@ class HistoryManager:
         if not history_file:
             self.chat_history.clear()
             return
-        history_file_path = Path(history_file)
+        journal = self._journal(history_file)
         with self._write_lock:
             self.delete_tmp(history_file)
-            history_file_path.parent.mkdir(parents=True, exist_ok=True)
-            history_file_path.write_text("[]", encoding="utf-8")
+            journal.write_all([])
+            journal.remember([])
             self.chat_history.clear()
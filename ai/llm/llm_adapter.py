@@ -323,6 +323,8 @@ class ClaudeAdapter(LLMAdapter):
 
         # 2. 过滤并转换 user/assistant/tool 消息
         raw_msgs = [m for m in messages if m.get("role") != "system"]
+        # 整个请求共用：多轮重复出现的同一张图片只编码一次
+        encoded_images: dict = {}
 
         for msg in raw_msgs:
             role = msg.get("role")
@@ -357,7 +359,7 @@ class ClaudeAdapter(LLMAdapter):
 
             # 处理 User 消息
             elif role == "user":
-                user_content = normalize_anthropic_user_content(content)
+                user_content = normalize_anthropic_user_content(content, encoded_images)
                 if user_content:
                     api_messages.append({"role": "user", "content": user_content})
 
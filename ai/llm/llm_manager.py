@@ -30,7 +30,13 @@ from ai.llm.message_sanitizer import (
 from ai.tools.tool_executor import ToolExecutor
 from ai.tools.tool_manager import ToolManager
 from sdk.exception.types import HTTP_REASON_UNPAIRED_TOOL_MESSAGES, classify_exception
-from sdk.hooks import BeforeChatContext, MessageAddedContext, PluginHookDispatcher, PluginHookEvent
+from sdk.hooks import (
+    BeforeChatContext,
+    HookSnapshotCache,
+    MessageAddedContext,
+    PluginHookDispatcher,
+    PluginHookEvent,
+)
 from sdk.llm_runtime import get_llm_host_runtime
 from sdk.logging import get_logger
 
@@ -47,6 +53,10 @@ from sdk.tool_registry import set_tool_ready_callback
 set_tool_ready_callback(_on_tool_ready)
 
 FIRST_USER_TURN_TOOL_CALL_LIMIT = 1
+# Above this many active tool schemas, only the most relevant ones are sent.
+MAX_TOOL_DEFINITIONS_PER_REQUEST = 32
+# Groups whose schemas are always sent (search_tools lives here).
+PINNED_TOOL_GROUPS = frozenset({"default"})
 
 @dataclass
 class _ChatTurnState:
@@ -58,6 +68,7 @@ class _ChatTurnState:
     tool_calls_executed: int = 0
     tool_calls_skipped: int = 0
     tool_failures: dict[str, str] = field(default_factory=dict)
+    tool_search_keywords: list[str] = field(default_factory=list)
 
     def tool_budget_exhausted(self) -> bool:
         return (
@@ -241,6 +252,7 @@ class LLMManager:
         max_tool_result_chars: int = 6000,
         max_active_tool_groups: int = 3,
         first_turn_tool_call_limit: int = FIRST_USER_TURN_TOOL_CALL_LIMIT,
+        max_tool_definitions: int = MAX_TOOL_DEFINITIONS_PER_REQUEST,
         generation_config: Optional[Dict[str, Any]] = None,
         history_file: str = "",
         hook_dispatcher: PluginHookDispatcher | None = None,
@@ -253,6 +265,7 @@ class LLMManager:
         self.history_recent_messages = max(1, int(history_recent_messages))
         self.max_tool_result_chars = max(1, int(max_tool_result_chars))
         self.first_turn_tool_call_limit = max(0, int(first_turn_tool_call_limit))
+        self.max_tool_definitions = max(1, int(max_tool_definitions))
         self.compact_manager = CompactManager(
             adapter,
             self.max_context_tokens,
@@ -278,6 +291,9 @@ class LLMManager:
         self._cancel_requested = False
         self._turn_state: Optional[_ChatTurnState] = None
         self._history_file = history_file
+        # Hook snapshots are shared across events until a hook writes to them.
+        self._hook_snapshots = HookSnapshotCache()
+        self._tool_snapshots = HookSnapshotCache()
 
         # 设置日志
         self.logger = logger
@@ -346,8 +362,8 @@ class LLMManager:
             self.hook_dispatcher.dispatch_message_added(
                 MessageAddedContext(
                     role=role,
-                    message=copy.deepcopy(msg),
-                    messages=copy.deepcopy(self.messages),
+                    message=self._hook_snapshots.snapshot(msg),
+                    messages=self._hook_snapshots.snapshot_list(self.messages),
                 )
             )
 
@@ -427,15 +443,15 @@ class LLMManager:
             or not self.hook_dispatcher.has_hooks(PluginHookEvent.BEFORE_CHAT)
         ):
             return BeforeChatContext(
-                messages=self.get_messages(),
+                messages=self.messages,
                 tools=tools_defs,
                 generation_kwargs=generation_kwargs,
                 stream=stream,
             )
 
         context = BeforeChatContext(
-            messages=copy.deepcopy(self.get_messages()),
-            tools=copy.deepcopy(tools_defs) if tools_defs else None,
+            messages=self._hook_snapshots.snapshot_list(self.messages),
+            tools=self._tool_snapshots.snapshot_list(tools_defs) if tools_defs else None,
             generation_kwargs=copy.deepcopy(generation_kwargs),
             stream=stream,
         )
@@ -447,17 +463,20 @@ class LLMManager:
         tools_defs: list[dict] | None,
         messages: list[dict] | None = None,
     ) -> dict[str, int]:
-        messages = self.get_messages() if messages is None else messages
-        system_messages = [m for m in messages if m.get("role") == "system"]
-        history_messages = [m for m in messages if m.get("role") != "system"]
+        messages = self.messages if messages is None else messages
+        ledger = self.compact_manager.token_ledger
+        total_message_tokens = ledger.total(messages)
+        system_prompt_tokens = sum(
+            ledger.message_tokens(m) for m in messages if m.get("role") == "system"
+        )
         tool_definition_tokens = 0
         if tools_defs:
             tool_definition_tokens = self.compact_manager.count_text_tokens(
                 json.dumps(tools_defs, ensure_ascii=False, separators=(",", ":"), default=str)
             )
         estimate = {
-            "system_prompt_tokens": self.compact_manager.count_tokens(system_messages),
-            "history_tokens": self.compact_manager.count_tokens(history_messages),
+            "system_prompt_tokens": system_prompt_tokens,
+            "history_tokens": total_message_tokens - system_prompt_tokens,
             "tool_definition_tokens": tool_definition_tokens,
         }
         estimate["estimated_total_tokens"] = sum(estimate.values())
@@ -547,7 +566,61 @@ class LLMManager:
                     "filtered_tools": [item["name"] for item in filtered],
                 },
             )
-        return available
+        return self._select_relevant_tool_definitions(available)
+
+    def _select_relevant_tool_definitions(self, definitions: list[dict]) -> list[dict]:
+        """Trim an oversized tool list to the schemas most relevant to this turn.
+
+        Pinned groups are always kept; the remaining slots go to the BM25 top-k
+        for the latest user message plus this turn's search_tools keywords, then
+        to unranked tools in their original order. The original order is kept.
+        """
+        limit = self.max_tool_definitions
+        if len(definitions) <= limit:
+            return definitions
+        names = [str(d.get("function", {}).get("name") or "") for d in definitions]
+        keep = {
+            name for name in names
+            if tool_manager.get_tool_group(name) in PINNED_TOOL_GROUPS
+        }
+        candidates = [name for name in names if name not in keep]
+        slots = max(0, limit - len(keep))
+        query = self._tool_relevance_query()
+        ranked = tool_manager.rank_tools(query, candidates, limit=slots) if query else []
+        keep.update(ranked)
+        for name in candidates:
+            if len(keep) >= limit:
+                break
+            keep.add(name)
+        selected = [d for d, name in zip(definitions, names) if name in keep]
+        self.logger.info(
+            "Ranked tool definitions for request",
+            extra={
+                "event": "ai.tools.ranked",
+                "candidate_tool_count": len(definitions),
+                "selected_tool_count": len(selected),
+                "ranked_tool_count": len(ranked),
+            },
+        )
+        return selected
+
+    def _tool_relevance_query(self) -> str:
+        parts: list[str] = []
+        if self._turn_state is not None:
+            parts.extend(self._turn_state.tool_search_keywords)
+        for message in reversed(self.messages):
+            if message.get("role") != "user":
+                continue
+            content = message.get("content")
+            if isinstance(content, list):
+                content = " ".join(
+                    str(part.get("text") or "")
+                    for part in content
+                    if isinstance(part, dict) and part.get("type") == "text"
+                )
+            parts.append(str(content or ""))
+            break
+        return " ".join(part for part in parts if part.strip())
 
     def _log_llm_request_started(
         self,
@@ -564,7 +637,7 @@ class LLMManager:
                 "event": "llm.request.started",
                 "llm_round": round_index,
                 "stream": stream,
-                "message_count": len(self.get_messages()) if message_count is None else message_count,
+                "message_count": len(self.messages) if message_count is None else message_count,
                 "active_tool_groups": list(self._active_tool_groups),
                 "tool_count": len(tools_defs or []),
                 "tool_names": [
@@ -646,6 +719,8 @@ class LLMManager:
             kw = (parsed.get("keyword") or "").strip().lower() if isinstance(parsed, dict) else ""
             if not kw:
                 return
+            if self._turn_state is not None:
+                self._turn_state.tool_search_keywords.append(kw)
             for group in tool_manager.get_groups():
                 if kw in group.lower():
                     self._activate_tool_group(group)
@@ -690,13 +765,19 @@ class LLMManager:
         return True
 
     def get_messages(self):
-        """Returns the current list of messages."""
+        """Returns the current list of messages.
+
+        Hook snapshots only notice replaced messages, so callers that rewrite
+        history should go through :meth:`set_messages` rather than editing
+        nested message content in place.
+        """
         return self.messages
 
     def set_messages(self, new_messages: list):
         """Sets the conversation history to a new list of messages."""
         if isinstance(new_messages, list):
             self.messages = list(new_messages)
+            self._hook_snapshots.invalidate()
             self._strip_orphaned_tool_calls()
             self.messages = self._trim_loaded_history_if_needed(self.messages)
             self.compact_manager.set_token_count(self.compact_manager.count_tokens(self.messages))
@@ -773,7 +854,10 @@ class LLMManager:
 
     def _strip_orphaned_tool_calls(self) -> None:
         """清理不完整的 tool call 对：删孤立的 tool，补缺失的回执。"""
-        strip_orphaned_tool_calls(self.get_messages())
+        before = [id(message) for message in self.messages]
+        strip_orphaned_tool_calls(self.messages)
+        if [id(message) for message in self.messages] != before:
+            self._hook_snapshots.invalidate()
 
     def _recover_request_tool_pairs(self, exc: Exception, messages: list[dict]) -> list[dict] | None:
         error_info = classify_exception(exc)
@@ -869,6 +953,93 @@ class LLMManager:
         )
 
     def _execute_formatted_tool_call(self, call: dict) -> tuple[str, str]:
+        func_name, func_args, skipped = self._prepare_formatted_tool_call(call)
+        if skipped is not None:
+            return func_name, skipped
+        result = self.tool_executor.execute(
+            func_name,
+            func_args,
+            risk_confirm=self._confirm_risky_tool,
+        )
+        return func_name, self._finish_formatted_tool_call(func_name, func_args, result)
+
+    def _execute_formatted_tool_calls(self, calls: list[dict]) -> list[tuple[str, str]]:
+        """Run one round of tool calls, returning ``(name, result)`` in call order.
+
+        Consecutive calls to read-only, low-risk tools from different groups are
+        executed concurrently; any other call is a barrier and runs on its own.
+        Budget, repeated-failure and cooldown checks still happen in call order.
+        """
+        results: list[tuple[str, str]] = []
+        batch: list[dict] = []
+        batch_groups: set[str] = set()
+
+        def flush() -> None:
+            if batch:
+                results.extend(self._execute_tool_call_batch(batch))
+                batch.clear()
+                batch_groups.clear()
+
+        for call in calls:
+            name = call["function"]["name"]
+            if not self._is_concurrent_tool(name):
+                flush()
+                results.extend(self._execute_tool_call_batch([call]))
+                continue
+            group = tool_manager.get_tool_group(name)
+            if group in batch_groups:
+                flush()
+            batch.append(call)
+            batch_groups.add(group)
+        flush()
+        return results
+
+    @staticmethod
+    def _is_concurrent_tool(tool_name: str) -> bool:
+        return (
+            tool_manager.is_read_only(tool_name)
+            and tool_manager.get_tool_risk(tool_name) == "low"
+        )
+
+    def _execute_tool_call_batch(self, calls: list[dict]) -> list[tuple[str, str]]:
+        if len(calls) == 1:
+            try:
+                return [self._execute_formatted_tool_call(calls[0])]
+            except Exception as e:
+                return [self._failed_tool_call(calls[0], e)]
+
+        results: list[tuple[str, str] | None] = [None] * len(calls)
+        pending: list[tuple[int, str, str]] = []
+        for index, call in enumerate(calls):
+            try:
+                func_name, func_args, skipped = self._prepare_formatted_tool_call(call)
+            except Exception as e:
+                results[index] = self._failed_tool_call(call, e)
+                continue
+            if skipped is not None:
+                results[index] = (func_name, skipped)
+            else:
+                pending.append((index, func_name, func_args))
+
+        outputs = self.tool_executor.execute_many(
+            [(func_name, func_args) for _, func_name, func_args in pending],
+            risk_confirm=self._confirm_risky_tool,
+        )
+        for (index, func_name, func_args), output in zip(pending, outputs):
+            try:
+                result = self._finish_formatted_tool_call(func_name, func_args, output)
+            except Exception as e:
+                results[index] = self._failed_tool_call(calls[index], e)
+                continue
+            results[index] = (func_name, result)
+        return [result for result in results if result is not None]
+
+    def _failed_tool_call(self, call: dict, error: Exception) -> tuple[str, str]:
+        self.logger.error(f"Tool execution failed: {error}")
+        return call["function"]["name"], json.dumps({"error": str(error)})
+
+    def _prepare_formatted_tool_call(self, call: dict) -> tuple[str, str, str | None]:
+        """Apply per-turn checks; the third item is a skip result, or None to run."""
         func_name = call["function"]["name"]
         func_args = call["function"]["arguments"]
         if isinstance(func_args, str) and not func_args.strip():
@@ -888,7 +1059,7 @@ class LLMManager:
                     "first_turn_tool_call_limit": state.first_turn_tool_call_limit,
                 },
             )
-            return func_name, result
+            return func_name, func_args, result
 
         if state is not None:
             state.tool_call_attempts += 1
@@ -905,7 +1076,7 @@ class LLMManager:
                         "previous_status": previous_failure,
                     },
                 )
-                return func_name, result
+                return func_name, func_args, result
 
         cooldown_message = self.tool_executor.cooldown_message_for_tool(func_name)
         if cooldown_message is not None:
@@ -921,15 +1092,13 @@ class LLMManager:
                     "reason": "tool_group_in_cooldown",
                 },
             )
-            return func_name, result
+            return func_name, func_args, result
 
         _notify_tool_call_hint(func_name)
-        result = self.tool_executor.execute(
-            func_name,
-            func_args,
-            risk_confirm=self._confirm_risky_tool,
-        )
+        return func_name, func_args, None
 
+    def _finish_formatted_tool_call(self, func_name: str, func_args: str, result: Any) -> str:
+        state = self._turn_state
         if func_name == "search_tools":
             self._activate_tool_group_from_search(func_args)
 
@@ -953,7 +1122,7 @@ class LLMManager:
                 "result_chars": len(result or ""),
             },
         )
-        return func_name, result
+        return result
 
     # llm_manager.py 修正核心片段
 
@@ -1109,13 +1278,8 @@ class LLMManager:
             self.add_message("assistant", collected_content, tool_calls=formatted_calls, **assistant_kw)
 
             # --- 然后添加 Tool 结果消息 ---
-            for call in formatted_calls:
-                try:
-                    func_name, result = self._execute_formatted_tool_call(call)
-                except Exception as e:
-                    self.logger.error(f"Tool execution failed: {e}")
-                    result = json.dumps({"error": str(e)})
-                    func_name = call['function']['name']
+            tool_results = self._execute_formatted_tool_calls(formatted_calls)
+            for call, (func_name, result) in zip(formatted_calls, tool_results):
                 self.add_message("tool", result, tool_call_id=call['id'], name=func_name)
 
             if self._cancel_requested:
@@ -1234,13 +1398,8 @@ class LLMManager:
             # --- 关键：先 Assistant 再 Tool ---
             assistant_sync_kw = _deepseek_reasoning_message_kwargs(self.llm_adapter, reasoning)
             self.add_message("assistant", content, tool_calls=formatted_calls, **assistant_sync_kw)
-            for call in formatted_calls:
-                try:
-                    func_name, result = self._execute_formatted_tool_call(call)
-                except Exception as e:
-                    self.logger.error(f"Tool execution failed: {e}")
-                    result = json.dumps({"error": str(e)})
-                    func_name = call['function']['name']
+            tool_results = self._execute_formatted_tool_calls(formatted_calls)
+            for call, (func_name, result) in zip(formatted_calls, tool_results):
                 self.add_message("tool", result, tool_call_id=call['id'], name=func_name)
 
             if self._cancel_requested:
@@ -12,8 +12,8 @@ from typing import Any
 from ai.memory.chunking import DEFAULT_DIALOGUE_CHUNK_TOKENS
 from ai.memory.extraction import MemoryExtractor
 from ai.memory.operations import memory_search, memory_service_status
-from ai.memory.queue import MemoryWriteQueue
-from core.sprite.chat_history_text import history_payload_to_plain_text, parse_assistant_dialog_content
+from ai.memory.queue import DEFAULT_FLUSH_BATCH_SIZE, DEFAULT_FLUSH_CONCURRENCY, MemoryWriteQueue
+from core.sprite.chat_history_text import history_payload_to_plain_text, parse_assistant_dialog_cached
 from sdk.chat_init import InitChatContext
 from sdk.hooks import BeforeChatContext, MessageAddedContext, PluginHookDispatcher
 
@@ -74,7 +74,7 @@ def _memory_rows(result: dict[str, Any]) -> list[str]:
 
 
 def _dialog_speaker_names(content: Any) -> list[str]:
-    dialog = parse_assistant_dialog_content(content)
+    dialog = parse_assistant_dialog_cached(content)
     names: list[str] = []
     for item in dialog:
         if not isinstance(item, dict):
@@ -297,7 +297,8 @@ class MemoryAutoHooks:
             self._extract_enqueue_and_flush(tail_snapshot, source=f"shutdown:{tail_turn}")
         for worker in self._live_workers():
             worker.join(timeout=max(0.0, wait_timeout))
-        return self.queue.flush()
+        # 退出前不等待退避，尽量把所有待写入记忆落库
+        return self.queue.flush(force=True)
 
     def wait_for_idle(self, timeout: float = 3.0) -> None:
         for worker in self._live_workers():
@@ -319,13 +320,17 @@ class MemoryAutoHooks:
         with self._summary_lock:
             try:
                 extracted = self._extract_memories(messages)
-                for item in extracted:
-                    self.queue.enqueue(
-                        item["memory"],
-                        character_name=item.get("character_name") or self.primary_character_name,
-                        source=source,
-                        confidence=float(item.get("confidence", 1.0)),
-                    )
+                self.queue.enqueue_many(
+                    [
+                        {
+                            "memory": item["memory"],
+                            "character_name": item.get("character_name") or self.primary_character_name,
+                            "confidence": float(item.get("confidence", 1.0)),
+                        }
+                        for item in extracted
+                    ],
+                    source=source,
+                )
                 self.queue.flush()
             except Exception:
                 logger.exception("automatic memory extraction failed")
@@ -389,6 +394,11 @@ def install_memory_hooks(
 ) -> MemoryAutoHooks | None:
     if dispatcher is None or not _env_enabled("SHINSEKAI_MEMORY_AUTO_ENABLED", True):
         return None
+    if queue is None:
+        queue = MemoryWriteQueue(
+            flush_batch_size=_env_int("SHINSEKAI_MEMORY_FLUSH_BATCH_SIZE", DEFAULT_FLUSH_BATCH_SIZE),
+            flush_concurrency=_env_int("SHINSEKAI_MEMORY_FLUSH_CONCURRENCY", DEFAULT_FLUSH_CONCURRENCY),
+        )
     hooks = MemoryAutoHooks(
         llm_adapter=llm_adapter,
         character_names=character_names,
@@ -16,6 +16,7 @@ from ai.memory.extraction import (
     estimate_extraction_input_tokens,
 )
 from ai.memory.operations import memory_remember
+from ai.memory.queue import DEFAULT_FLUSH_CONCURRENCY, remember_concurrently
 from ai.memory.token_estimator import estimate_text_tokens
 from core.sprite.chat_history_text import history_payload_to_turns
 
@@ -235,6 +236,7 @@ def execute_memory_import(
     remember_func: Callable[[str, str | None], dict[str, Any]] = memory_remember,
     progress_callback: ProgressCallback | None = None,
     cancel_callback: CancelCallback | None = None,
+    write_concurrency: int = DEFAULT_FLUSH_CONCURRENCY,
 ) -> dict[str, Any]:
     _report(progress_callback, "parse", 0.02, "正在读取并转换历史消息。")
     prepared = prepare_memory_import(
@@ -268,22 +270,35 @@ def execute_memory_import(
     unique, duplicate_count = deduplicate_memories(extracted)
     saved_count = 0
     stored_duplicate_count = 0
-    for index, item in enumerate(unique, start=1):
-        if cancel_callback is not None:
-            cancel_callback()
-        _report(
-            progress_callback,
-            "write",
-            0.77 + 0.21 * ((index - 1) / max(1, len(unique))),
-            f"正在写入长期记忆（{index}/{len(unique)}）。",
-            None,
-        )
-        result = remember_func(item["memory"], prepared.character_name)
-        _raise_for_remember_failure(result, item["memory"])
-        if isinstance(result, dict) and result.get("duplicate") is True:
-            stored_duplicate_count += 1
-            continue
-        saved_count += 1
+    if cancel_callback is not None:
+        cancel_callback()
+    _report(progress_callback, "write", 0.77, f"正在写入长期记忆（0/{len(unique)}）。", None)
+    # 并发写入：记忆服务按自身吞吐处理，而不是每条记忆等待一次往返
+    writes = remember_concurrently(
+        ((item["memory"], prepared.character_name) for item in unique),
+        remember_func,
+        concurrency=write_concurrency,
+    )
+    try:
+        for done, (index, result, error) in enumerate(writes, start=1):
+            if error is not None:
+                raise error
+            _raise_for_remember_failure(result, unique[index]["memory"])
+            if isinstance(result, dict) and result.get("duplicate") is True:
+                stored_duplicate_count += 1
+            else:
+                saved_count += 1
+            if cancel_callback is not None:
+                cancel_callback()
+            _report(
+                progress_callback,
+                "write",
+                0.77 + 0.21 * (done / max(1, len(unique))),
+                f"正在写入长期记忆（{done}/{len(unique)}）。",
+                None,
+            )
+    finally:
+        writes.close()
 
     _report(progress_callback, "write", 0.99, "长期记忆导入即将完成。")
     return {
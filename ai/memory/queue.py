@@ -1,4 +1,11 @@
-"""Durable write queue for long-term memory saves."""
+"""Durable write queue for long-term memory saves.
+
+Pending items live in a compact JSON snapshot (``pending_queue.json``) plus an
+append-only write-ahead log next to it (``pending_queue.json.wal``). Enqueueing
+appends one line; a flush appends one line listing the saved ids. The log is
+folded back into the snapshot once it grows past ``WAL_COMPACT_RECORDS`` lines
+or the queue drains, so no operation rewrites the whole queue per item.
+"""
 
 from __future__ import annotations
 
@@ -8,14 +15,23 @@ import os
 import threading
 import time
 import uuid
-from dataclasses import asdict, dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator
 
 from ai.memory.operations import memory_remember
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_FLUSH_BATCH_SIZE = 32
+DEFAULT_FLUSH_CONCURRENCY = 4
+WAL_COMPACT_RECORDS = 512
+RETRY_BACKOFF_BASE_SECONDS = 2.0
+RETRY_BACKOFF_MAX_SECONDS = 300.0
+
+RememberFunc = Callable[[str, str | None], dict[str, Any]]
+
 
 class QueuePersistenceError(RuntimeError):
     """Raised when the memory write queue cannot be persisted."""
@@ -37,6 +53,47 @@ def _remember_succeeded(result: Any) -> bool:
     return isinstance(result, dict) and result.get("ok") is True
 
 
+def remember_concurrently(
+    jobs: Iterable[tuple[str, str | None]],
+    remember: RememberFunc,
+    *,
+    concurrency: int = DEFAULT_FLUSH_CONCURRENCY,
+) -> Iterator[tuple[int, Any, BaseException | None]]:
+    """Run ``remember(memory, character_name)`` for each job with bounded parallelism.
+
+    Yields ``(index, result, error)`` as calls complete. At most ``concurrency``
+    calls are in flight; closing the generator cancels the ones not yet started.
+    """
+
+    workers = max(1, int(concurrency))
+    iterator = enumerate(jobs)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="memory-remember")
+    in_flight: dict[Future, int] = {}
+
+    def submit_next() -> bool:
+        try:
+            index, (memory, character_name) = next(iterator)
+        except StopIteration:
+            return False
+        in_flight[executor.submit(remember, memory, character_name)] = index
+        return True
+
+    try:
+        while len(in_flight) < workers and submit_next():
+            pass
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                error = future.exception()
+                yield index, None if error is not None else future.result(), error
+                submit_next()
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def _remember_failure_message(result: Any) -> str:
     if not isinstance(result, dict):
         return f"unexpected remember result: {result!r}"
@@ -55,6 +112,19 @@ class MemoryQueueItem:
     source: str
     confidence: float
     created_at: float
+    # 仅在内存中记录的重试状态，不写入快照
+    attempts: int = field(default=0, repr=False, compare=False)
+    retry_at: float = field(default=0.0, repr=False, compare=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "character_name": self.character_name,
+            "memory": self.memory,
+            "source": self.source,
+            "confidence": self.confidence,
+            "created_at": self.created_at,
+        }
 
     @classmethod
     def from_dict(cls, raw: dict[str, Any]) -> "MemoryQueueItem | None":
@@ -86,12 +156,28 @@ class MemoryWriteQueue:
         self,
         *,
         path: str | Path | None = None,
-        remember_func: Callable[[str, str | None], dict[str, Any]] | None = None,
+        remember_func: RememberFunc | None = None,
+        flush_batch_size: int = DEFAULT_FLUSH_BATCH_SIZE,
+        flush_concurrency: int = DEFAULT_FLUSH_CONCURRENCY,
     ) -> None:
         self.path = Path(path) if path is not None else _default_queue_path()
+        self.wal_path = self.path.with_name(f"{self.path.name}.wal")
         self._remember = remember_func or memory_remember
+        self.flush_batch_size = max(1, int(flush_batch_size))
+        self.flush_concurrency = max(1, int(flush_concurrency))
         self._lock = threading.RLock()
-        self._items: list[MemoryQueueItem] = []
+        self._flush_lock = threading.Lock()
+        self._items: dict[str, MemoryQueueItem] = {}
+        self._keys: dict[str, str] = {}
+        self._wal_records = 0
+        self._metrics = {
+            "flushes": 0,
+            "attempted": 0,
+            "saved": 0,
+            "failed": 0,
+            "deferred": 0,
+            "flush_seconds": 0.0,
+        }
         self._load()
 
     def __len__(self) -> int:
@@ -100,7 +186,19 @@ class MemoryWriteQueue:
 
     def pending(self) -> list[dict[str, Any]]:
         with self._lock:
-            return [asdict(item) for item in self._items]
+            return [item.to_dict() for item in self._items.values()]
+
+    def metrics(self) -> dict[str, Any]:
+        """Cumulative flush counters plus throughput in items per second."""
+
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["pending"] = len(self._items)
+            metrics["wal_records"] = self._wal_records
+        seconds = metrics["flush_seconds"]
+        metrics["flush_seconds"] = round(seconds, 4)
+        metrics["items_per_second"] = round(metrics["saved"] / seconds, 2) if seconds > 0 else 0.0
+        return metrics
 
     def enqueue(
         self,
@@ -110,98 +208,257 @@ class MemoryWriteQueue:
         source: str = "auto",
         confidence: float = 1.0,
     ) -> dict[str, Any]:
-        text = _clean_text(memory)
-        if not text:
-            return {"ok": False, "error": "memory is required"}
-        character = _resolve_character_name(character_name)
-        try:
-            clean_confidence = float(confidence)
-        except (TypeError, ValueError):
-            clean_confidence = 1.0
-        dedupe_key = self._dedupe_key(character, text)
-        with self._lock:
-            for item in self._items:
-                if self._dedupe_key(item.character_name, item.memory) == dedupe_key:
-                    return {"ok": True, "queued": False, "duplicate": True, "id": item.id}
-            item = MemoryQueueItem(
-                id=uuid.uuid4().hex,
-                character_name=character,
-                memory=text,
-                source=_clean_text(source) or "auto",
-                confidence=max(0.0, min(1.0, clean_confidence)),
-                created_at=time.time(),
-            )
-            self._items.append(item)
-            self._save_locked()
-            return {"ok": True, "queued": True, "id": item.id}
-
-    def flush(self, *, limit: int | None = None) -> dict[str, Any]:
-        """Try to persist queued memories through the configured remember function."""
-
-        with self._lock:
-            items = list(self._items if limit is None else self._items[: max(0, int(limit))])
-        if not items:
-            return {"attempted": 0, "saved": 0, "pending": len(self), "errors": []}
+        return self.enqueue_many(
+            [{"memory": memory, "confidence": confidence}],
+            character_name=character_name,
+            source=source,
+        )[0]
 
-        saved_ids: set[str] = set()
-        errors: list[dict[str, str]] = []
-        for item in items:
-            try:
-                result = self._remember(item.memory, item.character_name)
-            except Exception as exc:
-                logger.exception("memory queue flush failed")
-                errors.append({"id": item.id, "error": str(exc)})
-                continue
-            if not _remember_succeeded(result):
-                errors.append({"id": item.id, "error": _remember_failure_message(result)})
-                continue
-            saved_ids.add(item.id)
+    def enqueue_many(
+        self,
+        memories: Iterable[dict[str, Any] | str],
+        *,
+        character_name: str | None = None,
+        source: str = "auto",
+    ) -> list[dict[str, Any]]:
+        """Queue several memories with a single log append; returns one result per input."""
 
+        results: list[dict[str, Any]] = []
+        new_items: list[MemoryQueueItem] = []
+        default_character = _resolve_character_name(character_name)
+        clean_source = _clean_text(source) or "auto"
         with self._lock:
-            if saved_ids:
-                previous_items = list(self._items)
-                self._items = [item for item in self._items if item.id not in saved_ids]
+            for raw in memories:
+                row = raw if isinstance(raw, dict) else {"memory": raw}
+                text = _clean_text(row.get("memory"))
+                if not text:
+                    results.append({"ok": False, "error": "memory is required"})
+                    continue
+                character = _resolve_character_name(row.get("character_name") or default_character)
+                try:
+                    clean_confidence = float(row.get("confidence", 1.0))
+                except (TypeError, ValueError):
+                    clean_confidence = 1.0
+                dedupe_key = self._dedupe_key(character, text)
+                existing = self._keys.get(dedupe_key)
+                if existing is not None:
+                    results.append({"ok": True, "queued": False, "duplicate": True, "id": existing})
+                    continue
+                item = MemoryQueueItem(
+                    id=uuid.uuid4().hex,
+                    character_name=character,
+                    memory=text,
+                    source=clean_source,
+                    confidence=max(0.0, min(1.0, clean_confidence)),
+                    created_at=time.time(),
+                )
+                self._items[item.id] = item
+                self._keys[dedupe_key] = item.id
+                new_items.append(item)
+                results.append({"ok": True, "queued": True, "id": item.id})
+            if new_items:
                 try:
-                    self._save_locked()
+                    self._append_wal_locked([{"op": "add", "item": item.to_dict()} for item in new_items])
                 except QueuePersistenceError:
-                    self._items = previous_items
+                    for item in new_items:
+                        self._forget_locked(item.id)
                     raise
+        return results
+
+    def flush(self, *, limit: int | None = None, force: bool = False) -> dict[str, Any]:
+        """Try to persist queued memories through the configured remember function.
+
+        Items are written in batches of ``flush_batch_size`` with up to
+        ``flush_concurrency`` calls in flight; each batch's successes are logged
+        before the next batch starts. Items that failed recently are skipped
+        until their backoff expires unless ``force`` is set.
+        """
+
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                ready = [item for item in self._items.values() if force or item.retry_at <= now]
+                deferred = len(self._items) - len(ready)
+                items = ready if limit is None else ready[: max(0, int(limit))]
+            if not items:
+                return {"attempted": 0, "saved": 0, "pending": len(self), "errors": [], "deferred": deferred}
+
+            started = time.perf_counter()
+            saved = 0
+            errors: list[dict[str, str]] = []
+            try:
+                for offset in range(0, len(items), self.flush_batch_size):
+                    batch = items[offset: offset + self.flush_batch_size]
+                    saved_ids, batch_errors = self._flush_batch(batch)
+                    errors.extend(batch_errors)
+                    if saved_ids:
+                        self._remove_saved(saved_ids)
+                        saved += len(saved_ids)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._metrics["flushes"] += 1
+                    self._metrics["attempted"] += len(items)
+                    self._metrics["saved"] += saved
+                    self._metrics["failed"] += len(errors)
+                    self._metrics["deferred"] += deferred
+                    self._metrics["flush_seconds"] += elapsed
+            logger.info(
+                "memory queue flushed",
+                extra={
+                    "event": "memory.queue.flushed",
+                    "attempted": len(items),
+                    "saved": saved,
+                    "failed": len(errors),
+                    "elapsed_ms": round(elapsed * 1000, 2),
+                },
+            )
             return {
                 "attempted": len(items),
-                "saved": len(saved_ids),
-                "pending": len(self._items),
+                "saved": saved,
+                "pending": len(self),
                 "errors": errors,
+                "deferred": deferred,
             }
 
+    def _flush_batch(self, batch: list[MemoryQueueItem]) -> tuple[set[str], list[dict[str, str]]]:
+        saved_ids: set[str] = set()
+        failures: dict[int, str] = {}
+        jobs = [(item.memory, item.character_name) for item in batch]
+        for index, result, error in remember_concurrently(
+            jobs, self._remember, concurrency=self.flush_concurrency
+        ):
+            if error is not None:
+                logger.error("memory queue flush failed", exc_info=error)
+                failures[index] = str(error)
+            elif not _remember_succeeded(result):
+                failures[index] = _remember_failure_message(result)
+            else:
+                saved_ids.add(batch[index].id)
+        now = time.monotonic()
+        for index in failures:
+            item = batch[index]
+            item.attempts += 1
+            item.retry_at = now + min(
+                RETRY_BACKOFF_MAX_SECONDS,
+                RETRY_BACKOFF_BASE_SECONDS * 2 ** (item.attempts - 1),
+            )
+        # 错误按队列顺序返回，与串行写入时一致
+        errors = [{"id": batch[index].id, "error": failures[index]} for index in sorted(failures)]
+        return saved_ids, errors
+
+    def _remove_saved(self, saved_ids: set[str]) -> None:
+        with self._lock:
+            removed = [self._items[item_id] for item_id in saved_ids if item_id in self._items]
+            for item in removed:
+                self._forget_locked(item.id)
+            try:
+                if not self._items or self._wal_records + 1 >= WAL_COMPACT_RECORDS:
+                    self._compact_locked()
+                else:
+                    self._append_wal_locked([{"op": "done", "ids": sorted(saved_ids)}])
+            except QueuePersistenceError:
+                for item in removed:
+                    self._items[item.id] = item
+                    self._keys[self._dedupe_key(item.character_name, item.memory)] = item.id
+                self._items = dict(sorted(self._items.items(), key=lambda pair: pair[1].created_at))
+                raise
+
+    def _forget_locked(self, item_id: str) -> None:
+        item = self._items.pop(item_id, None)
+        if item is not None:
+            self._keys.pop(self._dedupe_key(item.character_name, item.memory), None)
+
     def _load(self) -> None:
         with self._lock:
-            self._items = []
-            if not self.path.is_file():
+            self._items = {}
+            self._keys = {}
+            self._wal_records = 0
+            for row in self._snapshot_rows():
+                self._restore_locked(row)
+            if not self.wal_path.is_file():
                 return
             try:
-                raw = json.loads(self.path.read_text(encoding="utf-8"))
-            except (OSError, json.JSONDecodeError):
-                logger.exception("failed to load memory queue")
-                return
-            rows = raw.get("items") if isinstance(raw, dict) else raw
-            if not isinstance(rows, list):
+                data = self.wal_path.read_bytes()
+            except OSError:
+                logger.exception("failed to read memory queue log")
                 return
-            seen: set[str] = set()
-            for row in rows:
-                if not isinstance(row, dict):
-                    continue
-                item = MemoryQueueItem.from_dict(row)
-                if item is None:
+            if data and not data.endswith(b"\n"):
+                # 进程中断时可能留下半行；截掉它，否则下一条追加会粘在残行后面
+                data = data[: data.rfind(b"\n") + 1]
+                try:
+                    with open(self.wal_path, "r+b") as handle:
+                        handle.truncate(len(data))
+                except OSError:
+                    logger.warning("failed to trim memory queue log %s", self.wal_path, exc_info=True)
+            for line in data.splitlines():
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
                     continue
-                key = self._dedupe_key(item.character_name, item.memory)
-                if key in seen:
+                if not isinstance(record, dict):
                     continue
-                seen.add(key)
-                self._items.append(item)
+                self._wal_records += 1
+                if record.get("op") == "add" and isinstance(record.get("item"), dict):
+                    self._restore_locked(record["item"])
+                elif record.get("op") == "done" and isinstance(record.get("ids"), list):
+                    for item_id in record["ids"]:
+                        self._forget_locked(str(item_id))
+
+    def _snapshot_rows(self) -> list[Any]:
+        if not self.path.is_file():
+            return []
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            logger.exception("failed to load memory queue")
+            return []
+        rows = raw.get("items") if isinstance(raw, dict) else raw
+        return rows if isinstance(rows, list) else []
+
+    def _restore_locked(self, row: Any) -> None:
+        if not isinstance(row, dict):
+            return
+        item = MemoryQueueItem.from_dict(row)
+        if item is None or item.id in self._items:
+            return
+        key = self._dedupe_key(item.character_name, item.memory)
+        if key in self._keys:
+            return
+        self._items[item.id] = item
+        self._keys[key] = item.id
+
+    def _append_wal_locked(self, records: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        try:
+            self.wal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.wal_path, "a", encoding="utf-8") as handle:
+                handle.write(data)
+        except OSError as exc:
+            logger.error("failed to append memory queue log %s", self.wal_path, exc_info=True)
+            raise QueuePersistenceError(f"failed to persist memory queue to {self.wal_path}") from exc
+        self._wal_records += len(records)
+        if self._wal_records >= WAL_COMPACT_RECORDS:
+            try:
+                self._compact_locked()
+            except QueuePersistenceError:
+                # 日志已落盘，压缩失败不影响数据，下次再试
+                logger.warning("memory queue compaction deferred", exc_info=True)
+
+    def _compact_locked(self) -> None:
+        """Fold the log into a fresh snapshot, then truncate the log."""
+
+        self._save_locked()
+        try:
+            self.wal_path.unlink(missing_ok=True)
+        except OSError:
+            logger.warning("failed to truncate memory queue log %s", self.wal_path, exc_info=True)
+            return
+        self._wal_records = 0
 
     def _save_locked(self) -> None:
-        payload = {"items": [asdict(item) for item in self._items]}
-        data = json.dumps(payload, ensure_ascii=False, indent=2)
+        payload = {"items": [item.to_dict() for item in self._items.values()]}
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
         tmp_path = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
         try:
             self.path.parent.mkdir(parents=True, exist_ok=True)
@@ -25,6 +25,7 @@ from sdk.tool_registry import tool
 @tool(
     name="file_search",
     group="file",
+    read_only=True,
     description=(
         "Search for files by name pattern or extension in a directory. "
         "pattern: glob like '*.py' or 'report*'. dir_path: directory to search "
@@ -38,6 +39,7 @@ def file_search(pattern: str, dir_path: str = "~") -> dict[str, Any]:
 @tool(
     name="file_list_dir",
     group="file",
+    read_only=True,
     description=(
         "List contents of a directory. path: directory path "
         "(default current working dir). Returns files and subdirectories with sizes."
@@ -50,6 +52,7 @@ def file_list_dir(path: str = ".") -> dict[str, Any]:
 @tool(
     name="file_read",
     group="file",
+    read_only=True,
     description=(
         "Read a text file and return its content. path: file path. "
         "max_chars: max characters to read (default 5000, for preview). "
@@ -73,6 +76,7 @@ def file_read(
 @tool(
     name="file_info",
     group="file",
+    read_only=True,
     description=(
         "Get detailed info about a file or directory: size, modified time, type."
     ),
@@ -93,6 +97,7 @@ def file_open(path: str) -> dict[str, Any]:
 @tool(
     name="file_search_content",
     group="file",
+    read_only=True,
     description=(
         "Search for text inside files. keyword: text to search. "
         "dir_path: directory. file_pattern: optional glob filter like '*.py'. "
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import inspect
 import json
 import logging
 from asyncio.exceptions import CancelledError
+from collections.abc import Callable
 from contextlib import AsyncExitStack
 from typing import Any
 
@@ -15,6 +17,12 @@ from mcp.client.streamable_http import streamablehttp_client
 
 logger = logging.getLogger(__name__)
 
+TOOLS_LIST_CHANGED_METHOD = "notifications/tools/list_changed"
+# 旧版 SDK 的 ClientSession 没有 message_handler，此时收不到 list_changed 通知
+_SESSION_ACCEPTS_MESSAGE_HANDLER = (
+    "message_handler" in inspect.signature(ClientSession.__init__).parameters
+)
+
 
 def _mcp_teardown_exc_is_benign(exc: BaseException) -> bool:
     """SSE/ClientSession 关闭时 anyio 常抛出 CancelledError / ExceptionGroup / cancel scope RuntimeError。"""
@@ -40,11 +48,31 @@ class MCPBridge:
         tools = await bridge.list_tools()
         out = await bridge.call_tool(tools[0].name, {})
         await bridge.close()
+
+    ``on_tools_changed`` 在服务器发出 ``notifications/tools/list_changed`` 时于事件循环线程调用。
     """
 
-    def __init__(self) -> None:
+    def __init__(self, *, on_tools_changed: Callable[[], None] | None = None) -> None:
         self.session: ClientSession | None = None
         self._stack: AsyncExitStack | None = None
+        self._on_tools_changed = on_tools_changed
+
+    def _new_session(self, read: Any, write: Any) -> ClientSession:
+        if self._on_tools_changed is None or not _SESSION_ACCEPTS_MESSAGE_HANDLER:
+            return ClientSession(read, write)
+        return ClientSession(read, write, message_handler=self._handle_message)
+
+    async def _handle_message(self, message: Any) -> None:
+        notification = getattr(message, "root", message)
+        if getattr(notification, "method", None) != TOOLS_LIST_CHANGED_METHOD:
+            return
+        callback = self._on_tools_changed
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception:
+            logger.exception("MCPBridge: tools/list_changed callback failed")
 
     async def _ensure_fresh_stack(self) -> AsyncExitStack:
         await self.close()
@@ -64,7 +92,7 @@ class MCPBridge:
         try:
             transport = sse_client(url=url, headers=headers, **kwargs)
             read, write = await stack.enter_async_context(transport)
-            session_cm = ClientSession(read, write)
+            session_cm = self._new_session(read, write)
             self.session = await stack.enter_async_context(session_cm)
             await self.session.initialize()
         except (Exception, CancelledError):
@@ -85,7 +113,7 @@ class MCPBridge:
             )
             transport = stdio_client(params)
             read, write = await stack.enter_async_context(transport)
-            session_cm = ClientSession(read, write)
+            session_cm = self._new_session(read, write)
             self.session = await stack.enter_async_context(session_cm)
             await self.session.initialize()
         except (Exception, CancelledError):
@@ -102,7 +130,7 @@ class MCPBridge:
         try:
             transport = streamablehttp_client(url=url, headers=headers)
             read, write, _ = await stack.enter_async_context(transport)
-            session_cm = ClientSession(read, write)
+            session_cm = self._new_session(read, write)
             self.session = await stack.enter_async_context(session_cm)
             await self.session.initialize()
         except (Exception, CancelledError):
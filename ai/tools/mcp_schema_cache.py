@@ -0,0 +1,110 @@
+"""MCP 工具清单的持久化缓存：按服务器连接配置的哈希索引，带版本号。
+
+配置不变时启动直接用缓存注册工具，不必等 stdio 子进程握手；服务器发出
+``notifications/tools/list_changed`` 或重新连接后发现清单变化时再覆盖。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MCP_SCHEMA_CACHE_PATH = Path(".cache") / "mcp-tool-schemas.json"
+# 文件格式版本；结构不兼容时整体丢弃旧缓存
+_CACHE_FORMAT = 1
+# 只有这些字段决定服务器返回的工具清单；prefix / group / timeout 只影响注册方式
+_KEY_FIELDS = ("transport", "url", "headers", "command", "args", "env")
+
+
+def server_cache_key(entry: dict[str, Any]) -> str:
+    """由连接参数派生的稳定键（sha256）；header / env 中的密钥只以哈希形式落盘。"""
+    material = {field: entry.get(field) for field in _KEY_FIELDS}
+    encoded = json.dumps(
+        material, sort_keys=True, ensure_ascii=False, default=str
+    ).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class MCPSchemaCache:
+    """线程安全的 JSON 文件缓存：``{key: {"version", "savedAt", "tools"}}``。"""
+
+    def __init__(self, path: Path = MCP_SCHEMA_CACHE_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return None
+            return [dict(tool) for tool in entry["tools"]]
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            entry = self._load().get(key)
+            return int(entry["version"]) if entry is not None else 0
+
+    def put(self, key: str, tools: list[dict[str, Any]]) -> int:
+        """写入清单并返回其版本号；内容未变时不改版本、不写盘。"""
+        with self._lock:
+            entries = self._load()
+            previous = entries.get(key)
+            if previous is not None and previous["tools"] == tools:
+                return int(previous["version"])
+            version = int(previous["version"]) + 1 if previous is not None else 1
+            entries[key] = {
+                "version": version,
+                "savedAt": time.time(),
+                "tools": [dict(tool) for tool in tools],
+            }
+            self._save(entries)
+            return version
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._save(entries)
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is not None:
+            return self._entries
+        entries: dict[str, dict[str, Any]] = {}
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raw = None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable MCP schema cache: %s", self.path)
+            raw = None
+        if isinstance(raw, dict) and raw.get("format") == _CACHE_FORMAT:
+            for key, entry in (raw.get("servers") or {}).items():
+                if (
+                    isinstance(entry, dict)
+                    and isinstance(entry.get("tools"), list)
+                    and isinstance(entry.get("version"), int)
+                ):
+                    entries[str(key)] = entry
+        self._entries = entries
+        return entries
+
+    def _save(self, entries: dict[str, dict[str, Any]]) -> None:
+        payload = {"format": _CACHE_FORMAT, "servers": entries}
+        temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp, self.path)
+        except OSError:
+            # 缓存只是加速手段，写失败时下次启动照常握手
+            logger.warning("Failed to write MCP schema cache: %s", self.path)
+            temp.unlink(missing_ok=True)
@@ -2,6 +2,10 @@
 
 LLM 通过 :meth:`~ai.tools.tool_manager.ToolManager.execute` 同步调用工具，故在独立线程中运行
 ``MCPBridge`` 所属的事件循环，并用 :func:`asyncio.run_coroutine_threadsafe` 转发 ``call_tool``。
+
+每台服务器对应一个 :class:`_MCPServerPool`：持有 1..N 个会话，允许多个调用同时在途；
+工具清单按连接配置哈希缓存在 ``.cache/mcp-tool-schemas.json``，命中时启动不握手，
+首次调用时才连接并校验清单。
 """
 
 from __future__ import annotations
@@ -9,6 +13,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import threading
+import time
 import concurrent.futures
 from collections.abc import Callable, Coroutine
 from pathlib import Path
@@ -18,6 +23,7 @@ from config.mcp_config import (
     DEFAULT_MCP_CONFIG_PATH as _DEFAULT_CONFIG_PATH,
     read_mcp_config,
 )
+from ai.tools.mcp_schema_cache import MCPSchemaCache, server_cache_key
 from ai.tools.tool_manager import ToolManager
 
 logger = logging.getLogger(__name__)
@@ -29,7 +35,12 @@ _registered_mcp_full_names: list[str] = []
 _mcp_loop: asyncio.AbstractEventLoop | None = None
 _mcp_thread: threading.Thread | None = None
 _loop_lock = threading.Lock()
-_active_bridges: list[Any] = []
+_active_servers: list[_MCPServerPool] = []
+
+# 单个会话上允许同时在途的 tools/call 数（JSON-RPC 按 id 匹配响应，无需串行）
+DEFAULT_MAX_CONCURRENT_CALLS = 8
+
+_schema_cache_instance: MCPSchemaCache | None = None
 
 # MCPBridge 使用 AsyncExitStack + mcp SSE 内部的 anyio TaskGroup；CancelScope 必须在「进入时的同一
 # asyncio 任务」里退出。注册结束后若用 run_coroutine_threadsafe 再起新任务去 close，会触发
@@ -161,17 +172,13 @@ def _normalize_env(raw: Any) -> dict[str, str] | None:
 
 async def _async_close_all_bridges() -> None:
     # 后进先关，减轻 anyio CancelScope 在首条连接 teardown 后的栈错位；中间让出事件循环。
-    for b in reversed(list(_active_bridges)):
-        try:
-            await b.close()
-        except Exception:
-            logger.exception("MCP bridge close")
-        await asyncio.sleep(0)
-    _active_bridges.clear()
+    for server in reversed(list(_active_servers)):
+        await server.close()
+    _active_servers.clear()
 
 
 def close_all_mcp_bridges_sync(*, timeout: float = 60.0) -> None:
-    if not _active_bridges:
+    if not _active_servers:
         return
     try:
 
@@ -268,21 +275,41 @@ def preview_mcp_tools_from_config(
     return run_mcp_coro(_async_probe_tools(servers), timeout=timeout)
 
 
-async def _register_one_server(
-    tm: ToolManager,
+def _schema_cache() -> MCPSchemaCache:
+    global _schema_cache_instance
+    if _schema_cache_instance is None:
+        _schema_cache_instance = MCPSchemaCache()
+    return _schema_cache_instance
+
+
+def _positive_int(raw: Any, default: int) -> int:
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def _tool_dicts_from(tools_raw: list[Any]) -> list[dict[str, Any]]:
+    tool_dicts: list[dict[str, Any]] = []
+    for t in tools_raw:
+        try:
+            tool_dicts.append(_mcp_tool_to_dict(t))
+        except Exception:
+            logger.exception("Skip MCP tool (serialize failed): %r", t)
+    return tool_dicts
+
+
+async def _connect_bridge(
     entry: dict[str, Any],
     *,
-    default_timeout: float,
-) -> None:
+    on_tools_changed: Callable[[], None] | None = None,
+) -> Any:
+    """按配置建立一个已初始化的 MCPBridge（必须在 owner 任务上调用）。"""
     from ai.tools.mcp_bridge import MCPBridge
 
-    if entry.get("enabled") is False:
-        return
     transport = str(entry.get("transport") or "").strip().lower()
-    name_prefix = str(entry.get("name_prefix") or "").strip()
-    timeout = float(entry.get("call_timeout", default_timeout))
-
-    bridge = MCPBridge()
+    bridge = MCPBridge(on_tools_changed=on_tools_changed)
     if transport == "sse":
         url = str(entry.get("url") or "").strip()
         if not url:
@@ -309,53 +336,272 @@ async def _register_one_server(
         await bridge.connect_stdio(command, args, env)
     else:
         raise ValueError(f"Unknown MCP transport: {transport!r}")
+    return bridge
+
+
+class _MCPServerPool:
+    """一台 MCP 服务器的会话池、已注册工具与延迟统计。
+
+    会话的建立与关闭只在 owner 任务上进行；``tools/call`` 与 ``tools/list`` 则作为普通任务
+    派发到 MCP 事件循环，多个调用可同时在途，由信号量限制每台服务器的并发上限，
+    并分配给在途数最少的会话。
+    """
+
+    def __init__(
+        self,
+        tm: ToolManager,
+        entry: dict[str, Any],
+        *,
+        default_timeout: float,
+        cache: MCPSchemaCache,
+    ) -> None:
+        self.tm = tm
+        self.entry = entry
+        self.transport = str(entry.get("transport") or "").strip().lower()
+        self.name_prefix = str(entry.get("name_prefix") or "").strip()
+        self.group = str(entry.get("group") or "mcp").strip()
+        self.timeout = float(entry.get("call_timeout", default_timeout))
+        self.size = _positive_int(entry.get("sessions"), 1)
+        self.max_in_flight = _positive_int(
+            entry.get("max_concurrent_calls"), DEFAULT_MAX_CONCURRENT_CALLS
+        )
+        self.cache = cache
+        self.cache_key = server_cache_key(entry)
+        self.bridges: list[Any] = []
+        self.tool_names: list[str] = []
+        self._tool_dicts: list[dict[str, Any]] = []
+        self._in_flight: list[int] = []
+        self._semaphore: asyncio.Semaphore | None = None
+        self._connect_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._verify_on_connect = False
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._schema_source = "server"
+        self._schema_version = 0
+        self._connect_ms: float | None = None
+        self._list_ms: float | None = None
+        self._calls = 0
+        self._errors = 0
+        self._call_ms_total = 0.0
+        self._last_call_ms: float | None = None
+        self._max_call_ms = 0.0
+        self._list_changed = 0
+
+    @property
+    def label(self) -> str:
+        return (
+            self.name_prefix
+            or str(self.entry.get("url") or self.entry.get("command") or "").strip()
+        )
 
-    tools_raw = await bridge.list_tools()
-    tool_dicts: list[dict[str, Any]] = []
-    for t in tools_raw:
+    # ── 连接与工具清单（owner 任务 / MCP 事件循环）──────────────────────
+
+    async def connect(self) -> None:
+        if self.bridges:
+            return
+        started = time.perf_counter()
+        bridges: list[Any] = []
         try:
-            tool_dicts.append(_mcp_tool_to_dict(t))
-        except Exception:
-            logger.exception("Skip MCP tool (serialize failed): %r", t)
+            for _ in range(self.size):
+                bridges.append(
+                    await _connect_bridge(
+                        self.entry, on_tools_changed=self._tools_changed
+                    )
+                )
+        except BaseException:
+            for bridge in reversed(bridges):
+                await _close_bridge(bridge)
+            raise
+        self.bridges = bridges
+        self._in_flight = [0] * len(bridges)
+        self._connect_ms = _elapsed_ms(started)
+        if self._verify_on_connect:
+            # 用缓存注册过的服务器：连上后核对一次清单，服务器升级过就改为新清单
+            self._verify_on_connect = False
+            await self.refresh_tools()
+
+    async def refresh_tools(self) -> bool:
+        """重新拉取清单、写缓存，清单有变化时重新注册；返回是否变化。"""
+        started = time.perf_counter()
+        tool_dicts = _tool_dicts_from(await self.bridges[0].list_tools())
+        self._list_ms = _elapsed_ms(started)
+        self._schema_version = self.cache.put(self.cache_key, tool_dicts)
+        if tool_dicts == self._tool_dicts:
+            return False
+        self._schema_source = "server"
+        self.register(tool_dicts)
+        return True
+
+    def use_cached_tools(self, tool_dicts: list[dict[str, Any]]) -> None:
+        self._schema_source = "cache"
+        self._schema_version = self.cache.version(self.cache_key)
+        self._verify_on_connect = True
+        self.register(tool_dicts)
+
+    def register(self, tool_dicts: list[dict[str, Any]]) -> None:
+        # 在 MCP 事件循环线程上运行，对话可能正在读取工具表；替换交给
+        # ToolManager 在锁内一次完成
+        names = self.tm.replace_mcp_tools(
+            self.name_prefix,
+            tool_dicts,
+            invoke=self.invoke,
+            replaces=self.tool_names,
+            group=self.group,
+        )
+        for stale in set(self.tool_names) - set(names):
+            if stale in _registered_mcp_full_names:
+                _registered_mcp_full_names.remove(stale)
+        for name in names:
+            if name not in self.tool_names:
+                _registered_mcp_full_names.append(name)
+        self.tool_names = names
+        self._tool_dicts = tool_dicts
+
+    def _tools_changed(self) -> None:
+        # 在 MCP 事件循环线程上被调用；不能在通知回调里等待 list_tools，另起任务刷新
+        self._list_changed += 1
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(
+            self._refresh_after_change()
+        )
 
-    _active_bridges.append(bridge)
+    async def _refresh_after_change(self) -> None:
+        try:
+            await self.refresh_tools()
+        except Exception:
+            logger.exception("MCP tools/list_changed refresh failed: %s", self.label)
+            self.cache.invalidate(self.cache_key)
 
-    def _invoke(registered_name: str, arguments: dict[str, Any]) -> dict[str, Any]:
-        if name_prefix and not registered_name.startswith(name_prefix):
-            raise ValueError(
-                f"Tool {registered_name!r} does not match prefix {name_prefix!r}"
-            )
-        short = registered_name[len(name_prefix) :] if name_prefix else registered_name
+    async def close(self) -> None:
+        bridges, self.bridges = self.bridges, []
+        self._in_flight = []
+        for bridge in reversed(bridges):
+            await _close_bridge(bridge)
 
-        def _make_call() -> Coroutine[Any, Any, str]:
-            async def _do() -> str:
-                return await bridge.call_tool(short, arguments or {})
+    # ── 调用（任意线程）────────────────────────────────────────────────
 
-            return _do()
+    def ensure_connected(self) -> None:
+        if self.bridges:
+            return
+        with self._connect_lock:
+            if not self.bridges:
+                run_mcp_coro_on_bridge_owner(self.connect, timeout=self.timeout)
 
+    def invoke(self, registered_name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        if self.name_prefix and not registered_name.startswith(self.name_prefix):
+            raise ValueError(
+                f"Tool {registered_name!r} does not match prefix {self.name_prefix!r}"
+            )
+        short = (
+            registered_name[len(self.name_prefix) :]
+            if self.name_prefix
+            else registered_name
+        )
+        started = time.perf_counter()
         try:
-            text = run_mcp_coro_on_bridge_owner(_make_call, timeout=timeout)
+            self.ensure_connected()
+            text = run_mcp_coro(self._call(short, arguments or {}), timeout=self.timeout)
         except Exception as exc:
             logger.exception("MCP call_tool failed: %s", short)
+            self._record_call(started, failed=True)
             return {"error": str(exc), "tool": short}
+        self._record_call(started, failed=False)
         return {"result": text}
 
-    grp = str(entry.get("group") or "mcp").strip()
-    tm.register_mcp_tools(
-        tool_dicts,
-        invoke=_invoke,
-        name_prefix=name_prefix,
-        group=grp,
+    async def _call(self, short: str, arguments: dict[str, Any]) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            if not self.bridges:
+                raise RuntimeError(f"MCP server {self.label!r} is closed")
+            index = min(range(len(self.bridges)), key=self._in_flight.__getitem__)
+            bridge = self.bridges[index]
+            self._in_flight[index] += 1
+            try:
+                return await bridge.call_tool(short, arguments)
+            finally:
+                if index < len(self._in_flight):
+                    self._in_flight[index] -= 1
+
+    def _record_call(self, started: float, *, failed: bool) -> None:
+        elapsed = _elapsed_ms(started)
+        with self._stats_lock:
+            self._calls += 1
+            self._errors += int(failed)
+            self._call_ms_total += elapsed
+            self._last_call_ms = elapsed
+            self._max_call_ms = max(self._max_call_ms, elapsed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            calls = self._calls
+            return {
+                "avgCallMs": round(self._call_ms_total / calls, 2) if calls else None,
+                "calls": calls,
+                "connectMs": self._connect_ms,
+                "connected": bool(self.bridges),
+                "errors": self._errors,
+                "group": self.group,
+                "inFlight": sum(self._in_flight),
+                "lastCallMs": self._last_call_ms,
+                "listChanged": self._list_changed,
+                "listMs": self._list_ms,
+                "maxCallMs": round(self._max_call_ms, 2),
+                "name": self.label,
+                "schemaSource": self._schema_source,
+                "schemaVersion": self._schema_version,
+                "sessions": len(self.bridges),
+                "toolCount": len(self.tool_names),
+                "transport": self.transport,
+            }
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+async def _close_bridge(bridge: Any) -> None:
+    try:
+        await bridge.close()
+    except Exception:
+        logger.exception("MCP bridge close")
+    await asyncio.sleep(0)
+
+
+def mcp_server_stats() -> list[dict[str, Any]]:
+    """每台已注册 MCP 服务器的会话数、清单来源与调用延迟。"""
+    return [server.stats() for server in list(_active_servers)]
+
+
+async def _register_one_server(
+    tm: ToolManager,
+    entry: dict[str, Any],
+    *,
+    default_timeout: float,
+) -> None:
+    if entry.get("enabled") is False:
+        return
+    server = _MCPServerPool(
+        tm, entry, default_timeout=default_timeout, cache=_schema_cache()
     )
-    for td in tool_dicts:
-        n = td.get("name")
-        if isinstance(n, str) and n.strip():
-            _registered_mcp_full_names.append(f"{name_prefix}{n.strip()}")
+    cached = server.cache.get(server.cache_key)
+    if cached is not None:
+        server.use_cached_tools(cached)
+    else:
+        await server.connect()
+        try:
+            await server.refresh_tools()
+        except BaseException:
+            await server.close()
+            raise
+    _active_servers.append(server)
     logger.info(
-        "Registered %d MCP tools (transport=%s, prefix=%r)",
-        len(tool_dicts),
-        transport,
-        name_prefix,
+        "Registered %d MCP tools (transport=%s, prefix=%r, schema=%s)",
+        len(server.tool_names),
+        server.transport,
+        server.name_prefix,
+        server.stats()["schemaSource"],
     )
 
 
@@ -408,8 +654,7 @@ def reload_mcp_tools_from_config(
     config_path: Path | None = None,
 ) -> None:
     global _registered_mcp_full_names
-    for name in list(_registered_mcp_full_names):
-        tm._drop_tool(name)
+    tm.unregister_tools(list(_registered_mcp_full_names))
     _registered_mcp_full_names.clear()
     try:
         close_all_mcp_bridges_sync()
@@ -29,6 +29,7 @@ __all__ = [
 @tool(
     name="memory_search",
     group="memory",
+    read_only=True,
     description=(
         "Search YOUR memory. "
         "character_name: YOUR OWN full name from dialog (the character who is speaking). "
@@ -13,7 +13,7 @@ from types import MappingProxyType
 from typing import Any
 
 from core.story import SignalStrength, SpeechAct, StoryProgram
-from sdk.tool_registry import iter_registered_tools, tool
+from sdk.tool_registry import is_read_only_tool, iter_registered_tools, tool
 
 STORY_TOOL_GROUP = "story"
 
@@ -201,6 +201,7 @@ def ensure_story_tools_registered(tool_manager: Any | None = None) -> Any:
             description=description,
             group=group,
             risk=risk or "low",
+            read_only=is_read_only_tool(fn),
         )
     return manager
 
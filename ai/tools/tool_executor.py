@@ -7,9 +7,10 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutTimeoutError
-from typing import Callable
+from typing import Callable, Sequence
 
 from sdk.tool_registry import ToolNotReady
 from ai.tools.tool_manager import ToolManager
@@ -56,6 +57,10 @@ class ToolExecutor:
         self._pool = ThreadPoolExecutor(
             max_workers=4, thread_name_prefix="tool-exec"
         )
+        # execute_many 的调度线程：每个线程阻塞在 execute() 上等待 _pool，
+        # 不能与 _pool 共用，否则并发批次会占满 _pool 导致互相等待
+        self._dispatch_pool: ThreadPoolExecutor | None = None
+        self._dispatch_lock = threading.Lock()
 
     # ── public API ──────────────────────────────────────────────────────
 
@@ -148,6 +153,39 @@ class ToolExecutor:
 
         return result
 
+    def execute_many(
+        self,
+        calls: Sequence[tuple[str, str]],
+        *,
+        risk_confirm: Callable[[str, str, str], bool] | None = None,
+    ) -> list[str]:
+        """并发执行一批互不依赖的工具调用，结果按 ``calls`` 的顺序返回。
+
+        每个调用仍走 :meth:`execute` 的超时 / 冷却 / 风险确认流程；
+        调用方负责保证批内工具是只读的、彼此之间没有顺序要求。
+        """
+        if len(calls) <= 1:
+            return [
+                self.execute(name, arguments_json, risk_confirm=risk_confirm)
+                for name, arguments_json in calls
+            ]
+        pool = self._get_dispatch_pool()
+        futures = [
+            pool.submit(self.execute, name, arguments_json, risk_confirm=risk_confirm)
+            for name, arguments_json in calls
+        ]
+        results: list[str] = []
+        for (name, _), fut in zip(calls, futures):
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                logger.exception("Tool '%s' unexpected error", name)
+                results.append(json.dumps(
+                    {"error": f"Tool '{name}' failed: {e}"},
+                    ensure_ascii=False,
+                ))
+        return results
+
     def set_group_cooldown(self, group: str, seconds: float) -> None:
         """手动为一个工具组设置冷却时长。"""
         self._cooldown_map[group] = float(seconds)
@@ -168,9 +206,19 @@ class ToolExecutor:
 
     def shutdown(self) -> None:
         self._pool.shutdown(wait=False)
+        if self._dispatch_pool is not None:
+            self._dispatch_pool.shutdown(wait=False)
 
     # ── internal ────────────────────────────────────────────────────────
 
+    def _get_dispatch_pool(self) -> ThreadPoolExecutor:
+        with self._dispatch_lock:
+            if self._dispatch_pool is None:
+                self._dispatch_pool = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix="tool-dispatch"
+                )
+            return self._dispatch_pool
+
     def _is_in_cooldown(self, group: str) -> bool:
         """检查时间戳是否仍在冷却期内（不生成消息）。"""
         until = self._cooldowns.get(group, 0.0)
@@ -0,0 +1,179 @@
+"""Inverted index with BM25 ranking over registered tool definitions."""
+
+from __future__ import annotations
+
+import bisect
+import math
+import re
+from collections import Counter
+from typing import Iterable
+
+# Name tokens count twice: a query word that names the tool beats a passing
+# mention in some other tool's description.
+NAME_FIELD_WEIGHT = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_CAMEL_BOUNDARY_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+# Hiragana/katakana, CJK extension A, CJK unified, compatibility ideographs, hangul
+_CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(rf"[a-z0-9]+|[{_CJK_RANGES}]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase ASCII words plus overlapping bigrams for CJK runs.
+
+    ``get_character_info`` and ``getCharacterInfo`` both yield
+    ``["get", "character", "info"]``; ``查询天气`` yields ``["查询", "询天", "天气"]``.
+    A one-character CJK run is kept as a unigram.
+    """
+    tokens: list[str] = []
+    for match in _TOKEN_RE.finditer(_CAMEL_BOUNDARY_RE.sub(" ", text or "").lower()):
+        word = match.group()
+        if word.isascii() or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class ToolSearchIndex:
+    """Postings, document lengths and group facets, updated per tool.
+
+    ``add``/``remove`` touch only the postings of the affected tool's terms,
+    so registering one more MCP server does not rebuild the whole catalog.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, int]] = {}
+        self._doc_terms: dict[str, Counter[str]] = {}
+        self._doc_groups: dict[str, str] = {}
+        self._doc_descriptions: dict[str, str] = {}
+        self._doc_lengths: dict[str, int] = {}
+        self._group_counts: Counter[str] = Counter()
+        self._total_length = 0
+        self._vocabulary: list[str] | None = []
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, tool_name: object) -> bool:
+        return tool_name in self._doc_terms
+
+    def add(self, tool_name: str, *, group: str, description: str) -> None:
+        self.remove(tool_name)
+        terms: Counter[str] = Counter()
+        for token in tokenize(tool_name):
+            terms[token] += NAME_FIELD_WEIGHT
+        terms.update(tokenize(group))
+        terms.update(tokenize(description))
+        for term, count in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary = None
+            postings[tool_name] = count
+        self._doc_terms[tool_name] = terms
+        self._doc_groups[tool_name] = group
+        self._doc_descriptions[tool_name] = description
+        self._group_counts[group] += 1
+        self._doc_lengths[tool_name] = length = sum(terms.values())
+        self._total_length += length
+
+    def remove(self, tool_name: str) -> None:
+        terms = self._doc_terms.pop(tool_name, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(tool_name, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+        group = self._doc_groups.pop(tool_name)
+        self._doc_descriptions.pop(tool_name)
+        self._group_counts[group] -= 1
+        if self._group_counts[group] <= 0:
+            del self._group_counts[group]
+        self._total_length -= self._doc_lengths.pop(tool_name)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_groups.clear()
+        self._doc_descriptions.clear()
+        self._doc_lengths.clear()
+        self._group_counts.clear()
+        self._total_length = 0
+        self._vocabulary = []
+
+    def description(self, tool_name: str) -> str:
+        return self._doc_descriptions[tool_name]
+
+    def group_counts(self) -> dict[str, int]:
+        return dict(self._group_counts)
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int | None = None,
+        candidates: Iterable[str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Rank tools for ``query``; best first, ties broken by name.
+
+        A query term missing from the vocabulary matches every indexed term it
+        prefixes (``mem`` finds ``memory``), scored at its own IDF.
+        ``candidates`` restricts scoring to the given tool names.
+        """
+        allowed = set(candidates) if candidates is not None else None
+        doc_count = len(self._doc_terms)
+        if not doc_count:
+            return []
+        average_length = self._total_length / doc_count
+        scores: dict[str, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            for indexed in self._expand(term):
+                postings = self._postings[indexed]
+                frequency = len(postings)
+                idf = math.log(1 + (doc_count - frequency + 0.5) / (frequency + 0.5))
+                for tool_name, count in postings.items():
+                    if allowed is not None and tool_name not in allowed:
+                        continue
+                    length = self._doc_lengths[tool_name]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[tool_name] = scores.get(tool_name, 0.0) + idf * (
+                        count * (BM25_K1 + 1) / (count + norm)
+                    )
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[: max(0, limit)]
+
+    def substring_matches(self, query: str) -> list[str]:
+        """Tools whose name or description contains ``query`` (or whose group is it).
+
+        Catches partial words the token index cannot (``shot`` in
+        ``screenshot``); results are in registration order.
+        """
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        return [
+            tool_name
+            for tool_name in self._doc_terms
+            if needle in tool_name.lower()
+            or needle in self._doc_descriptions[tool_name].lower()
+            or needle == self._doc_groups[tool_name].lower()
+        ]
+
+    def _expand(self, term: str) -> list[str]:
+        if term in self._postings:
+            return [term]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        matches: list[str] = []
+        for position in range(bisect.bisect_left(vocabulary, term), len(vocabulary)):
+            if not vocabulary[position].startswith(term):
+                break
+            matches.append(vocabulary[position])
+        return matches
@@ -3,8 +3,10 @@
 import functools
 import inspect
 import json
-from typing import Any, Callable, Dict, List
+import threading
+from typing import Any, Callable, Dict, Iterable, List
 
+from ai.tools.tool_index import ToolSearchIndex
 from sdk.logging import get_logger
 from sdk.tool_registry import ToolNotReady
 
@@ -35,10 +37,16 @@ class ToolManager:
         self._functions: Dict[str, Callable[..., Any]] = {}
         self._tool_groups: Dict[str, str] = {}  # tool_name -> group
         self._tool_risks: Dict[str, str] = {}   # tool_name -> risk (low/medium/high)
+        self._read_only_tools: set[str] = set()  # 可与同轮其他只读调用并发
+        self._search_index = ToolSearchIndex()  # 名称 / 说明 / 分组的倒排索引
+        # 注册表的读写锁：MCP 事件循环线程会在对话进行中替换工具，
+        # 与 LLM 线程及并发的只读工具线程同时访问定义表和索引
+        self._lock = threading.RLock()
         self.logger = get_logger(__name__)
         self._initialized = True
 
     def _drop_tool(self, tool_name: str) -> None:
+        # 调用方持有 self._lock
         self._tools_definitions = [
             d
             for d in self._tools_definitions
@@ -47,6 +55,51 @@ class ToolManager:
         self._functions.pop(tool_name, None)
         self._tool_groups.pop(tool_name, None)
         self._tool_risks.pop(tool_name, None)
+        self._read_only_tools.discard(tool_name)
+        self._search_index.remove(tool_name)
+
+    def _index(self) -> ToolSearchIndex:
+        return self._search_index
+
+    def reset(self) -> None:
+        """注销全部工具（含搜索索引）；供测试与整体重新加载使用。"""
+        with self._lock:
+            self._tools_definitions = []
+            self._functions.clear()
+            self._tool_groups.clear()
+            self._tool_risks.clear()
+            self._read_only_tools.clear()
+            self._search_index.clear()
+
+    def unregister_tools(self, tool_names: Iterable[str]) -> None:
+        """注销给定名称的工具；不存在的名称忽略。"""
+        with self._lock:
+            for tool_name in tool_names:
+                self._drop_tool(tool_name)
+
+    def replace_mcp_tools(
+        self,
+        name_prefix: str,
+        tools: List[Dict[str, Any]],
+        *,
+        invoke: Callable[[str, Dict[str, Any]], Any],
+        replaces: Iterable[str] = (),
+        group: str = "mcp",
+    ) -> List[str]:
+        """原子地把一台 MCP 服务器的工具换成新清单，返回注册后的工具名。
+
+        ``replaces`` 是该服务器此前注册的工具名，其中不在新清单里的会被注销。
+        整个替换在锁内完成，其他线程不会看到注销了一半的工具表。
+        """
+        with self._lock:
+            names = self.register_mcp_tools(
+                tools, invoke=invoke, name_prefix=name_prefix, group=group
+            )
+            current = set(names)
+            for stale in replaces:
+                if stale not in current:
+                    self._drop_tool(stale)
+            return names
 
     def _schema_type_for_param(self, annotation: Any) -> str:
         if annotation is inspect.Parameter.empty:
@@ -85,12 +138,14 @@ class ToolManager:
         description: str | None = None,
         group: str | None = None,
         risk: str = "low",
+        read_only: bool = False,
     ) -> None:
         """
         将可调用对象注册为 LLM 工具（OpenAI 风格 function schema）。
         同名工具会先被移除再注册，便于热重载或覆盖。
         ``group`` 为工具分组（"character" / "memory" / "mcp" 等），默认 "default"。
         ``risk`` 为风险等级："low"（无风险）/ "medium"（中等）/ "high"（高危，需确认）。
+        ``read_only`` 表示工具无副作用，同一轮内可与其他只读调用并发执行。
         """
         tool_name = (name or func.__name__).strip()
         if not tool_name:
@@ -127,11 +182,19 @@ class ToolManager:
             },
         }
 
-        self._drop_tool(tool_name)
-        self._tools_definitions.append(definition)
-        self._functions[tool_name] = func
-        self._tool_groups[tool_name] = group or DEFAULT_TOOL_GROUP_OVERRIDES.get(tool_name, "default")
-        self._tool_risks[tool_name] = risk or "low"
+        with self._lock:
+            self._drop_tool(tool_name)
+            self._tools_definitions.append(definition)
+            self._functions[tool_name] = func
+            self._tool_groups[tool_name] = group or DEFAULT_TOOL_GROUP_OVERRIDES.get(
+                tool_name, "default"
+            )
+            self._tool_risks[tool_name] = risk or "low"
+            self._search_index.add(
+                tool_name, group=self._tool_groups[tool_name], description=doc
+            )
+            if read_only:
+                self._read_only_tools.add(tool_name)
 
     def register_mcp_tools(
         self,
@@ -149,9 +212,22 @@ class ToolManager:
 
         ``name_prefix`` 用于隔离多套 MCP 工具，避免与内置工具名冲突。
         ``group`` 为 MCP 工具分组，默认 "mcp"。
+        声明了 ``annotations.readOnlyHint`` 的工具按只读工具处理。
+        返回本次注册的工具名（按清单顺序）。
         """
+        with self._lock:
+            return self._register_mcp_tools_locked(tools, invoke, name_prefix, group)
+
+    def _register_mcp_tools_locked(
+        self,
+        tools: List[Dict[str, Any]],
+        invoke: Callable[[str, Dict[str, Any]], Any],
+        name_prefix: str,
+        group: str,
+    ) -> List[str]:
         prefix = name_prefix.strip()
         grp = (group or "mcp").strip()
+        registered: List[str] = []
         for raw in tools:
             if not isinstance(raw, dict):
                 self.logger.warning("register_mcp_tools: skip non-dict item %r", raw)
@@ -193,14 +269,27 @@ class ToolManager:
             self._tools_definitions.append(definition)
             self._functions[tool_name] = _make_runner(tool_name, invoke)
             self._tool_groups[tool_name] = grp
-
-    def tool(self, func: Callable[..., Any] = None, *, group: str | None = None, risk: str = "low") -> Callable[..., Any]:
+            self._search_index.add(tool_name, group=grp, description=doc)
+            annotations = raw.get("annotations")
+            if isinstance(annotations, dict) and annotations.get("readOnlyHint") is True:
+                self._read_only_tools.add(tool_name)
+            registered.append(tool_name)
+        return registered
+
+    def tool(
+        self,
+        func: Callable[..., Any] = None,
+        *,
+        group: str | None = None,
+        risk: str = "low",
+        read_only: bool = False,
+    ) -> Callable[..., Any]:
         """
         装饰器：@tool_manager.tool(group="character", risk="low")
         利用单例特性，将函数注册到当前实例。
         """
         def _decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
-            self.register_function(fn, group=group, risk=risk)
+            self.register_function(fn, group=group, risk=risk, read_only=read_only)
             @functools.wraps(fn)
             def wrapper(*args: Any, **kwargs: Any) -> Any:
                 return fn(*args, **kwargs)
@@ -211,44 +300,61 @@ class ToolManager:
 
     def get_definitions(self, groups: str | List[str] | None = None) -> List[Dict[str, Any]]:
         """Return tool definitions, optionally filtered by group(s)."""
-        if groups is None:
-            return [
-                definition
-                for definition in self._tools_definitions
-                if self._tool_groups.get(
-                    definition.get("function", {}).get("name"), "default"
-                )
-                not in HIDDEN_TOOL_GROUPS
-            ]
         if isinstance(groups, str):
             groups = [groups]
-        return [
-            d for d in self._tools_definitions
-            if self._tool_groups.get(d["function"]["name"], "default") in groups
-        ]
+        with self._lock:
+            if groups is None:
+                return [
+                    definition
+                    for definition in self._tools_definitions
+                    if self._tool_groups.get(
+                        definition.get("function", {}).get("name"), "default"
+                    )
+                    not in HIDDEN_TOOL_GROUPS
+                ]
+            return [
+                d for d in self._tools_definitions
+                if self._tool_groups.get(d["function"]["name"], "default") in groups
+            ]
 
-    def search_tools(self, keyword: str) -> List[Dict[str, Any]]:
-        """Search tools by keyword in name, description, or group."""
-        kw = keyword.strip().lower()
-        if not kw:
+    def search_tools(self, keyword: str, *, limit: int | None = None) -> List[Dict[str, Any]]:
+        """Search tools by keyword in name, description, or group, best match first."""
+        if not keyword.strip():
             return []
         results = []
-        for d in self._tools_definitions:
-            fn = d["function"]
-            group = self._tool_groups.get(fn["name"], "default")
-            if group in HIDDEN_TOOL_GROUPS:
-                continue
-            name = fn.get("name", "").lower()
-            desc = fn.get("description", "").lower()
-            grp = group.lower()
-            if kw in name or kw in desc or kw == grp:
+        with self._lock:
+            index = self._index()
+            # BM25 只匹配整词或词首；没有结果时退回子串匹配（shot 能找到 screenshot）
+            names = [name for name, _score in index.search(keyword)]
+            for name in names or index.substring_matches(keyword):
+                group = self._tool_groups.get(name, "default")
+                if group in HIDDEN_TOOL_GROUPS:
+                    continue
                 results.append({
-                    "name": fn["name"],
+                    "name": name,
                     "group": group,
-                    "description": fn.get("description", ""),
+                    "description": index.description(name),
                 })
+                if limit is not None and len(results) >= limit:
+                    break
         return results
 
+    def rank_tools(self, query: str, candidates: List[str], *, limit: int) -> List[str]:
+        """Return up to ``limit`` of ``candidates`` ranked by relevance to ``query``."""
+        with self._lock:
+            ranked = self._index().search(query, limit=limit, candidates=candidates)
+        return [name for name, _score in ranked]
+
+    def get_group_counts(self) -> Dict[str, int]:
+        """Return ``{group: tool_count}`` for visible groups, sorted by group name."""
+        with self._lock:
+            counts = self._index().group_counts()
+        return {
+            group: counts[group]
+            for group in sorted(counts)
+            if group not in HIDDEN_TOOL_GROUPS
+        }
+
     def get_tool_group(self, tool_name: str) -> str:
         """Return the group name for a tool."""
         return self._tool_groups.get(tool_name, "default")
@@ -257,18 +363,19 @@ class ToolManager:
         """Return the risk level for a tool (low/medium/high)."""
         return self._tool_risks.get(tool_name, "low")
 
+    def is_read_only(self, tool_name: str) -> bool:
+        """Return whether a tool declared itself free of side effects."""
+        return tool_name in self._read_only_tools
+
     def get_groups(self) -> List[str]:
         """Return list of all registered groups."""
-        return list(
-            sorted(
-                group
-                for group in set(self._tool_groups.values())
-                if group not in HIDDEN_TOOL_GROUPS
-            )
-        )
+        with self._lock:
+            groups = set(self._tool_groups.values())
+        return sorted(group for group in groups if group not in HIDDEN_TOOL_GROUPS)
 
     def execute(self, name: str, arguments_json: str) -> str:
-        if name not in self._functions:
+        function = self._functions.get(name)
+        if function is None:
             return json.dumps({"error": f"Tool '{name}' not found."})
 
         try:
@@ -281,7 +388,7 @@ class ToolManager:
                     "argument_keys": sorted(args.keys()) if isinstance(args, dict) else [],
                 },
             )
-            result = self._functions[name](**args)
+            result = function(**args)
             return json.dumps(result, ensure_ascii=False)
         except ToolNotReady:
             raise  # 向上抛给 ToolExecutor 统一处理
@@ -4,8 +4,11 @@ from __future__ import annotations
 
 from sdk.tool_registry import tool
 
+# Keyword searches return at most this many tools, best match first.
+SEARCH_RESULT_LIMIT = 20
 
-@tool(name="search_tools", group="default", description=(
+
+@tool(name="search_tools", group="default", read_only=True, description=(
     "Search available tools by keyword or group name. "
     "Call this FIRST when you need a capability you don't see in your current tool list. "
     "Returns matching tool names, groups, and descriptions."
@@ -18,19 +21,14 @@ def _tool_search_tools(keyword: str = "") -> list[dict]:
                  "group": tm.get_tool_group(d["function"]["name"]),
                  "description": d["function"]["description"]}
                 for d in tm.get_definitions()]
-    return tm.search_tools(keyword)
+    return tm.search_tools(keyword, limit=SEARCH_RESULT_LIMIT)
 
 
-@tool(name="list_tool_groups", group="default", description=(
+@tool(name="list_tool_groups", group="default", read_only=True, description=(
     "List all available tool group names and the tool count in each group. "
     "Use this to discover what categories of tools are available before enabling or searching specific groups."
 ))
 def _tool_list_groups() -> list[dict]:
     from ai.tools.tool_manager import ToolManager
     tm = ToolManager()
-    all_defs = tm.get_definitions()
-    group_counts: dict[str, int] = {}
-    for d in all_defs:
-        grp = tm.get_tool_group(d["function"]["name"])
-        group_counts[grp] = group_counts.get(grp, 0) + 1
-    return [{"group": g, "tool_count": c} for g, c in sorted(group_counts.items())]
+    return [{"group": g, "tool_count": c} for g, c in tm.get_group_counts().items()]
@@ -0,0 +1,163 @@
+"""Content-addressed store for synthesized speech.
+
+``TTSManager.generate_tts`` writes every line into a small ring of wav files
+and used to re-synthesize even when the exact same line had been spoken
+before (system lines, greetings, catch-phrases, story replays).
+:class:`AudioCache` keeps finished audio under ``<root>/<sha256>.wav``, where
+the digest covers everything that changes the waveform: normalized text,
+reference audio (path, size and mtime), prompt text/language, target
+language, model paths, speed factor and adapter.
+
+Entries are evicted least-recently-used once the store exceeds its byte
+budget. Recency is mirrored into file mtimes so the order survives restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_SUFFIX = ".wav"
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace so trivially different lines share audio."""
+    return " ".join(unicodedata.normalize("NFC", str(text or "")).split())
+
+
+def file_fingerprint(path: str | os.PathLike | None) -> list:
+    """Path plus size/mtime, so replacing a reference clip invalidates its audio."""
+    if not path:
+        return []
+    try:
+        st = os.stat(path)
+    except OSError:
+        return [str(path)]
+    return [str(path), st.st_size, st.st_mtime_ns]
+
+
+def cache_key(**parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Thread-safe LRU store of synthesized audio files keyed by :func:`cache_key`."""
+
+    def __init__(self, root: str | os.PathLike, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] | None = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{_SUFFIX}"
+
+    def _index(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            found = []
+            for path in self.root.glob(f"*{_SUFFIX}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if st.st_size > 0:
+                    found.append((st.st_mtime_ns, path.stem, st.st_size))
+            found.sort()
+            self._entries = OrderedDict((key, size) for _, key, size in found)
+            self._bytes = sum(self._entries.values())
+        return self._entries
+
+    def lookup(self, key: str) -> str | None:
+        """Return the cached audio path for ``key`` and mark it recently used."""
+        with self._lock:
+            entries = self._index()
+            if key in entries:
+                path = self._path(key)
+                try:
+                    os.utime(path)
+                except OSError:
+                    # 文件被外部删除：丢弃索引项，按未命中处理
+                    self._bytes -= entries.pop(key)
+                else:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return str(path)
+            self.misses += 1
+            return None
+
+    def store(self, key: str, source: str | os.PathLike) -> str | None:
+        """Copy (hard-link when possible) ``source`` into the store under ``key``."""
+        source = Path(source)
+        try:
+            size = source.stat().st_size
+        except OSError:
+            return None
+        if size <= 0 or (self.max_bytes and size > self.max_bytes):
+            return None
+        dest = self._path(key)
+        with self._lock:
+            entries = self._index()
+            tmp = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+            try:
+                try:
+                    os.link(source, tmp)
+                except OSError:
+                    shutil.copyfile(source, tmp)
+                os.replace(tmp, dest)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+                return None
+            self._bytes += size - entries.pop(key, 0)
+            entries[key] = size
+            self.stores += 1
+            self._evict_locked(keep=key)
+        return str(dest)
+
+    def _evict_locked(self, keep: str) -> None:
+        entries = self._entries
+        while self.max_bytes and self._bytes > self.max_bytes and entries:
+            key, size = next(iter(entries.items()))
+            if key == keep:
+                break
+            del entries[key]
+            self._bytes -= size
+            self._path(key).unlink(missing_ok=True)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._index()):
+                self._path(key).unlink(missing_ok=True)
+            self._entries = OrderedDict()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            entries = self._index()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,170 @@
+"""Track which voice models are loaded on the TTS backend.
+
+``DefaultCharacterTtsHandler`` requests a model switch for every dialog line.
+:class:`ModelResidencyManager` sits between ``TTSManager`` and the adapter:
+it skips switches to the voice that is already active, keeps up to
+``capacity`` voices resident (bounded by the adapter's
+``resident_model_capacity``; evicted voices are handed to
+``adapter.release_model``), pins the active voice while a synthesis request
+is in flight so a prefetch never swaps weights under it, and records how
+often and how long the backend spent switching.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESIDENT_MODELS = 2
+
+VoiceKey = tuple[tuple[str, str], ...]
+
+
+def voice_key(model_info: dict | None) -> VoiceKey:
+    return tuple(sorted((str(k), str(v)) for k, v in (model_info or {}).items()))
+
+
+class ModelResidencyManager:
+    """Serializes model switches for one adapter and keeps an LRU of resident voices."""
+
+    def __init__(self, adapter: Any = None, capacity: int = DEFAULT_RESIDENT_MODELS):
+        self._requested_capacity = max(1, int(capacity))
+        self._switch_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._prefetch_executor: ThreadPoolExecutor | None = None
+        self.set_adapter(adapter)
+
+    def set_adapter(self, adapter: Any) -> None:
+        with self._switch_lock:
+            self.adapter = adapter
+            adapter_capacity = int(getattr(adapter, "resident_model_capacity", 1) or 1)
+            self.capacity = max(1, min(self._requested_capacity, adapter_capacity))
+            self._active: VoiceKey | None = None
+            self._resident: OrderedDict[VoiceKey, dict] = OrderedDict()
+            self.switches = 0
+            self.hits = 0
+            self.resident_hits = 0
+            self.evictions = 0
+            self.prefetches = 0
+            self.switch_seconds = 0.0
+
+    def is_active(self, model_info: dict | None) -> bool:
+        return self._active is not None and self._active == voice_key(model_info)
+
+    def activate(self, model_info: dict) -> bool:
+        """Make ``model_info`` the active voice. Returns True when the adapter was called."""
+        with self._switch_lock:
+            return self._activate_locked(model_info, count_hit=True)
+
+    def _activate_locked(self, model_info: dict, *, count_hit: bool) -> bool:
+        key = voice_key(model_info)
+        if key == self._active:
+            if count_hit:
+                self.hits += 1
+            self._resident.move_to_end(key)
+            return False
+        with self._cond:
+            # 其他声音的请求还在进行时不能切换权重
+            self._cond.wait_for(lambda: self._in_use == 0)
+        resident = key in self._resident
+        started = time.perf_counter()
+        self.adapter.switch_model(model_info)
+        elapsed = time.perf_counter() - started
+        self.switch_seconds += elapsed
+        if resident:
+            self.resident_hits += 1
+        else:
+            self.switches += 1
+        self._active = key
+        self._resident[key] = dict(model_info)
+        self._resident.move_to_end(key)
+        self._evict_locked()
+        logger.debug(
+            "TTS voice activated",
+            extra={"event": "tts.model.activated", "resident": resident, "switch_ms": round(elapsed * 1000, 2)},
+        )
+        return True
+
+    def _evict_locked(self) -> None:
+        while len(self._resident) > self.capacity:
+            key, info = next(iter(self._resident.items()))
+            if key == self._active:
+                self._resident.move_to_end(key)
+                continue
+            del self._resident[key]
+            self.evictions += 1
+            release = getattr(self.adapter, "release_model", None)
+            if callable(release):
+                try:
+                    release(info)
+                except Exception:
+                    logger.warning("Failed to release TTS voice model", exc_info=True)
+
+    def acquire(self, model_info: dict | None) -> None:
+        """Activate ``model_info`` (if given) and pin it until :meth:`release`."""
+        with self._switch_lock:
+            if model_info is not None:
+                self._activate_locked(model_info, count_hit=False)
+            with self._cond:
+                self._in_use += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def using(self, model_info: dict | None) -> Iterator[None]:
+        self.acquire(model_info)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def prefetch(self, model_info: dict) -> Future | None:
+        """Load ``model_info`` in the background (e.g. while the current line plays)."""
+        if model_info is None or self.is_active(model_info):
+            return None
+        with self._cond:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="tts-prefetch"
+                )
+            executor = self._prefetch_executor
+        self.prefetches += 1
+
+        def run() -> None:
+            try:
+                with self._switch_lock:
+                    self._activate_locked(model_info, count_hit=False)
+            except Exception:
+                logger.warning("TTS voice prefetch failed", exc_info=True)
+
+        return executor.submit(run)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            executor, self._prefetch_executor = self._prefetch_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        # 不取 _switch_lock：切换可能持续数分钟，统计读取不应被阻塞
+        return {
+            "capacity": self.capacity,
+            "resident": len(self._resident),
+            "switches": self.switches,
+            "resident_hits": self.resident_hits,
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "prefetches": self.prefetches,
+            "switch_seconds": round(self.switch_seconds, 3),
+        }
@@ -0,0 +1,312 @@
+"""Streaming PCM handoff from TTS adapters to dialog playback.
+
+Streaming adapters (``TTSAdapter.supports_streaming``) yield raw PCM frames
+while the server is still synthesizing. ``TTSManager.stream_tts`` pumps those
+frames into a :class:`StreamingSpeech`: a bounded :class:`PcmRingBuffer` that
+the pygame playback backend drains as soon as the first frames land, while
+the same frames are written to a WAV file in the background for the audio
+cache and for consumers that can only play files.
+"""
+
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from typing import Iterable, Iterator
+
+from sdk.adapters.tts import PcmFormat
+
+RING_SECONDS = 30.0
+# 读端长时间不消费（例如回合已取消）时，生产端停止向环形缓冲写入，只继续写文件
+STALL_TIMEOUT_SECONDS = 5.0
+_MAX_WAV_HEADER_BYTES = 64 * 1024
+
+
+class PcmRingBuffer:
+    """Bounded single-producer / single-consumer byte ring."""
+
+    def __init__(self, capacity: int):
+        self._buf = bytearray(max(1, int(capacity)))
+        self._start = 0
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._detached = False
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    @property
+    def buffered(self) -> int:
+        with self._cond:
+            return self._size
+
+    def write(self, data: bytes, timeout: float | None = None) -> bool:
+        """Append ``data``, blocking while the ring is full.
+
+        Returns False (and detaches the reader) when the reader is gone or has
+        not made room within ``timeout`` seconds.
+        """
+        view = memoryview(data)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while view:
+                if self._detached:
+                    return False
+                free = len(self._buf) - self._size
+                if not free:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._detached = True
+                        self._cond.notify_all()
+                        return False
+                    self._cond.wait(remaining)
+                    continue
+                end = (self._start + self._size) % len(self._buf)
+                count = min(free, len(view), len(self._buf) - end)
+                self._buf[end:end + count] = view[:count]
+                self._size += count
+                view = view[count:]
+                self._cond.notify_all()
+        return True
+
+    def read(self, max_bytes: int, timeout: float | None = None) -> bytes | None:
+        """Return up to ``max_bytes``; ``b""`` at end of stream, ``None`` on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size or self._closed, timeout):
+                return None
+            if not self._size:
+                return b""
+            count = min(self._size, max(1, int(max_bytes)))
+            first = min(count, len(self._buf) - self._start)
+            out = bytes(self._buf[self._start:self._start + first])
+            if first < count:
+                out += bytes(self._buf[:count - first])
+            self._start = (self._start + count) % len(self._buf)
+            self._size -= count
+            self._cond.notify_all()
+            return out
+
+    def close(self) -> None:
+        """Producer side: no more data will be written."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def detach(self) -> None:
+        """Consumer side: stop accepting data; pending and future writes are dropped."""
+        with self._cond:
+            self._detached = True
+            self._size = 0
+            self._cond.notify_all()
+
+
+class StreamingSpeech:
+    """Handle for one streamed utterance: live PCM frames plus the eventual WAV file."""
+
+    def __init__(self, audio_path: str, pcm_format: PcmFormat | None, *, live: bool = True):
+        self.audio_path = str(audio_path)
+        self.format = pcm_format
+        self.started_at = time.monotonic()
+        self.first_chunk_at: float | None = None
+        self.error = ""
+        self._ring = (
+            PcmRingBuffer(pcm_format.seconds_to_bytes(RING_SECONDS))
+            if live and pcm_format is not None else None
+        )
+        self._carry = b""
+        self._done = threading.Event()
+        self._ok = False
+
+    @classmethod
+    def completed(cls, audio_path: str) -> "StreamingSpeech":
+        """A handle for audio that already exists on disk (e.g. an audio cache hit)."""
+        speech = cls(audio_path, None, live=False)
+        speech.finish(bool(audio_path))
+        return speech
+
+    @property
+    def live(self) -> bool:
+        return self._ring is not None
+
+    @property
+    def first_chunk_ms(self) -> float | None:
+        if self.first_chunk_at is None:
+            return None
+        return round((self.first_chunk_at - self.started_at) * 1000, 2)
+
+    # ---- producer ----------------------------------------------------------------
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+        if self._ring is None:
+            return
+        data = self._carry + chunk
+        cut = len(data) - len(data) % self.format.frame_bytes
+        self._carry = data[cut:]
+        if cut:
+            self._ring.write(data[:cut], timeout=STALL_TIMEOUT_SECONDS)
+
+    def finish(self, ok: bool, error: str = "") -> None:
+        self._ok = bool(ok)
+        self.error = str(error or "")
+        if self._ring is not None:
+            self._ring.close()
+        self._done.set()
+
+    # ---- consumer ----------------------------------------------------------------
+
+    def read(self, max_bytes: int, timeout: float | None = None) -> bytes | None:
+        """Frame-aligned PCM; ``b""`` once the stream ended, ``None`` on timeout."""
+        if self._ring is None:
+            return b""
+        frame = self.format.frame_bytes
+        return self._ring.read(max(frame, max_bytes - max_bytes % frame), timeout)
+
+    def cancel(self) -> None:
+        """Stop live delivery; the background WAV file is still completed."""
+        if self._ring is not None:
+            self._ring.detach()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait_file(self, timeout: float | None = None) -> str:
+        """Block until the WAV file is complete; return its path, or ``""`` on failure."""
+        if not self._done.wait(timeout):
+            return ""
+        return self.audio_path if self._ok else ""
+
+
+def _parse_wav_header(head: bytes) -> tuple[PcmFormat, int] | None:
+    """``(format, data_offset)`` for a RIFF/WAVE prefix, ``None`` if more bytes are needed."""
+    if len(head) < 12:
+        return None
+    if head[8:12] != b"WAVE":
+        raise ValueError("stream is RIFF but not WAVE")
+    offset = 12
+    pcm_format = None
+    while len(head) >= offset + 8:
+        chunk_id = head[offset:offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", head, offset + 4)
+        if chunk_id == b"data":
+            if pcm_format is None:
+                raise ValueError("WAV data chunk precedes fmt chunk")
+            return pcm_format, offset + 8
+        if len(head) < offset + 8 + chunk_size:
+            return None
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate = struct.unpack_from("<HHI", head, offset + 8)
+            (bits,) = struct.unpack_from("<H", head, offset + 22)
+            if audio_format != 1 or bits != 16:
+                raise ValueError(f"unsupported WAV encoding: format={audio_format} bits={bits}")
+            pcm_format = PcmFormat(sample_rate=sample_rate, channels=channels, sample_width=2)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def open_pcm_stream(chunks: Iterable[bytes], default: PcmFormat) -> tuple[PcmFormat, Iterator[bytes]]:
+    """Detect a leading WAV header in a byte stream and return ``(format, pcm_chunks)``.
+
+    Streams that do not start with ``RIFF`` are taken as raw PCM in ``default``.
+    Reads only as many chunks as the header needs.
+    """
+    iterator = iter(chunks)
+    head = b""
+    for chunk in iterator:
+        if not chunk:
+            continue
+        head += chunk
+        if len(head) < 4:
+            continue
+        if not head.startswith(b"RIFF"):
+            return default, _prepend(head, iterator)
+        parsed = _parse_wav_header(head)
+        if parsed is not None:
+            pcm_format, offset = parsed
+            return pcm_format, _prepend(head[offset:], iterator)
+        if len(head) > _MAX_WAV_HEADER_BYTES:
+            raise ValueError("WAV header too large")
+    if head and not head.startswith(b"RIFF"):
+        return default, iter([head])
+    raise ValueError("empty or truncated audio stream")
+
+
+def _prepend(first: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    if first:
+        yield first
+    for chunk in rest:
+        if chunk:
+            yield chunk
+
+
+def convert_pcm(data: bytes, source: PcmFormat, sample_rate: int, channels: int) -> bytes:
+    """Resample / remix a complete 16-bit PCM buffer to the mixer's rate and channel count."""
+    import numpy as np
+
+    samples = _remix(np.frombuffer(data, dtype="<i2"), source.channels, channels)
+    if sample_rate != source.sample_rate and len(samples) > 1:
+        count = max(1, int(round(len(samples) * sample_rate / source.sample_rate)))
+        positions = np.linspace(0, len(samples) - 1, count)
+        samples = _interp(samples, positions)
+    return np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+
+
+class PcmConverter:
+    """Resample / remix one PCM stream block by block.
+
+    Create one per stream: the resampling step is fixed up front and the read
+    position plus the previous block's last frame carry across blocks, so
+    block boundaries neither drift nor click.
+    """
+
+    def __init__(self, source: PcmFormat, sample_rate: int, channels: int):
+        self.source = source
+        self.channels = channels
+        self._step = source.sample_rate / sample_rate
+        self._position = 0.0
+        self._carry = None
+        self._partial = b""
+
+    def convert(self, data: bytes) -> bytes:
+        import numpy as np
+
+        data = self._partial + data
+        usable = len(data) - len(data) % self.source.frame_bytes
+        data, self._partial = data[:usable], data[usable:]
+        samples = _remix(np.frombuffer(data, dtype="<i2"), self.source.channels, self.channels)
+        if self._step != 1.0 and len(samples):
+            if self._carry is not None:
+                samples = np.concatenate([self._carry, samples])
+            self._carry = samples[-1:]
+            positions = np.arange(self._position, len(samples) - 1, self._step)
+            self._position = (
+                positions[-1] + self._step if len(positions) else self._position
+            ) - (len(samples) - 1)
+            samples = _interp(samples, positions)
+        return np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+
+
+def _remix(raw, source_channels: int, channels: int):
+    import numpy as np
+
+    samples = raw.reshape(-1, source_channels).astype(np.float32)
+    if source_channels != channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, channels, axis=1)
+    return samples
+
+
+def _interp(samples, positions):
+    import numpy as np
+
+    base = np.arange(len(samples))
+    return np.stack(
+        [np.interp(positions, base, samples[:, ch]) for ch in range(samples.shape[1])], axis=1
+    )
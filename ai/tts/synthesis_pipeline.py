@@ -0,0 +1,59 @@
+"""Bounded look-ahead synthesis for lines split into several sentences.
+
+``DefaultCharacterTtsHandler`` used to synthesize split sentences one after
+another. :func:`synthesize_in_order` keeps up to ``lookahead`` sentences in
+flight on the TTS manager's per-backend executor and yields finished audio in
+sentence order, so sentence N+1 is synthesized while sentence N is queued for
+playback. How many requests actually overlap is bounded by the executor,
+whose size comes from the adapter's ``max_concurrent_requests``.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Executor, Future, wait
+from typing import Callable, Iterator, Sequence
+
+DEFAULT_LOOKAHEAD = 2
+_POLL_INTERVAL_SECONDS = 0.1
+
+
+def synthesize_in_order(
+    segments: Sequence[str],
+    synthesize: Callable[[str], str],
+    *,
+    executor: Executor,
+    lookahead: int = DEFAULT_LOOKAHEAD,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Iterator[tuple[int, str]]:
+    """Yield ``(index, audio_path)`` for each segment in order.
+
+    Stops early when ``cancelled()`` turns true; closing the generator (for
+    example after the caller rejects a failed segment) cancels every segment
+    that has not started yet. Exceptions raised by ``synthesize`` propagate.
+    """
+
+    window = max(1, int(lookahead))
+    pending: deque[tuple[int, Future]] = deque()
+    next_index = 0
+    try:
+        while next_index < len(segments) or pending:
+            while next_index < len(segments) and len(pending) < window:
+                if cancelled():
+                    return
+                pending.append(
+                    (next_index, executor.submit(synthesize, segments[next_index]))
+                )
+                next_index += 1
+            index, future = pending.popleft()
+            while not future.done():
+                if cancelled():
+                    future.cancel()
+                    return
+                wait((future,), timeout=_POLL_INTERVAL_SECONDS)
+            if cancelled():
+                return
+            yield index, future.result()
+    finally:
+        for _index, future in pending:
+            future.cancel()
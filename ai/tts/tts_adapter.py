@@ -1,5 +1,6 @@
 """Built-in text-to-speech adapters."""
-from sdk.adapters import TTSAdapter
+from sdk.adapters import PcmFormat, TTSAdapter
+from ai.tts.pcm_stream import open_pcm_stream
 import os
 import requests
 import threading
@@ -8,6 +9,7 @@ import base64
 import math
 import wave
 import array
+from collections import OrderedDict
 from pathlib import Path
 import subprocess
 import sys
@@ -16,6 +18,13 @@ from typing import Optional, Callable
 from urllib.parse import urlparse
 
 
+def _iter_response_chunks(response, chunk_size: int = 4096):
+    with response:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                yield chunk
+
+
 def _is_local_server_url(url: str) -> bool:
     host = (urlparse(url).hostname or "").lower()
     return host in {"", "127.0.0.1", "localhost", "0.0.0.0", "::1"}
@@ -55,6 +64,7 @@ class GPTSoVitsAdapter(TTSAdapter):
     """
     STARTUP_TIMEOUT_SECONDS = 600.0
     STARTUP_POLL_INTERVAL_SECONDS = 0.5
+    supports_streaming = True
 
     def __init__(self, tts_server_url="http://127.0.0.1:9880/", gpt_sovits_work_path = None):
         self.tts_server_url = tts_server_url.rstrip("/") + "/"
@@ -164,12 +174,7 @@ class GPTSoVitsAdapter(TTSAdapter):
         self._server_process = subprocess.Popen([str(python_path), str(api_path)], cwd=str(os_path))
         print("GPT-SoVITS server starting...")
 
-    def generate_speech(self, text, file_path=None, **kwargs):
-        """
-        Generates TTS audio using the GPT-SoVITS API.
-        The kwargs dictionary can include parameters like ref_audio_path, prompt_text, etc.
-        """
-
+    def _tts_params(self, text, kwargs):
         # Parameters for the GPT-SoVITS API call
         speed_factor = kwargs.get("speed_factor")
         if speed_factor is None:
@@ -200,7 +205,14 @@ class GPTSoVitsAdapter(TTSAdapter):
         ):
             if key in kwargs and kwargs[key] is not None:
                 params[key] = kwargs[key]
+        return params
 
+    def generate_speech(self, text, file_path=None, **kwargs):
+        """
+        Generates TTS audio using the GPT-SoVITS API.
+        The kwargs dictionary can include parameters like ref_audio_path, prompt_text, etc.
+        """
+        params = self._tts_params(text, kwargs)
         try:
             response = self._session.post(self.tts_server_url + "tts", json=params, timeout=300)
             if not response.ok:
@@ -219,6 +231,17 @@ class GPTSoVitsAdapter(TTSAdapter):
             print(f"GPT-SoVITS TTS generation failed: {e}")
             return None
 
+    def stream_speech(self, text, **kwargs):
+        """Streams PCM from api_v2 (``streaming_mode`` with a leading WAV header)."""
+        params = self._tts_params(text, kwargs)
+        params["streaming_mode"] = True
+        params["media_type"] = "wav"
+        response = self._session.post(self.tts_server_url + "tts", json=params, stream=True, timeout=300)
+        if not response.ok:
+            response.close()
+            raise RuntimeError(self._response_error_text(response, "TTS stream request"))
+        return open_pcm_stream(_iter_response_chunks(response), PcmFormat(sample_rate=32000))
+
     def switch_model(self, model_info):
         """
         Switches the GPT-SoVITS models.
@@ -276,6 +299,11 @@ class KaggleGPTSoVitsAdapter(GPTSoVitsAdapter):
     paths can be configured when explicit weight switching is needed.
     """
 
+    # Network round-trips dominate; overlap the next sentence's request.
+    max_concurrent_requests = 2
+    # Reference/model paths are remapped in generate_speech only.
+    supports_streaming = False
+
     def __init__(
         self,
         tts_server_url="http://127.0.0.1:9880/",
@@ -668,6 +696,10 @@ class GenieTTSAdapter(TTSAdapter):
     Adapter for the Genie TTS service.
     Encapsulates the logic for loading character models, setting references, and generating speech.
     """
+    supports_streaming = True
+    # Genie 服务端按角色名保存已加载的 ONNX 模型，可同时驻留多个角色
+    resident_model_capacity = 4
+
     def __init__(
         self,
         tts_server_url="http://127.0.0.1:9880/",
@@ -680,6 +712,8 @@ class GenieTTSAdapter(TTSAdapter):
         self.character_name = None
         self.onnx_model_dir = None
         self.loaded_character_name = None
+        # 服务端已加载的角色：character_name -> onnx_model_dir
+        self._loaded_characters = OrderedDict()
         self.reference_audio_key = None
         self._server_process = None
         self._start_server_process()
@@ -872,23 +906,15 @@ class GenieTTSAdapter(TTSAdapter):
             response = requests.post(self.tts_server_url + "load_character", json=payload, timeout=20)
             response.raise_for_status()
             self.loaded_character_name = self.character_name
+            self._loaded_characters[self.character_name] = self.onnx_model_dir
+            self._loaded_characters.move_to_end(self.character_name)
             print(f"Genie TTS character '{self.character_name}' loaded successfully.")
         except Exception as e:
             print(f"Failed to load Genie TTS character model: {e}")
             raise
 
-    def generate_speech(self, text, file_path=None, **kwargs):
-        """
-        Generates TTS audio using the Genie TTS engine.
-
-        Args:
-            text (str): The text to synthesize.
-            file_path (str, optional): The path to save the generated audio.
-            **kwargs: Extra arguments, including 'ref_audio_path' and 'audio_text'.
-
-        Returns:
-            str: The absolute path of the generated audio file, or None on failure.
-        """
+    def _prepare_request(self, kwargs):
+        """Loads the active character and reference audio; returns the encoded character name."""
         runtime_character_name = kwargs.get("character_name")
         if runtime_character_name and runtime_character_name != self.character_name:
             self.character_name = runtime_character_name
@@ -904,11 +930,9 @@ class GenieTTSAdapter(TTSAdapter):
         reference_audio_key = f"{ref_audio_path}|{audio_text}|{audio_lang}"
         encoded_character_name = self._encode_name(self.character_name)
 
-        if self.loaded_character_name != self.character_name:
+        if self.loaded_character_name != self.character_name and not self._mark_resident():
             self._load_character_model(audio_lang)
 
-
-
         if ref_audio_path and audio_text and self.reference_audio_key != reference_audio_key:
             try:
                 payload = {
@@ -923,6 +947,41 @@ class GenieTTSAdapter(TTSAdapter):
                 print("Genie TTS reference audio set successfully.")
             except Exception as e:
                 print(f"Failed to set Genie TTS reference audio: {e}")
+        return encoded_character_name
+
+    def stream_speech(self, text, **kwargs):
+        """Streams raw PCM (32 kHz mono int16) from the Genie ``tts`` endpoint."""
+        encoded_character_name = self._prepare_request(kwargs)
+        if not encoded_character_name:
+            raise RuntimeError("Genie TTS has no active character. Call switch_model first.")
+        payload = {
+            "character_name": encoded_character_name,
+            "text": text,
+            "split_sentence": False,
+        }
+        response = requests.post(self.tts_server_url + "tts", json=payload, stream=True, timeout=120)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return open_pcm_stream(_iter_response_chunks(response), PcmFormat(sample_rate=32000))
+
+    def generate_speech(self, text, file_path=None, **kwargs):
+        """
+        Generates TTS audio using the Genie TTS engine.
+
+        Args:
+            text (str): The text to synthesize.
+            file_path (str, optional): The path to save the generated audio.
+            **kwargs: Extra arguments, including 'ref_audio_path' and 'audio_text'.
+
+        Returns:
+            str: The absolute path of the generated audio file, or None on failure.
+        """
+        encoded_character_name = self._prepare_request(kwargs)
+        if not encoded_character_name:
+            return None
 
         try:
             if not file_path:
@@ -969,6 +1028,32 @@ class GenieTTSAdapter(TTSAdapter):
             print(f"Genie TTS generation failed: {e}")
             return None
 
+    def _mark_resident(self):
+        """Marks the active character loaded when the server still holds the same model."""
+        if (
+            self.character_name
+            and self.onnx_model_dir
+            and self._loaded_characters.get(self.character_name) == self.onnx_model_dir
+        ):
+            self._loaded_characters.move_to_end(self.character_name)
+            self.loaded_character_name = self.character_name
+            return True
+        return False
+
+    def release_model(self, model_info):
+        """Unloads an evicted character from the Genie server (best effort)."""
+        name = (model_info or {}).get("character_name") or (model_info or {}).get("name")
+        if not name or name == self.character_name or self._loaded_characters.pop(name, None) is None:
+            return
+        try:
+            requests.post(
+                self.tts_server_url + "unload_character",
+                json={"character_name": self._encode_name(name)},
+                timeout=10,
+            )
+        except Exception as e:
+            print(f"Failed to unload Genie TTS character '{name}': {e}")
+
     def switch_model(self, model_info):
         """
         For Genie TTS, this method can be used to switch characters or reload the model.
@@ -1009,5 +1094,8 @@ class GenieTTSAdapter(TTSAdapter):
             self.loaded_character_name = None
 
         if self.character_name and self.onnx_model_dir and self.loaded_character_name != self.character_name:
+            if self._mark_resident():
+                print(f"Genie TTS character '{self.character_name}' already resident.")
+                return
             print(f"Switching Genie TTS character to: {self.character_name}")
             self._load_character_model()
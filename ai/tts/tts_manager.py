@@ -3,6 +3,11 @@ import threading
 import queue
 import subprocess
 import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from ai.tts.audio_cache import AudioCache, cache_key, file_fingerprint, normalize_text
+from ai.tts.model_residency import DEFAULT_RESIDENT_MODELS, ModelResidencyManager
+from ai.tts.pcm_stream import StreamingSpeech
 from ai.tts.tts_adapter import (
     TTSAdapter,
     GPTSoVitsAdapter,
@@ -68,13 +73,26 @@ class TTSAdapterFactory:
 
 #  TTS管理器
 class TTSManager:
-    def __init__(self, character_ui_url="http://localhost:7888/alive", tts_server_url="http://127.0.0.1:9880/"):
+    def __init__(self, character_ui_url="http://localhost:7888/alive", tts_server_url="http://127.0.0.1:9880/",
+                 audio_cache_max_bytes=0, resident_models=DEFAULT_RESIDENT_MODELS):
         self.audio_cache_dir = Path("cache") / "audio"
         self.character_ui_url = character_ui_url
         self.cache_num = 100
         self.index = 0
+        self._index_lock = threading.Lock()
+        self._synthesis_executor = None
+        self._synthesis_lock = threading.Lock()
 
         self.audio_cache_dir.mkdir(exist_ok=True, parents=True)
+        # 内容寻址缓存：相同文本/参考音频/模型的语音直接复用，0 表示关闭
+        self.audio_cache = (
+            AudioCache(self.audio_cache_dir / "store", audio_cache_max_bytes)
+            if audio_cache_max_bytes and audio_cache_max_bytes > 0 else None
+        )
+        # 最近请求的声音；真正加载到后端由 residency 负责（跳过重复切换、保留常用声音）
+        self._model_info = None
+        self._model_lock = threading.Lock()
+        self.residency = ModelResidencyManager(None, resident_models)
         # Use the adapter for TTS operations
         self.tts_adapter = None
 
@@ -82,12 +100,36 @@ class TTSManager:
         self.task_queue = queue.Queue()
         self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
         self.worker_thread.start()
+        # 预渲染在启动时创建的后台线程里排队执行，不占用合成当前台词的请求线程
+        self.warm_up_queue = queue.Queue()
+        self.warm_up_thread = threading.Thread(
+            target=self._process_warm_ups, name="tts-warm-up", daemon=True
+        )
+        self.warm_up_thread.start()
 
         self.voice_language = "ja"  # Default voice language is Japanese
 
     def set_tts_adapter(self, adapter: TTSAdapter):
         """Allows switching the TTS adapter at runtime."""
         self.tts_adapter = adapter
+        self.residency.set_adapter(adapter)
+        self._close_synthesis_executor()
+
+    def synthesis_executor(self) -> ThreadPoolExecutor:
+        """Worker pool for look-ahead synthesis, sized by the adapter's concurrency."""
+        with self._synthesis_lock:
+            if self._synthesis_executor is None:
+                workers = max(1, int(getattr(self.tts_adapter, "max_concurrent_requests", 1) or 1))
+                self._synthesis_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="tts-synthesis"
+                )
+            return self._synthesis_executor
+
+    def _close_synthesis_executor(self):
+        with self._synthesis_lock:
+            executor, self._synthesis_executor = self._synthesis_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     @staticmethod
     def _is_valid_audio_file(path: str | Path | None) -> bool:
@@ -103,8 +145,134 @@ class TTSManager:
                      prompt_text=None, prompt_lang=None, character_name=None,
                      speed_factor=None):
         """Generates TTS audio using the currently set adapter."""
+        return self._generate_tts(
+            text, text_processor, ref_audio_path, prompt_text, prompt_lang,
+            character_name, speed_factor,
+        )[0]
+
+    def _generate_tts(self, text, text_processor, ref_audio_path, prompt_text,
+                      prompt_lang, character_name, speed_factor, model_info=None):
+        """Returns ``(audio_path, from_cache)``.
+
+        ``model_info`` pins the voice for this line; ``None`` uses the requested model.
+        """
         print("Generating speech")
+        text = self._prepare_text(text, text_processor, character_name)
+
+        if not ref_audio_path:
+            print("No reference audio provided")
+            return '', False
+
+        key = None
+        if self.audio_cache is not None:
+            key = self._audio_cache_key(
+                text, ref_audio_path, prompt_text, prompt_lang, character_name, speed_factor,
+                model_info,
+            )
+            cached = self.audio_cache.lookup(key)
+            if cached:
+                return cached, True
+
+        final_path = self._synthesize_to_ring(
+            text, ref_audio_path, prompt_text, prompt_lang, character_name, speed_factor,
+            model_info,
+        )
+        if final_path and key is not None:
+            self.audio_cache.store(key, final_path)
+        return final_path, False
+
+    def stream_tts(self, text, text_processor=None, ref_audio_path=None,
+                   prompt_text=None, prompt_lang=None, character_name=None,
+                   speed_factor=None):
+        """Starts streaming synthesis and returns a :class:`StreamingSpeech`.
+
+        PCM frames are readable from the handle as soon as the server sends them; the WAV
+        file (and audio cache entry) is written in the background. Cache hits and failed
+        stream requests return an already completed handle. Returns ``None`` when the
+        adapter cannot stream, so callers fall back to :meth:`generate_tts`.
+        """
+        if not getattr(self.tts_adapter, "supports_streaming", False):
+            return None
+        print("Streaming speech")
+        text = self._prepare_text(text, text_processor, character_name)
+        if not ref_audio_path:
+            print("No reference audio provided")
+            return StreamingSpeech.completed('')
+
+        key = None
+        if self.audio_cache is not None:
+            key = self._audio_cache_key(
+                text, ref_audio_path, prompt_text, prompt_lang, character_name, speed_factor
+            )
+            cached = self.audio_cache.lookup(key)
+            if cached:
+                return StreamingSpeech.completed(cached)
+
+        self.residency.acquire(self._requested_model())
+        try:
+            pcm_format, chunks = self.tts_adapter.stream_speech(
+                text=text,
+                ref_audio_path=ref_audio_path,
+                prompt_text=prompt_text,
+                prompt_lang=prompt_lang,
+                text_lang=self.voice_language,
+                character_name=character_name,
+                speed_factor=speed_factor,
+            )
+        except Exception as e:
+            self.residency.release()
+            print(f"TTS stream request failed, falling back to file synthesis: {e}")
+            final_path = self._synthesize_to_ring(
+                text, ref_audio_path, prompt_text, prompt_lang, character_name, speed_factor
+            )
+            if final_path and key is not None:
+                self.audio_cache.store(key, final_path)
+            return StreamingSpeech.completed(final_path)
+
+        speech = StreamingSpeech(str(self._next_ring_path()), pcm_format)
+        threading.Thread(
+            target=self._pump_stream,
+            args=(speech, chunks, key),
+            name="tts-stream",
+            daemon=True,
+        ).start()
+        return speech
+
+    def _pump_stream(self, speech, chunks, key):
+        """Tees streamed PCM into the playback ring and a background WAV file."""
+        final_path = Path(speech.audio_path)
+        tmp_path = final_path.with_suffix(final_path.suffix + ".part")
+        pcm_format = speech.format
+        ok = False
+        error = ""
+        try:
+            with wave.open(str(tmp_path), "wb") as wav_file:
+                wav_file.setnchannels(pcm_format.channels)
+                wav_file.setsampwidth(pcm_format.sample_width)
+                wav_file.setframerate(pcm_format.sample_rate)
+                for chunk in chunks:
+                    wav_file.writeframesraw(chunk)
+                    speech.feed(chunk)
+            ok = speech.first_chunk_at is not None and self._is_valid_audio_file(tmp_path)
+            if ok:
+                tmp_path.replace(final_path)
+                if key is not None:
+                    self.audio_cache.store(key, final_path)
+            else:
+                error = "TTS stream returned no audio"
+        except Exception as e:
+            error = str(e)
+            print(f"TTS stream failed: {e}")
+        finally:
+            if not ok:
+                tmp_path.unlink(missing_ok=True)
+                close = getattr(chunks, "close", None)
+                if callable(close):
+                    close()
+            self.residency.release()
+            speech.finish(ok, error)
 
+    def _prepare_text(self, text, text_processor, character_name):
         # Pre-process the text using the provided processor
         if text_processor:
             text = text_processor.remove_parentheses(text)
@@ -115,36 +283,59 @@ class TTSManager:
                 text = text_processor.libre_translate(text, source=language, target=self.voice_language)
             if self.voice_language == 'ja' and (character_name == "狛枝凪斗" or character_name == "仆役" or character_name == "小狛枝"):
                 text = text_processor.replace_watashi(text)
+        return text
 
-        if not ref_audio_path:
-            print("No reference audio provided")
-            return ''
-
+    def _next_ring_path(self):
         # 最终文件路径
-        final_path = self.audio_cache_dir / f"{self.index % self.cache_num}.wav"
-        self.index += 1
+        with self._index_lock:
+            final_path = self.audio_cache_dir / f"{self.index % self.cache_num}.wav"
+            self.index += 1
+        return final_path
+
+    def _audio_cache_key(self, text, ref_audio_path, prompt_text, prompt_lang,
+                         character_name, speed_factor, model_info=None):
+        if model_info is None:
+            model_info = self._requested_model() or {}
+        return cache_key(
+            text=normalize_text(text),
+            ref_audio=file_fingerprint(ref_audio_path),
+            prompt_text=normalize_text(prompt_text or ""),
+            prompt_lang=prompt_lang or "",
+            text_lang=self.voice_language,
+            character_name=character_name or "",
+            model={str(k): str(v) for k, v in model_info.items()},
+            speed_factor=speed_factor,
+            adapter=type(self.tts_adapter).__name__,
+        )
+
+    def _synthesize_to_ring(self, text, ref_audio_path, prompt_text, prompt_lang,
+                            character_name, speed_factor, model_info=None):
+        final_path = self._next_ring_path()
         tmp_path = final_path.with_suffix(final_path.suffix + ".part")
+        if model_info is None:
+            model_info = self._requested_model()
 
         attempts = 2
-        for attempt in range(1, attempts + 1):
-            tmp_path.unlink(missing_ok=True)
-            result = self.tts_adapter.generate_speech(
-                text=text,
-                file_path=str(tmp_path),
-                ref_audio_path=ref_audio_path,
-                prompt_text=prompt_text,
-                prompt_lang=prompt_lang,
-                text_lang=self.voice_language,
-                character_name=character_name,
-                speed_factor=speed_factor,
-            )
-            if result and self._is_valid_audio_file(tmp_path):
-                tmp_path.replace(final_path)
-                return str(final_path)
-            print(f"TTS generation returned no usable audio (attempt {attempt}/{attempts}).")
-            tmp_path.unlink(missing_ok=True)
-            if attempt < attempts:
-                time.sleep(0.35 * attempt)
+        with self.residency.using(model_info):
+            for attempt in range(1, attempts + 1):
+                tmp_path.unlink(missing_ok=True)
+                result = self.tts_adapter.generate_speech(
+                    text=text,
+                    file_path=str(tmp_path),
+                    ref_audio_path=ref_audio_path,
+                    prompt_text=prompt_text,
+                    prompt_lang=prompt_lang,
+                    text_lang=self.voice_language,
+                    character_name=character_name,
+                    speed_factor=speed_factor,
+                )
+                if result and self._is_valid_audio_file(tmp_path):
+                    tmp_path.replace(final_path)
+                    return str(final_path)
+                print(f"TTS generation returned no usable audio (attempt {attempt}/{attempts}).")
+                tmp_path.unlink(missing_ok=True)
+                if attempt < attempts:
+                    time.sleep(0.35 * attempt)
         return ''
 
     def set_language(self, language):
@@ -156,7 +347,85 @@ class TTSManager:
         if model_info is None:
             print("No model info provided, cannot switch model.")
             return
-        self.tts_adapter.switch_model(model_info)
+        with self._model_lock:
+            self._model_info = dict(model_info)
+        if self.audio_cache is None:
+            self.residency.activate(model_info)
+        # 开启音频缓存时延迟到真正需要合成时再切换，命中缓存的台词不触碰 TTS 服务
+
+    def _requested_model(self):
+        with self._model_lock:
+            return self._model_info
+
+    def prefetch_model(self, model_info):
+        """Loads the next speaker's voice in the background (no-op when already active)."""
+        if model_info is None or self.tts_adapter is None:
+            return None
+        return self.residency.prefetch(model_info)
+
+    def model_stats(self):
+        """Switch / residency counters and time spent switching models."""
+        return self.residency.stats()
+
+    def warm_up(self, lines, text_processor=None, ref_audio_path=None,
+                prompt_text=None, prompt_lang=None, character_name=None,
+                speed_factor=None, model_info=None):
+        """Pre-renders frequent lines into the audio cache.
+
+        Lines are rendered and cached with ``model_info`` (default: the model requested
+        when the call starts) without changing the requested model. Lines already cached
+        are skipped. Returns counts of cached / rendered / failed lines.
+        """
+        result = {"cached": 0, "rendered": 0, "failed": 0}
+        if self.audio_cache is None:
+            return result
+        if model_info is None:
+            model_info = self._requested_model()
+        model_info = dict(model_info) if model_info is not None else None
+        for line in lines:
+            path, from_cache = self._generate_tts(
+                line, text_processor, ref_audio_path, prompt_text, prompt_lang,
+                character_name, speed_factor, model_info,
+            )
+            if not path:
+                result["failed"] += 1
+            elif from_cache:
+                result["cached"] += 1
+            else:
+                result["rendered"] += 1
+        return result
+
+    def schedule_warm_up(self, lines, cancelled=None, model_info=None, **kwargs):
+        """Queues :meth:`warm_up` on the background warm-up thread and returns immediately.
+
+        The voice is fixed now (``model_info``, default: the currently requested model),
+        so a speaker switch before the job runs cannot render or cache the lines with
+        another voice. ``cancelled`` is polled when the job starts; a true result skips it.
+        """
+        if model_info is None:
+            model_info = self._requested_model()
+        kwargs["model_info"] = dict(model_info) if model_info is not None else None
+        self.warm_up_queue.put((list(lines), cancelled, kwargs))
+
+    def _process_warm_ups(self):
+        """Worker thread running scheduled warm-ups one at a time."""
+        while True:
+            job = self.warm_up_queue.get()
+            if job is None:
+                self.warm_up_queue.task_done()
+                break
+            lines, cancelled, kwargs = job
+            try:
+                if cancelled is None or not cancelled():
+                    self.warm_up(lines, **kwargs)
+            except Exception as e:
+                print(f"TTS warm-up failed: {e}")
+            finally:
+                self.warm_up_queue.task_done()
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of the audio cache (``None`` when disabled)."""
+        return self.audio_cache.stats() if self.audio_cache is not None else None
 
     # ---------------- Used in the THA mode ------------------------------
     def _process_queue(self):
@@ -235,5 +504,9 @@ class TTSManager:
         """Shuts down the queue, worker thread, and TTS server process."""
         self.task_queue.put(None)
         self.worker_thread.join()
+        self.warm_up_queue.put(None)
+        self.warm_up_thread.join()
+        self._close_synthesis_executor()
+        self.residency.shutdown()
         if hasattr(self.tts_adapter, "stop_server"):
             self.tts_adapter.stop_server()
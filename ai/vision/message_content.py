@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import base64
 import binascii
-import copy
 from collections.abc import Mapping
 from typing import Any
 
 from core.media.chat_attachments import ResolvedChatAttachment, resolve_chat_attachments
+from core.media.image_blobs import image_blob_store, is_blob_digest
 
 
 LOCAL_IMAGE_BLOCK_TYPE = "local_image"
@@ -20,13 +20,41 @@ def local_image_block(attachment: ResolvedChatAttachment) -> dict[str, Any]:
         "media_type": attachment.mime_type,
         "name": attachment.name,
         "path": str(attachment.path),
-        # Keep a recoverable copy in persisted message history. The path remains
-        # useful for display and reroll, but later model requests no longer rely
-        # on the user-selected source file still existing.
-        "data": base64.b64encode(attachment.path.read_bytes()).decode("ascii"),
+        # Keep a recoverable copy in the content-addressed blob store and only
+        # its digest in history. The path remains useful for display and
+        # reroll, but later model requests no longer rely on the user-selected
+        # source file still existing.
+        "sha256": image_blob_store().put_file(attachment.path),
     }
 
 
+def externalize_embedded_images(messages: list[dict[str, Any]]) -> int:
+    """Move legacy base64 ``data`` of local image blocks into the blob store.
+
+    Blocks are rewritten in place to carry ``sha256`` instead; returns how many
+    were converted so callers can force a full rewrite of persisted history.
+    """
+    converted = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, list):
+            continue
+        for block in content:
+            if not isinstance(block, dict) or block.get("type") != LOCAL_IMAGE_BLOCK_TYPE:
+                continue
+            embedded = str(block.get("data") or "").strip()
+            if not embedded:
+                continue
+            try:
+                data = base64.b64decode(embedded, validate=True)
+            except (binascii.Error, ValueError):
+                continue
+            block["sha256"] = image_blob_store().put(data)
+            del block["data"]
+            converted += 1
+    return converted
+
+
 def _resolved_block_image(block: Mapping[str, Any]) -> ResolvedChatAttachment:
     return resolve_chat_attachments([{"kind": "image", "path": block.get("path")}])[0]
 
@@ -36,8 +64,15 @@ def _image_data(attachment: ResolvedChatAttachment) -> str:
 
 
 def _recover_image(block: Mapping[str, Any]) -> tuple[str, str] | None:
-    embedded = str(block.get("data") or "").strip()
     media_type = str(block.get("media_type") or "image/png").strip() or "image/png"
+    digest = block.get("sha256")
+    if is_blob_digest(digest):
+        encoded = image_blob_store().encoded(digest)
+        if encoded is not None:
+            return media_type, encoded
+
+    # Histories written before the blob store embedded the bytes directly.
+    embedded = str(block.get("data") or "").strip()
     if embedded:
         try:
             base64.b64decode(embedded, validate=True)
@@ -53,6 +88,19 @@ def _recover_image(block: Mapping[str, Any]) -> tuple[str, str] | None:
         return None
 
 
+def _recover_image_cached(
+    block: Mapping[str, Any],
+    encoded_blocks: dict[str, tuple[str, str] | None],
+) -> tuple[str, str] | None:
+    """Recover each distinct blob once per request, however often it recurs."""
+    digest = block.get("sha256")
+    if not is_blob_digest(digest):
+        return _recover_image(block)
+    if digest not in encoded_blocks:
+        encoded_blocks[digest] = _recover_image(block)
+    return encoded_blocks[digest]
+
+
 def _historical_image_placeholder(block: Mapping[str, Any], *, unsupported: bool) -> dict[str, str]:
     name = str(block.get("name") or "image").strip() or "image"
     reason = "current model does not support image input" if unsupported else "source is no longer available"
@@ -85,7 +133,10 @@ def normalize_openai_messages(
     *,
     supports_native_vision: bool = False,
 ) -> list[dict[str, Any]]:
-    normalized = copy.deepcopy(messages)
+    # Only top-level keys and content lists are rewritten below; blocks are
+    # reused as-is, so a shallow copy per message keeps callers' history intact.
+    normalized = [dict(message) for message in messages]
+    encoded_blocks: dict[str, tuple[str, str] | None] = {}
     for message in normalized:
         # These fields are application-only replay/display metadata and are not
         # part of the OpenAI-compatible message schema.
@@ -103,7 +154,7 @@ def normalize_openai_messages(
                 if not supports_native_vision:
                     next_content.append(_historical_image_placeholder(block, unsupported=True))
                 else:
-                    recovered = _recover_image(block)
+                    recovered = _recover_image_cached(block, encoded_blocks)
                     if recovered is not None:
                         next_content.append(_openai_image_block(*recovered))
                     else:
@@ -120,12 +171,22 @@ def normalize_openai_messages(
     return normalized
 
 
-def normalize_anthropic_user_content(content: Any) -> str | list[dict[str, Any]]:
+def normalize_anthropic_user_content(
+    content: Any,
+    encoded_blocks: dict[str, tuple[str, str] | None] | None = None,
+) -> str | list[dict[str, Any]]:
+    """Anthropic user content with local images encoded.
+
+    Pass one ``encoded_blocks`` dict for every message of a request so an image
+    repeated across turns is recovered only once.
+    """
     if isinstance(content, str):
         return content
     if not isinstance(content, list):
         return str(content or "")
     normalized: list[dict[str, Any]] = []
+    if encoded_blocks is None:
+        encoded_blocks = {}
     for block in content:
         if not isinstance(block, Mapping):
             text = str(block or "").strip()
@@ -133,7 +194,7 @@ def normalize_anthropic_user_content(content: Any) -> str | list[dict[str, Any]]
                 normalized.append({"type": "text", "text": text})
             continue
         if block.get("type") == LOCAL_IMAGE_BLOCK_TYPE:
-            recovered = _recover_image(block)
+            recovered = _recover_image_cached(block, encoded_blocks)
             if recovered is None:
                 normalized.append(_historical_image_placeholder(block, unsupported=False))
             else:
@@ -6,7 +6,9 @@ UI worker 用 TTS 输出消息处理器（见 handler_registry.UIOutputMessageHa
 
 from __future__ import annotations
 
+import logging
 import re
+import time
 import traceback
 from pathlib import Path
 from typing import Any, List
@@ -29,6 +31,23 @@ from sdk.handlers import UIOutputMessageHandler
 from sdk.messages import TTSOutputMessage
 
 _config = ConfigManager()
+logger = logging.getLogger(__name__)
+
+
+def _log_first_sound(out: TTSOutputMessage) -> None:
+    """记录从开始合成到开始发声的耗时（stream / file 两种模式分别统计）。"""
+    if out.synthesis_started_at is None:
+        return
+    stream = out.audio_stream
+    logger.info(
+        "TTS first sound",
+        extra={
+            "event": "tts.first_sound",
+            "mode": "stream" if stream is not None and stream.live else "file",
+            "first_sound_ms": round((time.monotonic() - out.synthesis_started_at) * 1000, 2),
+            "first_chunk_ms": getattr(stream, "first_chunk_ms", None),
+        },
+    )
 
 
 def get_character_by_name(name: str):
@@ -222,7 +241,8 @@ class CharacterDialogUiHandler(UIOutputMessageHandler):
             if (_tmo is not None and _tmo > 0)
             else (max(len(speech) / 8, 0.5) if speech else 0.3)
         )
-        audio_exists = bool(audio_path and Path(audio_path).exists())
+        audio_stream = out.audio_stream
+        audio_exists = bool(audio_path and (audio_stream is not None or Path(audio_path).exists()))
         controller = getattr(ch, "playback_controller", None)
         ev = ch.task_done_requested
         if audio_exists and controller is not None:
@@ -233,6 +253,7 @@ class CharacterDialogUiHandler(UIOutputMessageHandler):
                 )
 
             def pause_asr_when_started() -> None:
+                _log_first_sound(out)
                 get_asr_log().info(
                     "CharacterDialogUiHandler: playback started -> post_pause_asr "
                     "(character=%s)",
@@ -246,6 +267,7 @@ class CharacterDialogUiHandler(UIOutputMessageHandler):
                 volume=volume,
                 minimum_duration_seconds=min_stop_time,
                 on_started=pause_asr_when_started,
+                audio_stream=audio_stream,
             )
             if result.error:
                 print(f"UIWorker: 对话音频播放失败: {result.error}")
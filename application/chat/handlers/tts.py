@@ -8,13 +8,17 @@ from __future__ import annotations
 
 import logging
 import re
+import time
 import traceback
+from contextlib import closing
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Callable, List
 from urllib.parse import urlparse
 
 import yaml
 from config.config_manager import ConfigManager
+from ai.tts.synthesis_pipeline import DEFAULT_LOOKAHEAD, synthesize_in_order
 from sdk.handlers import MessageHandler
 from core.messaging.dialog_tokens import (
     match_bgm_name,
@@ -30,6 +34,9 @@ from i18n import tr as tr_i18n
 _config = ConfigManager()
 logger = logging.getLogger(__name__)
 
+# 当前台词发出后，向后查看多少条待合成台词（同声线预渲染 / 下一位说话人预加载）
+VOICE_LOOKAHEAD = 3
+
 
 def _read_sprite_voice_cfg(name_s: str, sprite_id: int):
     """直接从 YAML 读取立绘的 voice_type、voice_path、voice_text，避免跨进程缓存。"""
@@ -72,6 +79,14 @@ def _cc():
     return get_app_runtime().opencc
 
 
+def _turn_cancelled_probe(rt) -> Callable[[], bool]:
+    """TTSWorker 在合成期间把 audio_path_queue 换成可感知取消的包装。"""
+    probe = getattr(rt.audio_path_queue, "is_cancelled", None)
+    if not callable(probe):
+        return lambda: False
+    return lambda: bool(probe())
+
+
 def _is_remote_gpt_sovits() -> bool:
     try:
         api_config = _config.config.api_config
@@ -88,6 +103,144 @@ def _is_remote_reference_path(path: str) -> bool:
     return str(path or "").strip().startswith("/kaggle/")
 
 
+@lru_cache(maxsize=512)
+def _resolved_path(path: str) -> str:
+    """每句台词都要用到模型与参考音频路径，缓存 resolve 结果避免重复访问文件系统。"""
+    return Path(path).resolve().as_posix()
+
+
+def _voice_model_info(name_s: str, character_config) -> dict:
+    return {
+        "character_name": name_s,
+        "sovits_model_path": _resolved_path(character_config.sovits_model_path),
+        "gpt_model_path": _resolved_path(character_config.gpt_model_path),
+    }
+
+
+def _sprite_index(asset_id, character_config) -> int:
+    try:
+        sprite_id = int(asset_id) - 1
+    except (TypeError, ValueError):
+        return -1
+    if sprite_id < 0 or sprite_id >= len(character_config.sprites):
+        return -1
+    return sprite_id
+
+
+def _speech_text(rt, msg: LLMDialogMessage):
+    """返回 (待合成文本, 交给 TTSManager 的 text_processor)。"""
+    if msg.translate:
+        speech_text = rt.text_processor.remove_parentheses(msg.translate)
+        return rt.text_processor.replace_names(speech_text), None
+    text_processor = rt.text_processor
+    return text_processor.remove_parentheses(msg.text), text_processor
+
+
+def _reference_voice(character_config, sprite_id: int):
+    """立绘可覆盖角色默认的参考音频；返回 (ref_audio_path, prompt_text)。"""
+    ref_audio_path = _resolved_path(character_config.refer_audio_path)
+    prompt_text = character_config.prompt_text
+    if sprite_id < 0:
+        return ref_audio_path, prompt_text
+    try:
+        sprite_data = character_config.sprites[sprite_id]
+        _voice_type = _sprite_value(sprite_data, "voice_type")
+        _vt = _sprite_value(sprite_data, "voice_text")
+        _vp = str(_sprite_value(sprite_data, "voice_path", "") or "").strip()
+        if _vp and (_voice_type == "reference" or (_voice_type is None and _vt)) and _vt and (
+            not _is_remote_gpt_sovits() or _is_remote_reference_path(_vp)
+        ):
+            return _resolved_path(_vp), _vt
+    except Exception:
+        print("没有立绘")
+    return ref_audio_path, prompt_text
+
+
+def _split_sentences(speech_text: str, api_config) -> list[str]:
+    """按配置分句；未开启分句时返回空列表。"""
+    if not getattr(api_config, "tts_split_enabled", False):
+        return []
+    max_len = getattr(api_config, "tts_max_sentence_length", 15)
+    pieces = re.split(r'(?<=[。！？，、；：\.!\?,;:])', speech_text)
+    pieces = [s.strip() for s in pieces if s.strip()]
+    sentences: list[str] = []
+    cur = ""
+    for piece in pieces:
+        if not cur:
+            cur = piece
+        elif len(cur) + len(piece) <= max_len:
+            cur += piece
+        else:
+            sentences.append(cur)
+            cur = piece
+    if cur:
+        sentences.append(cur)
+    return sentences
+
+
+def _upcoming_voice_lines(rt, msg: LLMDialogMessage):
+    """待合成队列中同一回合、走常规角色路径的台词：yield (msg, name_s, character_config)。"""
+    peek = getattr(rt.tts_queue, "peek", None)
+    if not callable(peek):
+        return
+    cc = _cc()
+    for item in peek(VOICE_LOOKAHEAD):
+        if not isinstance(item, LLMDialogMessage) or item.turn_id != msg.turn_id:
+            continue
+        if (
+            match_cot_tts(cc, item.name)
+            or match_system_dialog_tts(cc, item.name)
+            or match_bgm_name(item.name)
+            or match_cg_name(item.name)
+        ):
+            continue
+        name_s = cc.convert(item.name)
+        character_config = get_character_by_name(name_s)
+        if character_config is not None:
+            yield item, name_s, character_config
+
+
+def _prepare_upcoming_voices(rt, msg: LLMDialogMessage, model_info: dict) -> None:
+    """当前台词播放期间：按声线批量预渲染后续同声线台词，并预加载下一位说话人的模型。
+
+    台词发出顺序不变；预渲染交给 TTSManager 的后台预热线程排队执行，结果进入音频缓存，
+    轮到这些台词时直接命中，不必在说话人交替时来回切换模型，也不阻塞当前请求。
+    """
+    manager = rt.tts_manager
+    cancelled = _turn_cancelled_probe(rt)
+    next_model = None
+    try:
+        for item, name_s, character_config in _upcoming_voice_lines(rt, msg):
+            item_model = _voice_model_info(name_s, character_config)
+            if item_model != model_info:
+                next_model = next_model or item_model
+                continue
+            if getattr(manager, "audio_cache", None) is None or cancelled():
+                continue
+            sprite_id = _sprite_index(item.asset_id, character_config)
+            if sprite_id >= 0 and _sprite_voice_audio(character_config, sprite_id, "preset")[1]:
+                continue
+            speech_text, text_processor = _speech_text(rt, item)
+            if len(_split_sentences(speech_text, _config.config.api_config)) > 1:
+                continue
+            ref_audio_path, prompt_text = _reference_voice(character_config, sprite_id)
+            manager.schedule_warm_up(
+                [speech_text],
+                cancelled=cancelled,
+                model_info=item_model,
+                text_processor=text_processor,
+                ref_audio_path=ref_audio_path,
+                prompt_text=prompt_text,
+                prompt_lang=character_config.prompt_lang,
+                character_name=name_s,
+                speed_factor=character_config.speech_speed,
+            )
+        if next_model is not None and not cancelled():
+            manager.prefetch_model(next_model)
+    except Exception:
+        logger.debug("Failed to prepare upcoming TTS voices", exc_info=True)
+
+
 def _sprite_value(sprite_data, key: str, default=None):
     if isinstance(sprite_data, dict):
         return sprite_data.get(key, default)
@@ -110,7 +263,7 @@ def _sprite_voice_audio(character_config, sprite_id: int, *allowed_types: str):
             voice_path = str(_sprite_value(sprite_data, "voice_path", "") or "").strip()
             voice_text = _sprite_value(sprite_data, "voice_text", "") or ""
         if voice_type in allowed_types and voice_path:
-            return voice_type, Path(voice_path).resolve().as_posix(), voice_text
+            return voice_type, _resolved_path(voice_path), voice_text
     except Exception:
         logger.debug(
             "Failed to resolve sprite voice audio for character=%s sprite_id=%s",
@@ -202,33 +355,21 @@ class DefaultCharacterTtsHandler(MessageHandler):
         character_config = get_character_by_name(name_s)
         if character_config is None:
             raise ValueError(f"未找到角色配置: {name_s}")
-        translate = msg.translate
         speech = msg.text
         asset_id = msg.asset_id if msg.asset_id is not None else "-1"
-        text_processor = rt.text_processor
-        speech_text = speech
-        if translate:
-            text_processor = None
-            speech_text = rt.text_processor.remove_parentheses(translate)
-            speech_text = rt.text_processor.replace_names(speech_text)
         audio_path = ""
+        audio_stream = None
+        synthesis_started_at = None
+        model_info = None
         if rt.tts_manager:
             _post_tts_busy(tr_i18n("desktop.tts_busy_synthesizing", name=name_s))
             try:
-                model_info = {
-                    "character_name": name_s,
-                    "sovits_model_path": Path(character_config.sovits_model_path).resolve().as_posix(),
-                    "gpt_model_path": Path(character_config.gpt_model_path).resolve().as_posix(),
-                }
+                model_info = _voice_model_info(name_s, character_config)
                 rt.tts_manager.switch_model(model_info)
                 print("TTSWorker: 使用模型", name_s, model_info)
-                try:
-                    sprite_id = int(asset_id) - 1
-                    if sprite_id < 0 or sprite_id >= len(character_config.sprites):
-                        raise IndexError("Sprite ID out of range")
-                except (ValueError, IndexError):
+                sprite_id = _sprite_index(asset_id, character_config)
+                if sprite_id < 0:
                     print(f"无效或缺失的立绘编号: {asset_id}. 使用默认立绘。")
-                    sprite_id = -1
 
                 # 预设语音：跳过 TTS 合成，直接播放立绘上传的语音文件
                 if sprite_id >= 0:
@@ -243,50 +384,17 @@ class DefaultCharacterTtsHandler(MessageHandler):
                         )
                         return
 
-                ref_audio_path = Path(character_config.refer_audio_path).resolve().as_posix()
-                prompt_text = character_config.prompt_text
-                try:
-                    if sprite_id < 0:
-                        raise IndexError("Sprite ID out of range")
-                    sprite_data = character_config.sprites[sprite_id]
-                    _voice_type = _sprite_value(sprite_data, "voice_type")
-                    _vt = _sprite_value(sprite_data, "voice_text")
-                    _vp = str(_sprite_value(sprite_data, "voice_path", "") or "").strip()
-                    if _vp and (_voice_type == "reference" or (_voice_type is None and _vt)) and _vt and (
-                        not _is_remote_gpt_sovits() or _is_remote_reference_path(_vp)
-                    ):
-                        ref_audio_path = Path(_vp).resolve().as_posix()
-                        prompt_text = _vt
-                except Exception:
-                    print("没有立绘")
-                if text_processor:
-                    speech_text = text_processor.remove_parentheses(speech_text)
+                ref_audio_path, prompt_text = _reference_voice(character_config, sprite_id)
+                speech_text, text_processor = _speech_text(rt, msg)
 
                 # 根据配置决定是否分句发送
                 _api_cfg = _config.config.api_config
-                _split_enabled = getattr(_api_cfg, "tts_split_enabled", False)
-                _max_len = getattr(_api_cfg, "tts_max_sentence_length", 15)
-
-                _sentences: list[str] = []
-                if _split_enabled:
-                    _pieces = re.split(r'(?<=[。！？，、；：\.!\?,;:])', speech_text)
-                    _pieces = [s.strip() for s in _pieces if s.strip()]
-                    _cur = ""
-                    for _p in _pieces:
-                        if not _cur:
-                            _cur = _p
-                        elif len(_cur) + len(_p) <= _max_len:
-                            _cur += _p
-                        else:
-                            _sentences.append(_cur)
-                            _cur = _p
-                    if _cur:
-                        _sentences.append(_cur)
+                _sentences = _split_sentences(speech_text, _api_cfg)
 
                 _speed = character_config.speech_speed
+                synthesis_started_at = time.monotonic()
                 if not _sentences or len(_sentences) <= 1:
-                    audio_path = rt.tts_manager.generate_tts(
-                        speech_text,
+                    _tts_kwargs = dict(
                         text_processor=text_processor,
                         ref_audio_path=ref_audio_path,
                         prompt_text=prompt_text,
@@ -294,10 +402,21 @@ class DefaultCharacterTtsHandler(MessageHandler):
                         character_name=name_s,
                         speed_factor=_speed,
                     )
+                    if getattr(_api_cfg, "tts_streaming_enabled", False):
+                        # 流式：拿到首批 PCM 即可开始播放，文件在后台写完
+                        audio_stream = rt.tts_manager.stream_tts(speech_text, **_tts_kwargs)
+                    if audio_stream is not None:
+                        audio_path = audio_stream.audio_path
+                        if not audio_stream.live:
+                            audio_stream = None
+                    else:
+                        audio_path = rt.tts_manager.generate_tts(speech_text, **_tts_kwargs)
                 else:
                     _asset_str = str(asset_id)
-                    for _i, _sent in enumerate(_sentences):
-                        _path = rt.tts_manager.generate_tts(
+                    _started = time.perf_counter()
+                    _segments = synthesize_in_order(
+                        _sentences,
+                        lambda _sent: rt.tts_manager.generate_tts(
                             _sent,
                             text_processor=text_processor,
                             ref_audio_path=ref_audio_path,
@@ -305,32 +424,52 @@ class DefaultCharacterTtsHandler(MessageHandler):
                             prompt_lang=character_config.prompt_lang,
                             character_name=name_s,
                             speed_factor=_speed,
-                        )
-                        if not _path or not Path(_path).is_file() or Path(_path).stat().st_size <= 0:
-                            print(
-                                "TTSWorker: 分句语音生成失败，停止后续分句播放，"
-                                f"segment={_i + 1}/{len(_sentences)}, text={_sent!r}"
-                            )
-                            tts_emit_to_ui_queue(
-                                name_s,
-                                speech,
-                                _asset_str,
-                                "",
-                                is_system_message=False,
-                                effect=msg.effect,
-                            )
-                            return
-                        _is_first = _i == 0
-                        _is_last = _i == len(_sentences) - 1
-                        rt.audio_path_queue.put(TTSOutputMessage(
-                            audio_path=_path or "",
-                            name=name_s,
-                            text=speech if _is_first else "",
-                            asset_id=_asset_str if _is_first else _asset_str,
-                            effect=msg.effect if _is_first else "",
-                            is_final_segment=_is_last,
-                            timeout=None if _is_first else 0,
-                        ))
+                        ),
+                        executor=rt.tts_manager.synthesis_executor(),
+                        lookahead=DEFAULT_LOOKAHEAD,
+                        cancelled=_turn_cancelled_probe(rt),
+                    )
+                    _first_audio_ms = None
+                    with closing(_segments):
+                        for _i, _path in _segments:
+                            _sent = _sentences[_i]
+                            if not _path or not Path(_path).is_file() or Path(_path).stat().st_size <= 0:
+                                print(
+                                    "TTSWorker: 分句语音生成失败，停止后续分句播放，"
+                                    f"segment={_i + 1}/{len(_sentences)}, text={_sent!r}"
+                                )
+                                tts_emit_to_ui_queue(
+                                    name_s,
+                                    speech,
+                                    _asset_str,
+                                    "",
+                                    is_system_message=False,
+                                    effect=msg.effect,
+                                )
+                                return
+                            _is_first = _i == 0
+                            _is_last = _i == len(_sentences) - 1
+                            if _is_first:
+                                _first_audio_ms = round((time.perf_counter() - _started) * 1000, 2)
+                            rt.audio_path_queue.put(TTSOutputMessage(
+                                audio_path=_path or "",
+                                name=name_s,
+                                text=speech if _is_first else "",
+                                asset_id=_asset_str if _is_first else _asset_str,
+                                effect=msg.effect if _is_first else "",
+                                is_final_segment=_is_last,
+                                timeout=None if _is_first else 0,
+                                synthesis_started_at=synthesis_started_at if _is_first else None,
+                            ))
+                    logger.info(
+                        "TTS sentence pipeline finished",
+                        extra={
+                            "event": "tts.pipeline.completed",
+                            "segments": len(_sentences),
+                            "first_audio_ms": _first_audio_ms,
+                            "total_ms": round((time.perf_counter() - _started) * 1000, 2),
+                        },
+                    )
                     return  # already emitted per-sentence, skip final tts_emit_to_ui_queue
             finally:
                 _hide_tts_busy()
@@ -344,7 +483,10 @@ class DefaultCharacterTtsHandler(MessageHandler):
             )
         tts_emit_to_ui_queue(
             name_s, speech, str(asset_id), audio_path, is_system_message=False, effect=msg.effect,
+            audio_stream=audio_stream, synthesis_started_at=synthesis_started_at,
         )
+        if model_info is not None:
+            _prepare_upcoming_voices(rt, msg, model_info)
 
 
 def get_tts_handlers() -> List[MessageHandler]:
@@ -104,6 +104,7 @@ def _validate_history_storage_target(path: Path) -> Path:
     known_names = {
         "active.json",
         "active.json.tmp",
+        "active.json.idx",
         "branches.json",
     }
     try:
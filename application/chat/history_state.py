@@ -53,6 +53,13 @@ def load_chat_history(file_path: str) -> Any:
     return _get_history_manager().load_chat_history(file_path)
 
 
+def history_file_present(file_path: str) -> bool:
+    """正式历史文件存在且是 JSON 列表（空列表同样算存在）。"""
+    from ai.llm.history_manager import HistoryManager
+
+    return HistoryManager.history_file_present(file_path)
+
+
 def clear_chat_history(history_file: str, ui_queue: Any, llm_manager: Any) -> None:
     from i18n import tr
     from sdk.messages import TTSOutputMessage
@@ -281,9 +288,9 @@ def extract_valid_dialog_from_messages(messages: list) -> list:
     for message in reversed(messages):
         if message.get("role") != "assistant":
             continue
-        from ai.llm.history_manager import parse_assistant_dialog_content
+        from core.sprite.chat_history_text import parse_assistant_dialog_cached
         content = message.get("content", "")
-        dialog = parse_assistant_dialog_content(content)
+        dialog = parse_assistant_dialog_cached(content)
         if dialog:
             return dialog
     return []
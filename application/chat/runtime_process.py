@@ -12,7 +12,9 @@ import time
 import uuid
 from datetime import datetime
 from pathlib import Path
+from collections import OrderedDict
 from collections.abc import Sequence
+from dataclasses import dataclass, field
 from typing import Any
 from urllib.parse import quote
 
@@ -44,7 +46,8 @@ from core.sprite.chat_branch_storage import (
     remove_chat_history_storage,
     save_branch_state,
 )
-from core.sprite.chat_history_text import history_payload_to_plain_text, parse_assistant_dialog_content
+from core.sprite.chat_history_text import history_payload_to_plain_text, parse_assistant_dialog_cached
+from ai.llm.history_journal import HistoryJournal
 from ai.tools.chat_ui_tools import sanitize_user_display_name
 
 from application.chat.history_paths import (
@@ -81,6 +84,7 @@ from sdk.path_utils import reject_control_chars
 TRANSPARENT_BACKGROUND_NAME = "透明场景"
 _TRANSPARENT_BACKGROUND_ALIAS = "透明背景"
 _HISTORY_DOWNLOAD_CAPABILITY_TTL_SECONDS = 60.0
+_HISTORY_PAGE_LIMIT_MAX = 500
 _RUNTIME_CHAT_COMMANDS = {
     "audio-playback-signal",
     "cancel-input-batch",
@@ -106,6 +110,8 @@ _main_chat_process_lock = threading.Lock()
 _main_chat_log_file: Any = None
 _SYSTEM_HISTORY_NAMES = COT_ALIASES | NARR_ALIASES | STAT_ALIASES | SCENE_ALIASES | BGM_ALIASES | CG_ALIASES
 _DEFAULT_USER_DISPLAY_NAME = "你"
+# Rendered entries and user-entry prefix counts of recently read history files
+_HISTORY_FILE_CACHE_LIMIT = 8
 
 
 def _is_transparent_background_name(name: str | None) -> bool:
@@ -166,11 +172,16 @@ def _chat_runtime_status(state: BridgeState) -> dict[str, Any]:
     # an incorrect idle result that would re-enable launch controls too early.
     closing = _chat_runtime_closing(state)
     runtime_state = "closing" if closing else "running" if running else "idle"
-    return {
+    status: dict[str, Any] = {
         "state": runtime_state,
         "chatProcessRunning": running,
         "chatRuntimeClosing": closing,
     }
+    stream_stats = getattr(getattr(state, "chat_stream", None), "stats", None)
+    if callable(stream_stats):
+        # 每个 viewer 的排队深度、滞后、合并/丢弃计数，便于排查移动端卡顿
+        status["chatStream"] = stream_stats()
+    return status
 
 
 def _set_chat_runtime_closing(state: BridgeState, closing: bool) -> None:
@@ -691,11 +702,14 @@ def _message_created_at_ms(message: dict[str, Any]) -> int | None:
 def _serialize_history_entries_from_messages(
     messages: Any,
     user_display_name: str = _DEFAULT_USER_DISPLAY_NAME,
+    *,
+    user_index_start: int = 0,
+    row_id_prefix: str = "history-",
 ) -> list[dict[str, Any]]:
     if not isinstance(messages, list):
         return []
     entries: list[dict[str, Any]] = []
-    user_index = 0
+    user_index = user_index_start
     row_index = 0
     user_name = _sanitize_user_display_name(user_display_name) or _DEFAULT_USER_DISPLAY_NAME
     for message in messages:
@@ -707,7 +721,7 @@ def _serialize_history_entries_from_messages(
             if not text:
                 continue
             entry = {
-                "id": f"history-{row_index}",
+                "id": f"{row_id_prefix}{row_index}",
                 "revertUserIndex": user_index,
                 "role": "user",
                 "text": f"{user_name}: {text}",
@@ -721,7 +735,7 @@ def _serialize_history_entries_from_messages(
             continue
         if role != "assistant":
             continue
-        for item in parse_assistant_dialog_content(message.get("content", "")):
+        for item in parse_assistant_dialog_cached(message.get("content", "")):
             if not isinstance(item, dict):
                 continue
             speaker = str(item.get("character_name") or "").strip()
@@ -731,7 +745,7 @@ def _serialize_history_entries_from_messages(
             plain = f"{speaker}: {speech}" if speaker else speech
             entries.append(
                 {
-                    "id": f"history-{row_index}",
+                    "id": f"{row_id_prefix}{row_index}",
                     "role": _history_entry_role_from_text(plain),
                     "text": plain,
                 }
@@ -763,13 +777,137 @@ def _chat_history_entries(state: BridgeState) -> list[dict[str, Any]]:
     history_file = chat_history_active_path(history_path) if history_path is not None else None
     if history_file is None or not history_file.is_file():
         return []
-    return _serialize_history_entries_from_messages(_read_history_file(history_file), _chat_user_display_name(state))
+    user_name = _chat_user_display_name(state)
+    view = _history_file_view(history_file)
+    entries = view.entries.get(user_name)
+    if entries is None:
+        messages = view.load(history_file)
+        entries = _serialize_history_entries_from_messages(messages, user_name)
+        view.entries[user_name] = entries
+    return [dict(entry) for entry in entries]
 
 
 def _chat_history(state: BridgeState) -> list[dict[str, Any]]:
     return _chat_history_entries(state)
 
 
+def _is_user_history_entry(message: Any) -> bool:
+    return (
+        isinstance(message, dict)
+        and str(message.get("role") or "").strip() == "user"
+        and bool(str(message.get("display_content") or message.get("content") or "").strip())
+    )
+
+
+@dataclass(eq=False)
+class _HistoryFileView:
+    """What the bridge derived from one version (size, mtime) of a history file."""
+
+    stamp: tuple[int, int]
+    # user_counts[i] is the number of user entries in messages[:i]
+    user_counts: list[int] | None = None
+    # serialized entries keyed by user display name
+    entries: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+
+    def load(self, history_file: Path) -> list[Any]:
+        messages = HistoryJournal(history_file).read_all()
+        if self.user_counts is None:
+            counts = [0]
+            for message in messages:
+                counts.append(counts[-1] + _is_user_history_entry(message))
+            self.user_counts = counts
+        return messages
+
+    def user_entries_before(self, history_file: Path, position: int) -> int:
+        if self.user_counts is None:
+            self.load(history_file)
+        counts = self.user_counts or [0]
+        return counts[max(0, min(position, len(counts) - 1))]
+
+
+_history_file_views: OrderedDict[str, _HistoryFileView] = OrderedDict()
+_history_file_views_lock = threading.Lock()
+
+
+def _history_file_view(history_file: Path) -> _HistoryFileView:
+    """Per-file derived data, rebuilt once after the file changes on disk.
+
+    Paging and snapshot rebuilds would otherwise re-parse the whole history on
+    every request just to number user entries.
+    """
+    stat = history_file.stat()
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    key = str(history_file)
+    with _history_file_views_lock:
+        view = _history_file_views.get(key)
+        if view is None or view.stamp != stamp:
+            view = _history_file_views[key] = _HistoryFileView(stamp)
+        _history_file_views.move_to_end(key)
+        while len(_history_file_views) > _HISTORY_FILE_CACHE_LIMIT:
+            _history_file_views.popitem(last=False)
+        return view
+
+
+def _chat_history_page(state: BridgeState, *, before: int | None, limit: int) -> dict[str, Any]:
+    """One page of history entries, newest page first when ``before`` is None.
+
+    While a chat stream is live the page is cut from its rendered
+    ``historyEntries`` and the cursor counts entries. Otherwise the cursor
+    counts persisted messages and only the window's assistant turns are
+    parsed; entry ids are anchored to the page start so they stay stable
+    across pages.
+    """
+
+    limit = max(1, min(int(limit), _HISTORY_PAGE_LIMIT_MAX))
+    session_id = str(state.chat_session.get("sessionId") or "").strip()
+    chat_stream = getattr(state, "chat_stream", None)
+    if session_id and chat_stream is not None:
+        snapshot = chat_stream.get_snapshot(session_id)
+        if isinstance(snapshot, dict) and "historyEntries" in snapshot:
+            entries = _history_entries_from_snapshot(snapshot)
+            total = len(entries)
+            end = total if before is None else max(0, min(before, total))
+            start = max(0, end - limit)
+            return {
+                "entries": entries[start:end],
+                "start": start,
+                "end": end,
+                "total": total,
+                "hasMore": start > 0,
+                "source": "snapshot",
+            }
+    empty = {"entries": [], "start": 0, "end": 0, "total": 0, "hasMore": False, "source": "file"}
+    history_raw = str(state.chat_session.get("historyPath") or "").strip()
+    if not history_raw or is_unc_history_path(history_raw):
+        return empty
+    history_path = _resolve_history_file(state, history_raw)
+    if is_unc_history_path(history_path):
+        return empty
+    history_file = chat_history_active_path(history_path)
+    if not history_file.is_file():
+        return empty
+    journal = HistoryJournal(history_file)
+    total = journal.message_count()
+    end = total if before is None else max(0, min(before, total))
+    start = max(0, end - limit)
+    entries = _serialize_history_entries_from_messages(
+        journal.read_range(start, end),
+        _chat_user_display_name(state),
+        user_index_start=(
+            _history_file_view(history_file).user_entries_before(history_file, start) if start else 0
+        ),
+        row_id_prefix=f"history-m{start}-",
+    )
+    return {
+        "entries": entries,
+        "start": start,
+        "end": end,
+        "total": total,
+        "hasMore": start > 0,
+        "source": "file",
+    }
+
+
 def _chat_snapshot(
     state: BridgeState,
     status: str | None = None,
@@ -877,6 +1015,18 @@ def _read_history_file(path: Path) -> Any:
         return json.load(file)
 
 
+def _append_history_messages(active: Path, messages: list[Any], appended: list[Any]) -> None:
+    """Append to ``active.json`` in place; ``messages`` is the loaded list."""
+    journal = HistoryJournal(active)
+    index = journal.ensure_index()
+    if index is not None and index[0] == len(messages):
+        journal.append(appended)
+    else:
+        active.parent.mkdir(parents=True, exist_ok=True)
+        journal.write_all(messages + appended)
+    messages.extend(appended)
+
+
 def _current_chat_history_download_file(state: BridgeState) -> Path:
     history_raw = str(state.chat_session.get("historyPath") or "").strip()
     if not history_raw:
@@ -965,10 +1115,8 @@ def _persist_story_choice_messages(
         loaded = _read_history_file(active)
         if isinstance(loaded, list):
             messages = loaded
-    messages.append({"role": "user", "content": label})
-    active.parent.mkdir(parents=True, exist_ok=True)
-    with active.open("w", encoding="utf-8") as file:
-        json.dump(messages, file, ensure_ascii=False, indent=4)
+    appended = [{"role": "user", "content": label}]
+    _append_history_messages(active, messages, appended)
     branch_state = load_branch_state(history_path)
     if branch_state is None:
         return
@@ -1054,18 +1202,16 @@ def _persist_scene_turn_messages(
         loaded = _read_history_file(active)
         if isinstance(loaded, list):
             messages = loaded
-    messages.append({"role": "user", "content": user_text})
+    appended = [{"role": "user", "content": user_text}]
     for item in dialogue:
-        messages.append(
+        appended.append(
             {
                 "role": "assistant",
                 "name": item.character_id,
                 "content": item.text,
             }
         )
-    active.parent.mkdir(parents=True, exist_ok=True)
-    with active.open("w", encoding="utf-8") as file:
-        json.dump(messages, file, ensure_ascii=False, indent=4)
+    _append_history_messages(active, messages, appended)
     branch_state = load_branch_state(history_path)
     if branch_state is None:
         return
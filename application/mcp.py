@@ -20,6 +20,19 @@ def _as_str_list(value: Any) -> list[str]:
     return [str(item) for item in value]
 
 
+def _positive_int_fields(raw: dict[str, Any]) -> dict[str, int]:
+    """会话池大小与每台服务器的并发调用上限；非正数或非整数时省略，使用默认值。"""
+    fields: dict[str, int] = {}
+    for key in ("sessions", "max_concurrent_calls"):
+        try:
+            value = int(raw.get(key))
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            fields[key] = value
+    return fields
+
+
 def _mcp_config_response(data: dict[str, Any] | None = None) -> dict[str, Any]:
     from config.mcp_config import DEFAULT_MCP_CONFIG_PATH, read_mcp_config
 
@@ -46,6 +59,7 @@ def _mcp_config_response(data: dict[str, Any] | None = None) -> dict[str, Any]:
                     entry["call_timeout"] = value
             except (TypeError, ValueError):
                 pass
+        entry.update(_positive_int_fields(raw))
         if transport in {"sse", "streamable_http"}:
             entry["url"] = str(raw.get("url") or "")
             entry["headers"] = _as_str_map(raw.get("headers"))
@@ -58,10 +72,13 @@ def _mcp_config_response(data: dict[str, Any] | None = None) -> dict[str, Any]:
         default_timeout = float(cfg.get("default_call_timeout", 300))
     except (TypeError, ValueError):
         default_timeout = 300.0
+    from ai.tools.mcp_tool_setup import mcp_server_stats
+
     return {
         "default_call_timeout": default_timeout,
         "enabled": cfg.get("enabled") is not False,
         "path": DEFAULT_MCP_CONFIG_PATH.as_posix(),
+        "server_stats": mcp_server_stats(),
         "servers": servers,
     }
 
@@ -87,6 +104,7 @@ def _validate_mcp_server(raw: Any) -> dict[str, Any]:
             raise ValueError("MCP call_timeout must be a number") from exc
         if timeout > 0:
             entry["call_timeout"] = timeout
+    entry.update(_positive_int_fields(raw))
 
     if transport in {"sse", "streamable_http"}:
         url = str(raw.get("url") or "").strip()
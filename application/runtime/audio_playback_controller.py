@@ -7,7 +7,10 @@ import time
 import uuid
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable, Protocol
+from typing import Any, Callable, Protocol
+
+# 流式播放每次从环形缓冲取出的音频时长（秒）
+STREAM_BLOCK_SECONDS = 0.25
 
 
 class PlaybackState(str, Enum):
@@ -33,6 +36,9 @@ class VoicePlaybackRequest:
     character_name: str
     audio_path: str
     volume: float
+    # ai.tts.pcm_stream.StreamingSpeech while synthesis is still streaming;
+    # audio_path is the file it completes into.
+    stream: Any = None
 
 
 @dataclass(frozen=True)
@@ -118,12 +124,14 @@ class VoicePlaybackController:
         minimum_duration_seconds: float = 0.0,
         timeout_seconds: float | None = None,
         on_started: Callable[[], None] | None = None,
+        audio_stream: Any = None,
     ) -> PlaybackResult:
         request = VoicePlaybackRequest(
             playback_id=uuid.uuid4().hex,
             character_name=str(character_name or ""),
             audio_path=str(audio_path or ""),
             volume=min(1.0, max(0.0, float(volume))),
+            stream=audio_stream,
         )
         active = _ActivePlayback(
             request=request,
@@ -300,18 +308,72 @@ class VoicePlaybackController:
         return True
 
 
+def _start_when_file_ready(
+    request: VoicePlaybackRequest,
+    signal: PlaybackSignalHandler,
+    play: Callable[[], None],
+    is_current: Callable[[], bool],
+) -> None:
+    """Wait off-thread for a streamed utterance's WAV file, then ``play()`` it."""
+
+    def run() -> None:
+        try:
+            path = request.stream.wait_file()
+            if not is_current():
+                return
+            if not path:
+                signal(
+                    request.playback_id,
+                    PlaybackState.FAILED,
+                    getattr(request.stream, "error", "") or "streamed audio was not produced",
+                )
+                return
+            play()
+        except Exception as exc:
+            signal(request.playback_id, PlaybackState.FAILED, str(exc))
+
+    threading.Thread(
+        target=run,
+        name=f"dialog-audio-wait-{request.playback_id[:8]}",
+        daemon=True,
+    ).start()
+
+
 class FrontendVoicePlaybackBackend:
-    """Emit playback requests; completion arrives through frontend signals."""
+    """Emit playback requests; completion arrives through frontend signals.
+
+    The frontend plays URLs served by the bridge process, so streamed speech
+    is handed over once its WAV file is complete.
+    """
 
     def __init__(self, ui_updates: object) -> None:
         self._ui_updates = ui_updates
+        self._lock = threading.Lock()
+        self._stopped: set[str] = set()
 
     def start(
         self,
         request: VoicePlaybackRequest,
         signal: PlaybackSignalHandler,
     ) -> None:
-        del signal
+        if request.stream is not None and not request.stream.done:
+            _start_when_file_ready(
+                request,
+                signal,
+                lambda: self._post_play(request),
+                lambda: self._take_pending(request.playback_id),
+            )
+            return
+        self._post_play(request)
+
+    def _take_pending(self, playback_id: str) -> bool:
+        with self._lock:
+            if playback_id in self._stopped:
+                self._stopped.discard(playback_id)
+                return False
+            return True
+
+    def _post_play(self, request: VoicePlaybackRequest) -> None:
         self._ui_updates.post_tts_play(
             request.character_name,
             request.audio_path,
@@ -320,6 +382,9 @@ class FrontendVoicePlaybackBackend:
         )
 
     def stop(self, request: VoicePlaybackRequest) -> None:
+        if request.stream is not None and not request.stream.done:
+            with self._lock:
+                self._stopped.add(request.playback_id)
         self._ui_updates.post_tts_skip(playback_id=request.playback_id)
 
 
@@ -342,7 +407,13 @@ class UnavailableVoicePlaybackBackend:
 
 
 class PygameVoicePlaybackBackend:
-    """Adapt a pygame mixer channel to the same playback signal protocol."""
+    """Adapt a pygame mixer channel to the same playback signal protocol.
+
+    Streamed speech is played block by block through the channel queue,
+    starting with the first block instead of waiting for the WAV file.
+    ``pcm_sound_factory`` is called once per stream with its PCM format and
+    returns the ``bytes -> sound`` builder used for every block.
+    """
 
     def __init__(
         self,
@@ -351,9 +422,11 @@ class PygameVoicePlaybackBackend:
         sound_factory: Callable[[str], object],
         ui_updates: object,
         poll_interval_seconds: float = 0.05,
+        pcm_sound_factory: Callable[[Any], Callable[[bytes], object]] | None = None,
     ) -> None:
         self._channel = channel
         self._sound_factory = sound_factory
+        self._pcm_sound_factory = pcm_sound_factory
         self._ui_updates = ui_updates
         self._poll_interval_seconds = max(0.01, float(poll_interval_seconds))
         self._lock = threading.Lock()
@@ -364,6 +437,37 @@ class PygameVoicePlaybackBackend:
         self,
         request: VoicePlaybackRequest,
         signal: PlaybackSignalHandler,
+    ) -> None:
+        stream = request.stream
+        if stream is not None and not stream.done:
+            with self._lock:
+                self._current_id = request.playback_id
+                self._current_sound = None
+            if stream.live and self._pcm_sound_factory is not None:
+                threading.Thread(
+                    target=self._play_stream,
+                    args=(request, signal),
+                    name=f"dialog-audio-{request.playback_id[:8]}",
+                    daemon=True,
+                ).start()
+            else:
+                _start_when_file_ready(
+                    request,
+                    signal,
+                    lambda: self._play_file(request, signal),
+                    lambda: self._is_current(request.playback_id),
+                )
+            return
+        self._play_file(request, signal)
+
+    def _is_current(self, playback_id: str) -> bool:
+        with self._lock:
+            return self._current_id == playback_id
+
+    def _play_file(
+        self,
+        request: VoicePlaybackRequest,
+        signal: PlaybackSignalHandler,
     ) -> None:
         sound = self._sound_factory(request.audio_path)
         sound.set_volume(request.volume)
@@ -385,7 +489,65 @@ class PygameVoicePlaybackBackend:
             daemon=True,
         ).start()
 
+    def _play_stream(
+        self,
+        request: VoicePlaybackRequest,
+        signal: PlaybackSignalHandler,
+    ) -> None:
+        stream = request.stream
+        block_bytes = stream.format.seconds_to_bytes(STREAM_BLOCK_SECONDS)
+        make_sound = self._pcm_sound_factory(stream.format)
+        started = False
+        try:
+            while self._is_current(request.playback_id):
+                data = stream.read(block_bytes, timeout=self._poll_interval_seconds)
+                if data is None:
+                    continue
+                if not data:
+                    break
+                sound = make_sound(data)
+                sound.set_volume(request.volume)
+                if not started:
+                    with self._lock:
+                        if self._current_id != request.playback_id:
+                            return
+                        self._current_sound = sound
+                    self._channel.play(sound)
+                    self._ui_updates.post_tts_play(
+                        request.character_name,
+                        request.audio_path,
+                        playback_id=request.playback_id,
+                        volume=request.volume,
+                    )
+                    signal(request.playback_id, PlaybackState.STARTED, "")
+                    started = True
+                    continue
+                # pygame 通道只有一个排队槽位：等前一块开始播放后再排下一块
+                while (
+                    self._channel.get_queue() is not None
+                    and self._is_current(request.playback_id)
+                ):
+                    time.sleep(self._poll_interval_seconds)
+                if not self._is_current(request.playback_id):
+                    return
+                self._channel.queue(sound)
+            else:
+                return
+            if not started:
+                signal(
+                    request.playback_id,
+                    PlaybackState.FAILED,
+                    stream.error or "TTS stream returned no audio",
+                )
+                return
+        except Exception as exc:
+            signal(request.playback_id, PlaybackState.FAILED, str(exc))
+            return
+        self._wait_for_channel(request, signal)
+
     def stop(self, request: VoicePlaybackRequest) -> None:
+        if request.stream is not None:
+            request.stream.cancel()
         with self._lock:
             if self._current_id != request.playback_id:
                 return
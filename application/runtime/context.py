@@ -136,6 +136,8 @@ def tts_emit_to_ui_queue(
     *,
     is_system_message: bool = False,
     effect: str = "",
+    audio_stream: object | None = None,
+    synthesis_started_at: float | None = None,
 ) -> None:
     """Emit one TTS result to the UI queue."""
     from sdk.messages import TTSOutputMessage
@@ -149,6 +151,8 @@ def tts_emit_to_ui_queue(
         text=speech,
         is_system_message=is_system_message,
         effect=effect,
+        audio_stream=audio_stream,
+        synthesis_started_at=synthesis_started_at,
     )
     rt.audio_path_queue.put(out)
 
@@ -11,6 +11,7 @@ from __future__ import annotations
 import itertools
 import math
 import re
+import threading
 import time
 from typing import Any, Dict, List, Protocol, runtime_checkable
 
@@ -125,35 +126,48 @@ def _fold_chat_init_task(
     return task
 
 
+def _ensure_snapshot_defaults(target: Dict[str, Any]) -> None:
+    target.setdefault("dialogText", "")
+    target.setdefault("eventSeq", 0)
+    target.setdefault("historyEntries", [])
+    target.setdefault("inputDraft", "")
+    target.setdefault("activePlayback", None)
+    target.setdefault("loopingEffects", [])
+    target.setdefault("options", [])
+    target.setdefault("pluginPagePresentations", [])
+    target.setdefault("sprites", [])
+    target.setdefault("stats", [])
+    target.setdefault("status", "idle")
+
+
+def _replacement_snapshot(event: Dict[str, Any]) -> Dict[str, Any] | None:
+    """``snapshot`` 事件携带的整份快照；载荷无效时返回 ``None``。"""
+    payload = event.get("snapshot")
+    if not isinstance(payload, dict):
+        return None
+    merged = make_empty_chat_snapshot()
+    merged.update(payload)
+    if "eventSeq" not in merged:
+        try:
+            merged["eventSeq"] = int(event.get("seq") or 0)
+        except (TypeError, ValueError):
+            merged["eventSeq"] = 0
+    return merged
+
+
 def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
     """Fold one chat stage event into a ChatSnapshot-like dict."""
-    event_type = str(event.get("type") or "").strip()
     next_snapshot = dict(snapshot or make_empty_chat_snapshot())
-    next_snapshot.setdefault("dialogText", "")
-    next_snapshot.setdefault("eventSeq", 0)
-    next_snapshot.setdefault("historyEntries", [])
-    next_snapshot.setdefault("inputDraft", "")
-    next_snapshot.setdefault("activePlayback", None)
-    next_snapshot.setdefault("loopingEffects", [])
-    next_snapshot.setdefault("options", [])
-    next_snapshot.setdefault("pluginPagePresentations", [])
-    next_snapshot.setdefault("sprites", [])
-    next_snapshot.setdefault("stats", [])
-    next_snapshot.setdefault("status", "idle")
-
-    if event_type == "snapshot":
-        payload = event.get("snapshot")
-        if isinstance(payload, dict):
-            merged = make_empty_chat_snapshot()
-            merged.update(payload)
-            if "eventSeq" not in merged:
-                try:
-                    merged["eventSeq"] = int(event.get("seq") or 0)
-                except (TypeError, ValueError):
-                    merged["eventSeq"] = 0
-            return merged
-        return next_snapshot
+    _ensure_snapshot_defaults(next_snapshot)
+    if str(event.get("type") or "").strip() == "snapshot":
+        return _replacement_snapshot(event) or next_snapshot
+    _apply_event(next_snapshot, event)
+    return next_snapshot
+
 
+def _apply_event(next_snapshot: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """原地折叠一个非 ``snapshot`` 事件（供拷贝式 fold 与 ``SnapshotStore`` 共用）。"""
+    event_type = str(event.get("type") or "").strip()
     try:
         next_snapshot["eventSeq"] = max(int(next_snapshot.get("eventSeq") or 0), int(event.get("seq") or 0))
     except (TypeError, ValueError):
@@ -170,7 +184,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             event.get("task"),
             event_type=event_type,
         )
-        return next_snapshot
+        return
 
     if event_type == "dialog.end":
         _clear_transient_notification_state(next_snapshot)
@@ -187,13 +201,13 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             next_snapshot["systemMessageText"] = ""
         if speaker.strip() or not bool(event.get("isSystem")):
             next_snapshot["options"] = []
-        return next_snapshot
+        return
 
     if event_type == "user.display_name.change":
         name = str(event.get("name") or "").strip()
         if name:
             next_snapshot["userDisplayName"] = name
-        return next_snapshot
+        return
 
     if event_type == "sprite.show":
         _clear_transient_notification_state(next_snapshot)
@@ -222,7 +236,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 next_sprite[axis] = event.get(axis)
         current.append(next_sprite)
         next_snapshot["sprites"] = current
-        return next_snapshot
+        return
 
     if event_type == "sprite.remove":
         character_name = str(event.get("characterName") or "")
@@ -234,25 +248,25 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             and item.get("label") != character_name
             and item.get("characterName") != character_name
         ]
-        return next_snapshot
+        return
 
     if event_type == "background.change":
         _clear_transient_notification_state(next_snapshot)
         next_snapshot["backgroundPath"] = str(event.get("url") or "")
-        return next_snapshot
+        return
 
     if event_type == "bgm.change":
         next_snapshot["bgmPath"] = str(event.get("url") or "")
-        return next_snapshot
+        return
 
     if event_type == "cg.show":
         _clear_transient_notification_state(next_snapshot)
         next_snapshot["cgPath"] = str(event.get("url") or "")
-        return next_snapshot
+        return
 
     if event_type == "cg.hide":
         next_snapshot["cgPath"] = ""
-        return next_snapshot
+        return
 
     if event_type == "options.show":
         _clear_transient_notification_state(next_snapshot)
@@ -261,7 +275,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             for item in (event.get("options") or [])
         ]
         next_snapshot["toolConfirmation"] = None
-        return next_snapshot
+        return
 
     if event_type == "story.state.replace":
         story = event.get("story")
@@ -272,7 +286,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 for item in story.get("options", [])
                 if isinstance(item, dict)
             ]
-        return next_snapshot
+        return
 
     if event_type in {"story.node.entered", "story.node.unlocked", "story.cast.replace", "story.ending.reached"}:
         story = dict(next_snapshot.get("story") or {})
@@ -284,11 +298,11 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 "revision": event.get("revision"),
             }
         next_snapshot["story"] = story
-        return next_snapshot
+        return
 
     if event_type == "options.clear":
         next_snapshot["options"] = []
-        return next_snapshot
+        return
 
     if event_type == "tool.confirmation.show":
         _clear_transient_notification_state(next_snapshot)
@@ -299,7 +313,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             "risk": str(event.get("risk") or "high"),
             "toolName": str(event.get("toolName") or ""),
         }
-        return next_snapshot
+        return
 
     if event_type == "tool.confirmation.clear":
         current = next_snapshot.get("toolConfirmation")
@@ -308,26 +322,26 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             current.get("confirmationId") or ""
         ) == confirmation_id:
             next_snapshot["toolConfirmation"] = None
-        return next_snapshot
+        return
 
     if event_type == "history.replace":
         next_snapshot["historyEntries"] = [
             dict(item) for item in (event.get("entries") or []) if isinstance(item, dict)
         ]
-        return next_snapshot
+        return
 
     if event_type == "conversation.tree":
         tree = event.get("tree")
         if isinstance(tree, dict):
             next_snapshot["conversationTree"] = dict(tree)
-        return next_snapshot
+        return
 
     if event_type == "plugin.page.present":
         plugin_id = str(event.get("pluginId") or "").strip()[:128]
         page_id = str(event.get("pageId") or "").strip()[:128]
         presentation_id = str(event.get("presentationId") or "").strip()[:128]
         if not plugin_id or not page_id or not presentation_id:
-            return next_snapshot
+            return
         current = [
             dict(item)
             for item in (next_snapshot.get("pluginPagePresentations") or [])
@@ -351,7 +365,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             }
         )
         next_snapshot["pluginPagePresentations"] = current[-8:]
-        return next_snapshot
+        return
 
     if event_type == "plugin.page.dismiss":
         plugin_id = str(event.get("pluginId") or "").strip()
@@ -365,7 +379,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 or str(item.get("presentationId") or "") != presentation_id
             )
         ]
-        return next_snapshot
+        return
 
     if event_type == "chat.turn.state":
         state = event.get("state")
@@ -405,11 +419,11 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                     "batchEnabled": batch_enabled,
                     "batchIdleSeconds": float(batch_idle_seconds),
                 }
-        return next_snapshot
+        return
 
     if event_type == "numeric.update":
         next_snapshot["numericInfo"] = _plain_text(str(event.get("html") or ""))
-        return next_snapshot
+        return
 
     if event_type == "stats.update":
         stats: list[dict[str, Any]] = []
@@ -441,26 +455,26 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 stat["max"] = maximum
             stats.append(stat)
         next_snapshot["stats"] = stats
-        return next_snapshot
+        return
 
     if event_type == "busy.show":
         next_snapshot["busyText"] = str(event.get("text") or "")
         next_snapshot["busyDurationSeconds"] = float(event.get("durationSeconds") or 0.0)
-        return next_snapshot
+        return
 
     if event_type == "busy.hide":
         next_snapshot["busyText"] = ""
         next_snapshot["busyDurationSeconds"] = 0.0
-        return next_snapshot
+        return
 
     if event_type == "notification.change":
         next_snapshot["notificationText"] = str(event.get("text") or "")
-        return next_snapshot
+        return
 
     if event_type == "status.change":
         _clear_transient_notification_state(next_snapshot)
         next_snapshot["status"] = str(event.get("status") or "idle")
-        return next_snapshot
+        return
 
     if event_type == "tts.play":
         _clear_transient_notification_state(next_snapshot)
@@ -480,7 +494,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 else 1.0
             ),
         }
-        return next_snapshot
+        return
 
     if event_type == "tts.skip":
         active_playback = next_snapshot.get("activePlayback")
@@ -494,7 +508,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             next_snapshot["activePlayback"] = None
             if str(next_snapshot.get("status") or "") == "speaking":
                 next_snapshot["status"] = "idle"
-        return next_snapshot
+        return
 
     if event_type == "effect.loop.start":
         key = str(event.get("key") or "")
@@ -512,7 +526,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
                 }
             )
         next_snapshot["loopingEffects"] = current[-32:]
-        return next_snapshot
+        return
 
     if event_type == "effect.loop.stop":
         key = str(event.get("key") or "")
@@ -521,11 +535,11 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             for item in (next_snapshot.get("loopingEffects") or [])
             if isinstance(item, dict) and str(item.get("key") or "") != key
         ]
-        return next_snapshot
+        return
 
     if event_type == "effect.loop.stop-all":
         next_snapshot["loopingEffects"] = []
-        return next_snapshot
+        return
 
     if event_type == "asr.partial":
         _clear_transient_notification_state(next_snapshot)
@@ -534,7 +548,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
         next_snapshot["asrRunning"] = True
         next_snapshot["inputDraft"] = str(event.get("text") or "")
         next_snapshot["status"] = "listening"
-        return next_snapshot
+        return
 
     if event_type == "asr.final":
         _clear_transient_notification_state(next_snapshot)
@@ -542,7 +556,7 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
         # Persist its consumed presentation state for reconnect hydration.
         next_snapshot["inputDraft"] = ""
         next_snapshot["options"] = []
-        return next_snapshot
+        return
 
     if event_type == "asr.state":
         _clear_transient_notification_state(next_snapshot)
@@ -556,13 +570,13 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
             next_snapshot["status"] = "listening"
         elif current_status not in {"generating", "streaming", "speaking"}:
             next_snapshot["status"] = "paused"
-        return next_snapshot
+        return
 
     if event_type == "reply.finished":
         _clear_transient_notification_state(next_snapshot)
         next_snapshot["activePlayback"] = None
         next_snapshot["status"] = "idle"
-        return next_snapshot
+        return
 
     if event_type == "session.closed":
         next_snapshot["activePlayback"] = None
@@ -576,9 +590,155 @@ def fold_event_into_snapshot(snapshot: Dict[str, Any], event: Dict[str, Any]) ->
         next_snapshot["status"] = "idle"
         next_snapshot["systemMessageText"] = ""
         next_snapshot["toolConfirmation"] = None
-        return next_snapshot
 
-    return next_snapshot
+
+#: ``SnapshotStore`` 为增量 hydrate 保留的最近 eventSeq 数；更早的 seq 只能拿全量快照。
+SNAPSHOT_DELTA_HISTORY = 256
+
+
+class _TrackedSnapshot(dict):
+    """记录被改写的顶层字段；写入相同值不算改动。"""
+
+    __slots__ = ("changed",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.changed: set[str] = set()
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self:
+            current = dict.__getitem__(self, key)
+            if current is value or (type(current) is type(value) and current == value):
+                return
+        dict.__setitem__(self, key, value)
+        self.changed.add(key)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+
+def _patch_path(field: str) -> str:
+    return "/" + str(field).replace("~", "~0").replace("/", "~1")
+
+
+class SnapshotStore:
+    """原地折叠事件的快照存储，带逐字段版本，可导出某个 eventSeq 以来的增量。
+
+    字段值按约定不可变（折叠总是整体替换顶层字段），因此 ``snapshot()`` 只做浅拷贝，
+    与存储共享嵌套的列表/字典。``delta_since(seq)`` 返回 RFC 6902 顶层 ``add`` /
+    ``remove`` 操作，把一个停在 ``eventSeq == seq`` 的快照补到当前状态。
+    """
+
+    def __init__(
+        self,
+        snapshot: Dict[str, Any] | None = None,
+        *,
+        history_limit: int = SNAPSHOT_DELTA_HISTORY,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._history_limit = max(1, int(history_limit))
+        self._data = _TrackedSnapshot(snapshot or make_empty_chat_snapshot())
+        _ensure_snapshot_defaults(self._data)
+        self._data.changed.clear()
+        self._revision = 0
+        self._versions: Dict[str, int] = dict.fromkeys(self._data, 0)
+        self._removed: Dict[str, int] = {}
+        # eventSeq -> 快照首次到达该 seq 时的 revision
+        self._seq_revisions: Dict[int, int] = {self._event_seq(): 0}
+
+    def _event_seq(self) -> int:
+        try:
+            return int(self._data.get("eventSeq") or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _commit_locked(self) -> None:
+        changed = self._data.changed
+        if changed:
+            self._revision += 1
+            for key in changed:
+                self._versions[key] = self._revision
+                self._removed.pop(key, None)
+            changed.clear()
+        self._seq_revisions.setdefault(self._event_seq(), self._revision)
+        if len(self._seq_revisions) > self._history_limit:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        while len(self._seq_revisions) > self._history_limit:
+            del self._seq_revisions[next(iter(self._seq_revisions))]
+        floor = min(self._seq_revisions.values())
+        self._removed = {key: rev for key, rev in self._removed.items() if rev > floor}
+
+    @property
+    def event_seq(self) -> int:
+        with self._lock:
+            return self._event_seq()
+
+    def get(self, field: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(field, default)
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """把一个事件折叠进存储（语义同 ``fold_event_into_snapshot``）。"""
+        with self._lock:
+            if str(event.get("type") or "").strip() == "snapshot":
+                replacement = _replacement_snapshot(event)
+                if replacement is not None:
+                    self._replace_locked(replacement)
+            else:
+                _apply_event(self._data, event)
+            self._commit_locked()
+
+    def update(self, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            for key, value in fields.items():
+                self._data[key] = value
+            self._commit_locked()
+
+    def replace(self, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            self._replace_locked(dict(snapshot))
+            self._commit_locked()
+
+    def _replace_locked(self, snapshot: Dict[str, Any]) -> None:
+        _ensure_snapshot_defaults(snapshot)
+        removed = [key for key in self._data if key not in snapshot]
+        if removed:
+            self._revision += 1
+            for key in removed:
+                dict.__delitem__(self._data, key)
+                self._versions.pop(key, None)
+                self._removed[key] = self._revision
+        for key, value in snapshot.items():
+            self._data[key] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._data)
+
+    def delta_since(self, seq: int) -> List[Dict[str, Any]] | None:
+        """``seq`` 之后改动过的字段；seq 已被压缩掉或从未出现过时返回 ``None``。"""
+        with self._lock:
+            try:
+                base = self._seq_revisions.get(int(seq))
+            except (TypeError, ValueError):
+                return None
+            if base is None:
+                return None
+            ops: List[Dict[str, Any]] = [
+                {"op": "remove", "path": _patch_path(key)}
+                for key, rev in self._removed.items()
+                if rev > base
+            ]
+            ops.extend(
+                {"op": "add", "path": _patch_path(key), "value": self._data[key]}
+                for key, rev in self._versions.items()
+                if rev > base
+            )
+            return ops
 
 
 @runtime_checkable
@@ -617,17 +777,17 @@ class BaseEventSink:
 
     def __init__(self) -> None:
         self._seq = itertools.count(1)
-        self._snapshot: Dict[str, Any] = make_empty_chat_snapshot()
+        self._snapshot = SnapshotStore()
 
     def _next(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         return build_event(next(self._seq), payload)
 
     def _remember(self, event: Dict[str, Any]) -> None:
         """把事件折叠进快照，便于 ``snapshot()`` 给新 viewer。"""
-        self._snapshot = fold_event_into_snapshot(self._snapshot, event)
+        self._snapshot.apply(event)
 
     def snapshot(self) -> Dict[str, Any]:
-        return dict(self._snapshot)
+        return self._snapshot.snapshot()
 
 
 class NullEventSink(BaseEventSink):
@@ -44,10 +44,20 @@ from application.chat.handlers.registry import (
 )
 from core.media.chat_attachments import resolve_chat_attachments
 from ai.vision.service import ChatVisionService
+from ai.tts.pcm_stream import PcmConverter
 
 logger = get_logger(__name__)
 
 
+def _pygame_pcm_sounds(pcm_format):
+    """Per-stream builder wrapping 16-bit PCM blocks as Sounds in the mixer's own layout."""
+    freq, size, channels = pygame.mixer.get_init()
+    if abs(size) != 16:
+        raise ValueError(f"unsupported mixer sample size: {size}")
+    converter = PcmConverter(pcm_format, freq, channels)
+    return lambda data: pygame.mixer.Sound(buffer=converter.convert(data))
+
+
 # --- stdlib thread + DagNode base ---
 
 class _CancelAwareQueue:
@@ -60,6 +70,10 @@ class _CancelAwareQueue:
     def _cancelled(self) -> bool:
         return any(event.is_set() for event in self._cancel_events)
 
+    def is_cancelled(self) -> bool:
+        """供 handler 在长耗时合成中轮询当前轮次是否已取消。"""
+        return self._cancelled()
+
     def put(self, *args, **kwargs):
         if self._cancelled():
             return None
@@ -563,6 +577,7 @@ class PresentationWorker(ThreadDagNode):
                 channel=self.dialog_channel,
                 sound_factory=pygame.mixer.Sound,
                 ui_updates=self.ui_update_manager,
+                pcm_sound_factory=_pygame_pcm_sounds,
             )
         else:
             playback_backend = UnavailableVoicePlaybackBackend()
@@ -10,6 +10,7 @@ from application.chat.history_paths import resolve_history_path_for_project
 from config.feature_flags import FeatureFlag
 from core.sprite.chat_branch_storage import (
     STORY_SESSION_FILENAME,
+    STORY_SESSION_JOURNAL_FILENAME,
     chat_history_session_dir,
 )
 from core.story import StoryCompiler, StoryRuntime
@@ -205,8 +206,9 @@ def clear_story_session(state: Any) -> None:
 
 
 def discard_story_session_storage(history_path: str | Path) -> None:
-    path = chat_history_session_dir(history_path) / STORY_SESSION_FILENAME
-    path.unlink(missing_ok=True)
+    session_dir = chat_history_session_dir(history_path)
+    (session_dir / STORY_SESSION_FILENAME).unlink(missing_ok=True)
+    (session_dir / STORY_SESSION_JOURNAL_FILENAME).unlink(missing_ok=True)
 
 
 def release_unbound_story_session(state: Any, history_path: str | Path) -> None:
@@ -7,7 +7,9 @@ that can become a playable story.
 
 from __future__ import annotations
 
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
 import hashlib
@@ -62,6 +64,52 @@ class StoryGenerationStage(str, Enum):
 
 GENERATION_STAGES = tuple(StoryGenerationStage)
 
+# Direct inputs of each stage.  Stages whose inputs are all checkpointed run
+# concurrently; a stage's request only carries its transitive inputs so the
+# prompt does not depend on which sibling happened to finish first.
+STAGE_DEPENDENCIES = {
+    StoryGenerationStage.REQUIREMENTS: (),
+    StoryGenerationStage.BIBLE: (StoryGenerationStage.REQUIREMENTS,),
+    StoryGenerationStage.CHARACTERS: (
+        StoryGenerationStage.REQUIREMENTS,
+        StoryGenerationStage.BIBLE,
+    ),
+    StoryGenerationStage.STATE: (
+        StoryGenerationStage.BIBLE,
+        StoryGenerationStage.CHARACTERS,
+    ),
+    StoryGenerationStage.NARRATIVE: (
+        StoryGenerationStage.BIBLE,
+        StoryGenerationStage.CHARACTERS,
+        StoryGenerationStage.STATE,
+    ),
+    StoryGenerationStage.LOGIC: (
+        StoryGenerationStage.STATE,
+        StoryGenerationStage.NARRATIVE,
+    ),
+    StoryGenerationStage.RESOURCES: (
+        StoryGenerationStage.STATE,
+        StoryGenerationStage.NARRATIVE,
+        StoryGenerationStage.LOGIC,
+    ),
+}
+DEFAULT_PROVIDER_CONCURRENCY = 2
+_SIMULATION_CODES = frozenset(
+    {
+        "simulation.unreachable_nodes",
+        "simulation.no_ending",
+        "simulation.unreachable_endings",
+        "simulation.truncated",
+        "cast.simulation_failed",
+    }
+)
+_NODE_POINTER = re.compile(r"/narrativeGraph/nodes/(\d+)(?=/|$)")
+_PRESENTATION_POINTER = re.compile(
+    r"/metadata(?:/.*)?"
+    r"|/narrativeGraph/nodes/\d+/(?:title|exposedContext|lockedContext)(?:/.*)?"
+    r"|/narrativeGraph/nodes/\d+/choices/\d+/label"
+)
+
 
 class StoryGenerationStatus(str, Enum):
     QUEUED = "queued"
@@ -142,10 +190,17 @@ class ConfigStoryAuthorModel:
         self.config_manager = config_manager
         self._manager: Any = None
         self._signature: tuple[tuple[str, str], ...] = ()
+        self._lock = threading.Lock()
+
+    def concurrency_key(self) -> str:
+        """Requests sharing this key share one concurrency cap."""
+        provider = self.config_manager.get_llm_api_config()[0]
+        return str(provider or type(self).__name__)
 
     def complete(self, request: Mapping[str, Any]) -> Mapping[str, Any]:
         self.flags.require(FeatureFlag.STORY_SYSTEM)
-        manager = self._llm_manager()
+        with self._lock:
+            manager = self._llm_manager()
         adapter = getattr(manager, "llm_adapter", None)
         if adapter is None or not hasattr(adapter, "chat"):
             raise StoryGenerationError(
@@ -384,6 +439,20 @@ class StoryPatchApplier:
         *,
         base_version: int,
     ) -> dict[str, Any]:
+        return self.apply_tracked(source, patch, base_version=base_version)[0]
+
+    def apply_tracked(
+        self,
+        source: Mapping[str, Any],
+        patch: Mapping[str, Any],
+        *,
+        base_version: int,
+    ) -> tuple[dict[str, Any], tuple[str, ...]]:
+        """Apply ``patch`` and return the JSON pointers whose values may differ.
+
+        Inserting into or removing from an array shifts its later items, so
+        those operations report the array itself rather than the index.
+        """
         candidate = _json_copy(source)
         if patch.get("baseVersion") != base_version:
             raise StoryGenerationError(
@@ -399,22 +468,24 @@ class StoryPatchApplier:
                 "generation.patch_too_large",
                 f"patch has more than {MAX_PATCH_OPERATIONS} operations",
             )
+        touched: list[str] = []
         for index, operation in enumerate(operations):
             if not isinstance(operation, Mapping):
                 raise StoryGenerationError(
                     "generation.patch_invalid", f"operation {index} must be an object"
                 )
-            self._apply_operation(candidate, operation, index)
+            path = self._apply_operation(candidate, operation, index)
+            if path not in touched:
+                touched.append(path)
         candidate["version"] = base_version + 1
-        return candidate
+        return candidate, tuple(touched)
 
     def _apply_operation(
         self, source: dict[str, Any], operation: Mapping[str, Any], index: int
-    ) -> None:
+    ) -> str:
         op = str(operation.get("op") or "")
         if op.startswith("replace-"):
-            self._replace_domain_object(source, operation, index)
-            return
+            return self._replace_domain_object(source, operation, index)
         if op not in {"add", "replace", "remove"}:
             raise StoryGenerationError(
                 "generation.patch_op_forbidden",
@@ -443,8 +514,10 @@ class StoryPatchApplier:
                 parent.insert(position, _json_value(operation.get("value")))
             elif op == "replace":
                 parent[position] = _json_value(operation.get("value"))
+                return _encode_pointer(tokens[:-1] + [str(position)])
             else:
                 parent.pop(position)
+            return _encode_pointer(tokens[:-1])
         elif isinstance(parent, dict):
             exists = key in parent
             if op in {"replace", "remove"} and not exists:
@@ -455,6 +528,7 @@ class StoryPatchApplier:
                 del parent[key]
             else:
                 parent[key] = _json_value(operation.get("value"))
+            return _encode_pointer(tokens)
         else:
             raise StoryGenerationError(
                 "generation.patch_path_invalid", f"path {raw_path!r} has no container"
@@ -463,15 +537,24 @@ class StoryPatchApplier:
     @staticmethod
     def _replace_domain_object(
         source: dict[str, Any], operation: Mapping[str, Any], index: int
-    ) -> None:
+    ) -> str:
         specs = {
-            "replace-node": ("nodeId", source.get("narrativeGraph", {}).get("nodes")),
+            "replace-node": (
+                "nodeId",
+                "/narrativeGraph/nodes",
+                source.get("narrativeGraph", {}).get("nodes"),
+            ),
             "replace-character": (
                 "characterId",
+                "/cast/characters",
                 source.get("cast", {}).get("characters"),
             ),
-            "replace-variable": ("variableId", source.get("variables")),
-            "replace-rule-node": ("nodeId", source.get("logicGraph", {}).get("nodes")),
+            "replace-variable": ("variableId", "/variables", source.get("variables")),
+            "replace-rule-node": (
+                "nodeId",
+                "/logicGraph/nodes",
+                source.get("logicGraph", {}).get("nodes"),
+            ),
         }
         op = str(operation.get("op") or "")
         if op not in specs:
@@ -479,7 +562,7 @@ class StoryPatchApplier:
                 "generation.patch_op_forbidden",
                 f"operation {index} uses forbidden op {op!r}",
             )
-        id_field, collection = specs[op]
+        id_field, pointer, collection = specs[op]
         object_id = _safe_id(operation.get(id_field), id_field)
         value = operation.get("value")
         if not isinstance(value, Mapping):
@@ -497,10 +580,10 @@ class StoryPatchApplier:
                         )
                     replacement["id"] = object_id
                     collection[position] = replacement
-                    return
+                    return f"{pointer}/{position}"
         elif isinstance(collection, dict) and object_id in collection:
             collection[object_id] = _json_copy(value)
-            return
+            return _encode_pointer([*pointer.split("/")[1:], object_id])
         raise StoryGenerationError(
             "generation.patch_target_missing", f"operation {index} target was not found"
         )
@@ -512,7 +595,16 @@ class StoryDraftValidator:
         source: Mapping[str, Any],
         *,
         story_bible: Mapping[str, Any] | None = None,
+        previous: GenerationValidationReport | None = None,
+        changed_paths: Sequence[str] | None = None,
     ) -> GenerationValidationReport:
+        """Validate ``source``; with ``previous`` and ``changed_paths`` reuse work.
+
+        Schema parsing and compilation always rerun.  When every changed path
+        is presentation-only (titles, labels, exposed or locked context,
+        metadata) the previous simulation result stands, and the secret scan
+        only revisits narrative nodes under a changed path.
+        """
         issues: list[GenerationValidationIssue] = []
         source_hash = hashlib.sha256(canonical_json(source).encode("utf-8")).hexdigest()
         try:
@@ -546,6 +638,32 @@ class StoryDraftValidator:
                 valid=False, issues=tuple(issues), source_hash=source_hash
             )
 
+        secret_issues = _incremental_secret_issues(
+            source, story_bible or {}, previous, changed_paths
+        )
+        if (
+            previous is not None
+            and changed_paths is not None
+            and previous.explored_states > 0
+            and all(_is_presentation_path(path) for path in changed_paths)
+        ):
+            issues.extend(
+                item for item in previous.issues if item.code in _SIMULATION_CODES
+            )
+            issues.extend(secret_issues)
+            return GenerationValidationReport(
+                valid=not any(
+                    item.severity == DiagnosticSeverity.ERROR.value for item in issues
+                ),
+                issues=tuple(issues),
+                reachable_node_ids=previous.reachable_node_ids,
+                ending_node_ids=previous.ending_node_ids,
+                reachable_ending_ids=previous.reachable_ending_ids,
+                cast_failure_node_ids=previous.cast_failure_node_ids,
+                explored_states=previous.explored_states,
+                source_hash=source_hash,
+            )
+
         runtime = StoryRuntime(compile_result.program)
         try:
             simulation = StorySimulator(
@@ -598,7 +716,6 @@ class StoryDraftValidator:
                     f"/narrativeGraph/nodes/{node_id}/castPolicy",
                 )
             )
-        issues.extend(_secret_isolation_issues(source, story_bible or {}))
         if simulation.truncated:
             issues.append(
                 GenerationValidationIssue(
@@ -608,6 +725,7 @@ class StoryDraftValidator:
                     "warning",
                 )
             )
+        issues.extend(secret_issues)
         valid = not any(
             item.severity == DiagnosticSeverity.ERROR.value for item in issues
         )
@@ -623,6 +741,15 @@ class StoryDraftValidator:
         )
 
 
+@dataclass(frozen=True, slots=True)
+class _StageOutcome:
+    stage: StoryGenerationStage
+    request: Mapping[str, Any]
+    response: Mapping[str, Any]
+    artifact: dict[str, Any]
+    wall_ms: int
+
+
 class StoryGenerationService:
     def __init__(
         self,
@@ -632,6 +759,7 @@ class StoryGenerationService:
         *,
         validator: StoryDraftValidator | None = None,
         patch_applier: StoryPatchApplier | None = None,
+        provider_concurrency: int = DEFAULT_PROVIDER_CONCURRENCY,
     ) -> None:
         flags.require(FeatureFlag.STORY_SYSTEM)
         self.flags = flags
@@ -639,14 +767,28 @@ class StoryGenerationService:
         self.model = model
         self.validator = validator or StoryDraftValidator()
         self.patch_applier = patch_applier or StoryPatchApplier()
+        self.provider_concurrency = max(1, int(provider_concurrency))
         self._guard = threading.Lock()
         self._task_locks: dict[str, threading.Lock] = {}
         self._active_runs: set[str] = set()
+        self._provider_slots: dict[str, threading.BoundedSemaphore] = {}
 
     def _lock_for(self, task_id: str) -> threading.Lock:
         with self._guard:
             return self._task_locks.setdefault(task_id, threading.Lock())
 
+    @contextmanager
+    def _provider_slot(self) -> Iterator[None]:
+        key_for = getattr(self.model, "concurrency_key", None)
+        key = str(key_for()) if callable(key_for) else type(self.model).__name__
+        with self._guard:
+            slot = self._provider_slots.get(key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.provider_concurrency)
+                self._provider_slots[key] = slot
+        with slot:
+            yield
+
     def create(
         self,
         synopsis: str,
@@ -683,6 +825,7 @@ class StoryGenerationService:
                 "inputChars": 0,
                 "outputChars": 0,
                 "estimatedTokens": 0,
+                "stages": {},
             },
             "repairAttempts": 0,
             "cancelRequested": False,
@@ -813,59 +956,38 @@ class StoryGenerationService:
         if task.get("cancelRequested") and not resume:
             raise StoryGenerationCancelled()
         try:
-            for stage in GENERATION_STAGES:
-                if stage.value in task.get("completedStages", []):
-                    continue
-                self._check_cancel(task_id, is_cancelled)
-                task["currentStage"] = stage.value
-                task = self.repository.save(task)
-                self._notify(on_progress, task, stage)
-                request = self._stage_request(task, stage)
-                response = self.model.complete(request)
-                artifact = self._validate_stage_response(
-                    stage,
-                    response,
-                    resource_catalog=task.get("resourceCatalog", {}),
-                )
-                digest = self.repository.save_artifact(task_id, stage, artifact)
-                completed = list(task.get("completedStages", []))
-                completed.append(stage.value)
-                task["completedStages"] = completed
-                task.setdefault("artifactHashes", {})[stage.value] = digest
-                if stage is StoryGenerationStage.REQUIREMENTS:
-                    task["assumptions"] = list(artifact.get("assumptions") or [])
-                if stage is StoryGenerationStage.CHARACTERS:
-                    self._materialize_author_characters(task_id, artifact)
-                task["cost"] = _updated_cost(task.get("cost"), request, response)
-                task = self.repository.save(task)
-                self._notify(on_progress, task, stage)
+            task = self._run_stages(task_id, task, is_cancelled, on_progress)
 
             self._check_cancel(task_id, is_cancelled)
             source = self._compose_source(task_id)
-            report = self.validator.validate(
-                source,
-                story_bible=self.repository.load_artifact(
-                    task_id, StoryGenerationStage.BIBLE
-                ),
-            )
+            bible = self.repository.load_artifact(task_id, StoryGenerationStage.BIBLE)
+            report = self.validator.validate(source, story_bible=bible)
             while (
                 not report.valid and task.get("repairAttempts", 0) < MAX_REPAIR_ATTEMPTS
             ):
                 self._check_cancel(task_id, is_cancelled)
                 task["currentStage"] = "repair"
                 request = self._repair_request(task, source, report)
-                response = self.model.complete(request)
-                source = self.patch_applier.apply(
+                with self._provider_slot():
+                    started = time.perf_counter()
+                    response = self.model.complete(request)
+                source, changed_paths = self.patch_applier.apply_tracked(
                     source, response, base_version=int(source["version"])
                 )
                 self._checkpoint_repaired_source(task, source)
                 task["repairAttempts"] = int(task.get("repairAttempts", 0)) + 1
-                task["cost"] = _updated_cost(task.get("cost"), request, response)
+                task["cost"] = _updated_cost(
+                    task.get("cost"),
+                    request,
+                    response,
+                    stage="repair",
+                    wall_ms=_elapsed_ms(started),
+                )
                 report = self.validator.validate(
                     source,
-                    story_bible=self.repository.load_artifact(
-                        task_id, StoryGenerationStage.BIBLE
-                    ),
+                    story_bible=bible,
+                    previous=report,
+                    changed_paths=changed_paths,
                 )
                 task["validation"] = report.to_payload()
                 task = self.repository.save(task)
@@ -915,12 +1037,131 @@ class StoryGenerationService:
             self.repository.save(task)
             raise
 
+    def _run_stages(
+        self,
+        task_id: str,
+        task: dict[str, Any],
+        is_cancelled: Callable[[], bool] | None,
+        on_progress: Callable[[Mapping[str, Any]], None] | None,
+    ) -> dict[str, Any]:
+        """Run every missing stage as soon as its inputs are checkpointed.
+
+        Model calls run on worker threads; checkpoints, progress callbacks and
+        cancellation checks stay on this thread.  After the first failure no
+        new stage starts, stages already in flight are still checkpointed, and
+        the failure is raised with ``currentStage`` naming the failed stage.
+        """
+        pending = [
+            stage
+            for stage in GENERATION_STAGES
+            if stage.value not in task.get("completedStages", [])
+        ]
+        running: dict[Future[_StageOutcome], StoryGenerationStage] = {}
+        failure: BaseException | None = None
+        failed_stage: StoryGenerationStage | None = None
+        with ThreadPoolExecutor(
+            max_workers=self.provider_concurrency,
+            thread_name_prefix="story-generation",
+        ) as executor:
+            while pending or running:
+                try:
+                    for stage in self._ready_stages(task, pending, len(running)):
+                        self._check_cancel(task_id, is_cancelled)
+                        pending.remove(stage)
+                        task["currentStage"] = stage.value
+                        task = self.repository.save(task)
+                        self._notify(on_progress, task, stage)
+                        future = executor.submit(
+                            self._complete_stage,
+                            stage,
+                            self._stage_request(task, stage),
+                            task.get("resourceCatalog", {}),
+                        )
+                        running[future] = stage
+                except Exception as error:
+                    failure = error
+                    pending.clear()
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(
+                    done, key=lambda item: GENERATION_STAGES.index(running[item])
+                ):
+                    stage = running.pop(future)
+                    try:
+                        task = self._checkpoint_stage(task_id, task, future.result())
+                    except Exception as error:
+                        if failure is None:
+                            failure, failed_stage = error, stage
+                        pending.clear()
+                        continue
+                    self._notify(on_progress, task, stage)
+        if failure is not None:
+            if failed_stage is not None:
+                task["currentStage"] = failed_stage.value
+                self.repository.save(task)
+            raise failure
+        return task
+
+    def _ready_stages(
+        self,
+        task: Mapping[str, Any],
+        pending: Sequence[StoryGenerationStage],
+        in_flight: int,
+    ) -> list[StoryGenerationStage]:
+        completed = set(task.get("completedStages", []))
+        ready = [
+            stage
+            for stage in pending
+            if all(item.value in completed for item in STAGE_DEPENDENCIES[stage])
+        ]
+        return ready[: max(0, self.provider_concurrency - in_flight)]
+
+    def _complete_stage(
+        self,
+        stage: StoryGenerationStage,
+        request: Mapping[str, Any],
+        resource_catalog: Mapping[str, Any],
+    ) -> _StageOutcome:
+        with self._provider_slot():
+            started = time.perf_counter()
+            response = self.model.complete(request)
+        artifact = self._validate_stage_response(
+            stage, response, resource_catalog=resource_catalog
+        )
+        return _StageOutcome(stage, request, response, artifact, _elapsed_ms(started))
+
+    def _checkpoint_stage(
+        self, task_id: str, task: dict[str, Any], outcome: _StageOutcome
+    ) -> dict[str, Any]:
+        stage = outcome.stage
+        digest = self.repository.save_artifact(task_id, stage, outcome.artifact)
+        completed = set(task.get("completedStages", []))
+        completed.add(stage.value)
+        task["completedStages"] = [
+            item.value for item in GENERATION_STAGES if item.value in completed
+        ]
+        task.setdefault("artifactHashes", {})[stage.value] = digest
+        if stage is StoryGenerationStage.REQUIREMENTS:
+            task["assumptions"] = list(outcome.artifact.get("assumptions") or [])
+        if stage is StoryGenerationStage.CHARACTERS:
+            self._materialize_author_characters(task_id, outcome.artifact)
+        task["cost"] = _updated_cost(
+            task.get("cost"),
+            outcome.request,
+            outcome.response,
+            stage=stage.value,
+            wall_ms=outcome.wall_ms,
+        )
+        return self.repository.save(task)
+
     def _stage_request(
         self, task: Mapping[str, Any], stage: StoryGenerationStage
     ) -> dict[str, Any]:
+        inputs = _stage_inputs(stage)
         completed: dict[str, Any] = {}
         for item in GENERATION_STAGES:
-            if item.value in task.get("completedStages", []):
+            if item in inputs and item.value in task.get("completedStages", []):
                 completed[item.value] = self.repository.load_artifact(
                     str(task["id"]), item
                 )
@@ -1491,8 +1732,50 @@ def _binding_ids(value: Any) -> set[str]:
     return set()
 
 
+def _is_presentation_path(path: str) -> bool:
+    return _PRESENTATION_POINTER.fullmatch(path) is not None
+
+
+def _incremental_secret_issues(
+    source: Mapping[str, Any],
+    bible: Mapping[str, Any],
+    previous: GenerationValidationReport | None,
+    changed_paths: Sequence[str] | None,
+) -> list[GenerationValidationIssue]:
+    # Reports that stopped before simulation never ran the secret scan.
+    if previous is None or changed_paths is None or previous.explored_states <= 0:
+        return _secret_isolation_issues(source, bible)
+    changed_nodes: set[int] = set()
+    for path in changed_paths:
+        match = _NODE_POINTER.match(path)
+        if match is not None:
+            changed_nodes.add(int(match.group(1)))
+        elif path in {"", "/narrativeGraph"} or path.startswith(
+            "/narrativeGraph/nodes"
+        ):
+            return _secret_isolation_issues(source, bible)
+    kept = [
+        item
+        for item in previous.issues
+        if item.code == "secret.exposed"
+        and _issue_node_index(item) not in changed_nodes
+    ]
+    if not changed_nodes:
+        return kept
+    rescanned = _secret_isolation_issues(source, bible, only_nodes=changed_nodes)
+    return sorted(kept + rescanned, key=_issue_node_index)
+
+
+def _issue_node_index(issue: GenerationValidationIssue) -> int:
+    match = _NODE_POINTER.match(issue.path)
+    return int(match.group(1)) if match is not None else -1
+
+
 def _secret_isolation_issues(
-    source: Mapping[str, Any], bible: Mapping[str, Any]
+    source: Mapping[str, Any],
+    bible: Mapping[str, Any],
+    *,
+    only_nodes: set[int] | None = None,
 ) -> list[GenerationValidationIssue]:
     secrets = {
         item.strip()
@@ -1506,6 +1789,8 @@ def _secret_isolation_issues(
     for index, node in enumerate(nodes if isinstance(nodes, list) else []):
         if not isinstance(node, Mapping):
             continue
+        if only_nodes is not None and index not in only_nodes:
+            continue
         visible_fields = (
             ("title", node.get("title", "")),
             ("exposedContext", node.get("exposedContext", {})),
@@ -1541,8 +1826,13 @@ def _secret_isolation_issues(
 
 
 def _updated_cost(
-    current: Any, request: Mapping[str, Any], response: Mapping[str, Any]
-) -> dict[str, int]:
+    current: Any,
+    request: Mapping[str, Any],
+    response: Mapping[str, Any],
+    *,
+    stage: str,
+    wall_ms: int,
+) -> dict[str, Any]:
     base = dict(current) if isinstance(current, Mapping) else {}
     input_chars = len(canonical_json(request))
     output_chars = len(canonical_json(response))
@@ -1558,15 +1848,42 @@ def _updated_cost(
             raw = usage.get(key)
             if isinstance(raw, int) and raw > 0:
                 explicit_tokens += raw
+    tokens = explicit_tokens or (input_chars + output_chars + 3) // 4
+    stages = base.get("stages")
+    stages = dict(stages) if isinstance(stages, Mapping) else {}
+    spent = stages.get(stage)
+    spent = spent if isinstance(spent, Mapping) else {}
+    stages[stage] = {
+        "requests": int(spent.get("requests", 0)) + 1,
+        "inputChars": int(spent.get("inputChars", 0)) + input_chars,
+        "outputChars": int(spent.get("outputChars", 0)) + output_chars,
+        "estimatedTokens": int(spent.get("estimatedTokens", 0)) + tokens,
+        "wallMs": int(spent.get("wallMs", 0)) + wall_ms,
+    }
     return {
         "requests": int(base.get("requests", 0)) + 1,
         "inputChars": int(base.get("inputChars", 0)) + input_chars,
         "outputChars": int(base.get("outputChars", 0)) + output_chars,
-        "estimatedTokens": int(base.get("estimatedTokens", 0))
-        + (explicit_tokens or (input_chars + output_chars + 3) // 4),
+        "estimatedTokens": int(base.get("estimatedTokens", 0)) + tokens,
+        "stages": stages,
     }
 
 
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1_000)
+
+
+def _stage_inputs(stage: StoryGenerationStage) -> frozenset[StoryGenerationStage]:
+    inputs: set[StoryGenerationStage] = set()
+    frontier = list(STAGE_DEPENDENCIES[stage])
+    while frontier:
+        item = frontier.pop()
+        if item not in inputs:
+            inputs.add(item)
+            frontier.extend(STAGE_DEPENDENCIES[item])
+    return frozenset(inputs)
+
+
 def _adapter_text_content(response: Any) -> Any:
     if isinstance(response, (str, Mapping)):
         return response
@@ -1646,6 +1963,10 @@ def _list_position(value: str, length: int, *, allow_end: bool) -> int:
     return position
 
 
+def _encode_pointer(tokens: Sequence[str]) -> str:
+    return "".join("/" + item.replace("~", "~0").replace("/", "~1") for item in tokens)
+
+
 def _decode_pointer(value: str) -> str:
     if re.search(r"~(?![01])", value):
         raise StoryGenerationError(
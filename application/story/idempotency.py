@@ -9,6 +9,7 @@ from types import MappingProxyType
 from typing import Any
 
 from core.story.compiler import canonical_json
+from core.story.persistent import PersistentVector
 from core.story.state import freeze_mapping
 
 
@@ -37,6 +38,40 @@ class StoryCommandRecord:
         object.__setattr__(self, "event_ids", tuple(self.event_ids))
         object.__setattr__(self, "ack", freeze_mapping(self.ack))
 
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "commandId": self.command_id,
+            "payloadHash": self.payload_hash,
+            "accepted": self.accepted,
+            "resultingRevision": self.resulting_revision,
+            "eventIds": list(self.event_ids),
+            "ack": dict(self.ack),
+        }
+
+    @classmethod
+    def from_payload(cls, raw: Any) -> StoryCommandRecord:
+        if not isinstance(raw, Mapping):
+            raise ValueError("idempotency record must be an object")
+        command_id = str(raw.get("commandId") or "")
+        payload_hash = str(raw.get("payloadHash") or "")
+        event_ids = raw.get("eventIds")
+        ack = raw.get("ack")
+        if (
+            not command_id
+            or len(payload_hash) != 64
+            or not isinstance(event_ids, list)
+            or not isinstance(ack, Mapping)
+        ):
+            raise ValueError("invalid idempotency record")
+        return cls(
+            command_id=command_id,
+            payload_hash=payload_hash,
+            accepted=bool(raw.get("accepted")),
+            resulting_revision=int(raw.get("resultingRevision") or 0),
+            event_ids=tuple(str(item) for item in event_ids),
+            ack=ack,
+        )
+
 
 class StoryCommandIdempotencyIndex:
     """Bounded branch-local command result index persisted by application."""
@@ -45,26 +80,31 @@ class StoryCommandIdempotencyIndex:
         if max_entries < 1:
             raise ValueError("max_entries must be positive")
         self.max_entries = max_entries
-        self._records: dict[str, StoryCommandRecord] = {}
-        self._order: list[str] = []
+        self._order: PersistentVector[StoryCommandRecord] = PersistentVector()
+        self._by_id: dict[str, StoryCommandRecord] | None = {}
 
     @property
     def records(self) -> Mapping[str, StoryCommandRecord]:
-        return MappingProxyType(dict(self._records))
+        return MappingProxyType(dict(self._lookup_table()))
+
+    def snapshot(self) -> PersistentVector[StoryCommandRecord]:
+        """The current records in order; O(1) and unaffected by later writes."""
+        return self._order
+
+    @classmethod
+    def from_records(
+        cls,
+        records: PersistentVector[StoryCommandRecord],
+        *,
+        max_entries: int = 256,
+    ) -> StoryCommandIdempotencyIndex:
+        index = cls(max_entries=max_entries)
+        index._order = records.drop(len(records) - max_entries)
+        index._by_id = None
+        return index
 
     def to_payload(self) -> list[dict[str, Any]]:
-        return [
-            {
-                "commandId": record.command_id,
-                "payloadHash": record.payload_hash,
-                "accepted": record.accepted,
-                "resultingRevision": record.resulting_revision,
-                "eventIds": list(record.event_ids),
-                "ack": dict(record.ack),
-            }
-            for command_id in self._order
-            if (record := self._records.get(command_id)) is not None
-        ]
+        return [record.to_payload() for record in self._order]
 
     @classmethod
     def from_payload(
@@ -75,36 +115,14 @@ class StoryCommandIdempotencyIndex:
     ) -> StoryCommandIdempotencyIndex:
         if not isinstance(payload, list):
             raise ValueError("idempotency payload must be a list")
-        index = cls(max_entries=max_entries)
-        for raw in payload[-max_entries:]:
-            if not isinstance(raw, Mapping):
-                raise ValueError("idempotency record must be an object")
-            command_id = str(raw.get("commandId") or "")
-            payload_hash = str(raw.get("payloadHash") or "")
-            event_ids = raw.get("eventIds")
-            ack = raw.get("ack")
-            if (
-                not command_id
-                or len(payload_hash) != 64
-                or not isinstance(event_ids, list)
-                or not isinstance(ack, Mapping)
-            ):
-                raise ValueError("invalid idempotency record")
-            record = StoryCommandRecord(
-                command_id=command_id,
-                payload_hash=payload_hash,
-                accepted=bool(raw.get("accepted")),
-                resulting_revision=int(raw.get("resultingRevision") or 0),
-                event_ids=tuple(str(item) for item in event_ids),
-                ack=ack,
-            )
-            index._records[command_id] = record
-            index._order.append(command_id)
-        return index
+        records = PersistentVector(
+            StoryCommandRecord.from_payload(raw) for raw in payload[-max_entries:]
+        )
+        return cls.from_records(records, max_entries=max_entries)
 
     def lookup(self, command: Any) -> StoryCommandRecord | None:
         command_id = self._command_id(command)
-        existing = self._records.get(command_id)
+        existing = self._lookup_table().get(command_id)
         if existing is None:
             return None
         self._require_same_payload(existing, story_command_payload_hash(command))
@@ -121,7 +139,8 @@ class StoryCommandIdempotencyIndex:
     ) -> StoryCommandRecord:
         command_id = self._command_id(command)
         payload_hash = story_command_payload_hash(command)
-        existing = self._records.get(command_id)
+        records = self._lookup_table()
+        existing = records.get(command_id)
         if existing is not None:
             self._require_same_payload(existing, payload_hash)
             return existing
@@ -133,13 +152,23 @@ class StoryCommandIdempotencyIndex:
             event_ids=event_ids,
             ack=ack,
         )
-        self._records[command_id] = record
-        self._order.append(command_id)
-        while len(self._order) > self.max_entries:
-            removed = self._order.pop(0)
-            self._records.pop(removed, None)
+        records[command_id] = record
+        self._order = self._order.append(record)
+        if len(self._order) > self.max_entries:
+            evicted = self._order[: len(self._order) - self.max_entries]
+            self._order = self._order.drop(len(evicted))
+            for removed in evicted:
+                if records.get(removed.command_id) is removed:
+                    del records[removed.command_id]
         return record
 
+    def _lookup_table(self) -> dict[str, StoryCommandRecord]:
+        # Built lazily so forks and restores that never look anything up
+        # stay O(1).
+        if self._by_id is None:
+            self._by_id = {record.command_id: record for record in self._order}
+        return self._by_id
+
     @staticmethod
     def _command_id(command: Any) -> str:
         command_id = getattr(command, "command_id", None)
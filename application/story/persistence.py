@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass, field
 import hashlib
 import json
@@ -10,10 +10,14 @@ import os
 from pathlib import Path
 import re
 import tempfile
+import threading
 from types import MappingProxyType
 from typing import Any
 
-from core.sprite.chat_branch_storage import STORY_SESSION_FILENAME
+from core.sprite.chat_branch_storage import (
+    STORY_SESSION_FILENAME,
+    STORY_SESSION_JOURNAL_FILENAME,
+)
 
 from core.story import (
     CanonFact,
@@ -33,7 +37,14 @@ from core.story import (
 from core.story.state import variable_value_is_valid
 
 
-STORY_SESSION_STORAGE_VERSION = 2
+# v3 delta-encodes checkpoints without their states and records the journal
+# position (journalSeq); v2 documents carry full checkpoints and no journal,
+# and still load as-is.
+STORY_SESSION_STORAGE_VERSION = 3
+_READABLE_STORY_SESSION_STORAGE_VERSIONS = frozenset({2, STORY_SESSION_STORAGE_VERSION})
+STORY_SESSION_SNAPSHOT_INTERVAL = 64
+MAX_BRANCH_CHECKPOINTS = 128
+MAX_OUTBOX_ENTRIES = 256
 _GLOBAL_PROGRESS_SLUG_LIMIT = 100
 _GLOBAL_PROGRESS_HASH_LENGTH = 16
 _VARIABLE_EVENT_TYPES = frozenset(
@@ -349,33 +360,324 @@ class GlobalEffectOutboxEntry:
 
 
 class JsonStorySessionRepository:
-    """Store one v2 story document beside, but separate from, legacy history."""
-
-    def __init__(self, session_root: str | Path) -> None:
+    """Store one v3 story document beside, but separate from, legacy history.
+
+    The document is a periodic snapshot. Between snapshots the session appends
+    small journal records (one JSON line each) describing what changed in a
+    single branch; :meth:`load` folds them back into the document. Branch and
+    checkpoint states touched by the journal are left out and rebuilt by
+    replaying the branch event log.
+    """
+
+    def __init__(
+        self,
+        session_root: str | Path,
+        *,
+        snapshot_interval: int = STORY_SESSION_SNAPSHOT_INTERVAL,
+    ) -> None:
+        if snapshot_interval < 1:
+            raise ValueError("snapshot_interval must be positive")
         self.session_root = Path(session_root).resolve(strict=False)
         self.path = self.session_root / STORY_SESSION_FILENAME
+        self.journal_path = self.session_root / STORY_SESSION_JOURNAL_FILENAME
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._pending = 0
+        self._attached = False
 
     def load(self) -> dict[str, Any] | None:
-        if not self.path.is_file():
-            return None
-        try:
-            with self.path.open(encoding="utf-8") as file:
-                payload = json.load(file)
-        except (OSError, json.JSONDecodeError) as error:
-            raise StoryPersistenceError(
-                "story session document is unreadable"
-            ) from error
-        if not isinstance(payload, dict):
-            raise StoryPersistenceError("story session document must be an object")
-        if int(payload.get("version") or 0) != STORY_SESSION_STORAGE_VERSION:
-            raise StoryPersistenceError("unsupported story session storage version")
-        return payload
+        with self._lock:
+            if not self.path.is_file():
+                return None
+            try:
+                with self.path.open(encoding="utf-8") as file:
+                    payload = json.load(file)
+            except (OSError, json.JSONDecodeError) as error:
+                raise StoryPersistenceError(
+                    "story session document is unreadable"
+                ) from error
+            if not isinstance(payload, dict):
+                raise StoryPersistenceError("story session document must be an object")
+            if (
+                int(payload.get("version") or 0)
+                not in _READABLE_STORY_SESSION_STORAGE_VERSIONS
+            ):
+                raise StoryPersistenceError("unsupported story session storage version")
+            seq = int(payload.get("journalSeq") or 0)
+            records, complete_bytes = self._read_journal()
+            self._truncate_torn_tail(complete_bytes)
+            for record in records:
+                record_seq = int(record.get("seq") or 0)
+                if record_seq <= seq:
+                    continue
+                if record_seq != seq + 1:
+                    raise StoryPersistenceError("story session journal has a gap")
+                apply_story_session_record(payload, record)
+                seq = record_seq
+            self._seq = seq
+            self._pending = len(records)
+            self._attached = True
+            return payload
 
     def save(self, payload: Mapping[str, Any]) -> None:
+        """Write a full snapshot and start an empty journal."""
+        with self._lock:
+            self._write_snapshot(payload)
+
+    def append(
+        self,
+        record: Mapping[str, Any],
+        *,
+        snapshot: Callable[[], Mapping[str, Any]],
+    ) -> None:
+        """Durably append one journal record.
+
+        ``snapshot`` returns the full document (already including ``record``);
+        it is only called when no snapshot exists yet or the journal is due
+        for compaction.
+        """
+        with self._lock:
+            if not self._attached or not self.path.is_file():
+                self._write_snapshot(snapshot())
+                return
+            line = json.dumps(
+                {**_json_value(record), "seq": self._seq + 1},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            with self.journal_path.open("a", encoding="utf-8") as file:
+                file.write(line + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self._seq += 1
+            self._pending += 1
+            if self._pending >= self.snapshot_interval:
+                self._write_snapshot(snapshot())
+
+    def _write_snapshot(self, payload: Mapping[str, Any]) -> None:
         document = dict(payload)
         document["version"] = STORY_SESSION_STORAGE_VERSION
+        document["journalSeq"] = self._seq
         self.session_root.mkdir(parents=True, exist_ok=True)
         _atomic_write_json(self.path, document)
+        # Records up to journalSeq are in the snapshot; if we crash before the
+        # unlink, load() skips them.
+        self.journal_path.unlink(missing_ok=True)
+        self._pending = 0
+        self._attached = True
+
+    def _read_journal(self) -> tuple[list[Mapping[str, Any]], int]:
+        """Parse complete journal lines; also return the byte length they span.
+
+        A final line without its newline is a torn append that was never
+        acknowledged, so it is dropped.
+        """
+        try:
+            data = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return [], 0
+        except OSError as error:
+            raise StoryPersistenceError(
+                "story session journal is unreadable"
+            ) from error
+        complete_bytes = data.rfind(b"\n") + 1
+        records: list[Mapping[str, Any]] = []
+        for line in data[:complete_bytes].split(b"\n"):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError) as error:
+                raise StoryPersistenceError(
+                    "story session journal is corrupted"
+                ) from error
+            if not isinstance(record, Mapping):
+                raise StoryPersistenceError(
+                    "story session journal record must be an object"
+                )
+            records.append(record)
+        return records, complete_bytes
+
+    def _truncate_torn_tail(self, complete_bytes: int) -> None:
+        # Cut the fragment off before the next append lands behind it on the
+        # same line and turns it into a corrupted middle record.
+        try:
+            with self.journal_path.open("r+b") as file:
+                if file.seek(0, os.SEEK_END) <= complete_bytes:
+                    return
+                file.truncate(complete_bytes)
+                file.flush()
+                os.fsync(file.fileno())
+        except FileNotFoundError:
+            return
+        except OSError as error:
+            raise StoryPersistenceError(
+                "story session journal is unreadable"
+            ) from error
+
+
+def apply_story_session_record(
+    document: dict[str, Any],
+    record: Mapping[str, Any],
+) -> None:
+    """Fold one journal record into a story session document in place."""
+    branches = document.get("branches")
+    if not isinstance(branches, dict):
+        raise StoryPersistenceError("invalid story session document")
+    op = str(record.get("op") or "")
+    branch_id = str(record.get("branchId") or "")
+    if op == "switch":
+        if branch_id not in branches:
+            raise StoryPersistenceError("journal switches to an unknown branch")
+        document["activeBranchId"] = branch_id
+        return
+    if op == "outbox":
+        applied = set(_sequence(record.get("appliedIds", ()), "appliedIds"))
+        outbox = _mapping_sequence(document.get("globalEffectOutbox", []), "outbox")
+        document["globalEffectOutbox"] = [
+            dict(item) for item in outbox if item.get("id") not in applied
+        ][-MAX_OUTBOX_ENTRIES:]
+        return
+    if op == "fork":
+        source = _journal_branch(branches, str(record.get("sourceBranchId") or ""))
+        checkpoint = _journal_checkpoint(source, int(record.get("generation") or 0))
+        forked = {
+            "id": branch_id,
+            "parentId": source["id"],
+            "generation": checkpoint["generation"],
+            "headEventId": checkpoint.get("headEventId"),
+            "events": list(source["events"][: int(checkpoint["eventCount"])]),
+            "checkpoints": [
+                item
+                for item in source["checkpoints"]
+                if int(item["generation"]) <= int(checkpoint["generation"])
+            ],
+            "idempotency": list(checkpoint.get("idempotency", [])),
+            "historyEntries": list(checkpoint.get("historyEntries", [])),
+        }
+        if "state" in checkpoint:
+            forked["state"] = checkpoint["state"]
+        branches[branch_id] = forked
+        document["activeBranchId"] = branch_id
+        return
+    branch = _journal_branch(branches, branch_id)
+    if op == "restore":
+        checkpoint = _journal_checkpoint(branch, int(record.get("generation") or 0))
+        branch["generation"] = checkpoint["generation"]
+        branch["headEventId"] = checkpoint.get("headEventId")
+        del branch["events"][int(checkpoint["eventCount"]) :]
+        branch["checkpoints"] = [
+            item
+            for item in branch["checkpoints"]
+            if int(item["generation"]) <= int(checkpoint["generation"])
+        ]
+        branch["idempotency"] = list(checkpoint.get("idempotency", []))
+        branch["historyEntries"] = list(checkpoint.get("historyEntries", []))
+        branch.pop("state", None)
+        if "state" in checkpoint:
+            branch["state"] = checkpoint["state"]
+    elif op == "history":
+        branch["historyEntries"] = _apply_sequence_delta(
+            branch["historyEntries"], record.get("historyDelta")
+        )
+        if branch["checkpoints"]:
+            latest = dict(branch["checkpoints"][-1])
+            latest["historyEntries"] = branch["historyEntries"]
+            latest["messageCount"] = len(branch["historyEntries"])
+            branch["checkpoints"][-1] = latest
+    elif op == "commit":
+        if "historyDelta" in record:
+            branch["historyEntries"] = _apply_sequence_delta(
+                branch["historyEntries"], record["historyDelta"]
+            )
+        branch["events"].extend(_sequence(record.get("events", ()), "events"))
+        branch["headEventId"] = record.get("headEventId")
+        branch["generation"] = int(record.get("generation") or 0)
+        command = record.get("command")
+        if isinstance(command, Mapping):
+            branch["idempotency"].append(dict(command))
+        branch.pop("state", None)
+        branch["checkpoints"].append(
+            {
+                "generation": branch["generation"],
+                "messageCount": len(branch["historyEntries"]),
+                "headEventId": branch["headEventId"],
+                "eventCount": len(branch["events"]),
+                "historyEntries": branch["historyEntries"],
+                "idempotency": list(branch["idempotency"]),
+            }
+        )
+        del branch["checkpoints"][:-MAX_BRANCH_CHECKPOINTS]
+        outbox = record.get("outbox")
+        if isinstance(outbox, Mapping):
+            document.setdefault("globalEffectOutbox", []).append(dict(outbox))
+    else:
+        raise StoryPersistenceError(f"unknown story session journal op {op!r}")
+
+
+def _journal_branch(branches: Mapping[str, Any], branch_id: str) -> dict[str, Any]:
+    branch = branches.get(branch_id)
+    if not isinstance(branch, dict):
+        raise StoryPersistenceError(f"journal references unknown branch {branch_id!r}")
+    for key in ("events", "checkpoints", "idempotency"):
+        if not isinstance(branch.get(key), list):
+            raise StoryPersistenceError("story branch logs must be lists")
+    branch.setdefault("historyEntries", [])
+    _expand_checkpoint_deltas(branch)
+    return branch
+
+
+def _expand_checkpoint_deltas(branch: dict[str, Any]) -> None:
+    """Rewrite delta-encoded checkpoints with full lists so records can edit them."""
+    checkpoints = _mapping_sequence(branch["checkpoints"], "checkpoints")
+    if not any(
+        "historyDelta" in item or "idempotencyDelta" in item for item in checkpoints
+    ):
+        return
+    history: list[Any] = []
+    records: list[Any] = []
+    expanded = []
+    for checkpoint in checkpoints:
+        checkpoint = dict(checkpoint)
+        if "historyDelta" in checkpoint or "idempotencyDelta" in checkpoint:
+            history = _apply_sequence_delta(
+                history, checkpoint.pop("historyDelta", None)
+            )
+            records = _apply_sequence_delta(
+                records, checkpoint.pop("idempotencyDelta", None)
+            )
+            checkpoint["historyEntries"] = history
+            checkpoint["idempotency"] = records
+        else:
+            history = list(_sequence(checkpoint.get("historyEntries", []), "history"))
+            records = list(_sequence(checkpoint.get("idempotency", []), "idempotency"))
+        expanded.append(checkpoint)
+    branch["checkpoints"] = expanded
+
+
+def _apply_sequence_delta(previous: list[Any], delta: Any) -> list[Any]:
+    delta = _mapping(delta, "checkpoint delta")
+    drop = int(delta.get("drop") or 0)
+    keep = int(delta.get("keep") or 0)
+    if drop < 0 or keep < 0 or drop + keep > len(previous):
+        raise StoryPersistenceError("checkpoint delta does not fit its predecessor")
+    return previous[drop : drop + keep] + list(
+        _sequence(delta.get("append", []), "checkpoint delta")
+    )
+
+
+def _journal_checkpoint(
+    branch: Mapping[str, Any],
+    generation: int,
+) -> Mapping[str, Any]:
+    for checkpoint in reversed(branch["checkpoints"]):
+        if (
+            isinstance(checkpoint, Mapping)
+            and int(checkpoint.get("generation") or 0) == generation
+        ):
+            return checkpoint
+    raise StoryPersistenceError(f"journal references missing generation {generation}")
 
 
 class JsonGlobalStoryProgressStore:
@@ -25,10 +25,17 @@ from core.story import (
     VariableType,
     freeze_value,
 )
+from core.story.persistent import PersistentVector
 from core.story.state import variable_value_is_valid
 
-from .idempotency import StoryCommandConflictError, StoryCommandIdempotencyIndex
+from .idempotency import (
+    StoryCommandConflictError,
+    StoryCommandIdempotencyIndex,
+    StoryCommandRecord,
+)
 from .persistence import (
+    MAX_BRANCH_CHECKPOINTS,
+    MAX_OUTBOX_ENTRIES,
     GlobalEffectOutboxEntry,
     GlobalStoryProgress,
     JsonGlobalStoryProgressStore,
@@ -63,26 +70,52 @@ class CausalStoryEvent:
         }
 
 
+HistoryEntries = PersistentVector[Mapping[str, Any]]
+
+
 @dataclass(slots=True)
 class StoryCheckpoint:
+    """One generation of a branch.
+
+    Every field is immutable and shared with the branch it was taken from,
+    so taking a checkpoint or forking from one costs O(1).
+    """
+
     generation: int
     message_count: int
     state: StoryState
     head_event_id: str | None
     event_count: int
-    history_entries: tuple[Mapping[str, Any], ...] = ()
-    idempotency_payload: tuple[Mapping[str, Any], ...] = ()
+    history_entries: HistoryEntries = field(default_factory=PersistentVector)
+    idempotency: PersistentVector[StoryCommandRecord] = field(
+        default_factory=PersistentVector
+    )
 
-    def to_payload(self) -> dict[str, Any]:
-        return {
+    def to_payload(self, previous: StoryCheckpoint | None = None) -> dict[str, Any]:
+        """Serialize relative to ``previous``; states are rebuilt by replay."""
+        payload: dict[str, Any] = {
             "generation": self.generation,
             "messageCount": self.message_count,
-            "state": story_state_to_payload(self.state),
             "headEventId": self.head_event_id,
             "eventCount": self.event_count,
-            "historyEntries": [dict(item) for item in self.history_entries],
-            "idempotency": [dict(item) for item in self.idempotency_payload],
         }
+        if previous is None:
+            payload["historyEntries"] = [dict(item) for item in self.history_entries]
+            payload["idempotency"] = [item.to_payload() for item in self.idempotency]
+            return payload
+        drop, keep = _vector_delta(previous.history_entries, self.history_entries)
+        payload["historyDelta"] = {
+            "drop": drop,
+            "keep": keep,
+            "append": [dict(item) for item in self.history_entries[keep:]],
+        }
+        drop, keep = _vector_delta(previous.idempotency, self.idempotency)
+        payload["idempotencyDelta"] = {
+            "drop": drop,
+            "keep": keep,
+            "append": [item.to_payload() for item in self.idempotency[keep:]],
+        }
+        return payload
 
 
 class StoryTurnCancelledError(RuntimeError):
@@ -112,12 +145,16 @@ class StoryBranch:
     generation: int
     state: StoryState
     head_event_id: str | None
-    events: list[CausalStoryEvent] = field(default_factory=list)
-    checkpoints: list[StoryCheckpoint] = field(default_factory=list)
+    events: PersistentVector[CausalStoryEvent] = field(
+        default_factory=PersistentVector
+    )
+    checkpoints: PersistentVector[StoryCheckpoint] = field(
+        default_factory=PersistentVector
+    )
     idempotency: StoryCommandIdempotencyIndex = field(
         default_factory=StoryCommandIdempotencyIndex
     )
-    history_entries: tuple[Mapping[str, Any], ...] = ()
+    history_entries: HistoryEntries = field(default_factory=PersistentVector)
 
     def to_payload(self) -> dict[str, Any]:
         return {
@@ -127,7 +164,10 @@ class StoryBranch:
             "state": story_state_to_payload(self.state),
             "headEventId": self.head_event_id,
             "events": [item.to_payload() for item in self.events],
-            "checkpoints": [item.to_payload() for item in self.checkpoints],
+            "checkpoints": [
+                item.to_payload(self.checkpoints[index - 1] if index else None)
+                for index, item in enumerate(self.checkpoints)
+            ],
             "idempotency": self.idempotency.to_payload(),
             "historyEntries": [dict(item) for item in self.history_entries],
         }
@@ -269,7 +309,7 @@ class StorySession:
             generation=0,
             state=result.state,
             head_event_id=None,
-            history_entries=_history_entries(history_entries),
+            history_entries=_history_entries(history_entries, PersistentVector()),
         )
         session.branches[branch.id] = branch
         session._commit_result(
@@ -368,7 +408,9 @@ class StorySession:
             )
             result = self._prepare_runtime_result(branch.state, result)
             if history_entries is not None:
-                branch.history_entries = _history_entries(history_entries)
+                branch.history_entries = _history_entries(
+                    history_entries, branch.history_entries
+                )
             return self._commit_result(
                 branch,
                 command,
@@ -416,20 +458,23 @@ class StorySession:
                 generation=checkpoint.generation,
                 state=checkpoint.state,
                 head_event_id=checkpoint.head_event_id,
-                events=list(source.events[: checkpoint.event_count]),
-                checkpoints=[
-                    item
-                    for item in source.checkpoints
-                    if item.generation <= checkpoint.generation
-                ],
-                idempotency=StoryCommandIdempotencyIndex.from_payload(
-                    list(checkpoint.idempotency_payload)
+                events=source.events.take(checkpoint.event_count),
+                checkpoints=_checkpoints_through(source, checkpoint.generation),
+                idempotency=StoryCommandIdempotencyIndex.from_records(
+                    checkpoint.idempotency
                 ),
                 history_entries=checkpoint.history_entries,
             )
             self.branches[branch_id] = forked
             self.active_branch_id = branch_id
-            self._save()
+            self._persist(
+                {
+                    "op": "fork",
+                    "branchId": branch_id,
+                    "sourceBranchId": source.id,
+                    "generation": checkpoint.generation,
+                }
+            )
             self._rebuild_cast_resources()
             return forked
 
@@ -442,15 +487,19 @@ class StorySession:
             branch.generation = checkpoint.generation
             branch.state = checkpoint.state
             branch.head_event_id = checkpoint.head_event_id
-            del branch.events[checkpoint.event_count :]
-            branch.checkpoints = [
-                item for item in branch.checkpoints if item.generation <= generation
-            ]
-            branch.idempotency = StoryCommandIdempotencyIndex.from_payload(
-                list(checkpoint.idempotency_payload)
+            branch.events = branch.events.take(checkpoint.event_count)
+            branch.checkpoints = _checkpoints_through(branch, generation)
+            branch.idempotency = StoryCommandIdempotencyIndex.from_records(
+                checkpoint.idempotency
             )
             branch.history_entries = checkpoint.history_entries
-            self._save()
+            self._persist(
+                {
+                    "op": "restore",
+                    "branchId": branch.id,
+                    "generation": checkpoint.generation,
+                }
+            )
             self._rebuild_cast_resources()
             return branch
 
@@ -461,7 +510,7 @@ class StorySession:
             if branch_id not in self.branches:
                 raise KeyError(f"story branch {branch_id!r} does not exist")
             self.active_branch_id = branch_id
-            self._save()
+            self._persist({"op": "switch", "branchId": branch_id})
             self._rebuild_cast_resources()
             return self.active_branch
 
@@ -515,7 +564,10 @@ class StorySession:
             if existing is not None:
                 return existing.ack
             if history_entries is not None:
-                branch.history_entries = _history_entries(history_entries)
+                branch.history_entries = _history_entries(
+                    history_entries, branch.history_entries
+                )
+            history_delta = _history_delta(branch)
             record = branch.idempotency.record(
                 command,
                 accepted=True,
@@ -526,22 +578,8 @@ class StorySession:
                 ack={"sceneTurn": dict(result_payload)},
             )
             branch.generation += 1
-            branch.checkpoints.append(
-                StoryCheckpoint(
-                    generation=branch.generation,
-                    message_count=len(branch.history_entries),
-                    state=branch.state,
-                    head_event_id=branch.head_event_id,
-                    event_count=len(branch.events),
-                    history_entries=branch.history_entries,
-                    idempotency_payload=tuple(
-                        MappingProxyType(item)
-                        for item in branch.idempotency.to_payload()
-                    ),
-                )
-            )
-            branch.checkpoints = branch.checkpoints[-128:]
-            self._save()
+            _append_checkpoint(branch)
+            self._persist(_commit_record(branch, (), record, history_delta))
             return record.ack
 
     def replace_history_entries(
@@ -555,15 +593,31 @@ class StorySession:
             if scene_scope is not None:
                 self._require_scene_scope(scene_scope)
             branch = self.active_branch
-            branch.history_entries = _history_entries(history_entries)
+            branch.history_entries = _history_entries(
+                history_entries, branch.history_entries
+            )
+            history_delta = _history_delta(branch) or {
+                "keep": len(branch.history_entries),
+                "append": [],
+            }
             if branch.checkpoints:
                 latest = branch.checkpoints[-1]
-                branch.checkpoints[-1] = replace(
-                    latest,
-                    message_count=len(branch.history_entries),
-                    history_entries=branch.history_entries,
+                branch.checkpoints = branch.checkpoints.take(
+                    len(branch.checkpoints) - 1
+                ).append(
+                    replace(
+                        latest,
+                        message_count=len(branch.history_entries),
+                        history_entries=branch.history_entries,
+                    )
                 )
-            self._save()
+            self._persist(
+                {
+                    "op": "history",
+                    "branchId": branch.id,
+                    "historyDelta": history_delta,
+                }
+            )
 
     def _invalidate_scene_turns(self) -> None:
         self._epoch += 1
@@ -615,21 +669,28 @@ class StorySession:
     def flush_global_outbox(self) -> None:
         with self._lock:
             self._require_enabled()
-            changed = False
-            for entry in self.outbox:
-                if entry.applied:
-                    continue
-                if entry.id not in self.global_progress.applied_outbox_ids:
+            pending = [entry for entry in self.outbox if not entry.applied]
+            if not pending:
+                return
+            unapplied = [
+                entry
+                for entry in pending
+                if entry.id not in self.global_progress.applied_outbox_ids
+            ]
+            if unapplied:
+                for entry in unapplied:
                     self._apply_global_entry(entry)
-                    if self.global_store is not None:
-                        self.global_store.save(self.global_progress)
-                    self.failure_injector("after_global_apply")
+                if self.global_store is not None:
+                    self.global_store.save(self.global_progress)
+                self.failure_injector("after_global_apply")
+            for entry in pending:
                 entry.applied = True
-                changed = True
-                self._save()
-            if changed:
-                self.outbox = [item for item in self.outbox if not item.applied][-256:]
-                self._save()
+            self.outbox = [item for item in self.outbox if not item.applied][
+                -MAX_OUTBOX_ENTRIES:
+            ]
+            self._persist(
+                {"op": "outbox", "appliedIds": [entry.id for entry in pending]}
+            )
 
     def _commit_result(
         self,
@@ -643,6 +704,7 @@ class StorySession:
     ) -> StorySessionAck:
         if state is not None:
             branch.state = state
+        history_delta = _history_delta(branch)
         parent = branch.head_event_id
         causal_events = []
         for event in events:
@@ -650,7 +712,7 @@ class StorySession:
             causal = CausalStoryEvent(causal_id, parent, event)
             causal_events.append(causal)
             parent = causal_id
-        branch.events.extend(causal_events)
+        branch.events = branch.events.extend(causal_events)
         branch.head_event_id = parent
         branch.generation += 1
 
@@ -659,20 +721,20 @@ class StorySession:
             for event in events
             if event.type == StoryEventType.ENDING_REACHED
         )
+        outbox_entry = None
         if global_effects or ending_ids:
             branch_command_id = str(getattr(command, "command_id"))
-            self.outbox.append(
-                GlobalEffectOutboxEntry(
-                    id=(
-                        f"{self.runtime.program.story_id}:{branch.id}:"
-                        f"{branch_command_id}"
-                    ),
-                    source_branch_id=branch.id,
-                    source_command_id=branch_command_id,
-                    effects=global_effects,
-                    ending_ids=ending_ids,
-                )
+            outbox_entry = GlobalEffectOutboxEntry(
+                id=(
+                    f"{self.runtime.program.story_id}:{branch.id}:"
+                    f"{branch_command_id}"
+                ),
+                source_branch_id=branch.id,
+                source_command_id=branch_command_id,
+                effects=global_effects,
+                ending_ids=ending_ids,
             )
+            self.outbox.append(outbox_entry)
 
         view = story_state_view(
             self.runtime.program,
@@ -692,28 +754,17 @@ class StorySession:
                 MappingProxyType(item) for item in story_event_messages(events)
             ),
         )
-        branch.idempotency.record(
+        record = branch.idempotency.record(
             command,
             accepted=True,
             resulting_revision=branch.state.revision,
             event_ids=ack.event_ids,
             ack=ack.to_payload(),
         )
-        branch.checkpoints.append(
-            StoryCheckpoint(
-                generation=branch.generation,
-                message_count=len(branch.history_entries),
-                state=branch.state,
-                head_event_id=branch.head_event_id,
-                event_count=len(branch.events),
-                history_entries=branch.history_entries,
-                idempotency_payload=tuple(
-                    MappingProxyType(item) for item in branch.idempotency.to_payload()
-                ),
-            )
+        _append_checkpoint(branch)
+        self._persist(
+            _commit_record(branch, causal_events, record, history_delta, outbox_entry)
         )
-        branch.checkpoints = branch.checkpoints[-128:]
-        self._save()
         self.failure_injector("after_session_commit")
         self.flush_global_outbox()
         if self.cast_plan_committed is not None:
@@ -816,7 +867,7 @@ class StorySession:
 
     def _branch_from_payload(self, raw: Mapping[str, Any]) -> StoryBranch:
         state_raw = raw.get("state")
-        if not isinstance(state_raw, Mapping):
+        if state_raw is not None and not isinstance(state_raw, Mapping):
             raise StoryPersistenceError("story branch state must be an object")
         events_raw = raw.get("events", ())
         checkpoints_raw = raw.get("checkpoints", ())
@@ -835,46 +886,124 @@ class StorySession:
                     event=story_event_from_payload(item["event"]),
                 )
             )
-        checkpoints = [
-            self._checkpoint_from_payload(item)
-            for item in checkpoints_raw
-            if isinstance(item, Mapping)
+        events = PersistentVector(events)
+        checkpoints_raw = [
+            item for item in checkpoints_raw if isinstance(item, Mapping)
         ]
+        replayed = self._replay_event_prefixes(
+            events,
+            {
+                int(item.get("eventCount") or 0)
+                for item in checkpoints_raw
+                if item.get("state") is None
+            }
+            | ({len(events)} if state_raw is None else set()),
+        )
+        checkpoints: list[StoryCheckpoint] = []
+        previous: StoryCheckpoint | None = None
+        for item in checkpoints_raw:
+            previous = self._checkpoint_from_payload(item, replayed, previous)
+            checkpoints.append(previous)
+        idempotency_raw = raw.get("idempotency", [])
+        if not isinstance(idempotency_raw, list):
+            raise StoryPersistenceError("story branch idempotency must be a list")
         return StoryBranch(
             id=str(raw.get("id") or ""),
             parent_id=_optional_text(raw.get("parentId")),
             generation=int(raw.get("generation") or 0),
-            state=story_state_from_payload(state_raw, program=self.runtime.program),
+            state=(
+                replayed[len(events)]
+                if state_raw is None
+                else story_state_from_payload(state_raw, program=self.runtime.program)
+            ),
             head_event_id=_optional_text(raw.get("headEventId")),
             events=events,
-            checkpoints=checkpoints,
-            idempotency=StoryCommandIdempotencyIndex.from_payload(
-                raw.get("idempotency", [])
+            checkpoints=PersistentVector(checkpoints),
+            idempotency=StoryCommandIdempotencyIndex.from_records(
+                (previous.idempotency if previous else PersistentVector()).rebase(
+                    [StoryCommandRecord.from_payload(item) for item in idempotency_raw]
+                )
+            ),
+            history_entries=_history_entries(
+                raw.get("historyEntries", ()),
+                previous.history_entries if previous else PersistentVector(),
             ),
-            history_entries=_history_entries(raw.get("historyEntries", ())),
         )
 
-    def _checkpoint_from_payload(self, raw: Mapping[str, Any]) -> StoryCheckpoint:
+    def _checkpoint_from_payload(
+        self,
+        raw: Mapping[str, Any],
+        replayed: Mapping[int, StoryState],
+        previous: StoryCheckpoint | None,
+    ) -> StoryCheckpoint:
         state_raw = raw.get("state")
-        if not isinstance(state_raw, Mapping):
+        if state_raw is None:
+            state = replayed[int(raw.get("eventCount") or 0)]
+        elif isinstance(state_raw, Mapping):
+            state = story_state_from_payload(state_raw, program=self.runtime.program)
+        else:
             raise StoryPersistenceError("checkpoint state must be an object")
-        idempotency = raw.get("idempotency", ())
-        if not isinstance(idempotency, list):
-            raise StoryPersistenceError("checkpoint idempotency must be a list")
+        previous_history = previous.history_entries if previous else PersistentVector()
+        previous_records = previous.idempotency if previous else PersistentVector()
+        if "historyDelta" in raw or "idempotencyDelta" in raw:
+            if previous is None:
+                raise StoryPersistenceError("first checkpoint cannot be a delta")
+            history_base, history_added = _delta_parts(
+                previous_history, raw.get("historyDelta"), "historyDelta"
+            )
+            history = history_base.extend(
+                _history_entries(history_added, PersistentVector())
+            )
+            records_base, records_added = _delta_parts(
+                previous_records, raw.get("idempotencyDelta"), "idempotencyDelta"
+            )
+            records = records_base.extend(
+                StoryCommandRecord.from_payload(item) for item in records_added
+            )
+        else:
+            idempotency = raw.get("idempotency", ())
+            if not isinstance(idempotency, list):
+                raise StoryPersistenceError("checkpoint idempotency must be a list")
+            history = _history_entries(
+                raw.get("historyEntries", ()), previous_history
+            )
+            records = previous_records.rebase(
+                [StoryCommandRecord.from_payload(item) for item in idempotency]
+            )
         return StoryCheckpoint(
             generation=int(raw.get("generation") or 0),
             message_count=int(raw.get("messageCount") or 0),
-            state=story_state_from_payload(state_raw, program=self.runtime.program),
+            state=state,
             head_event_id=_optional_text(raw.get("headEventId")),
             event_count=int(raw.get("eventCount") or 0),
-            history_entries=_history_entries(raw.get("historyEntries", ())),
-            idempotency_payload=tuple(
-                MappingProxyType(dict(item))
-                for item in idempotency
-                if isinstance(item, Mapping)
-            ),
+            history_entries=history,
+            idempotency=records,
         )
 
+    def _replay_event_prefixes(
+        self,
+        events: Sequence[CausalStoryEvent],
+        counts: set[int],
+    ) -> dict[int, StoryState]:
+        """States after ``events[:count]`` for journaled entries that omit them."""
+        states: dict[int, StoryState] = {}
+        if not counts:
+            return states
+        if max(counts) > len(events) or min(counts) < 0:
+            raise StoryPersistenceError("checkpoint event count exceeds event log")
+        replayer = StoryEventReplayer()
+        state = self.runtime.initial_state()
+        position = 0
+        for count in sorted(counts):
+            state = replayer.replay(
+                state,
+                tuple(item.event for item in events[position:count]),
+                program=self.runtime.program,
+            )
+            states[count] = state
+            position = count
+        return states
+
     def _validate_all_branches(self) -> None:
         initial = self.runtime.initial_state()
         for branch_id, branch in self.branches.items():
@@ -907,9 +1036,9 @@ class StorySession:
                 return checkpoint
         raise KeyError(f"generation {generation} has no checkpoint")
 
-    def _save(self) -> None:
+    def _persist(self, record: Mapping[str, Any]) -> None:
         if self.repository is not None:
-            self.repository.save(self.to_payload())
+            self.repository.append(record, snapshot=self.to_payload)
 
     def _require_enabled(self) -> None:
         self.flags.require(FeatureFlag.STORY_SYSTEM)
@@ -933,14 +1062,119 @@ def _initial_global_progress(program: StoryProgram) -> GlobalStoryProgress:
     )
 
 
-def _history_entries(value: Any) -> tuple[Mapping[str, Any], ...]:
+def _append_checkpoint(branch: StoryBranch) -> None:
+    branch.checkpoints = branch.checkpoints.append(
+        StoryCheckpoint(
+            generation=branch.generation,
+            message_count=len(branch.history_entries),
+            state=branch.state,
+            head_event_id=branch.head_event_id,
+            event_count=len(branch.events),
+            history_entries=branch.history_entries,
+            idempotency=branch.idempotency.snapshot(),
+        )
+    )
+    excess = len(branch.checkpoints) - MAX_BRANCH_CHECKPOINTS
+    if excess > 0:
+        branch.checkpoints = branch.checkpoints.drop(excess)
+
+
+def _checkpoints_through(
+    branch: StoryBranch,
+    generation: int,
+) -> PersistentVector[StoryCheckpoint]:
+    # Generations only grow along a branch's checkpoint list, so the
+    # checkpoints up to ``generation`` are a shared prefix.
+    count = 0
+    for count, item in enumerate(branch.checkpoints, start=1):
+        if item.generation > generation:
+            count -= 1
+            break
+    return branch.checkpoints.take(count)
+
+
+def _vector_delta(
+    previous: PersistentVector[Any],
+    current: PersistentVector[Any],
+) -> tuple[int, int]:
+    """``(drop, keep)`` such that ``current`` starts with ``previous[drop:][:keep]``."""
+    if previous and current:
+        first = current[0]
+        for drop, item in enumerate(previous):
+            if item is first:
+                return drop, previous.drop(drop).common_prefix(current)
+    return 0, 0
+
+
+def _history_delta(branch: StoryBranch) -> dict[str, Any] | None:
+    """How ``branch.history_entries`` differs from the last persisted history."""
+    previous = (
+        branch.checkpoints[-1].history_entries
+        if branch.checkpoints
+        else PersistentVector()
+    )
+    if previous is branch.history_entries:
+        return None
+    keep = previous.common_prefix(branch.history_entries)
+    return {
+        "keep": keep,
+        "append": [dict(item) for item in branch.history_entries[keep:]],
+    }
+
+
+def _commit_record(
+    branch: StoryBranch,
+    events: Sequence[CausalStoryEvent],
+    command: StoryCommandRecord,
+    history_delta: dict[str, Any] | None,
+    outbox_entry: GlobalEffectOutboxEntry | None = None,
+) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "op": "commit",
+        "branchId": branch.id,
+        "generation": branch.generation,
+        "headEventId": branch.head_event_id,
+        "events": [item.to_payload() for item in events],
+        "command": command.to_payload(),
+    }
+    if history_delta is not None:
+        record["historyDelta"] = history_delta
+    if outbox_entry is not None:
+        record["outbox"] = outbox_entry.to_payload()
+    return record
+
+
+def _history_entries(value: Any, base: HistoryEntries) -> HistoryEntries:
+    """Freeze ``value``, reusing whatever leading entries ``base`` already holds."""
     if not isinstance(value, Sequence) or isinstance(value, (str, bytes, bytearray)):
         raise StoryPersistenceError("history entries must be a list")
-    return tuple(
-        MappingProxyType(dict(item)) for item in value if isinstance(item, Mapping)
+    entries = [item for item in value if isinstance(item, Mapping)]
+    shared = base.common_prefix(entries)
+    return base.take(shared).extend(
+        MappingProxyType(dict(item)) for item in entries[shared:]
     )
 
 
+def _delta_parts(
+    previous: PersistentVector[Any],
+    raw: Any,
+    label: str,
+) -> tuple[PersistentVector[Any], list[Any]]:
+    if not isinstance(raw, Mapping):
+        raise StoryPersistenceError(f"{label} must be an object")
+    drop = int(raw.get("drop") or 0)
+    keep = int(raw.get("keep") or 0)
+    append = raw.get("append", [])
+    if (
+        drop < 0
+        or keep < 0
+        or drop + keep > len(previous)
+        or not isinstance(append, list)
+    ):
+        raise StoryPersistenceError(f"{label} does not fit the previous checkpoint")
+    return previous.drop(drop).take(keep), append
+
+
 def _branch_id(value: str) -> str:
     candidate = str(value or "").strip()
     if not candidate or len(candidate) > 80:
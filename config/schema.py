@@ -89,6 +89,9 @@ class ApiConfig(BaseModel):
 
     tts_split_enabled: DefaultIfNone[bool] = Field(default=False, description="是否启用TTS分句发送")
     tts_max_sentence_length: DefaultIfNone[int] = Field(default=15, description="TTS分句最大长度（字符数）")
+    tts_streaming_enabled: DefaultIfNone[bool] = Field(default=False, description="流式播放：支持流式的 TTS 引擎边合成边播放")
+    tts_cache_max_mb: DefaultIfNone[int] = Field(default=256, ge=0, description="TTS 语音缓存上限（MB），0 表示关闭缓存")
+    tts_resident_models: DefaultIfNone[int] = Field(default=2, ge=1, description="TTS 后端同时驻留的声线模型数（受引擎能力限制）")
 
     t2i_provider: DefaultIfNone[str] = Field(
         default="comfyui",
@@ -0,0 +1,13 @@
+"""入口进程的多进程准备：缩略图等进程池使用 spawn 启动子进程。"""
+
+from __future__ import annotations
+
+import multiprocessing
+
+
+def init_process_pool_support() -> None:
+    """
+    在入口 ``if __name__ == "__main__"`` 中最先调用。冻结构建里 spawn 出的子进程会
+    重新执行入口可执行文件，需先交给 freeze_support 接管；非冻结环境下为空操作。
+    """
+    multiprocessing.freeze_support()
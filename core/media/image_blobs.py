@@ -0,0 +1,129 @@
+"""Content-addressed store for chat image attachments.
+
+Chat history keeps only an image's sha256 digest; the bytes are written once
+under ``data/image_blobs/<first two hex chars>/<digest>`` however many times the
+image is attached or replayed. Provider payloads base64-encode blobs lazily
+through a byte-bounded cache, so a long image-heavy session does not re-read
+and re-encode every historical image on each request.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+IMAGE_BLOB_ROOT_ENV = "SHINSEKAI_IMAGE_BLOB_ROOT"
+DEFAULT_IMAGE_BLOB_ROOT = Path("data") / "image_blobs"
+DEFAULT_ENCODED_CACHE_BYTES = 64 * 1024 * 1024
+
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def is_blob_digest(value: Any) -> bool:
+    return isinstance(value, str) and _DIGEST_RE.fullmatch(value) is not None
+
+
+class ImageBlobStore:
+    """sha256-addressed image files plus an LRU of their base64 encodings."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        encoded_cache_bytes: int = DEFAULT_ENCODED_CACHE_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self._encoded_cache_bytes = max(0, int(encoded_cache_bytes))
+        self._encoded: OrderedDict[str, str] = OrderedDict()
+        self._encoded_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def path_for(self, digest: str) -> Path:
+        if not is_blob_digest(digest):
+            raise ValueError(f"Invalid image blob digest: {digest!r}")
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` (idempotently) and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if path.is_file() and path.stat().st_size == len(data):
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temp.write_bytes(data)
+            os.replace(temp, path)
+        finally:
+            temp.unlink(missing_ok=True)
+        return digest
+
+    def put_file(self, path: Path) -> str:
+        return self.put(Path(path).read_bytes())
+
+    def read(self, digest: str) -> bytes | None:
+        """The blob's bytes, or None when it is missing or fails verification."""
+        try:
+            data = self.path_for(digest).read_bytes()
+        except (OSError, ValueError):
+            return None
+        if hashlib.sha256(data).hexdigest() != digest:
+            return None
+        return data
+
+    def encoded(self, digest: str) -> str | None:
+        """Base64 of the blob, served from the LRU after the first request."""
+        with self._lock:
+            cached = self._encoded.get(digest)
+            if cached is not None:
+                self._encoded.move_to_end(digest)
+                self._hits += 1
+                return cached
+            self._misses += 1
+        data = self.read(digest)
+        if data is None:
+            return None
+        encoded = base64.b64encode(data).decode("ascii")
+        size = len(encoded)
+        if size > self._encoded_cache_bytes:
+            return encoded
+        with self._lock:
+            if digest not in self._encoded:
+                self._encoded[digest] = encoded
+                self._encoded_bytes += size
+                while self._encoded_bytes > self._encoded_cache_bytes:
+                    _, evicted = self._encoded.popitem(last=False)
+                    self._encoded_bytes -= len(evicted)
+        return encoded
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "encodedBytes": self._encoded_bytes,
+                "encodedEntries": len(self._encoded),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+_STORES: dict[Path, ImageBlobStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def image_blob_store() -> ImageBlobStore:
+    """The store for ``$SHINSEKAI_IMAGE_BLOB_ROOT`` (default ``data/image_blobs``)."""
+    configured = os.environ.get(IMAGE_BLOB_ROOT_ENV, "").strip()
+    root = Path(configured).expanduser() if configured else DEFAULT_IMAGE_BLOB_ROOT
+    with _STORES_LOCK:
+        store = _STORES.get(root)
+        if store is None:
+            store = _STORES[root] = ImageBlobStore(root)
+        return store
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import itertools
 from queue import Queue
 from typing import List, Optional
 
@@ -18,6 +19,13 @@ class ClearableQueue(Queue):
                 self.all_tasks_done.notify_all()
             self.not_full.notify_all()
 
+    def peek(self, max_items: Optional[int] = None) -> List[object]:
+        """Return up to ``max_items`` pending FIFO items without removing them."""
+        with self.mutex:
+            if max_items is None:
+                return list(self.queue)
+            return list(itertools.islice(self.queue, max(0, max_items)))
+
     def drain(self, max_items: Optional[int] = None) -> List[object]:
         """Return and account for up to ``max_items`` pending FIFO items."""
         result: List[object] = []
@@ -1,45 +1,115 @@
 """从 LLM 流式输出中按 JSON 对象切分并解析为 LLMDialogMessage。"""
 
+import heapq
 import json
+import re
 from typing import Iterator
 
 from sdk.messages import LLMDialogMessage
 
 
-def _complete_json_object_span(text: str) -> tuple[int, int] | None:
-    """Return the first complete top-level JSON object span, if one exists.
+_SPECIAL_CHARS = re.compile(r'[{}"\\]')
 
-    The scanner ignores braces inside JSON strings and supports nested objects.
-    If an earlier malformed ``{`` never closes, later candidate starts are still
-    considered so the stream can recover from bad prose or broken JSON prefixes.
+
+class _ScannerGroup:
+    """A set of candidate scanners that share the same string/escape state.
+
+    Every ``{`` starts a candidate scanner (see :class:`_JsonObjectScanner`).
+    Scanners in the same state react identically to every character, so a
+    group stores each scanner's depth relative to a shared ``delta`` and
+    updates all of them in O(1). ``by_base`` maps ``depth - delta`` to the
+    start offsets at that depth.
     """
-    starts = [index for index, char in enumerate(text) if char == "{"]
-    for start_index in starts:
-        depth = 0
-        in_string = False
-        escaped = False
-        for index in range(start_index, len(text)):
-            char = text[index]
-            if in_string:
-                if escaped:
-                    escaped = False
-                elif char == "\\":
-                    escaped = True
-                elif char == '"':
-                    in_string = False
-                continue
-
-            if char == '"':
-                in_string = True
-            elif char == "{":
-                depth += 1
-            elif char == "}":
-                depth -= 1
-                if depth == 0:
-                    return start_index, index + 1
-                if depth < 0:
-                    break
-    return None
+
+    __slots__ = ("delta", "by_base", "size")
+
+    def __init__(self) -> None:
+        self.delta = 0
+        self.by_base: dict[int, list[int]] = {}
+        self.size = 0
+
+    def add(self, start: int, depth: int) -> None:
+        self.by_base.setdefault(depth - self.delta, []).append(start)
+        self.size += 1
+
+    def pop_closed(self) -> list[int]:
+        """Remove and return the scanners whose depth just reached zero."""
+        starts = self.by_base.pop(-self.delta, [])
+        self.size -= len(starts)
+        return starts
+
+
+def _merge(left: _ScannerGroup, right: _ScannerGroup) -> _ScannerGroup:
+    """Union two groups that have entered the same state (small-to-large)."""
+    if left.size < right.size:
+        left, right = right, left
+    if right.size:
+        shift = right.delta - left.delta
+        for base, starts in right.by_base.items():
+            left.by_base.setdefault(base + shift, []).extend(starts)
+        left.size += right.size
+    return left
+
+
+class _JsonObjectScanner:
+    """Resumable scanner for complete top-level JSON object spans.
+
+    Finds the same spans as scanning the buffer from every ``{`` (ignoring
+    braces inside strings, supporting nesting, and letting a later ``{``
+    recover when an earlier malformed one never closes), but keeps all
+    candidate states across chunks so each character is examined once.
+    Only ``{ } " \\`` change scanner state, so plain text is skipped with a
+    regex search.
+    """
+
+    def __init__(self) -> None:
+        self._out = _ScannerGroup()  # outside strings
+        self._in = _ScannerGroup()  # inside a string
+        self._esc = _ScannerGroup()  # inside a string, right after a backslash
+        self._pos = 0
+        self._completed: list[tuple[int, int]] = []  # heap of (start, end)
+
+    def feed(self, chunk: str) -> None:
+        base = self._pos
+        for match in _SPECIAL_CHARS.finditer(chunk):
+            index = base + match.start()
+            if self._esc.size and index > self._pos:
+                self._plain_char()
+            self._special_char(match.group(), index)
+            self._pos = index + 1
+        end = base + len(chunk)
+        if self._esc.size and end > self._pos:
+            self._plain_char()
+        self._pos = end
+
+    def _plain_char(self) -> None:
+        # 转义只吞掉一个字符
+        self._in = _merge(self._in, self._esc)
+        self._esc = _ScannerGroup()
+
+    def _special_char(self, char: str, index: int) -> None:
+        if char == '"':
+            self._out, self._in, self._esc = self._in, _merge(self._out, self._esc), _ScannerGroup()
+            return
+        if char == "\\":
+            self._in, self._esc = self._esc, self._in
+            return
+        if self._esc.size:
+            self._plain_char()
+        if char == "{":
+            self._out.delta += 1
+            self._out.add(index, 1)
+        else:
+            self._out.delta -= 1
+            for start in self._out.pop_closed():
+                heapq.heappush(self._completed, (start, index + 1))
+
+    def next_span(self, floor: int) -> tuple[int, int] | None:
+        """Earliest-starting complete span that starts at or after ``floor``."""
+        completed = self._completed
+        while completed and completed[0][0] < floor:
+            heapq.heappop(completed)
+        return heapq.heappop(completed) if completed else None
 
 
 class LlmResponseStreamParser:
@@ -52,11 +122,23 @@ class LlmResponseStreamParser:
     """
 
     def __init__(self) -> None:
-        self._buffer = ""
-        self.accumulated_text = ""
+        self._scanner = _JsonObjectScanner()
+        # 未解析文本：_head 从绝对偏移 _head_start 开始，之后到达的 chunk 暂存在 _tail
+        self._head = ""
+        self._head_start = 0
+        self._tail: list[str] = []
+        self._floor = 0
+        self._chunks: list[str] = []
         self.parse_failures = 0
         self.last_error: str = ""
 
+    @property
+    def accumulated_text(self) -> str:
+        """Full raw response received so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
     @property
     def has_errors(self) -> bool:
         return self.parse_failures > 0
@@ -64,41 +146,50 @@ class LlmResponseStreamParser:
     @property
     def buffer(self) -> str:
         """The current unparsed trailing text (may contain an incomplete JSON)."""
-        return self._buffer
+        text = self._pending_text()[self._floor - self._head_start:]
+        return text.lstrip() if self._floor else text
 
     @property
     def unparsed_remainder(self) -> str:
         """流结束后缓冲区里残留的内容（截短便于展示）。"""
-        return self._buffer[:200].strip()
+        return self.buffer[:200].strip()
 
     def feed(self, chunk: str) -> Iterator[LLMDialogMessage]:
         """将新到达的文本并入缓冲区，并对其中已完整的 JSON 逐条 yield。"""
         if chunk:
-            self._buffer += chunk
-            self.accumulated_text += chunk
+            self._tail.append(chunk)
+            self._chunks.append(chunk)
+            self._scanner.feed(chunk)
         yield from self._iter_drain_complete_objects()
 
+    def _pending_text(self) -> str:
+        if self._tail:
+            # 丢弃已解析的前缀，只在确实需要取出文本时拼接一次
+            self._head = self._head[self._floor - self._head_start:] + "".join(self._tail)
+            self._head_start = self._floor
+            self._tail = []
+        return self._head
+
     def _iter_drain_complete_objects(self) -> Iterator[LLMDialogMessage]:
-        while "}" in self._buffer:
-            span = _complete_json_object_span(self._buffer)
+        while True:
+            span = self._scanner.next_span(self._floor)
             if span is None:
                 break
             start_index, end_index = span
-            json_str = self._buffer[start_index:end_index]
+            text = self._pending_text()
+            json_str = text[start_index - self._head_start:end_index - self._head_start]
+            self._floor = end_index
             try:
                 dialog_item = json.loads(json_str)
                 messages = self._dialog_messages(dialog_item)
-                self._buffer = self._buffer[end_index:].strip()
                 yield from messages
             except json.JSONDecodeError:
                 self.parse_failures += 1
                 _snippet = json_str[:120].replace("\n", " ")
                 self.last_error = f"JSON 解析失败 ({_snippet}…)"
-                self._buffer = self._buffer[end_index:].strip()
             except Exception as e:
                 self.parse_failures += 1
                 self.last_error = str(e)[:200]
-                self._buffer = self._buffer[end_index:].strip()
                 break
 
     @staticmethod
@@ -9,6 +9,7 @@ from typing import Any
 ACTIVE_HISTORY_FILENAME = "active.json"
 BRANCH_TREE_FILENAME = "branches.json"
 STORY_SESSION_FILENAME = "story-v2.json"
+STORY_SESSION_JOURNAL_FILENAME = "story-v2.journal.jsonl"
 BRANCH_TREE_VERSION = 1
 
 
@@ -54,7 +55,7 @@ def chat_history_download_path(path: str | Path) -> Path:
 def remove_chat_history_storage(path: str | Path) -> None:
     candidate = Path(path)
     if candidate.suffix.lower() == ".json" and not _is_branch_file(candidate):
-        file_targets = [candidate, Path(str(candidate) + ".tmp")]
+        file_targets = [candidate, Path(str(candidate) + ".tmp"), Path(str(candidate) + ".idx")]
         directory_targets = [candidate.with_suffix("")]
     elif _is_branch_file(candidate):
         file_targets = []
@@ -71,8 +72,10 @@ def remove_chat_history_storage(path: str | Path) -> None:
         for name in (
             BRANCH_TREE_FILENAME,
             f"{ACTIVE_HISTORY_FILENAME}.tmp",
+            f"{ACTIVE_HISTORY_FILENAME}.idx",
             ACTIVE_HISTORY_FILENAME,
             STORY_SESSION_FILENAME,
+            STORY_SESSION_JOURNAL_FILENAME,
         ):
             target = directory / name
             target.unlink(missing_ok=True)
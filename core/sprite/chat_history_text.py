@@ -11,19 +11,24 @@ from __future__ import annotations
 import html
 import json
 import re
+import threading
+from collections import OrderedDict
 from collections.abc import Iterable, Mapping
 from typing import Any, TypedDict
 
 
 DEFAULT_USER_DISPLAY_NAME = "你"
+DIALOG_CACHE_ENTRIES = 4096
 
 __all__ = [
     "ChatHistoryTurn",
+    "DialogParseCache",
     "chat_history_to_text",
     "chat_history_to_turns",
     "history_payload_to_plain_text",
     "history_payload_to_turns",
     "parse_assistant_dialog_content",
+    "parse_assistant_dialog_cached",
     "rendered_history_text",
     "turns_to_text",
 ]
@@ -128,6 +133,55 @@ def parse_assistant_dialog_content(content: Any) -> list[Any]:
     return dialog if isinstance(dialog, list) else []
 
 
+class DialogParseCache:
+    """Bounded LRU of :func:`parse_assistant_dialog_content` results.
+
+    Entries are keyed by the raw content string, so reopening a history (or
+    serving it again from the bridge) reuses earlier parses instead of
+    decoding and repairing every assistant turn. Callers receive fresh lists
+    of shallow-copied items and may mutate them freely.
+    """
+
+    def __init__(self, max_entries: int = DIALOG_CACHE_ENTRIES) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Any, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, content: Any) -> list[Any]:
+        if not isinstance(content, str):
+            return parse_assistant_dialog_content(content)
+        with self._lock:
+            cached = self._entries.get(content)
+            if cached is not None:
+                self._entries.move_to_end(content)
+                self.hits += 1
+        if cached is None:
+            cached = tuple(parse_assistant_dialog_content(content))
+            with self._lock:
+                self.misses += 1
+                self._entries[content] = cached
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return [dict(item) if isinstance(item, Mapping) else item for item in cached]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+dialog_parse_cache = DialogParseCache()
+
+
+def parse_assistant_dialog_cached(content: Any) -> list[Any]:
+    """:func:`parse_assistant_dialog_content` through the shared parse cache."""
+
+    return dialog_parse_cache.parse(content)
+
+
 def rendered_history_text(value: Any) -> str:
     """Convert a legacy rendered HTML row to readable plain text."""
 
@@ -200,7 +254,7 @@ def _turns_from_message(message: Mapping[str, Any], user_display_name: str) -> l
 
     content_value = message.get("content")
     turns: list[ChatHistoryTurn] = []
-    dialog = parse_assistant_dialog_content(content_value)
+    dialog = parse_assistant_dialog_cached(content_value)
     for item in dialog:
         if not isinstance(item, Mapping):
             continue
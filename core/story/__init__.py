@@ -59,6 +59,7 @@ from .models import (
     RuleGraph,
     RuleNode,
     RuleNodeSchema,
+    RulePlan,
     StoryChoice,
     StoryMetadata,
     StoryNode,
@@ -71,7 +72,7 @@ from .models import (
 from .events import StoryEvent, StoryEventType
 from .renderer import StubPresentationEvent, StubSceneRenderer
 from .replay import StoryEventReplayError, StoryEventReplayer
-from .rules import ConditionEvaluator, RuleEvaluator
+from .rules import ConditionEvaluator, RuleEvaluator, build_rule_plan
 from .runtime import RuntimeResult, StoryRuntime, StoryRuntimeError
 from .schema import parse_story_project
 from .semantic import (
@@ -138,6 +139,7 @@ __all__ = [
     "RuleNode",
     "RuleNodeSchema",
     "RuleEvaluator",
+    "RulePlan",
     "RuntimeCommand",
     "RuntimeResult",
     "SelectChoice",
@@ -177,6 +179,7 @@ __all__ = [
     "StubPresentationEvent",
     "StubSceneRenderer",
     "parse_story_project",
+    "build_rule_plan",
     "canonical_json",
     "story_program_json",
     "freeze_mapping",
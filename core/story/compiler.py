@@ -34,6 +34,7 @@ from .models import (
     VariableScope,
     VariableType,
 )
+from .rules import build_rule_plan
 from .semantic import MAX_REPEAT_WINDOW, SignalStrength
 from .state import freeze_value, variable_value_is_valid
 
@@ -197,8 +198,11 @@ def _primitive(value: Any) -> Any:
     if isinstance(value, Enum):
         return value.value
     if is_dataclass(value) and not isinstance(value, type):
+        # compare=False fields are derived caches (StoryProgram.rule_plan), not source.
         return {
-            item.name: _primitive(getattr(value, item.name)) for item in fields(value)
+            item.name: _primitive(getattr(value, item.name))
+            for item in fields(value)
+            if item.compare
         }
     if isinstance(value, Mapping):
         return {
@@ -310,6 +314,7 @@ class StoryCompiler:
                 nodes=nodes,
                 rule_graph=rule_graph,
                 source_map=source_map,
+                rule_plan=build_rule_plan(rule_graph),
             ),
             diagnostics=tuple(diagnostics),
         )
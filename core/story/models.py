@@ -36,6 +36,9 @@ class FrozenDict(Mapping[Any, Any]):
     def __repr__(self) -> str:
         return f"FrozenDict({self._data!r})"
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (FrozenDict, (dict(self._data),))
+
 
 def _freeze_value(value: Any) -> Any:
     if isinstance(value, FrozenDict):
@@ -323,6 +326,31 @@ class RuleGraph:
         return {node.id: node for node in self.nodes}
 
 
+@dataclass(frozen=True, slots=True)
+class RulePlan:
+    """Execution plan for a RuleGraph, built once by ``StoryCompiler``.
+
+    Rule nodes are listed in topological order and referenced by index.
+    ``inputs[i]`` maps each input port of node ``i`` to the indices of the
+    nodes feeding it (in edge order), ``dependents[i]`` lists the nodes that
+    read node ``i``'s output and ``variable_readers`` lists the ref nodes
+    reading each story variable.
+    """
+
+    node_ids: tuple[str, ...]
+    node_types: tuple[str, ...]
+    configs: tuple[Mapping[str, Any], ...]
+    inputs: tuple[tuple[tuple[str, tuple[int, ...]], ...], ...]
+    dependents: tuple[tuple[int, ...], ...]
+    variable_readers: Mapping[str, tuple[int, ...]]
+    graph: RuleGraph | None = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "variable_readers", FrozenDict(self.variable_readers)
+        )
+
+
 @dataclass(frozen=True, slots=True)
 class StoryMetadata:
     language: str = "zh-CN"
@@ -405,13 +433,21 @@ class StoryProgram:
     nodes: tuple[CompiledStoryNode, ...]
     rule_graph: RuleGraph
     source_map: Mapping[str, str]
+    rule_plan: RulePlan | None = field(default=None, compare=False, repr=False)
+    _nodes_by_id: Mapping[str, CompiledStoryNode] = field(
+        init=False, default=None, compare=False, repr=False
+    )
 
     def __post_init__(self) -> None:
         object.__setattr__(self, "source_map", FrozenDict(self.source_map))
+        # The runtime looks nodes up several times per command; index them once.
+        object.__setattr__(
+            self, "_nodes_by_id", FrozenDict({node.id: node for node in self.nodes})
+        )
 
     @property
     def nodes_by_id(self) -> Mapping[str, CompiledStoryNode]:
-        return {node.id: node for node in self.nodes}
+        return self._nodes_by_id
 
     @property
     def variables_by_id(self) -> Mapping[str, StoryVariableDefinition]:
@@ -0,0 +1,156 @@
+"""Structurally shared immutable sequences for branch-local story logs."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Generic, TypeVar, overload
+
+T = TypeVar("T")
+
+_CHUNK = 32
+
+
+class PersistentVector(Sequence[T], Generic[T]):
+    """Immutable sequence stored as shared 32-item chunks.
+
+    ``append``/``extend`` copy only the chunk index and the last chunk, and
+    ``drop``/``take`` reuse every untouched chunk, so versions kept by
+    checkpoints and forks share almost all of their storage. Holding a
+    version is O(1): it is just a reference.
+    """
+
+    __slots__ = ("_chunks", "_start", "_length")
+
+    def __init__(self, items: Iterable[T] = ()) -> None:
+        values = tuple(items)
+        self._chunks: tuple[tuple[T, ...], ...] = tuple(
+            values[index : index + _CHUNK] for index in range(0, len(values), _CHUNK)
+        )
+        self._start = 0
+        self._length = len(values)
+
+    @classmethod
+    def _make(
+        cls,
+        chunks: tuple[tuple[T, ...], ...],
+        start: int,
+        length: int,
+    ) -> PersistentVector[T]:
+        vector = cls.__new__(cls)
+        if length <= 0:
+            chunks, start, length = (), 0, 0
+        vector._chunks = chunks
+        vector._start = start
+        vector._length = length
+        return vector
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> PersistentVector[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | PersistentVector[T]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return PersistentVector(tuple(self)[index])
+            return self.drop(start).take(max(0, stop - start))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PersistentVector index out of range")
+        position = self._start + index
+        return self._chunks[position // _CHUNK][position % _CHUNK]
+
+    def __iter__(self) -> Iterator[T]:
+        remaining = self._length
+        skip = self._start
+        for chunk in self._chunks:
+            for item in chunk[skip : skip + remaining]:
+                yield item
+            remaining -= len(chunk) - skip
+            skip = 0
+            if remaining <= 0:
+                return
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, PersistentVector):
+            return self._length == other._length and all(
+                left is right or left == right for left, right in zip(self, other)
+            )
+        if isinstance(other, tuple):
+            return self._length == len(other) and tuple(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PersistentVector({list(self)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (PersistentVector, (tuple(self),))
+
+    def append(self, item: T) -> PersistentVector[T]:
+        return self.extend((item,))
+
+    def extend(self, items: Iterable[T]) -> PersistentVector[T]:
+        values = tuple(items)
+        if not values:
+            return self
+        length = self._length + len(values)
+        chunks = list(self._chunks)
+        if chunks and len(chunks[-1]) < _CHUNK:
+            last = chunks.pop()
+            room = _CHUNK - len(last)
+            chunks.append(last + values[:room])
+            values = values[room:]
+        chunks.extend(
+            values[index : index + _CHUNK] for index in range(0, len(values), _CHUNK)
+        )
+        return PersistentVector._make(tuple(chunks), self._start, length)
+
+    def drop(self, count: int) -> PersistentVector[T]:
+        """Everything after the first ``count`` items."""
+        count = max(0, min(count, self._length))
+        if not count:
+            return self
+        position = self._start + count
+        return PersistentVector._make(
+            self._chunks[position // _CHUNK :],
+            position % _CHUNK,
+            self._length - count,
+        )
+
+    def take(self, count: int) -> PersistentVector[T]:
+        """The first ``count`` items."""
+        count = max(0, min(count, self._length))
+        if count == self._length:
+            return self
+        end = self._start + count
+        full, partial = divmod(end, _CHUNK)
+        chunks = self._chunks[:full]
+        if partial:
+            chunks += (self._chunks[full][:partial],)
+        return PersistentVector._make(chunks, self._start, count)
+
+    def common_prefix(self, other: Sequence[T]) -> int:
+        """Length of the shared leading run (identity first, then equality)."""
+        count = 0
+        for left, right in zip(self, other):
+            if left is not right and left != right:
+                break
+            count += 1
+        return count
+
+    def rebase(self, items: Sequence[T]) -> PersistentVector[T]:
+        """A vector equal to ``items`` that shares this vector's common prefix."""
+        if isinstance(items, PersistentVector) and items is self:
+            return self
+        prefix = self.common_prefix(items)
+        return self.take(prefix).extend(items[prefix:])
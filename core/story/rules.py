@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import heapq
+import threading
 from collections import defaultdict, deque
 from collections.abc import Mapping
 from typing import Any
 
-from .models import ConditionSpec, StoryProgram
+from .models import ConditionSpec, PortRef, RuleGraph, RulePlan, StoryProgram
 
 
 class ConditionEvaluator:
@@ -65,107 +67,265 @@ class ConditionEvaluator:
         raise ValueError(f"unsupported runtime condition operator: {op}")
 
 
+_VALUE_NODE_TYPES = frozenset({"metric-ref", "flag-ref"})
+_RESULT_NODE_TYPES = frozenset(
+    {
+        "condition.gte",
+        "condition.lte",
+        "condition.equals",
+        "compare",
+        "all",
+        "any",
+        "not",
+    }
+)
+# Output slot of nodes that produce no value (unlock and unknown types).
+_NO_OUTPUT = object()
+
+
+def _output_port(node_type: str) -> str | None:
+    if node_type in _VALUE_NODE_TYPES:
+        return "value"
+    if node_type in _RESULT_NODE_TYPES:
+        return "result"
+    return None
+
+
+def build_rule_plan(graph: RuleGraph) -> RulePlan:
+    """Topologically order ``graph`` and resolve every edge to node indices.
+
+    Nodes on a cycle are left out, exactly as the queue-based evaluation never
+    reached them; edges from a port the source node does not produce are
+    dropped because they never carried a value.
+    """
+    incoming: dict[str, list[tuple[str, PortRef]]] = defaultdict(list)
+    outgoing: dict[str, set[str]] = defaultdict(set)
+    indegree = {node.id: 0 for node in graph.nodes}
+    for edge in graph.edges:
+        incoming[edge.target.node_id].append((edge.target.port, edge.source))
+        if edge.target.node_id not in outgoing[edge.source.node_id]:
+            outgoing[edge.source.node_id].add(edge.target.node_id)
+            indegree[edge.target.node_id] += 1
+    ready = deque(
+        sorted(node_id for node_id, degree in indegree.items() if degree == 0)
+    )
+    order: list[str] = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for target in sorted(outgoing.get(node_id, ())):
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                ready.append(target)
+
+    nodes = graph.by_id
+    index = {node_id: position for position, node_id in enumerate(order)}
+    inputs: list[tuple[tuple[str, tuple[int, ...]], ...]] = []
+    dependents: list[set[int]] = [set() for _ in order]
+    variable_readers: dict[str, list[int]] = defaultdict(list)
+    for position, node_id in enumerate(order):
+        node = nodes[node_id]
+        ports: dict[str, list[int]] = {}
+        for port, source in incoming.get(node_id, ()):
+            sources = ports.setdefault(port, [])
+            source_index = index.get(source.node_id)
+            if source_index is None or source.port != _output_port(
+                nodes[source.node_id].type
+            ):
+                continue
+            sources.append(source_index)
+            dependents[source_index].add(position)
+        inputs.append(tuple((port, tuple(items)) for port, items in ports.items()))
+        if node.type in _VALUE_NODE_TYPES:
+            variable_readers[str(node.config.get("variable"))].append(position)
+    return RulePlan(
+        node_ids=tuple(order),
+        node_types=tuple(nodes[node_id].type for node_id in order),
+        configs=tuple(nodes[node_id].config for node_id in order),
+        inputs=tuple(inputs),
+        dependents=tuple(tuple(sorted(items)) for items in dependents),
+        variable_readers={
+            variable: tuple(readers) for variable, readers in variable_readers.items()
+        },
+        graph=graph,
+    )
+
+
+def _differs(previous: Any, current: Any) -> bool:
+    return previous is not current and (
+        type(previous) is not type(current) or previous != current
+    )
+
+
+class _PlanState:
+    """Rule outputs from the previous evaluation of one plan."""
+
+    __slots__ = ("plan", "variables", "outputs", "fired", "unlock_counts", "unlocked")
+
+    def __init__(self, plan: RulePlan) -> None:
+        self.plan = plan
+        self.variables: dict[str, Any] = {}
+        self.outputs: list[Any] = [_NO_OUTPUT] * len(plan.node_ids)
+        self.fired: list[str | None] = [None] * len(plan.node_ids)
+        self.unlock_counts: dict[str, int] = {}
+        self.unlocked: frozenset[str] = frozenset()
+
+
 class RuleEvaluator:
-    """Evaluate the pure subset of RuleGraph that produces node unlocks."""
+    """Evaluate the pure subset of RuleGraph that produces node unlocks.
+
+    The evaluator keeps the outputs of its previous run. A later call only
+    re-runs the ref nodes whose variable changed and the nodes downstream of
+    an output that actually changed, visiting them in plan order.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: _PlanState | None = None
+        self._fallback_plan: RulePlan | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Locks cannot be pickled, and the cached outputs are only a speed-up;
+        # a copy sent to another process starts from a clean evaluation.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_state"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def plan_for(self, program: StoryProgram) -> RulePlan:
+        plan = program.rule_plan
+        if plan is not None and plan.graph is program.rule_graph:
+            return plan
+        # Programs built by hand (or copied with a new rule graph) carry no
+        # compiled plan; build one once per graph.
+        fallback = self._fallback_plan
+        if fallback is None or fallback.graph is not program.rule_graph:
+            fallback = build_rule_plan(program.rule_graph)
+            self._fallback_plan = fallback
+        return fallback
 
     def evaluate_unlocks(
         self,
         program: StoryProgram,
         variables: Mapping[str, Any],
     ) -> frozenset[str]:
-        graph = program.rule_graph
-        nodes = graph.by_id
-        incoming: dict[tuple[str, str], list[tuple[str, str]]] = defaultdict(list)
-        outgoing: dict[str, set[str]] = defaultdict(set)
-        indegree = {node.id: 0 for node in graph.nodes}
-        for edge in graph.edges:
-            incoming[(edge.target.node_id, edge.target.port)].append(
-                (edge.source.node_id, edge.source.port)
-            )
-            if edge.target.node_id not in outgoing[edge.source.node_id]:
-                outgoing[edge.source.node_id].add(edge.target.node_id)
-                indegree[edge.target.node_id] += 1
-        ready = deque(
-            sorted(node_id for node_id, degree in indegree.items() if degree == 0)
-        )
-        outputs: dict[tuple[str, str], Any] = {}
-        unlocked: set[str] = set()
-        while ready:
-            node_id = ready.popleft()
-            node = nodes[node_id]
+        plan = self.plan_for(program)
+        with self._lock:
+            state = self._state
+            try:
+                if state is None or state.plan is not plan:
+                    state = _PlanState(plan)
+                    self._state = state
+                    dirty = list(range(len(plan.node_ids)))
+                else:
+                    dirty = []
+                    for variable, readers in plan.variable_readers.items():
+                        if _differs(state.variables.get(variable), variables.get(variable)):
+                            dirty.extend(readers)
+                    heapq.heapify(dirty)
+                for variable in plan.variable_readers:
+                    state.variables[variable] = variables.get(variable)
+                self._run(state, dirty, variables)
+            except Exception:
+                self._state = None
+                raise
+            return state.unlocked
+
+    def _run(
+        self,
+        state: _PlanState,
+        dirty: list[int],
+        variables: Mapping[str, Any],
+    ) -> None:
+        plan = state.plan
+        outputs = state.outputs
+        queued = set(dirty)
+        unlocks_changed = False
+        while dirty:
+            position = heapq.heappop(dirty)
             values = {
-                port: [outputs[source] for source in sources if source in outputs]
-                for (target_id, port), sources in incoming.items()
-                if target_id == node_id
+                port: [outputs[source] for source in sources if outputs[source] is not _NO_OUTPUT]
+                for port, sources in plan.inputs[position]
             }
-            self._evaluate_node(
-                node.type,
-                node.config,
-                values,
-                outputs,
-                node_id,
-                unlocked,
-                variables,
+            node_type = plan.node_types[position]
+            output = self._evaluate_node(
+                node_type, plan.configs[position], values, variables
             )
-            for target in sorted(outgoing.get(node_id, ())):
-                indegree[target] -= 1
-                if indegree[target] == 0:
-                    ready.append(target)
-        return frozenset(unlocked)
+            if node_type == "unlock":
+                if output != state.fired[position]:
+                    self._count_unlock(state, state.fired[position], -1)
+                    self._count_unlock(state, output, 1)
+                    state.fired[position] = output
+                    unlocks_changed = True
+                continue
+            if not _differs(outputs[position], output):
+                continue
+            outputs[position] = output
+            for dependent in plan.dependents[position]:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(dirty, dependent)
+        if unlocks_changed:
+            state.unlocked = frozenset(state.unlock_counts)
+
+    @staticmethod
+    def _count_unlock(state: _PlanState, target: str | None, delta: int) -> None:
+        if target is None:
+            return
+        count = state.unlock_counts.get(target, 0) + delta
+        if count > 0:
+            state.unlock_counts[target] = count
+        else:
+            state.unlock_counts.pop(target, None)
 
     @staticmethod
     def _evaluate_node(
         node_type: str,
         config: Mapping[str, Any],
         values: Mapping[str, list[Any]],
-        outputs: dict[tuple[str, str], Any],
-        node_id: str,
-        unlocked: set[str],
         variables: Mapping[str, Any],
-    ) -> None:
+    ) -> Any:
+        """Output of one node; an ``unlock`` node returns the story node it unlocks."""
+
         def first(port: str, default: Any = None) -> Any:
             items = values.get(port, ())
             return items[0] if items else default
 
         if node_type == "metric-ref":
-            outputs[(node_id, "value")] = variables.get(str(config.get("variable")))
-            return
+            return variables.get(str(config.get("variable")))
         if node_type == "flag-ref":
-            outputs[(node_id, "value")] = variables.get(str(config.get("variable")))
-            return
+            return variables.get(str(config.get("variable")))
         if node_type == "condition.gte":
-            outputs[(node_id, "result")] = first("input", 0) >= config.get("value", 0)
-            return
+            return first("input", 0) >= config.get("value", 0)
         if node_type == "condition.lte":
-            outputs[(node_id, "result")] = first("input", 0) <= config.get("value", 0)
-            return
+            return first("input", 0) <= config.get("value", 0)
         if node_type == "condition.equals":
-            outputs[(node_id, "result")] = first("input") == config.get("value")
-            return
+            return first("input") == config.get("value")
         if node_type == "compare":
             operator = config.get("operator", "gte")
             left = first("input")
             right = config.get("value")
             if operator == "gte":
-                result = left >= right
-            elif operator == "lte":
-                result = left <= right
-            elif operator == "equals":
-                result = left == right
-            else:
-                raise ValueError(f"unsupported compare operator: {operator}")
-            outputs[(node_id, "result")] = result
-            return
+                return left >= right
+            if operator == "lte":
+                return left <= right
+            if operator == "equals":
+                return left == right
+            raise ValueError(f"unsupported compare operator: {operator}")
         if node_type == "all":
-            outputs[(node_id, "result")] = all(values.get("input", ()))
-            return
+            return all(values.get("input", ()))
         if node_type == "any":
-            outputs[(node_id, "result")] = any(values.get("input", ()))
-            return
+            return any(values.get("input", ()))
         if node_type == "not":
-            outputs[(node_id, "result")] = not bool(first("input"))
-            return
-        if node_type == "unlock" and bool(first("when")):
+            return not bool(first("input"))
+        if node_type == "unlock":
             target = config.get("storyNodeId")
-            if isinstance(target, str):
-                unlocked.add(target)
+            if bool(first("when")) and isinstance(target, str):
+                return target
+            return None
+        return _NO_OUTPUT
+
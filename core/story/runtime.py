@@ -79,6 +79,7 @@ class _Transaction:
         cast_context: CastResolutionContext,
         condition_evaluator: ConditionEvaluator,
         rule_evaluator: RuleEvaluator,
+        record_events: bool = True,
     ) -> None:
         self.program = program
         self.original = state
@@ -101,10 +102,15 @@ class _Transaction:
         self.global_effects: list[EffectSpec] = []
         self.cast_plans: list[CastResolutionPlan] = []
         self.pending: list[_PendingEvent] = []
+        self.record_events = record_events
+        self.emitted = 0
 
     def emit(self, event_type: StoryEventType, **payload: Any) -> str:
-        self.pending.append(_PendingEvent(event_type, freeze_mapping(payload)))
-        return self._event_id(len(self.pending) - 1)
+        index = self.emitted
+        self.emitted += 1
+        if self.record_events:
+            self.pending.append(_PendingEvent(event_type, freeze_mapping(payload)))
+        return self._event_id(index)
 
     def evaluate(self, condition: Any) -> bool:
         variables = {**self.global_variables, **self.variables}
@@ -198,7 +204,7 @@ class _Transaction:
                 raise StoryRuntimeError(
                     "effect.invalid_canon", "canon text cannot be empty"
                 )
-            canon_id = f"canon-{self.original.event_cursor + len(self.pending) + 1}"
+            canon_id = f"canon-{self.original.event_cursor + self.emitted + 1}"
             event_id = self.emit(
                 StoryEventType.CANON_APPENDED,
                 canonId=canon_id,
@@ -232,8 +238,9 @@ class _Transaction:
         self.emit(StoryEventType.NODE_UNLOCKED, nodeId=node_id)
 
     def recompute_unlocks(self) -> None:
-        transient_state = self._preview_state()
-        variables = {**self.global_variables, **transient_state.variables}
+        # Transaction values are already normalized by _apply_effect, so the
+        # evaluator can read them directly instead of a frozen preview state.
+        variables = {**self.global_variables, **self.variables}
         for node_id in sorted(
             self.rule_evaluator.evaluate_unlocks(
                 self.program,
@@ -470,7 +477,7 @@ class _Transaction:
 
     def commit(self) -> RuntimeResult:
         self._validate_state()
-        if not self.pending:
+        if not self.emitted:
             self.emit(StoryEventType.COMMAND_PROCESSED)
         new_revision = self.original.revision + 1
         events = tuple(
@@ -513,7 +520,7 @@ class _Transaction:
             canon=tuple(self.canon),
             semantic_signal_state=self.semantic_state,
             cast_state=cast_state,
-            event_cursor=self.original.event_cursor + len(events),
+            event_cursor=self.original.event_cursor + self.emitted,
         )
         return RuntimeResult(
             state=state,
@@ -522,15 +529,6 @@ class _Transaction:
             cast_plans=tuple(self.cast_plans),
         )
 
-    def _preview_state(self) -> StoryState:
-        return replace(
-            self.original,
-            current_node_id=self.current_node_id,
-            variables=freeze_mapping(self.variables),
-            completed_node_ids=frozenset(self.completed),
-            unlocked_node_ids=frozenset(self.unlocked),
-        )
-
     def _event_id(self, pending_index: int) -> str:
         return (
             f"event-{self.original.revision + 1}-"
@@ -661,13 +659,16 @@ class StoryRuntime:
         *,
         cast_context: CastResolutionContext | None = None,
         global_variables: Mapping[str, Any] | None = None,
+        dry_run: bool = False,
     ) -> RuntimeResult:
+        """Apply one command; ``dry_run`` skips building events (``events`` is empty)."""
         self._validate_command(state, command)
         transaction = self._transaction(
             state,
             command.command_id,
             cast_context or CastResolutionContext(),
             self._prepare_global_variables(global_variables),
+            record_events=not dry_run,
         )
         if isinstance(command, SelectChoice):
             self._select_choice(transaction, command)
@@ -806,6 +807,8 @@ class StoryRuntime:
         command_id: str,
         cast_context: CastResolutionContext,
         global_variables: Mapping[str, Any],
+        *,
+        record_events: bool = True,
     ) -> _Transaction:
         return _Transaction(
             program=self.program,
@@ -816,6 +819,7 @@ class StoryRuntime:
             cast_context=cast_context,
             condition_evaluator=self.condition_evaluator,
             rule_evaluator=self.rule_evaluator,
+            record_events=record_events,
         )
 
     def _validate_command(self, state: StoryState, command: RuntimeCommand) -> None:
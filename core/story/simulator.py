@@ -1,19 +1,174 @@
-"""Bounded deterministic path exploration for compiled story programs."""
+"""Bounded deterministic path exploration for compiled story programs.
+
+States are deduplicated by a 128-bit digest of their structural content and
+expanded breadth-first, one depth level at a time, through the runtime's
+event-free ``dry_run`` path. With ``workers > 1`` each level's frontier is
+partitioned by digest across a process pool (``mp_context`` picks its start
+method). ``prune_unobserved`` merges states that differ only in variables
+(or completed nodes) no condition or rule can read, which preserves node and
+ending reachability.
+"""
 
 from __future__ import annotations
 
-from collections import deque
+import copyreg
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from multiprocessing.context import BaseContext
 from types import MappingProxyType
-from typing import Mapping
+from typing import Any, Mapping
 
 from .cast import CastResolutionContext, CastResolutionError
 from .commands import EnterNode, PerformIntent, SelectChoice, StartStory
-from .compiler import canonical_json
+from .models import ConditionSpec
 from .runtime import StoryRuntime, StoryRuntimeError
 from .state import StoryState
 
 
+def _mapping_proxy(data: dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(data)
+
+
+# StoryState freezes its mappings into MappingProxyType, which cannot be
+# pickled by default; worker processes need to receive and return states.
+copyreg.pickle(MappingProxyType, lambda proxy: (_mapping_proxy, (dict(proxy),)))
+
+# Levels smaller than this are expanded in-process even when workers are set.
+_PARALLEL_MIN_FRONTIER = 64
+
+_Path = tuple[str, Any] | None
+_Successor = tuple[str, bytes, StoryState]
+
+
+@dataclass(frozen=True, slots=True)
+class _Observed:
+    variables: frozenset[str]
+    completed: bool
+
+
+_ATOMS = (str, int, bool, float, type(None))
+
+
+def _canonical(value: Any) -> Any:
+    if type(value) in _ATOMS:
+        return value
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(key), _canonical(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_canonical(item) for item in value), key=repr))
+    if isinstance(value, (tuple, list)):
+        return tuple(_canonical(item) for item in value)
+    return value
+
+
+def state_digest(state: StoryState, observed: _Observed | None = None) -> bytes:
+    """128-bit digest of the parts of ``state`` that affect future exploration."""
+    variables = state.variables
+    if observed is not None:
+        variables = {
+            key: value for key, value in variables.items() if key in observed.variables
+        }
+    completed = (
+        state.completed_node_ids if observed is None or observed.completed else ()
+    )
+    key = (
+        state.current_node_id,
+        _canonical(variables),
+        tuple(sorted(completed)),
+        tuple(sorted(state.unlocked_node_ids)),
+        tuple(state.cast_state.active_character_ids),
+        _canonical(state.cast_state.role_bindings),
+        state.semantic_signal_state.sequence,
+    )
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+
+
+def _unwind(path: _Path) -> tuple[str, ...]:
+    labels: list[str] = []
+    while path is not None:
+        label, path = path
+        labels.append(label)
+    return tuple(reversed(labels))
+
+
+def expand_state(
+    runtime: StoryRuntime,
+    state: StoryState,
+    cast_context: CastResolutionContext | None,
+    observed: _Observed | None = None,
+) -> list[_Successor]:
+    """Every ``(label, digest, state)`` reachable from ``state`` in one command."""
+    node = runtime.program.nodes_by_id[state.current_node_id]
+    commands: list[tuple[str, SelectChoice | PerformIntent | EnterNode]] = []
+    for choice in node.choices:
+        commands.append(
+            (
+                f"choice:{node.id}/{choice.id}",
+                SelectChoice(
+                    command_id=f"sim-choice-{choice.id}",
+                    expected_revision=state.revision,
+                    choice_id=choice.id,
+                    expected_node_id=state.current_node_id,
+                ),
+            )
+        )
+    for intent in node.freeform_intents:
+        commands.append(
+            (
+                f"intent:{node.id}/{intent.id}",
+                PerformIntent(
+                    command_id=f"sim-intent-{intent.id}",
+                    expected_revision=state.revision,
+                    intent_id=intent.id,
+                    expected_node_id=state.current_node_id,
+                ),
+            )
+        )
+    for node_id in sorted(state.unlocked_node_ids.difference({state.current_node_id})):
+        commands.append(
+            (
+                f"enter:{node_id}",
+                EnterNode(
+                    command_id=f"sim-enter-{node_id}",
+                    expected_revision=state.revision,
+                    node_id=node_id,
+                ),
+            )
+        )
+    successors: list[_Successor] = []
+    for label, command in commands:
+        try:
+            result = runtime.execute(
+                state,
+                command,
+                cast_context=cast_context,
+                dry_run=True,
+            ).state
+        except StoryRuntimeError:
+            continue
+        successors.append((label, state_digest(result, observed), result))
+    return successors
+
+
+_WORKER: tuple[StoryRuntime, CastResolutionContext | None, _Observed | None] | None = None
+
+
+def _init_worker(
+    runtime: StoryRuntime,
+    cast_context: CastResolutionContext | None,
+    observed: _Observed | None,
+) -> None:
+    global _WORKER
+    _WORKER = (runtime, cast_context, observed)
+
+
+def _expand_batch(states: list[StoryState]) -> list[list[_Successor]]:
+    assert _WORKER is not None
+    runtime, cast_context, observed = _WORKER
+    return [expand_state(runtime, state, cast_context, observed) for state in states]
+
+
 @dataclass(frozen=True, slots=True)
 class SimulationReport:
     explored_states: int
@@ -31,12 +186,18 @@ class StorySimulator:
         *,
         max_states: int = 1_000,
         max_depth: int = 100,
+        workers: int = 1,
+        prune_unobserved: bool = False,
+        mp_context: BaseContext | None = None,
     ) -> None:
-        if max_states < 1 or max_depth < 1:
+        if max_states < 1 or max_depth < 1 or workers < 1:
             raise ValueError("simulation limits must be positive")
         self.runtime = runtime
         self.max_states = max_states
         self.max_depth = max_depth
+        self.workers = workers
+        self.prune_unobserved = prune_unobserved
+        self.mp_context = mp_context
 
     def simulate(
         self,
@@ -64,74 +225,55 @@ class StorySimulator:
                 cast_resolution_failures=MappingProxyType(cast_failures),
                 truncated=False,
             )
-        queue = deque([(started.state, tuple(), 0)])
-        visited: set[str] = set()
+        observed = self._observed_components() if self.prune_unobserved else None
+        start_digest = state_digest(started.state, observed)
+        frontier: list[tuple[StoryState, bytes, _Path]] = [
+            (started.state, start_digest, None)
+        ]
+        seen = {start_digest}
+        explored = 0
+        depth = 0
         reachable: set[str] = set()
         endings: dict[str, tuple[str, ...]] = {}
         dead_ends: set[str] = set()
         truncated = False
-
-        while queue:
-            state, path, depth = queue.popleft()
-            signature = self._state_signature(state)
-            if signature in visited:
-                continue
-            if len(visited) >= self.max_states:
-                truncated = True
-                break
-            visited.add(signature)
-            reachable.add(state.current_node_id)
-            node = self.runtime.program.nodes_by_id[state.current_node_id]
-            if node.type == "ending":
-                endings.setdefault(node.id, path)
-                continue
-            if depth >= self.max_depth:
-                truncated = True
-                continue
-
-            next_states: list[tuple[StoryState, tuple[str, ...], int]] = []
-            for index, choice in enumerate(node.choices):
-                command = SelectChoice(
-                    command_id=f"sim-{len(visited)}-choice-{index}",
-                    expected_revision=state.revision,
-                    choice_id=choice.id,
-                    expected_node_id=state.current_node_id,
-                )
-                result = self._try_execute(state, command, cast_context)
-                if result is not None:
-                    next_states.append(
-                        (result, (*path, f"choice:{node.id}/{choice.id}"), depth + 1)
-                    )
-            for index, intent in enumerate(node.freeform_intents):
-                command = PerformIntent(
-                    command_id=f"sim-{len(visited)}-intent-{index}",
-                    expected_revision=state.revision,
-                    intent_id=intent.id,
-                    expected_node_id=state.current_node_id,
-                )
-                result = self._try_execute(state, command, cast_context)
-                if result is not None:
-                    next_states.append(
-                        (result, (*path, f"intent:{node.id}/{intent.id}"), depth + 1)
-                    )
-            enterable_node_ids = sorted(
-                state.unlocked_node_ids.difference({state.current_node_id})
-            )
-            for index, node_id in enumerate(enterable_node_ids):
-                command = EnterNode(
-                    command_id=f"sim-{len(visited)}-enter-{index}",
-                    expected_revision=state.revision,
-                    node_id=node_id,
-                )
-                result = self._try_execute(state, command, cast_context)
-                if result is not None:
-                    next_states.append((result, (*path, f"enter:{node_id}"), depth + 1))
-            if not next_states:
-                dead_ends.add(node.id)
-            queue.extend(next_states)
+        capped = False
+        nodes = self.runtime.program.nodes_by_id
+        executor = self._executor(cast_context, observed)
+        try:
+            while frontier and not capped:
+                expandable: list[tuple[StoryState, bytes, _Path]] = []
+                for state, digest, path in frontier:
+                    if explored >= self.max_states:
+                        truncated = capped = True
+                        break
+                    explored += 1
+                    reachable.add(state.current_node_id)
+                    node = nodes[state.current_node_id]
+                    if node.type == "ending":
+                        endings.setdefault(node.id, _unwind(path))
+                        continue
+                    if depth >= self.max_depth:
+                        truncated = True
+                        continue
+                    expandable.append((state, digest, path))
+                expansions = self._expand_level(expandable, cast_context, observed, executor)
+                frontier = []
+                for (state, _, path), successors in zip(expandable, expansions):
+                    if not successors:
+                        dead_ends.add(state.current_node_id)
+                    for label, digest, successor in successors:
+                        if digest in seen:
+                            continue
+                        seen.add(digest)
+                        frontier.append((successor, digest, (label, path)))
+                depth += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
         return SimulationReport(
-            explored_states=len(visited),
+            explored_states=explored,
             reachable_node_ids=frozenset(reachable),
             ending_paths=MappingProxyType(endings),
             dead_end_node_ids=frozenset(dead_ends),
@@ -139,6 +281,72 @@ class StorySimulator:
             truncated=truncated,
         )
 
+    def _executor(
+        self,
+        cast_context: CastResolutionContext | None,
+        observed: _Observed | None,
+    ) -> ProcessPoolExecutor | None:
+        if self.workers <= 1:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(self.runtime, cast_context, observed),
+        )
+
+    def _expand_level(
+        self,
+        frontier: list[tuple[StoryState, bytes, _Path]],
+        cast_context: CastResolutionContext | None,
+        observed: _Observed | None,
+        executor: ProcessPoolExecutor | None,
+    ) -> list[list[_Successor]]:
+        if executor is None or len(frontier) < _PARALLEL_MIN_FRONTIER:
+            return [
+                expand_state(self.runtime, state, cast_context, observed)
+                for state, _, _ in frontier
+            ]
+        # Partition the frontier by state digest so every worker gets an even,
+        # deterministic share; results are merged back in frontier order, so
+        # parallel runs report exactly what a serial run would.
+        partitions: list[list[int]] = [[] for _ in range(self.workers)]
+        for index, (_, digest, _) in enumerate(frontier):
+            partitions[int.from_bytes(digest[:4], "big") % self.workers].append(index)
+        partitions = [part for part in partitions if part]
+        expansions: list[list[_Successor]] = [[] for _ in frontier]
+        batches = [[frontier[index][0] for index in part] for part in partitions]
+        for part, results in zip(partitions, executor.map(_expand_batch, batches)):
+            for index, successors in zip(part, results):
+                expansions[index] = successors
+        return expansions
+
+    def _observed_components(self) -> _Observed:
+        """Variables (and whether completion) any guard in the program can read."""
+        program = self.runtime.program
+        variables: set[str] = set()
+        reads_completed = False
+
+        def visit(condition: ConditionSpec) -> None:
+            nonlocal reads_completed
+            if condition.op in {"all", "any", "not"}:
+                for child in condition.args:
+                    if isinstance(child, ConditionSpec):
+                        visit(child)
+            elif condition.op == "completed":
+                reads_completed = True
+            elif condition.op in {"flag", "equals", "gte", "lte", "contains"}:
+                variables.add(str(condition.args[0]))
+
+        for node in program.nodes:
+            visit(node.enter_when)
+            for choice in node.choices:
+                visit(choice.when)
+            for intent in node.freeform_intents:
+                visit(intent.when)
+        variables.update(self.runtime.rule_evaluator.plan_for(program).variable_readers)
+        return _Observed(frozenset(variables), reads_completed)
+
     def _check_cast_resolution(
         self,
         context: CastResolutionContext,
@@ -155,32 +363,3 @@ class StorySimulator:
             except CastResolutionError as error:
                 failures[node.id] = error.code
         return failures
-
-    def _try_execute(
-        self,
-        state: StoryState,
-        command: SelectChoice | PerformIntent | EnterNode,
-        cast_context: CastResolutionContext | None,
-    ) -> StoryState | None:
-        try:
-            return self.runtime.execute(
-                state,
-                command,
-                cast_context=cast_context,
-            ).state
-        except StoryRuntimeError:
-            return None
-
-    @staticmethod
-    def _state_signature(state: StoryState) -> str:
-        return canonical_json(
-            {
-                "node": state.current_node_id,
-                "variables": state.variables,
-                "completed": sorted(state.completed_node_ids),
-                "unlocked": sorted(state.unlocked_node_ids),
-                "activeCast": state.cast_state.active_character_ids,
-                "roles": state.cast_state.role_bindings,
-                "semanticSequence": state.semantic_signal_state.sequence,
-            }
-        )
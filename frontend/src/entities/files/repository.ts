@@ -78,14 +78,28 @@ export async function fileThumbnailBatch(
     options.batchSize ?? (delivery === "data" ? DATA_THUMBNAIL_BATCH_SIZE : THUMBNAIL_BATCH_SIZE),
   );
   const loadBatch = async (batch: string[]) => {
-    const sources = await platform.files.thumbnailBatch!(batch, { delivery, size }).catch(() =>
-      Object.fromEntries(batch.map((path) => [path, platform.files.thumbnailUrl(path, { size })])),
+    const streamed = new Set<string>();
+    const remember = (path: string, source: string) => {
+      thumbnailSourceCache.set(thumbnailCacheKey(path, size, delivery), source);
+      result[path] = source;
+    };
+    const onItem = (path: string, source: string) => {
+      // Paint each streamed thumbnail immediately instead of waiting for the batch.
+      streamed.add(path);
+      remember(path, source);
+      options.onBatch?.({ [path]: source });
+    };
+    const sources = await platform.files.thumbnailBatch!(batch, { delivery, onItem, size }).catch(() =>
+      Object.fromEntries(
+        batch.filter((path) => !streamed.has(path)).map((path) => [path, platform.files.thumbnailUrl(path, { size })]),
+      ),
     );
     const loadedSources: Record<string, string> = {};
     for (const [path, source] of Object.entries(sources)) {
-      thumbnailSourceCache.set(thumbnailCacheKey(path, size, delivery), source);
-      result[path] = source;
-      loadedSources[path] = source;
+      remember(path, source);
+      if (!streamed.has(path)) {
+        loadedSources[path] = source;
+      }
     }
     if (Object.keys(loadedSources).length) {
       options.onBatch?.(loadedSources);
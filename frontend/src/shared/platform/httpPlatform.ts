@@ -188,6 +188,56 @@ async function requestJson<T>(baseUrl: string, path: string, init?: RequestInit)
   return data as T;
 }
 
+type ThumbnailBatchItem = { cachePath?: string; dataUrl?: string; path: string };
+
+// Resolves true once the `{"done": true}` sentinel arrives; false means the stream was cut short.
+async function streamThumbnailBatch(
+  baseUrl: string,
+  paths: string[],
+  size: number,
+  onItem: (item: ThumbnailBatchItem) => void,
+): Promise<boolean> {
+  const response = await fetchWithStartupRetry(`${baseUrl}/api/media/thumbnails`, {
+    body: JSON.stringify({ mode: "stream", paths, size }),
+    headers: {
+      Accept: "application/x-ndjson",
+      "Content-Type": "application/json",
+      ...bridgeAuthHeaders(baseUrl),
+    },
+    method: "POST",
+  });
+  if (!response.ok || !response.body) {
+    const data = await response.json().catch(() => ({}));
+    const message = typeof data?.error === "string" ? data.error : `${response.status} ${response.statusText}`;
+    throw new PlatformRequestError(message, response.status);
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let complete = false;
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split("\n");
+    // Every record ends with a newline; a fragment left at end of stream is a truncated write.
+    buffered = lines.pop() ?? "";
+    for (const line of lines) {
+      if (!line.trim()) {
+        continue;
+      }
+      const item = JSON.parse(line) as ThumbnailBatchItem & { done?: boolean };
+      if (item.done) {
+        complete = true;
+      } else {
+        onItem(item);
+      }
+    }
+    if (done) {
+      return complete;
+    }
+  }
+}
+
 async function fetchWithStartupRetry(url: string, init: RequestInit): Promise<Response> {
   const method = (init.method ?? "GET").toUpperCase();
   const retryable = method === "GET" || method === "HEAD";
@@ -344,17 +394,53 @@ function sanitizeRestartLogUrl(url: string) {
   }
 }
 
-function buildChatViewerWebSocketUrl(wsUrl: string, sessionId: string, authToken = "") {
+function buildChatViewerWebSocketUrl(wsUrl: string, sessionId: string, authToken = "", sinceSeq?: number) {
   const url = new URL(wsUrl);
   url.searchParams.set("sessionId", sessionId);
   url.searchParams.set("role", "viewer");
   url.searchParams.set("rendererId", currentChatRendererId());
+  if (typeof sinceSeq === "number" && Number.isFinite(sinceSeq)) {
+    url.searchParams.set("sinceSeq", String(sinceSeq));
+  }
   if (authToken.trim()) {
     url.searchParams.set("shinsekai_bridge_token", authToken.trim());
   }
   return url.toString();
 }
 
+// The bridge answers a viewer that announced `sinceSeq` with top-level JSON
+// Patch operations instead of a full snapshot.
+export function applyChatSnapshotPatch(snapshot: ChatSnapshot, patch: unknown[]): ChatSnapshot {
+  const next: Record<string, unknown> = { ...snapshot };
+  for (const operation of patch) {
+    if (!operation || typeof operation !== "object") {
+      continue;
+    }
+    const { op, path, value } = operation as { op?: unknown; path?: unknown; value?: unknown };
+    if (typeof path !== "string" || !path.startsWith("/")) {
+      continue;
+    }
+    const key = path.slice(1).replace(/~1/g, "/").replace(/~0/g, "~");
+    if (op === "remove") {
+      delete next[key];
+    } else if (op === "add" || op === "replace") {
+      next[key] = value;
+    }
+  }
+  return next as ChatSnapshot;
+}
+
+// The bridge coalesces or skips events for a lagging viewer and tags the next
+// delivered event with `prevSeq`, the last seq it sent on this socket; after a
+// queue overflow it sends a full `snapshot` frame. Only a jump the bridge did
+// not account for needs a snapshot refetch.
+function isChatEventSeqGap(lastEventSeq: number, event: { prevSeq?: unknown; seq: number; type: string }) {
+  if (event.type === "snapshot" || lastEventSeq <= 0 || event.seq <= lastEventSeq + 1) {
+    return false;
+  }
+  return !(typeof event.prevSeq === "number" && event.prevSeq <= lastEventSeq);
+}
+
 function isRealtimeChatCommand(command: ChatCommand): command is ChatUpstreamCommand {
   return command.type !== "copy-history" && command.type !== "open-history";
 }
@@ -646,8 +732,12 @@ export function createHttpPlatform(baseUrl: string, authToken = ""): ShinsekaiPl
         let seq = 0;
         let socket: WebSocket | null = null;
         let lastEventSeq = 0;
+        // Latest full snapshot seen; a reconnect announces its eventSeq so the
+        // bridge answers with a patch against exactly this state.
+        let heldSnapshot: ChatSnapshot | null = null;
 
         const emitSnapshot = (snapshot: ChatSnapshot) => {
+          heldSnapshot = snapshot;
           const snapshotSeq =
             typeof snapshot.eventSeq === "number" && Number.isFinite(snapshot.eventSeq) ? snapshot.eventSeq : 0;
           const event: ChatStageEvent = {
@@ -704,7 +794,12 @@ export function createHttpPlatform(baseUrl: string, authToken = ""): ShinsekaiPl
           closeSocket();
           let websocketConnected = false;
           const ws = new WebSocketCtor(
-            buildChatViewerWebSocketUrl(snapshot.wsUrl, snapshot.sessionId, bridgeAuthToken(apiBase)),
+            buildChatViewerWebSocketUrl(
+              snapshot.wsUrl,
+              snapshot.sessionId,
+              bridgeAuthToken(apiBase),
+              typeof snapshot.eventSeq === "number" ? snapshot.eventSeq : undefined,
+            ),
           );
           socket = ws;
           connectTimeoutId = window.setTimeout(() => {
@@ -736,8 +831,17 @@ export function createHttpPlatform(baseUrl: string, authToken = ""): ShinsekaiPl
               if (!parsed || typeof parsed !== "object" || typeof parsed.type !== "string") {
                 return;
               }
+              if (parsed.type === "snapshot.patch") {
+                if (Array.isArray(parsed.patch)) {
+                  emitSnapshot(applyChatSnapshotPatch(snapshot, parsed.patch));
+                }
+                return;
+              }
+              if (parsed.type === "snapshot" && parsed.snapshot && typeof parsed.snapshot === "object") {
+                heldSnapshot = parsed.snapshot as ChatSnapshot;
+              }
               if (typeof parsed.seq === "number") {
-                if (lastEventSeq > 0 && parsed.seq > lastEventSeq + 1) {
+                if (isChatEventSeqGap(lastEventSeq, parsed)) {
                   void requestJson<ChatSnapshot>(apiBase, chatSnapshotPath())
                     .then((nextSnapshot) => {
                       if (!stopped) {
@@ -766,12 +870,16 @@ export function createHttpPlatform(baseUrl: string, authToken = ""): ShinsekaiPl
             if (socket === ws) {
               socket = null;
             }
+            const wasConnected = websocketConnected;
             websocketConnected = false;
             window.clearTimeout(connectTimeoutId);
             connectTimeoutId = 0;
             if (!stopped) {
               emitTransportState("reconnecting", "websocket");
-              timeoutId = window.setTimeout(connectFromSnapshot, 800);
+              // A socket that worked reconnects straight from the held snapshot
+              // and lets the bridge send only what changed since its eventSeq;
+              // one that never opened (e.g. the session is gone) asks HTTP.
+              timeoutId = window.setTimeout(wasConnected ? reconnectFromHeldSnapshot : connectFromSnapshot, 800);
             }
           };
           return true;
@@ -794,6 +902,15 @@ export function createHttpPlatform(baseUrl: string, authToken = ""): ShinsekaiPl
           }
         };
 
+        const reconnectFromHeldSnapshot = () => {
+          if (stopped) {
+            return;
+          }
+          if (!heldSnapshot || !connectWebSocket(heldSnapshot)) {
+            void connectFromSnapshot();
+          }
+        };
+
         const connectFromSnapshot = async () => {
           try {
             const snapshot = await requestJson<ChatSnapshot>(apiBase, chatSnapshotPath());
@@ -1069,39 +1186,57 @@ export function createHttpPlatform(baseUrl: string, authToken = ""): ShinsekaiPl
         if (!localPaths.length) {
           return Object.fromEntries(directEntries);
         }
-        const response = await requestJson<{
-          items: Array<{ cachePath?: string; dataUrl?: string; path: string }>;
-        }>(apiBase, "/api/media/thumbnails", {
+        const preferDataUrl = options?.delivery === "data";
+        const sourceOf = (item: ThumbnailBatchItem): string | null => {
+          if (preferDataUrl && item.dataUrl) {
+            return item.dataUrl;
+          }
+          if (item.cachePath) {
+            return bridgeUrl(apiBase, `/api/media?path=${encodeURIComponent(item.cachePath)}`);
+          }
+          return item.dataUrl ?? null;
+        };
+        const sources: Record<string, string> = Object.fromEntries(directEntries);
+        const size = options?.size ?? 160;
+        if (!preferDataUrl) {
+          // NDJSON stream: each thumbnail arrives as soon as it is rendered.
+          const uniquePaths = [...new Set(localPaths)];
+          const received = new Set<string>();
+          const accept = (item: ThumbnailBatchItem) => {
+            received.add(item.path);
+            const source = sourceOf(item);
+            if (source) {
+              sources[item.path] = source;
+              options?.onItem?.(item.path, source);
+            }
+          };
+          const complete = await streamThumbnailBatch(apiBase, uniquePaths, size, accept);
+          const missing = uniquePaths.filter((path) => !received.has(path));
+          if (!complete && missing.length) {
+            // The stream ended without its done sentinel: fetch whatever never arrived.
+            const retry = await requestJson<{ items: ThumbnailBatchItem[] }>(apiBase, "/api/media/thumbnails", {
+              body: JSON.stringify({ mode: "url", paths: missing, size }),
+              method: "POST",
+            });
+            retry.items.forEach(accept);
+          }
+          return sources;
+        }
+        const response = await requestJson<{ items: ThumbnailBatchItem[] }>(apiBase, "/api/media/thumbnails", {
           body: JSON.stringify({
-            mode: options?.delivery === "data" ? "data" : "url",
+            mode: "data",
             paths: [...new Set(localPaths)],
-            size: options?.size ?? 160,
+            size,
           }),
           method: "POST",
         });
-        const preferDataUrl = options?.delivery === "data";
-        return {
-          ...Object.fromEntries(directEntries),
-          ...Object.fromEntries(
-            response.items
-              .map((item) => {
-                if (preferDataUrl && item.dataUrl) {
-                  return [item.path, item.dataUrl] as const;
-                }
-                if (item.cachePath) {
-                  return [
-                    item.path,
-                    bridgeUrl(apiBase, `/api/media?path=${encodeURIComponent(item.cachePath)}`),
-                  ] as const;
-                }
-                if (item.dataUrl) {
-                  return [item.path, item.dataUrl] as const;
-                }
-                return null;
-              })
-              .filter((entry): entry is readonly [string, string] => entry !== null),
-          ),
-        };
+        for (const item of response.items) {
+          const source = sourceOf(item);
+          if (source) {
+            sources[item.path] = source;
+          }
+        }
+        return sources;
       },
       thumbnailUrl(path, options) {
         if (!path) {
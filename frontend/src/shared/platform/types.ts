@@ -361,15 +361,38 @@ export interface McpServerEntry {
   env?: Record<string, string>;
   group?: string;
   headers?: Record<string, string>;
+  max_concurrent_calls?: number;
   name_prefix: string;
+  sessions?: number;
   transport: McpTransport;
   url?: string;
 }
 
+export interface McpServerStats {
+  avgCallMs: number | null;
+  calls: number;
+  connectMs: number | null;
+  connected: boolean;
+  errors: number;
+  group: string;
+  inFlight: number;
+  lastCallMs: number | null;
+  listChanged: number;
+  listMs: number | null;
+  maxCallMs: number;
+  name: string;
+  schemaSource: "cache" | "server";
+  schemaVersion: number;
+  sessions: number;
+  toolCount: number;
+  transport: string;
+}
+
 export interface McpConfig {
   default_call_timeout: number;
   enabled: boolean;
   path?: string;
+  server_stats?: McpServerStats[];
   servers: McpServerEntry[];
 }
 
@@ -1438,7 +1461,11 @@ export interface ShinsekaiPlatform {
     fileUrl: (path: string) => string;
     thumbnailBatch?: (
       paths: string[],
-      options?: { delivery?: "data" | "url"; size?: number },
+      options?: {
+        delivery?: "data" | "url";
+        onItem?: (path: string, source: string) => void;
+        size?: number;
+      },
     ) => Promise<Record<string, string>>;
     thumbnailUrl: (path: string, options?: { size?: number }) => string;
     openExternal: (url: string) => Promise<void>;
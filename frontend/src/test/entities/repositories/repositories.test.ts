@@ -146,7 +146,10 @@ describe("entity repositories", () => {
     expect(platform.config.cancelTtsBundleDownload).toHaveBeenCalledWith("task-1");
     expect(platform.config.detectNetworkProxy).toHaveBeenCalledWith();
     expect(platform.files.browse).toHaveBeenCalledWith({ path: "/tmp", showHidden: true });
-    expect(platform.files.thumbnailBatch).toHaveBeenCalledWith(["/tmp/a.png"], { delivery: "url", size: 160 });
+    expect(platform.files.thumbnailBatch).toHaveBeenCalledWith(
+      ["/tmp/a.png"],
+      expect.objectContaining({ delivery: "url", size: 160 }),
+    );
     expect(platform.files.openExternal).toHaveBeenCalledWith("https://example.test");
     expect(platform.templates.generate).toHaveBeenCalledWith({
       backgroundName: "默认房间",
@@ -1,7 +1,7 @@
 import { waitFor } from "@testing-library/react";
 import { afterEach, describe, expect, it, vi } from "vitest";
 
-import { createHttpPlatform } from "../../../shared/platform/httpPlatform";
+import { applyChatSnapshotPatch, createHttpPlatform } from "../../../shared/platform/httpPlatform";
 import { currentChatRendererId } from "../../../shared/platform/chatRenderer";
 import {
   sampleConfig,
@@ -684,29 +684,79 @@ describe("http platform", () => {
     );
   });
 
-  it("fetches local media thumbnails in one batch", async () => {
+  it("streams local media thumbnails as they are rendered", async () => {
     const fetchMock = vi.fn((_input: RequestInfo | URL, _init?: RequestInit) =>
-      mockJsonResponse({
-        items: [
-          { cachePath: ".cache/frontend-media-thumbnails/aaa.png", path: "data/backgrounds/a.png" },
-          { error: "missing", path: "data/backgrounds/missing.png" },
-        ],
-      }),
+      Promise.resolve(
+        new Response(
+          [
+            JSON.stringify({ error: "missing", path: "data/backgrounds/missing.png" }),
+            JSON.stringify({ cachePath: ".cache/frontend-media-thumbnails/aaa.png", path: "data/backgrounds/a.png" }),
+            JSON.stringify({ count: 2, done: true }),
+            "",
+          ].join("\n"),
+          { headers: { "Content-Type": "application/x-ndjson" } },
+        ),
+      ),
     );
     vi.stubGlobal("fetch", fetchMock);
+    const onItem = vi.fn();
 
     const platform = createHttpPlatform("http://127.0.0.1:8787");
     await expect(
-      platform.files.thumbnailBatch!(["data/backgrounds/a.png", "https://example.test/remote.png"], { size: 160 }),
+      platform.files.thumbnailBatch!(["data/backgrounds/a.png", "https://example.test/remote.png"], {
+        onItem,
+        size: 160,
+      }),
     ).resolves.toEqual({
       "data/backgrounds/a.png": "http://127.0.0.1:8787/api/media?path=.cache%2Ffrontend-media-thumbnails%2Faaa.png",
       "https://example.test/remote.png": "https://example.test/remote.png",
     });
 
+    expect(onItem).toHaveBeenCalledTimes(1);
+    expect(onItem).toHaveBeenCalledWith(
+      "data/backgrounds/a.png",
+      "http://127.0.0.1:8787/api/media?path=.cache%2Ffrontend-media-thumbnails%2Faaa.png",
+    );
     expect(fetchMock).toHaveBeenCalledWith(
       "http://127.0.0.1:8787/api/media/thumbnails",
       expect.objectContaining({
-        body: JSON.stringify({ mode: "url", paths: ["data/backgrounds/a.png"], size: 160 }),
+        body: JSON.stringify({ mode: "stream", paths: ["data/backgrounds/a.png"], size: 160 }),
+        method: "POST",
+      }),
+    );
+  });
+
+  it("re-requests thumbnails missing from a stream cut short before its done sentinel", async () => {
+    const fetchMock = vi.fn((_input: RequestInfo | URL, init?: RequestInit) => {
+      if (String(init?.body).includes('"mode":"stream"')) {
+        return Promise.resolve(
+          new Response(
+            [
+              JSON.stringify({ cachePath: ".cache/frontend-media-thumbnails/aaa.png", path: "data/backgrounds/a.png" }),
+              '{"cachePath":".cache/frontend-media-thumb',
+            ].join("\n"),
+            { headers: { "Content-Type": "application/x-ndjson" } },
+          ),
+        );
+      }
+      return mockJsonResponse({
+        items: [{ cachePath: ".cache/frontend-media-thumbnails/bbb.png", path: "data/backgrounds/b.png" }],
+      });
+    });
+    vi.stubGlobal("fetch", fetchMock);
+
+    const platform = createHttpPlatform("http://127.0.0.1:8787");
+    await expect(
+      platform.files.thumbnailBatch!(["data/backgrounds/a.png", "data/backgrounds/b.png"], { size: 160 }),
+    ).resolves.toEqual({
+      "data/backgrounds/a.png": "http://127.0.0.1:8787/api/media?path=.cache%2Ffrontend-media-thumbnails%2Faaa.png",
+      "data/backgrounds/b.png": "http://127.0.0.1:8787/api/media?path=.cache%2Ffrontend-media-thumbnails%2Fbbb.png",
+    });
+
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    expect(fetchMock.mock.calls[1][1]).toEqual(
+      expect.objectContaining({
+        body: JSON.stringify({ mode: "url", paths: ["data/backgrounds/b.png"], size: 160 }),
         method: "POST",
       }),
     );
@@ -1327,6 +1377,179 @@ describe("http platform", () => {
     unsubscribe();
   });
 
+  it("does not refetch the snapshot for seq jumps the bridge coalesced or resynced", async () => {
+    const snapshot = {
+      backgroundPath: "",
+      characterName: "Nanami",
+      dialogText: "聊天已连接。",
+      eventSeq: 2,
+      historyPath: "data/chat_history/default.json",
+      inputDraft: "",
+      options: [],
+      sessionId: "session-1",
+      sprites: [],
+      status: "idle",
+      wsUrl: "ws://127.0.0.1:8788/ws",
+    };
+    const fetchMock = vi.fn((_input: RequestInfo | URL, _init?: RequestInit) => mockJsonResponse(snapshot));
+    vi.stubGlobal("fetch", fetchMock);
+
+    class FakeWebSocket {
+      static instances: FakeWebSocket[] = [];
+
+      onclose: ((event: Event) => void) | null = null;
+      onerror: ((event: Event) => void) | null = null;
+      onmessage: ((event: MessageEvent<string>) => void) | null = null;
+      url: string;
+      close = vi.fn(() => undefined);
+
+      constructor(url: string) {
+        this.url = url;
+        FakeWebSocket.instances.push(this);
+      }
+    }
+
+    vi.stubGlobal("WebSocket", FakeWebSocket as unknown as typeof WebSocket);
+
+    const platform = createHttpPlatform("http://127.0.0.1:8787");
+    const listener = vi.fn();
+    const unsubscribe = platform.chat.subscribeEvents(listener);
+
+    await new Promise((resolve) => setTimeout(resolve, 0));
+    const send = (payload: Record<string, unknown>) =>
+      FakeWebSocket.instances[0]?.onmessage?.(
+        new MessageEvent("message", { data: JSON.stringify({ ts: 123, v: 1, ...payload }) }),
+      );
+
+    send({ prevSeq: 2, seq: 6, status: "speaking", type: "status.change" });
+    const resynced = { ...snapshot, dialogText: "resynced", eventSeq: 40 };
+    send({ seq: 40, snapshot: resynced, type: "snapshot" });
+    send({ seq: 41, text: "next", type: "notification.change" });
+    await new Promise((resolve) => setTimeout(resolve, 0));
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(listener).toHaveBeenCalledWith(
+      expect.objectContaining({ prevSeq: 2, seq: 6, type: "status.change" }),
+    );
+    expect(listener).toHaveBeenCalledWith(expect.objectContaining({ snapshot: resynced, type: "snapshot" }));
+    expect(listener).toHaveBeenLastCalledWith(expect.objectContaining({ seq: 41, type: "notification.change" }));
+
+    send({ seq: 45, text: "lost", type: "notification.change" });
+    await waitFor(() => expect(fetchMock).toHaveBeenCalledTimes(2));
+
+    unsubscribe();
+  });
+
+  it("applies top-level snapshot patch operations without touching the base snapshot", () => {
+    const base = {
+      backgroundPath: "bg.png",
+      characterName: "Nanami",
+      dialogText: "old",
+      eventSeq: 3,
+      "a/b": 1,
+      "m~n": 2,
+    } as unknown as Parameters<typeof applyChatSnapshotPatch>[0];
+
+    const next = applyChatSnapshotPatch(base, [
+      { op: "replace", path: "/dialogText", value: "new" },
+      { op: "add", path: "/eventSeq", value: 9 },
+      { op: "remove", path: "/backgroundPath" },
+      { op: "add", path: "/a~1b", value: 10 },
+      { op: "remove", path: "/m~0n" },
+      { op: "add", path: "missing-slash", value: "ignored" },
+      null,
+      { op: "move", path: "/characterName", value: "ignored" },
+    ]) as unknown as Record<string, unknown>;
+
+    expect(next).toEqual({ characterName: "Nanami", dialogText: "new", eventSeq: 9, "a/b": 10 });
+    expect(base.dialogText).toBe("old");
+    expect((base as unknown as Record<string, unknown>).backgroundPath).toBe("bg.png");
+  });
+
+  it("reconnects from the held snapshot eventSeq without refetching over HTTP", async () => {
+    vi.useFakeTimers();
+
+    const snapshot = {
+      backgroundPath: "",
+      characterName: "Nanami",
+      dialogText: "聊天已连接。",
+      eventSeq: 4,
+      historyPath: "data/chat_history/default.json",
+      inputDraft: "",
+      options: [],
+      sessionId: "session-1",
+      sprites: [],
+      status: "idle",
+      wsUrl: "ws://127.0.0.1:8788/ws",
+    };
+    const fetchMock = vi.fn((_input: RequestInfo | URL, _init?: RequestInit) => mockJsonResponse(snapshot));
+    vi.stubGlobal("fetch", fetchMock);
+
+    class FakeWebSocket {
+      static instances: FakeWebSocket[] = [];
+
+      onclose: ((event: Event) => void) | null = null;
+      onerror: ((event: Event) => void) | null = null;
+      onmessage: ((event: MessageEvent<string>) => void) | null = null;
+      onopen: ((event: Event) => void) | null = null;
+      url: string;
+      close = vi.fn(() => undefined);
+
+      constructor(url: string) {
+        this.url = url;
+        FakeWebSocket.instances.push(this);
+      }
+    }
+
+    vi.stubGlobal("WebSocket", FakeWebSocket as unknown as typeof WebSocket);
+
+    const platform = createHttpPlatform("http://127.0.0.1:8787");
+    const listener = vi.fn();
+    const unsubscribe = platform.chat.subscribeEvents(listener);
+
+    await Promise.resolve();
+    await Promise.resolve();
+    await Promise.resolve();
+    await vi.advanceTimersByTimeAsync(0);
+    const first = FakeWebSocket.instances[0];
+    first?.onopen?.(new Event("open"));
+    first?.onmessage?.(
+      new MessageEvent("message", {
+        data: JSON.stringify({ seq: 5, text: "正在回复……", ts: 1, type: "notification.change", v: 1 }),
+      }),
+    );
+    first?.onclose?.(new Event("close"));
+    await vi.advanceTimersByTimeAsync(800);
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    const second = FakeWebSocket.instances[1];
+    expect(new URL(second?.url ?? "").searchParams.get("sinceSeq")).toBe("4");
+
+    second?.onmessage?.(
+      new MessageEvent("message", {
+        data: JSON.stringify({
+          baseSeq: 4,
+          patch: [
+            { op: "add", path: "/dialogText", value: "reconnected" },
+            { op: "add", path: "/eventSeq", value: 6 },
+          ],
+          seq: 6,
+          ts: 2,
+          type: "snapshot.patch",
+          v: 1,
+        }),
+      }),
+    );
+    expect(listener).toHaveBeenLastCalledWith(
+      expect.objectContaining({
+        snapshot: { ...snapshot, dialogText: "reconnected", eventSeq: 6 },
+        type: "snapshot",
+      }),
+    );
+
+    unsubscribe();
+  });
+
   it("falls back to snapshot polling when websocket handshake stays pending", async () => {
     vi.useFakeTimers();
 
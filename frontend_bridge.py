@@ -23,6 +23,7 @@ from http.server import ThreadingHTTPServer
 from pathlib import Path
 
 from frontend_bridge_core.path_utils import resolve_regular_path
+from core.bootstrap.process_pool import init_process_pool_support
 from core.runtime_env.requirements import (
     RequirementCheck,
     check_requirement,
@@ -834,4 +835,5 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    init_process_pool_support()
     main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any
 
 from .media_utils import _path_namespace_list, _tag_content
+from .thumbnails import pregenerate_thumbnails
 from application.runtime.state import BridgeState, _jsonify
 
 
@@ -73,9 +74,10 @@ def _translate_background_fields(state: BridgeState, payload: dict[str, Any]) ->
 def _upload_background_images(state: BridgeState, payload: dict[str, Any]) -> dict[str, Any]:
     name = str(payload.get("name") or "").strip()
     files = _path_namespace_list(payload.get("paths") or [])
-    message, _paths, _tags = state.background_manager.upload_sprites(name, files, str(payload.get("bgTags") or ""))
+    message, image_paths, _tags = state.background_manager.upload_sprites(name, files, str(payload.get("bgTags") or ""))
     if message.startswith("找不到") or message.startswith("请选择") or message.startswith("请先"):
         raise RuntimeError(message)
+    pregenerate_thumbnails(image_paths[len(image_paths) - len(files) :])
     return _background_json_after_reload(state, name)
 
 
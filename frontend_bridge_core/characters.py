@@ -5,6 +5,7 @@ from typing import Any
 from urllib.parse import urlparse
 
 from frontend_bridge_core.media_utils import _optional_suffix_check, _path_namespace_list
+from frontend_bridge_core.thumbnails import pregenerate_thumbnails
 from application.runtime.state import BridgeState, _jsonify
 
 
@@ -218,13 +219,14 @@ def _upload_character_sprites(state: BridgeState, payload: dict[str, Any]) -> di
     paths = payload.get("paths") or []
     if not isinstance(paths, list):
         raise ValueError("paths must be a list")
-    message, _paths, _tags = state.character_manager.upload_sprites(
+    message, sprite_paths, _tags = state.character_manager.upload_sprites(
         name,
         _path_namespace_list([str(item) for item in paths]),
         emotion_tags,
     )
     if message.startswith("找不到") or message.startswith("请选择") or message.startswith("请先"):
         raise RuntimeError(message)
+    pregenerate_thumbnails(sprite_paths[len(sprite_paths) - len(paths) :])
     return _character_json_after_reload(state, name)
 
 
@@ -10,14 +10,16 @@ import secrets
 import threading
 import time
 import uuid
+import zlib
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Awaitable, Callable
 from urllib.parse import parse_qs, quote, urlparse
 
 from application.runtime.event_sink import (
     EVENT_PROTOCOL_VERSION,
+    SnapshotStore,
     build_event,
-    fold_event_into_snapshot,
     make_empty_chat_snapshot,
 )
 from frontend_bridge_core.media_paths import (
@@ -37,6 +39,29 @@ _MEDIA_EVENT_TYPES = {
 }
 _MAX_APPROVED_EXTERNAL_MEDIA_PATHS = 2048
 _POLLING_RENDERER_LEASE_SECONDS = 4.0
+# producer 尚未连上时命令在会话队列里最多等待这么久
+_COMMAND_DELIVERY_TIMEOUT_SECONDS = 2.0
+# 每个 viewer 的发送队列上限；超过后丢弃积压，改发全量快照
+_VIEWER_QUEUE_LIMIT = 256
+# 队列深度达到这里视为落后，开始跳过瞬时事件
+_VIEWER_LAG_DEPTH = 32
+# 新事件完整覆盖旧事件效果的类型：落后的 viewer 只需要最新一条
+_COALESCED_EVENT_TYPES = frozenset(
+    {
+        "asr.partial",
+        "background.change",
+        "bgm.change",
+        "conversation.tree",
+        "history.replace",
+        "notification.change",
+        "status.change",
+        "story.state.replace",
+    }
+)
+# 只在当下有意义、不进入快照的事件
+_TRANSIENT_EVENT_TYPES = frozenset({"effect.play"})
+_DEFLATE_MIN_BYTES = 512
+_MAX_INFLATED_BYTES = 8 * 1024 * 1024
 
 
 def _external_host(bind_host: str) -> str:
@@ -79,14 +104,123 @@ class _WebSocketConnection:
     advertised_ws_url: str = ""
     connected_at: float = field(default_factory=time.time)
     renderer_id: str = ""
+    # viewer 握手时声明已持有的 eventSeq；首帧据此发送增量而非全量快照
+    since_seq: int | None = None
     send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # 握手时协商了 permessage-deflate（无上下文保持）
+    deflate: bool = False
+    # 队列溢出后用来补发全量快照，由服务在接入 viewer 时设置
+    resync: Callable[[_WebSocketConnection], Awaitable[None]] | None = field(
+        default=None,
+        repr=False,
+    )
+    send_queue: deque[tuple[float, dict[str, Any]]] = field(default_factory=deque, repr=False)
+    resync_pending: bool = False
+    last_sent_seq: int | None = None
+    pump: asyncio.Task[None] | None = field(default=None, repr=False)
+    messages_sent: int = 0
+    bytes_sent: int = 0
+    events_coalesced: int = 0
+    events_dropped: int = 0
+    resyncs: int = 0
+    max_queued: int = 0
 
     async def send_json(self, payload: dict[str, Any]) -> None:
         data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        compressed = self.deflate and len(data) >= _DEFLATE_MIN_BYTES
+        if compressed:
+            data = _deflate_message(data)
         async with self.send_lock:
-            await _send_ws_frame(self.writer, 0x1, data)
+            await _send_ws_frame(self.writer, 0x1, data, compressed=compressed)
+        self.messages_sent += 1
+        self.bytes_sent += len(data)
+        seq = payload.get("seq")
+        if isinstance(seq, int):
+            self.last_sent_seq = seq
+
+    def enqueue(self, event: dict[str, Any]) -> None:
+        """不阻塞地把事件交给这个连接自己的发送任务。
+
+        慢连接只会拖慢自己：同类可覆盖事件只保留最新一条，落后时跳过瞬时
+        事件，队列溢出则清空积压并改发全量快照。客户端手里的状态已经叠加了
+        之后送达的事件，不能再当作某个 eventSeq 的快照去套增量。
+        """
+        if self.resync_pending:
+            # 即将发送的快照已经包含这条事件
+            self.events_dropped += 1
+            return
+        queue = self.send_queue
+        event_type = str(event.get("type") or "")
+        if event_type in _TRANSIENT_EVENT_TYPES and len(queue) >= _VIEWER_LAG_DEPTH:
+            self.events_dropped += 1
+            return
+        if event_type in _COALESCED_EVENT_TYPES:
+            for index, (_, queued) in enumerate(queue):
+                if queued.get("type") == event_type:
+                    del queue[index]
+                    self.events_coalesced += 1
+                    break
+        if len(queue) >= _VIEWER_QUEUE_LIMIT:
+            self.events_dropped += len(queue) + 1
+            queue.clear()
+            self.resync_pending = True
+            self.since_seq = None
+            self.resyncs += 1
+        else:
+            queue.append((time.monotonic(), event))
+            self.max_queued = max(self.max_queued, len(queue))
+        if self.pump is None or self.pump.done():
+            self.pump = asyncio.get_running_loop().create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            while True:
+                if self.resync_pending:
+                    self.resync_pending = False
+                    if self.resync is not None:
+                        await self.resync(self)
+                    continue
+                if not self.send_queue:
+                    return
+                _, event = self.send_queue.popleft()
+                seq = event.get("seq")
+                previous = self.last_sent_seq
+                if isinstance(seq, int) and previous is not None and seq > previous + 1:
+                    # 中间的序号是有意合并/跳过的，告诉客户端这不是丢包
+                    event = {**event, "prevSeq": previous}
+                await self.send_json(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 写失败说明连接已坏；关闭 writer 让接收循环退出并 detach
+            self.send_queue.clear()
+            with contextlib.suppress(Exception):
+                self.writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        try:
+            lag_ms = (time.monotonic() - self.send_queue[0][0]) * 1000.0
+        except IndexError:
+            lag_ms = 0.0
+        return {
+            "bytesSent": self.bytes_sent,
+            "coalesced": self.events_coalesced,
+            "deflate": self.deflate,
+            "dropped": self.events_dropped,
+            "lagMs": round(lag_ms, 3),
+            "maxQueued": self.max_queued,
+            "mobile": bool(self.advertised_ws_url),
+            "queued": len(self.send_queue),
+            "rendererId": self.renderer_id,
+            "resyncs": self.resyncs,
+            "sent": self.messages_sent,
+            "sessionId": self.session_id,
+        }
 
     async def close(self) -> None:
+        pump = self.pump
+        if pump is not None and pump is not asyncio.current_task():
+            pump.cancel()
         try:
             async with self.send_lock:
                 await _send_ws_frame(self.writer, 0x8, b"")
@@ -99,10 +233,17 @@ class _WebSocketConnection:
             pass
 
 
+@dataclass(eq=False)
+class _QueuedCommand:
+    command: dict[str, Any]
+    future: asyncio.Future[bool]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
 @dataclass
 class _ChatStreamSession:
     session_id: str
-    snapshot: dict[str, Any]
+    store: SnapshotStore
     last_seq: int = 0
     producer_token: str = field(
         default_factory=lambda: secrets.token_urlsafe(32),
@@ -113,10 +254,23 @@ class _ChatStreamSession:
     renderer_seen_at: dict[str, float] = field(default_factory=dict, repr=False)
     viewers: set[_WebSocketConnection] = field(default_factory=set)
     created_at: float = field(default_factory=time.time)
+    # 以下两个队列只在事件循环线程里读写（outbox 的追加例外，受服务锁保护）
+    pending_commands: deque[_QueuedCommand] = field(default_factory=deque, repr=False)
+    command_drain: asyncio.Task[None] | None = field(default=None, repr=False)
+    outbox: deque[tuple[dict[str, Any], tuple[_WebSocketConnection, ...]]] = field(
+        default_factory=deque,
+        repr=False,
+    )
 
 
-async def _send_ws_frame(writer: asyncio.StreamWriter, opcode: int, payload: bytes) -> None:
-    header = bytearray([0x80 | (opcode & 0x0F)])
+async def _send_ws_frame(
+    writer: asyncio.StreamWriter,
+    opcode: int,
+    payload: bytes,
+    *,
+    compressed: bool = False,
+) -> None:
+    header = bytearray([0x80 | (0x40 if compressed else 0) | (opcode & 0x0F)])
     length = len(payload)
     if length < 126:
         header.append(length)
@@ -130,8 +284,13 @@ async def _send_ws_frame(writer: asyncio.StreamWriter, opcode: int, payload: byt
     await writer.drain()
 
 
-async def _read_ws_frame(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+async def _read_ws_frame(
+    reader: asyncio.StreamReader,
+    *,
+    inflate: bool = False,
+) -> tuple[int, bytes]:
     header = await reader.readexactly(2)
+    compressed = bool(header[0] & 0x40)
     opcode = header[0] & 0x0F
     masked = bool(header[1] & 0x80)
     length = header[1] & 0x7F
@@ -143,9 +302,37 @@ async def _read_ws_frame(reader: asyncio.StreamReader) -> tuple[int, bytes]:
     payload = await reader.readexactly(length)
     if masked:
         payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+    if compressed and inflate:
+        payload = _inflate_message(payload)
     return opcode, payload
 
 
+def _accepts_permessage_deflate(header: str) -> bool:
+    """只接受不限制服务端窗口的 permessage-deflate 提议（浏览器默认如此）。"""
+    for offer in str(header or "").split(","):
+        name, _, params = offer.partition(";")
+        if name.strip().lower() != "permessage-deflate":
+            continue
+        if "server_max_window_bits" not in params.lower():
+            return True
+    return False
+
+
+def _deflate_message(data: bytes) -> bytes:
+    # 每条消息独立压缩（server_no_context_takeover），RFC 7692 要求去掉尾部空块
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return compressed[:-4] if compressed.endswith(b"\x00\x00\xff\xff") else compressed
+
+
+def _inflate_message(data: bytes) -> bytes:
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    payload = decompressor.decompress(data + b"\x00\x00\xff\xff", _MAX_INFLATED_BYTES)
+    if decompressor.unconsumed_tail:
+        raise ValueError("websocket message too large")
+    return payload
+
+
 class ChatStreamService:
     def __init__(self, *, host: str, bridge_port: int, auth_token: str = "") -> None:
         self.host = host
@@ -164,6 +351,13 @@ class ChatStreamService:
         self._thread: threading.Thread | None = None
         self._ready = threading.Event()
         self._start_error: Exception | None = None
+        self._events_published = 0
+        self._event_backlog_high_water = 0
+        self._commands_delivered = 0
+        self._commands_rejected = 0
+        self._commands_expired = 0
+        self._command_latency_ms_last = 0.0
+        self._command_latency_ms_max = 0.0
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -240,7 +434,7 @@ class ChatStreamService:
         snapshot["eventSeq"] = initial_seq
         session = _ChatStreamSession(
             session_id=session_id,
-            snapshot=snapshot,
+            store=SnapshotStore(snapshot),
             last_seq=initial_seq,
         )
         with self._lock:
@@ -273,7 +467,7 @@ class ChatStreamService:
                 return None
             if renderer_id:
                 self._claim_renderer_locked(session, renderer_id)
-            return dict(session.snapshot)
+            return session.store.snapshot()
 
     def delete_session(self, session_id: str) -> None:
         with self._lock:
@@ -290,96 +484,97 @@ class ChatStreamService:
         return ready.wait(timeout=max(float(timeout), 0.0))
 
     def close_session(self, session_id: str, *, reason: str = "聊天会话已结束。") -> None:
-        event: dict[str, Any] | None = None
         with self._lock:
             session = self._sessions.get(session_id)
             if session is None:
                 return
             event = build_event(session.last_seq + 1, {"type": "session.closed", "reason": reason})
-
-        loop = self._loop
-        if loop is None:
-            with self._lock:
-                session = self._sessions.get(session_id)
-                if session is None or event is None:
-                    return
-                session.last_seq = max(session.last_seq, int(event.get("seq") or 0))
-                session.snapshot = fold_event_into_snapshot(session.snapshot, event)
-                session.snapshot["sessionId"] = session_id
-                session.snapshot["wsUrl"] = self.ws_base
-            return
-
-        future = asyncio.run_coroutine_threadsafe(self._publish_event(session_id, event), loop)
-        try:
-            future.result(timeout=0.35)
-        except Exception:
-            with self._lock:
-                session = self._sessions.get(session_id)
-                if session is None:
-                    return
-                session.last_seq = max(session.last_seq, int(event.get("seq") or 0))
-                session.snapshot = fold_event_into_snapshot(session.snapshot, event)
-                session.snapshot["sessionId"] = session_id
-                session.snapshot["wsUrl"] = self.ws_base
+        if self._enqueue_event(session_id, event):
+            self._schedule_fanout(session_id)
 
     def update_session_snapshot(self, session_id: str, snapshot: dict[str, Any]) -> None:
         with self._lock:
             session = self._sessions.get(session_id)
             if session is None:
                 return
-            next_snapshot = make_empty_chat_snapshot()
-            next_snapshot.update(session.snapshot)
-            next_snapshot.update(snapshot)
-            next_snapshot["sessionId"] = session_id
-            next_snapshot["wsUrl"] = self.ws_base
+            fields = dict(snapshot)
+            fields["sessionId"] = session_id
+            fields["wsUrl"] = self.ws_base
             try:
-                snapshot_seq = max(0, int(next_snapshot.get("eventSeq") or 0))
+                snapshot_seq = max(0, int(fields.get("eventSeq", session.store.event_seq) or 0))
             except (TypeError, ValueError):
                 snapshot_seq = 0
             session.last_seq = max(session.last_seq, snapshot_seq)
-            next_snapshot["eventSeq"] = session.last_seq
-            session.snapshot = next_snapshot
+            fields["eventSeq"] = session.last_seq
+            session.store.update(fields)
 
     def publish_event(self, session_id: str, event: dict[str, Any]) -> bool:
-        """Publish one trusted bridge-local event to a Chat session."""
+        """Publish one trusted bridge-local event to a Chat session.
+
+        The snapshot is updated before this returns; delivery to viewers runs
+        on the stream loop, so the caller never waits on slow sockets.
+        """
+        if self._loop is None:
+            return False
+        local_event = dict(event)
+        local_event["v"] = EVENT_PROTOCOL_VERSION
+        local_event["ts"] = int(time.time() * 1000)
+        if not self._enqueue_event(session_id, local_event):
+            return False
+        self._schedule_fanout(session_id)
+        return True
+
+    def send_command(
+        self,
+        session_id: str,
+        command: dict[str, Any],
+        *,
+        timeout: float = _COMMAND_DELIVERY_TIMEOUT_SECONDS,
+    ) -> bool:
+        """Queue a command for the session producer and wait for its delivery.
+
+        Commands sent before the producer attaches are buffered in order and
+        flushed the moment it connects; ``False`` means it never arrived in time.
+        """
         loop = self._loop
         if loop is None:
             return False
         with self._lock:
             if session_id not in self._sessions:
                 return False
-        local_event = dict(event)
-        local_event["v"] = EVENT_PROTOCOL_VERSION
-        local_event["ts"] = int(time.time() * 1000)
+        timeout = max(float(timeout), 0.0)
         future = asyncio.run_coroutine_threadsafe(
-            self._publish_event(session_id, local_event),
+            self._deliver_command(session_id, command, timeout=timeout),
             loop,
         )
         try:
-            future.result(timeout=1.0)
-            return True
+            return bool(future.result(timeout=timeout + 1.0))
         except Exception:
+            future.cancel()
             return False
 
-    def send_command(self, session_id: str, command: dict[str, Any]) -> bool:
-        loop = self._loop
-        if loop is None:
-            return False
-        deadline = time.time() + 2.0
-        while time.time() < deadline:
-            remaining = deadline - time.time()
-            if remaining <= 0:
-                break
-            if not self.wait_for_producer(session_id, timeout=min(0.25, remaining)):
-                continue
-            future = asyncio.run_coroutine_threadsafe(self._send_command(session_id, command), loop)
-            try:
-                if bool(future.result(timeout=0.5)):
-                    return True
-            except Exception:
-                pass
-            time.sleep(0.1)
-        return False
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            return {
+                "commandLatencyMs": {
+                    "last": round(self._command_latency_ms_last, 3),
+                    "max": round(self._command_latency_ms_max, 3),
+                },
+                "commandsDelivered": self._commands_delivered,
+                "commandsExpired": self._commands_expired,
+                "commandsRejected": self._commands_rejected,
+                "eventBacklog": sum(len(session.outbox) for session in sessions),
+                "eventBacklogHighWater": self._event_backlog_high_water,
+                "eventsPublished": self._events_published,
+                "pendingCommands": sum(
+                    len(session.pending_commands) for session in sessions
+                ),
+                "sessions": len(sessions),
+                "viewers": [
+                    viewer.stats() for session in sessions for viewer in session.viewers
+                ],
+            }
 
     def media_url(self, raw_path: str) -> str:
         path = str(raw_path or "").strip()
@@ -483,7 +678,7 @@ class ChatStreamService:
         renderer_id: str,
     ) -> None:
         normalized = self._remember_renderer_locked(session, renderer_id)
-        active = session.snapshot.get("activePlayback")
+        active = session.store.get("activePlayback")
         if not normalized or not isinstance(active, dict):
             return
         owner = str(active.get("rendererId") or "")
@@ -497,7 +692,7 @@ class ChatStreamService:
             return
         next_active = dict(active)
         next_active["rendererId"] = normalized
-        session.snapshot["activePlayback"] = next_active
+        session.store.update({"activePlayback": next_active})
 
     def _approve_event_media_path(self, event: dict[str, Any]) -> None:
         if str(event.get("type") or "") not in _MEDIA_EVENT_TYPES:
@@ -535,6 +730,15 @@ class ChatStreamService:
                 session.viewers.clear()
                 session.producer = None
                 session.producer_ready.clear()
+                session.outbox.clear()
+        for session in sessions:
+            if session.command_drain is not None:
+                session.command_drain.cancel()
+                session.command_drain = None
+            while session.pending_commands:
+                queued = session.pending_commands.popleft()
+                if not queued.future.done():
+                    queued.future.set_result(False)
 
     async def _start_mobile_listener_async(self, websocket_url: str, port: int) -> str:
         if self._mobile_server is not None:
@@ -661,6 +865,10 @@ class ChatStreamService:
         session_id = str((query.get("sessionId") or [""])[0]).strip()
         role = str((query.get("role") or ["viewer"])[0]).strip() or "viewer"
         renderer_id = str((query.get("rendererId") or [""])[0]).strip()[:128]
+        try:
+            since_seq: int | None = int(str((query.get("sinceSeq") or [""])[0]).strip())
+        except ValueError:
+            since_seq = None
         if role not in {"producer", "viewer"}:
             raise ValueError("invalid websocket role")
         auth_token = str((query.get("shinsekai_bridge_token") or query.get("token") or [""])[0]).strip()
@@ -683,11 +891,19 @@ class ChatStreamService:
         accept = base64.b64encode(
             hashlib.sha1((key + "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode("utf-8")).digest()
         ).decode("ascii")
+        deflate = _accepts_permessage_deflate(headers.get("sec-websocket-extensions", ""))
+        extensions = (
+            "Sec-WebSocket-Extensions: permessage-deflate; "
+            "server_no_context_takeover; client_no_context_takeover\r\n"
+            if deflate
+            else ""
+        )
         response = (
             "HTTP/1.1 101 Switching Protocols\r\n"
             "Upgrade: websocket\r\n"
             "Connection: Upgrade\r\n"
             f"Sec-WebSocket-Accept: {accept}\r\n"
+            f"{extensions}"
             "\r\n"
         ).encode("utf-8")
         writer.write(response)
@@ -699,6 +915,9 @@ class ChatStreamService:
             session_id=session_id,
             advertised_ws_url=advertised_ws_url,
             renderer_id=renderer_id or (uuid.uuid4().hex if role == "viewer" else ""),
+            since_seq=since_seq if role == "viewer" else None,
+            deflate=deflate,
+            resync=self._send_snapshot if role == "viewer" else None,
         )
         old_producer: _WebSocketConnection | None = None
         with self._lock:
@@ -713,11 +932,13 @@ class ChatStreamService:
                 self._remember_renderer_locked(session, connection.renderer_id)
         if old_producer is not None:
             await old_producer.close()
+        if role == "producer":
+            self._ensure_command_drain(session)
         return connection
 
     async def _receive_loop(self, connection: _WebSocketConnection) -> None:
         while True:
-            opcode, payload = await _read_ws_frame(connection.reader)
+            opcode, payload = await _read_ws_frame(connection.reader, inflate=connection.deflate)
             if opcode == 0x8:
                 return
             if opcode == 0x9:
@@ -733,11 +954,16 @@ class ChatStreamService:
                 await self._publish_event(connection.session_id, event)
 
     async def _publish_event(self, session_id: str, event: dict[str, Any]) -> None:
+        if self._enqueue_event(session_id, event):
+            await self._fanout_events(session_id)
+
+    def _enqueue_event(self, session_id: str, event: dict[str, Any]) -> bool:
+        """把事件折叠进快照并放入会话 outbox；可以在任意线程调用。"""
         self._approve_event_media_path(event)
         with self._lock:
             session = self._sessions.get(session_id)
             if session is None:
-                return
+                return False
             # Producer processes own a local sequence counter that restarts at
             # one after a runtime restart or reconnect. The bridge session is
             # the serialization boundary, so expose one monotonic sequence to
@@ -749,18 +975,46 @@ class ChatStreamService:
             if str(normalized_event.get("type") or "") == "tts.play":
                 normalized_event["rendererId"] = self._select_renderer_locked(session)
             session.last_seq = int(normalized_event["seq"])
-            session.snapshot = fold_event_into_snapshot(session.snapshot, normalized_event)
-            session.snapshot["sessionId"] = session_id
-            session.snapshot["wsUrl"] = self.ws_base
-            viewers = list(session.viewers)
-        stale: list[_WebSocketConnection] = []
-        for viewer in viewers:
-            try:
-                await viewer.send_json(normalized_event)
-            except Exception:
-                stale.append(viewer)
-        for viewer in stale:
-            await self._detach(viewer)
+            session.store.apply(normalized_event)
+            session.store.update({"sessionId": session_id, "wsUrl": self.ws_base})
+            self._events_published += 1
+            if session.viewers:
+                # 按 seq 顺序入队，由同一个 fanout 依次发出，跨线程发布也不会乱序
+                session.outbox.append((normalized_event, tuple(session.viewers)))
+                self._event_backlog_high_water = max(
+                    self._event_backlog_high_water,
+                    len(session.outbox),
+                )
+        return True
+
+    def _schedule_fanout(self, session_id: str) -> None:
+        loop = self._loop
+        if loop is None:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    session.outbox.clear()
+            return
+        fanout = self._fanout_events(session_id)
+        try:
+            asyncio.run_coroutine_threadsafe(fanout, loop)
+        except RuntimeError:
+            fanout.close()
+
+    async def _fanout_events(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return
+        while True:
+            with self._lock:
+                if not session.outbox:
+                    return
+                event, targets = session.outbox.popleft()
+                viewers = [viewer for viewer in targets if viewer in session.viewers]
+            # 只是入队：每个 viewer 由自己的发送任务写 socket，慢连接不拖累别人
+            for viewer in viewers:
+                viewer.enqueue(event)
 
     async def _send_snapshot(self, connection: _WebSocketConnection) -> None:
         with self._lock:
@@ -768,8 +1022,27 @@ class ChatStreamService:
             if session is None:
                 return
             self._claim_renderer_locked(session, connection.renderer_id)
-            snapshot = dict(session.snapshot)
+            since_seq = getattr(connection, "since_seq", None)
+            patch = session.store.delta_since(since_seq) if since_seq is not None else None
+            snapshot = session.store.snapshot() if patch is None else {}
             seq = session.last_seq
+        # 增量只对握手时的那份快照有效；之后（如渲染端转移）一律发全量
+        connection.since_seq = None
+        if patch is not None:
+            if connection.advertised_ws_url:
+                patch = [op for op in patch if op["path"] != "/wsUrl"]
+                patch.append({"op": "add", "path": "/wsUrl", "value": connection.advertised_ws_url})
+            await connection.send_json(
+                {
+                    "v": 1,
+                    "seq": seq,
+                    "ts": int(time.time() * 1000),
+                    "type": "snapshot.patch",
+                    "baseSeq": since_seq,
+                    "patch": patch,
+                }
+            )
+            return
         if connection.advertised_ws_url:
             snapshot["wsUrl"] = connection.advertised_ws_url
         await connection.send_json(
@@ -782,13 +1055,80 @@ class ChatStreamService:
             }
         )
 
+    async def _deliver_command(
+        self,
+        session_id: str,
+        command: dict[str, Any],
+        *,
+        timeout: float,
+    ) -> bool:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return False
+        queued = _QueuedCommand(command, asyncio.get_running_loop().create_future())
+        session.pending_commands.append(queued)
+        self._ensure_command_drain(session)
+        try:
+            await asyncio.wait({queued.future}, timeout=timeout)
+            if not queued.future.done() and queued not in session.pending_commands:
+                # 已经在写 socket 了，给这一次写入一点收尾时间
+                await asyncio.wait({queued.future}, timeout=0.5)
+            future = queued.future
+            return future.done() and not future.cancelled() and bool(future.result())
+        finally:
+            if not queued.future.done():
+                # 取消后 drain 会跳过它，即使之后被放回队列也不会再投递
+                queued.future.cancel()
+                if queued in session.pending_commands:
+                    session.pending_commands.remove(queued)
+                with self._lock:
+                    self._commands_expired += 1
+
+    def _ensure_command_drain(self, session: _ChatStreamSession) -> None:
+        drain = session.command_drain
+        if session.pending_commands and (drain is None or drain.done()):
+            session.command_drain = asyncio.get_running_loop().create_task(
+                self._drain_commands(session)
+            )
+
+    async def _drain_commands(self, session: _ChatStreamSession) -> None:
+        while session.pending_commands:
+            with self._lock:
+                producer = session.producer
+            if producer is None:
+                # producer 重新连上时会再次启动 drain
+                return
+            queued = session.pending_commands.popleft()
+            if queued.future.done():
+                continue
+            try:
+                sent = await self._send_command(session.session_id, queued.command)
+            except Exception:
+                # 写失败说明 producer 正在断开；命令放回队首，等下一个 producer
+                session.pending_commands.appendleft(queued)
+                return
+            latency_ms = (time.perf_counter() - queued.enqueued_at) * 1000.0
+            with self._lock:
+                if sent:
+                    self._commands_delivered += 1
+                    self._command_latency_ms_last = latency_ms
+                    self._command_latency_ms_max = max(
+                        self._command_latency_ms_max,
+                        latency_ms,
+                    )
+                else:
+                    self._commands_rejected += 1
+            if not queued.future.done():
+                queued.future.set_result(sent)
+
     async def _send_command(self, session_id: str, command: dict[str, Any]) -> bool:
         with self._lock:
             session = self._sessions.get(session_id)
             producer = session.producer if session is not None else None
             if session is not None and str(command.get("type") or "") == "audio-playback-signal":
                 payload = command.get("payload")
-                active = session.snapshot.get("activePlayback")
+                active = session.store.get("activePlayback")
                 if not isinstance(payload, dict) or not isinstance(active, dict):
                     return False
                 renderer_id = self._remember_renderer_locked(
@@ -818,7 +1158,7 @@ class ChatStreamService:
             if state in {"failed", "finished", "interrupted"}:
                 with self._lock:
                     session = self._sessions.get(session_id)
-                    active = session.snapshot.get("activePlayback") if session is not None else None
+                    active = session.store.get("activePlayback") if session is not None else None
                     if (
                         session is not None
                         and isinstance(active, dict)
@@ -827,7 +1167,7 @@ class ChatStreamService:
                         and str(active.get("rendererId") or "")
                         == str(payload.get("rendererId") or "")
                     ):
-                        session.snapshot["activePlayback"] = None
+                        session.store.update({"activePlayback": None})
         return True
 
     async def _detach(self, connection: _WebSocketConnection) -> None:
@@ -844,7 +1184,7 @@ class ChatStreamService:
                 session.viewers.discard(connection)
                 renderer_id = str(getattr(connection, "renderer_id", "") or "")
                 session.renderer_seen_at.pop(renderer_id, None)
-                active = session.snapshot.get("activePlayback")
+                active = session.store.get("activePlayback")
                 if (
                     renderer_id
                     and isinstance(active, dict)
@@ -856,7 +1196,7 @@ class ChatStreamService:
                     )
                     next_active = dict(active)
                     next_active["rendererId"] = next_renderer_id
-                    session.snapshot["activePlayback"] = next_active
+                    session.store.update({"activePlayback": next_active})
                     replacement = next(
                         (
                             viewer
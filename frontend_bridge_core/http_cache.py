@@ -0,0 +1,90 @@
+"""本地文件响应的 HTTP 缓存校验器（ETag / Last-Modified / 条件请求）。"""
+
+from __future__ import annotations
+
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping
+
+# 构建产物的文件名带内容哈希，内容变了文件名也会变，可以永久缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 可能被原地替换的文件（立绘、背景、index.html）：允许缓存但每次都要用校验器确认
+REVALIDATE_CACHE_CONTROL = "no-cache"
+NO_STORE_CACHE_CONTROL = "no-store"
+
+FRONTEND_HASHED_ASSET_DIR = "web-assets"
+# Vite/Rollup 默认输出 ``[name]-[hash][extname]``，哈希是 8 位 base64url。
+# 普通单词（``main-settings.js``）也能凑出 8 位，所以还要求哈希里含数字或大写字母；
+# 偶尔漏判的全小写哈希只是退回到校验缓存，不会出错。
+_HASHED_NAME_RE = re.compile(
+    r"-(?=[A-Za-z0-9_-]{0,7}[A-Z0-9])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$"
+)
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """由 inode、大小和纳秒级 mtime 派生的强校验器，不读取文件内容。"""
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def is_not_modified(headers: Mapping[str, str], *, etag: str, mtime: float) -> bool:
+    """按 RFC 9110 判断 GET/HEAD 是否可以返回 304。
+
+    有 ``If-None-Match`` 时忽略 ``If-Modified-Since``。
+    """
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        return _etag_listed(str(if_none_match), etag, weak=True)
+    if_modified_since = headers.get("If-Modified-Since")
+    if not if_modified_since:
+        return False
+    since = _parse_http_date(str(if_modified_since))
+    return since is not None and int(mtime) <= since
+
+
+def if_range_matches(header: str | None, *, etag: str, mtime: float) -> bool:
+    """``If-Range`` 不匹配时应忽略 Range，返回完整内容。"""
+    if not header:
+        return True
+    value = header.strip()
+    if value.startswith(('"', "W/")):
+        return not value.startswith("W/") and value == etag
+    since = _parse_http_date(value)
+    return since is not None and int(mtime) == since
+
+
+def is_hashed_frontend_asset(path: Path, dist_root: Path) -> bool:
+    try:
+        relative = path.relative_to(dist_root)
+    except ValueError:
+        return False
+    return (
+        len(relative.parts) > 1
+        and relative.parts[0] == FRONTEND_HASHED_ASSET_DIR
+        and _HASHED_NAME_RE.search(relative.name) is not None
+    )
+
+
+def _etag_listed(header: str, etag: str, *, weak: bool) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    for item in header.split(","):
+        candidate = item.strip()
+        if weak:
+            candidate = candidate.removeprefix("W/")
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _parse_http_date(value: str) -> int | None:
+    try:
+        return int(parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
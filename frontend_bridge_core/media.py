@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 import base64
-import hashlib
 import mimetypes
 import os
-import tempfile
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from frontend_bridge_core.backgrounds import (
     _delete_all_background_bgm,
@@ -36,56 +35,40 @@ from frontend_bridge_core.characters import (
     _upload_sprite_voice,
 )
 from frontend_bridge_core.memory import _add_character_memory, _delete_character_memory, _list_character_memories
-from sdk.path_utils import safe_child_path, safe_existing_file_path
-
-
-def _media_thumbnail(source: Path, *, project_root: Path, size: int = 160) -> Path:
-    source = safe_existing_file_path(source, roots=[project_root], field="media source")
-    if not source.is_file():
-        raise FileNotFoundError(source.as_posix())
-
-    stat = source.stat()
-    target_size = max(32, min(int(size), 512))
-    digest = hashlib.sha256(
-        f"{source.resolve()}\0{stat.st_mtime_ns}\0{stat.st_size}\0{target_size}".encode(
-            "utf-8",
-            errors="surrogatepass",
-        )
-    ).hexdigest()
-    cache_root = project_root / ".cache" / "frontend-media-thumbnails"
-    cache_path = safe_child_path(cache_root, f"{digest}.png")
-    if cache_path.is_file():
-        return cache_path
-
-    from PIL import Image, ImageOps
-
-    cache_root.mkdir(parents=True, exist_ok=True)
-    with Image.open(source) as image:
-        thumbnail = ImageOps.exif_transpose(image)
-        if thumbnail.mode not in {"RGB", "RGBA"}:
-            thumbnail = thumbnail.convert(
-                "RGBA" if "A" in thumbnail.getbands() else "RGB",
-            )
-        resampling = getattr(getattr(Image, "Resampling", Image), "LANCZOS")
-        thumbnail.thumbnail((target_size, target_size), resampling)
-
-        with tempfile.NamedTemporaryFile(
-            dir=cache_root,
-            prefix=f"{digest}.",
-            suffix=".tmp",
-            delete=False,
-        ) as handle:
-            tmp_path = Path(handle.name)
-        try:
-            thumbnail.save(tmp_path, format="PNG", optimize=True)
-            tmp_path.replace(cache_path)
-        finally:
-            try:
-                tmp_path.unlink(missing_ok=True)
-            except OSError:
-                pass
+from frontend_bridge_core.thumbnails import DEFAULT_THUMBNAIL_SIZE, thumbnail_service_for
 
-    return cache_path
+
+def _media_thumbnail(
+    source: Path,
+    *,
+    project_root: Path,
+    size: int = DEFAULT_THUMBNAIL_SIZE,
+    image_format: str = "png",
+) -> Path:
+    return thumbnail_service_for(project_root).thumbnail(
+        source,
+        project_root=project_root,
+        size=size,
+        image_format=image_format,
+    )
+
+
+@contextmanager
+def _open_media_thumbnail(
+    source: Path,
+    *,
+    project_root: Path,
+    size: int = DEFAULT_THUMBNAIL_SIZE,
+    image_format: str = "png",
+) -> Iterator[Path]:
+    """同 :func:`_media_thumbnail`，但在 ``with`` 块内文件不会被缓存淘汰。"""
+    with thumbnail_service_for(project_root).open(
+        source,
+        project_root=project_root,
+        size=size,
+        image_format=image_format,
+    ) as thumbnail:
+        yield thumbnail
 
 
 def _thumbnail_cache_path(thumbnail: Path, project_root: Path) -> str:
@@ -95,10 +78,18 @@ def _thumbnail_cache_path(thumbnail: Path, project_root: Path) -> str:
         return thumbnail.as_posix()
 
 
-def _media_thumbnail_data_url(source: Path, *, project_root: Path, size: int = 160) -> str:
-    thumbnail = _media_thumbnail(source, project_root=project_root, size=size)
-    mime_type = mimetypes.guess_type(thumbnail.name)[0] or "image/png"
-    raw = thumbnail.read_bytes()
+def _media_thumbnail_data_url(
+    source: Path,
+    *,
+    project_root: Path,
+    size: int = DEFAULT_THUMBNAIL_SIZE,
+    image_format: str = "png",
+) -> str:
+    with _open_media_thumbnail(
+        source, project_root=project_root, size=size, image_format=image_format
+    ) as thumbnail:
+        mime_type = mimetypes.guess_type(thumbnail.name)[0] or "image/png"
+        raw = thumbnail.read_bytes()
     encoded = base64.b64encode(raw).decode("ascii")
     return f"data:{mime_type};base64,{encoded}"
 
@@ -108,7 +99,8 @@ def _media_thumbnail_batch(
     *,
     include_data_url: bool = True,
     project_root: Path,
-    size: int = 160,
+    size: int = DEFAULT_THUMBNAIL_SIZE,
+    image_format: str = "png",
 ) -> dict[str, Any]:
     if not items:
         return {"items": []}
@@ -126,16 +118,21 @@ def _media_thumbnail_batch(
     def build_item(item: tuple[str, Path]) -> dict[str, Any]:
         raw_path, source = item
         try:
-            thumbnail = _media_thumbnail(source, project_root=project_root, size=size)
-            payload = {
-                "cachePath": _thumbnail_cache_path(thumbnail, project_root),
-                "mimeType": mimetypes.guess_type(thumbnail.name)[0] or "image/png",
-                "path": raw_path,
-            }
-            if include_data_url:
-                raw = thumbnail.read_bytes()
-                encoded = base64.b64encode(raw).decode("ascii")
-                payload["dataUrl"] = f"data:{payload['mimeType']};base64,{encoded}"
+            with _open_media_thumbnail(
+                source,
+                project_root=project_root,
+                size=size,
+                image_format=image_format,
+            ) as thumbnail:
+                payload = {
+                    "cachePath": _thumbnail_cache_path(thumbnail, project_root),
+                    "mimeType": mimetypes.guess_type(thumbnail.name)[0] or "image/png",
+                    "path": raw_path,
+                }
+                if include_data_url:
+                    raw = thumbnail.read_bytes()
+                    encoded = base64.b64encode(raw).decode("ascii")
+                    payload["dataUrl"] = f"data:{payload['mimeType']};base64,{encoded}"
             return payload
         except Exception as exc:
             return {
@@ -149,6 +146,62 @@ def _media_thumbnail_batch(
     return {"items": results}
 
 
+def _iter_media_thumbnail_batch(
+    items: list[tuple[str, Path]],
+    *,
+    project_root: Path,
+    size: int = DEFAULT_THUMBNAIL_SIZE,
+    image_format: str = "png",
+) -> Iterator[dict[str, Any]]:
+    """按完成顺序逐个产出缩略图条目，只带缓存路径，不内联 base64。"""
+    service = thumbnail_service_for(project_root)
+    pending: dict[Future[Path], str] = {}
+    seen: set[str] = set()
+    for raw_path, source in items:
+        if raw_path in seen:
+            continue
+        seen.add(raw_path)
+        try:
+            future = service.submit(
+                source,
+                project_root=project_root,
+                size=size,
+                image_format=image_format,
+            )
+        except Exception as exc:
+            yield _thumbnail_error_item(raw_path, exc)
+            continue
+        if future.done():
+            # 命中缓存的条目不用等其他渲染，立刻交给客户端
+            yield _thumbnail_stream_item(raw_path, future, project_root)
+        else:
+            pending[future] = raw_path
+    for future in as_completed(pending):
+        yield _thumbnail_stream_item(pending[future], future, project_root)
+
+
+def _thumbnail_stream_item(
+    raw_path: str, future: Future[Path], project_root: Path
+) -> dict[str, Any]:
+    try:
+        thumbnail = future.result()
+    except Exception as exc:
+        return _thumbnail_error_item(raw_path, exc)
+    return {
+        "cachePath": _thumbnail_cache_path(thumbnail, project_root),
+        "mimeType": mimetypes.guess_type(thumbnail.name)[0] or "image/png",
+        "path": raw_path,
+    }
+
+
+def _thumbnail_error_item(raw_path: str, exc: BaseException) -> dict[str, str]:
+    return {
+        "error": str(exc),
+        "path": raw_path,
+        "type": exc.__class__.__name__,
+    }
+
+
 __all__ = [
     "_add_character_memory",
     "_as_character_config",
@@ -161,10 +214,12 @@ __all__ = [
     "_delete_character_sprite",
     "_delete_sprite_voice",
     "_generate_character_setting",
+    "_iter_media_thumbnail_batch",
     "_list_character_memories",
     "_media_thumbnail",
     "_media_thumbnail_batch",
     "_media_thumbnail_data_url",
+    "_open_media_thumbnail",
     "_thumbnail_cache_path",
     "_save_background",
     "_save_background_bgm_tags",
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import contextlib
 import hmac
 import ipaddress
+import itertools
 import json
 import mimetypes
 import shutil
+import socket
+import ssl
 import tempfile
 import threading
 from http.cookies import SimpleCookie
@@ -13,7 +17,7 @@ from email.policy import default as default_email_policy
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, BinaryIO, Callable
 from urllib.parse import parse_qs, quote, unquote, urlparse, urlunparse
 
 from sdk.logging import get_logger, log_context, new_log_id
@@ -44,6 +48,7 @@ from frontend_bridge_core.effects import (
 from application.chat.runtime_process import (
     _chat_history,
     _chat_history_download_file,
+    _chat_history_page,
     _close_chat,
     TRANSPARENT_BACKGROUND_NAME,
     _chat_history_path,
@@ -110,7 +115,22 @@ from application.diagnostics.logs import (
     _log_file_list,
     _log_snapshot,
 )
-from frontend_bridge_core.media import _media_thumbnail, _media_thumbnail_batch
+from frontend_bridge_core.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    NO_STORE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    file_etag,
+    http_date,
+    if_range_matches,
+    is_hashed_frontend_asset,
+    is_not_modified,
+)
+from frontend_bridge_core.media import (
+    _iter_media_thumbnail_batch,
+    _media_thumbnail_batch,
+    _open_media_thumbnail,
+)
+from frontend_bridge_core.thumbnails import thumbnail_format
 from frontend_bridge_core.media_paths import (
     is_absolute_local_media_path_text,
     iter_configured_external_media_paths,
@@ -244,6 +264,12 @@ def _safe_export_output_path(name: str, suffix: str) -> tuple[Path, str]:
     return output, output.relative_to(project_root).as_posix()
 
 
+def _wants_thumbnail_stream(body: dict[str, Any], accept: str | None) -> bool:
+    """``mode: "stream"`` 或 ``Accept: application/x-ndjson`` 时按 NDJSON 流式返回。"""
+    mode = str(body.get("mode") or "").strip().lower()
+    return mode == "stream" or "application/x-ndjson" in str(accept or "").lower()
+
+
 class _RangeNotSatisfiable(Exception):
     pass
 
@@ -434,7 +460,7 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
             self.send_header("Vary", "Origin")
         self.send_header("Access-Control-Allow-Methods", "GET, HEAD, POST, PUT, DELETE, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", f"Content-Type, Range, X-Task-Id, {BRIDGE_AUTH_HEADER}")
-        self.send_header("Access-Control-Expose-Headers", "Accept-Ranges, Content-Length, Content-Range")
+        self.send_header("Access-Control-Expose-Headers", "Accept-Ranges, Content-Length, Content-Range, ETag, Last-Modified")
         parsed = urlparse(getattr(self, "path", ""))
         query = parse_qs(parsed.query)
         query_token = str(
@@ -670,7 +696,18 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
                 renderer_id = str((query.get("rendererId") or [""])[0]).strip()[:128]
                 self._send_json(_chat_snapshot(self.state, renderer_id=renderer_id))
             elif path == "/api/chat/history":
-                self._send_json(_chat_history(self.state))
+                query = parse_qs(parsed.query)
+                if "limit" in query:
+                    raw_before = str((query.get("before") or [""])[0]).strip()
+                    self._send_json(
+                        _chat_history_page(
+                            self.state,
+                            before=int(raw_before) if raw_before else None,
+                            limit=int(str(query["limit"][0]).strip()),
+                        )
+                    )
+                else:
+                    self._send_json(_chat_history(self.state))
             elif path == "/api/chat/history-file":
                 if not self._request_origin_allowed():
                     raise PermissionError("request origin is not allowed")
@@ -702,7 +739,8 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
                 query = parse_qs(parsed.query)
                 target = unquote((query.get("path") or [""])[0])
                 size = (query.get("size") or ["160"])[0]
-                self._send_media_thumbnail(target, size)
+                image_format = (query.get("format") or ["png"])[0]
+                self._send_media_thumbnail(target, size, image_format=image_format)
             elif path.startswith("/assets/") or path.startswith("/data/"):
                 self._send_file(path.lstrip("/"))
             elif self._try_send_frontend(path):
@@ -743,7 +781,10 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
                 query = parse_qs(parsed.query)
                 target = unquote((query.get("path") or [""])[0])
                 size = (query.get("size") or ["160"])[0]
-                self._send_media_thumbnail(target, size, send_body=False)
+                image_format = (query.get("format") or ["png"])[0]
+                self._send_media_thumbnail(
+                    target, size, image_format=image_format, send_body=False
+                )
             elif path.startswith("/api/plugins/") and "/frontend/" in path:
                 rest = path[len("/api/plugins/") :]
                 plugin_part, _, frontend_tail = rest.partition("/frontend/")
@@ -831,7 +872,10 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
             elif method == "POST" and path == "/api/files/browse":
                 self._send_json(_browse_local_files(self.state, body))
             elif method == "POST" and path == "/api/media/thumbnails":
-                self._send_json(self._media_thumbnail_batch_response(body))
+                if _wants_thumbnail_stream(body, self.headers.get("Accept")):
+                    self._send_media_thumbnail_stream(body)
+                else:
+                    self._send_json(self._media_thumbnail_batch_response(body))
             elif method == "POST" and path == "/api/logs/read":
                 project_root = Path.cwd().resolve()
                 self._send_json(
@@ -1847,14 +1891,68 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
         return safe_child_path(root, request_path)
 
     def _media_thumbnail_batch_response(self, body: dict[str, Any]) -> dict[str, Any]:
+        items, failures = self._media_thumbnail_batch_items(body)
+        mode = str(body.get("mode") or "").strip().lower()
+        include_data_url = mode != "url" and body.get("embedDataUrls") is not False
+        payload = _media_thumbnail_batch(
+            items,
+            include_data_url=include_data_url,
+            project_root=Path.cwd().resolve(),
+            size=int(body.get("size") or "160"),
+            image_format=thumbnail_format(body.get("format")),
+        )
+        payload["items"].extend(failures)
+        return payload
+
+    def _send_media_thumbnail_stream(self, body: dict[str, Any]) -> None:
+        """NDJSON 流：每张缩略图生成完就写一行，最后一行是 ``{"done": true}``。
+
+        条目只带 ``cachePath``，图片本身由客户端经 ``/api/media`` 取（可走 304）。
+        """
+        # 参数错误要在发送响应头之前抛出，才能按普通 JSON 错误返回
+        items, failures = self._media_thumbnail_batch_items(body)
+        size = int(body.get("size") or "160")
+        image_format = thumbnail_format(body.get("format"))
+        self.send_response(HTTPStatus.OK)
+        self._send_cors()
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", NO_STORE_CACHE_CONTROL)
+        # 没有 Content-Length，以关闭连接标记响应结束
+        self.send_header("Connection", "close")
+        self.close_connection = True
+        lines = itertools.chain(
+            failures,
+            _iter_media_thumbnail_batch(
+                items,
+                project_root=Path.cwd().resolve(),
+                size=size,
+                image_format=image_format,
+            ),
+        )
+        count = 0
+        try:
+            self.end_headers()
+            for item in lines:
+                count += 1
+                self._write_ndjson_line(item)
+            self._write_ndjson_line({"count": count, "done": True})
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            # 客户端已离开；已提交的渲染会继续完成并留在缓存里
+            return
+
+    def _write_ndjson_line(self, item: dict[str, Any]) -> None:
+        line = json.dumps(_jsonify(item), ensure_ascii=False) + "\n"
+        self.wfile.write(line.encode("utf-8"))
+        self.wfile.flush()
+
+    def _media_thumbnail_batch_items(
+        self, body: dict[str, Any]
+    ) -> tuple[list[tuple[str, Path]], list[dict[str, str]]]:
         raw_paths = body.get("paths") or []
         if not isinstance(raw_paths, list):
             raise ValueError("paths must be a list")
-        size = int(body.get("size") or "160")
         if len(raw_paths) > 1000:
             raise ValueError("too many thumbnail paths")
-        mode = str(body.get("mode") or "").strip().lower()
-        include_data_url = mode != "url" and body.get("embedDataUrls") is not False
         items: list[tuple[str, Path]] = []
         failures: list[dict[str, str]] = []
         for path in raw_paths:
@@ -1871,14 +1969,7 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
                         "type": exc.__class__.__name__,
                     }
                 )
-        payload = _media_thumbnail_batch(
-            items,
-            include_data_url=include_data_url,
-            project_root=Path.cwd().resolve(),
-            size=size,
-        )
-        payload["items"].extend(failures)
-        return payload
+        return items, failures
 
     def _send_local_file(
         self,
@@ -1886,12 +1977,25 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
         *,
         attachment: bool = False,
         send_body: bool = True,
+        cache_control: str = REVALIDATE_CACHE_CONTROL,
     ) -> None:
         if not path.is_file():
             raise FileNotFoundError(path.as_posix())
-        file_size = path.stat().st_size
+        stat = path.stat()
+        file_size = stat.st_size
+        etag = file_etag(stat)
+        # 附件（聊天记录下载等）按能力令牌发放，不做缓存也不做条件请求
+        validators = not attachment
+        if validators and is_not_modified(self.headers, etag=etag, mtime=stat.st_mtime):
+            self._send_not_modified(etag, stat.st_mtime, cache_control)
+            return
+        range_header = self.headers.get("Range")
+        if range_header and not if_range_matches(
+            self.headers.get("If-Range"), etag=etag, mtime=stat.st_mtime
+        ):
+            range_header = None
         try:
-            byte_range = self._parse_byte_range(self.headers.get("Range"), file_size) if not attachment else None
+            byte_range = self._parse_byte_range(range_header, file_size) if not attachment else None
         except _RangeNotSatisfiable:
             self._send_range_not_satisfiable(file_size)
             return
@@ -1915,22 +2019,52 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
             self.send_header("Content-Range", f"bytes {start}-{end}/{file_size}")
         if attachment:
             self.send_header("Content-Disposition", safe_content_disposition(safe_name))
+            self.send_header("Cache-Control", NO_STORE_CACHE_CONTROL)
+        else:
+            self._send_validator_headers(etag, stat.st_mtime, cache_control)
         try:
             self.end_headers()
             if not send_body:
                 return
             with path.open("rb") as file:
-                file.seek(start)
-                remaining = content_length
-                while remaining > 0:
-                    chunk = file.read(min(1024 * 512, remaining))
-                    if not chunk:
-                        break
-                    self.wfile.write(chunk)
-                    remaining -= len(chunk)
+                self._write_file_body(file, start, content_length)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            return
+
+    def _send_validator_headers(self, etag: str, mtime: float, cache_control: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", http_date(mtime))
+        self.send_header("Cache-Control", cache_control)
+
+    def _send_not_modified(self, etag: str, mtime: float, cache_control: str) -> None:
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self._send_cors()
+        self._send_validator_headers(etag, mtime, cache_control)
+        try:
+            self.end_headers()
         except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
             return
 
+    def _write_file_body(self, file: BinaryIO, start: int, length: int) -> None:
+        connection = getattr(self, "connection", None)
+        # wbufsize == 0 时 end_headers 已把响应头直接写进套接字，可以零拷贝发送正文；
+        # TLS 连接无法用 os.sendfile，退回分块写
+        if (
+            self.wbufsize == 0
+            and isinstance(connection, socket.socket)
+            and not isinstance(connection, ssl.SSLSocket)
+        ):
+            connection.sendfile(file, start, length)
+            return
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file.read(min(1024 * 512, remaining))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+
     def _send_range_not_satisfiable(self, file_size: int) -> None:
         self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
         self._send_cors()
@@ -1979,7 +2113,15 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
 
         candidate = self._resolve_static_path(dist_root, request_path)
         if candidate.is_file():
-            self._send_local_file(candidate, send_body=send_body)
+            self._send_local_file(
+                candidate,
+                send_body=send_body,
+                cache_control=(
+                    IMMUTABLE_CACHE_CONTROL
+                    if is_hashed_frontend_asset(candidate, dist_root)
+                    else REVALIDATE_CACHE_CONTROL
+                ),
+            )
             return True
 
         if request_path.startswith("/web-assets/"):
@@ -2018,24 +2160,31 @@ class FrontendBridgeHandler(BaseHTTPRequestHandler):
         relative_path: str,
         size: str,
         *,
+        image_format: str = "png",
         send_body: bool = True,
     ) -> None:
         source = self._resolve_project_path(relative_path)
-        try:
-            thumbnail = _media_thumbnail(
-                source,
-                project_root=Path.cwd().resolve(),
-                size=int(size or "160"),
-            )
-        except Exception as exc:
-            logger.warning(
-                "Falling back to original media after thumbnail generation failed: %s",
-                exc,
-                extra={
-                    "event": "media.thumbnail.failed",
-                    "path": source.as_posix(),
-                    "error_type": exc.__class__.__name__,
-                },
-            )
-            thumbnail = source
-        self._send_local_file(thumbnail, attachment=False, send_body=send_body)
+        image_format = thumbnail_format(image_format)
+        with contextlib.ExitStack() as stack:
+            # 发送期间钉住缩略图，避免并发请求触发的 LRU 淘汰把它删掉
+            try:
+                thumbnail = stack.enter_context(
+                    _open_media_thumbnail(
+                        source,
+                        project_root=Path.cwd().resolve(),
+                        size=int(size or "160"),
+                        image_format=image_format,
+                    )
+                )
+            except Exception as exc:
+                logger.warning(
+                    "Falling back to original media after thumbnail generation failed: %s",
+                    exc,
+                    extra={
+                        "event": "media.thumbnail.failed",
+                        "path": source.as_posix(),
+                        "error_type": exc.__class__.__name__,
+                    },
+                )
+                thumbnail = source
+            self._send_local_file(thumbnail, attachment=False, send_body=send_body)
@@ -0,0 +1,455 @@
+"""媒体缩略图服务：同键请求合并、进程池解码缩放、按字节预算 LRU 淘汰。
+
+缓存键由源文件路径、mtime、大小、目标尺寸和输出格式派生，源文件被替换后
+自然失效。解码和缩放在独立进程里完成，不占用 bridge 的 GIL；同一缩略图
+正在生成时，后来的请求只等待同一个 Future，不会重复解码整张立绘。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from sdk.logging import get_logger
+from sdk.path_utils import safe_child_path, safe_existing_file_path
+
+logger = get_logger("frontend_bridge_core.thumbnails")
+
+THUMBNAIL_CACHE_DIR = Path(".cache") / "frontend-media-thumbnails"
+DEFAULT_THUMBNAIL_SIZE = 160
+DEFAULT_THUMBNAIL_CACHE_BYTES = 256 * 1024 * 1024
+THUMBNAIL_FORMATS = ("png", "webp", "avif")
+
+_SAVE_OPTIONS: dict[str, dict[str, Any]] = {
+    # 不再使用 optimize=True：体积只小几个百分点，编码时间却翻倍
+    "png": {"format": "PNG"},
+    "webp": {"format": "WEBP", "quality": 82, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+Renderer = Callable[[str, str, int, str], int]
+
+
+def _render_thumbnail(source: str, target: str, size: int, image_format: str) -> int:
+    """在工作进程中生成缩略图，原子写入 ``target``，返回文件字节数。"""
+    from PIL import Image, ImageOps
+
+    target_path = Path(target)
+    with Image.open(source) as image:
+        # JPEG 可以直接按缩小比例解码，大图省掉大部分解码开销
+        image.draft("RGB", (size, size))
+        thumbnail = ImageOps.exif_transpose(image)
+        if thumbnail.mode not in {"RGB", "RGBA"}:
+            thumbnail = thumbnail.convert(
+                "RGBA" if "A" in thumbnail.getbands() else "RGB",
+            )
+        resampling = getattr(getattr(Image, "Resampling", Image), "LANCZOS")
+        thumbnail.thumbnail((size, size), resampling)
+
+        with tempfile.NamedTemporaryFile(
+            dir=target_path.parent,
+            prefix=f"{target_path.stem}.",
+            suffix=".tmp",
+            delete=False,
+        ) as handle:
+            tmp_path = Path(handle.name)
+        try:
+            thumbnail.save(tmp_path, **_SAVE_OPTIONS[image_format])
+            tmp_path.replace(target_path)
+        finally:
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+    return target_path.stat().st_size
+
+
+@lru_cache(maxsize=None)
+def _encoder_available(image_format: str) -> bool:
+    if image_format == "png":
+        return True
+    try:
+        from PIL import features
+
+        return bool(features.check(image_format))
+    except Exception:
+        return False
+
+
+def thumbnail_format(value: Any) -> str:
+    """规范化请求的输出格式；编码器不可用时退回 PNG。"""
+    image_format = str(value or "png").strip().lower()
+    if image_format not in THUMBNAIL_FORMATS:
+        raise ValueError(f"unsupported thumbnail format: {image_format}")
+    return image_format if _encoder_available(image_format) else "png"
+
+
+class ThumbnailService:
+    """一个缓存目录对应一个服务实例。
+
+    ``workers=0`` 时在调用线程内渲染（测试或无法创建子进程的平台），
+    其余情况使用 spawn 上下文的进程池，避免在多线程 bridge 里 fork。
+    spawn 子进程会重新执行入口脚本，因此 bridge 入口在 ``__main__`` 中先调用
+    ``init_process_pool_support()``，冻结（PyInstaller）构建才不会重新启动整个应用。
+    """
+
+    def __init__(
+        self,
+        cache_root: Path,
+        *,
+        max_bytes: int = DEFAULT_THUMBNAIL_CACHE_BYTES,
+        workers: int | None = None,
+        executor: Executor | None = None,
+        renderer: Renderer = _render_thumbnail,
+    ) -> None:
+        self.cache_root = Path(cache_root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.workers = _default_workers() if workers is None else workers
+        self._renderer = renderer
+        self._lock = threading.Lock()
+        # 外部传入的进程池由调用方负责关闭
+        self._shared_executor = executor
+        self._executor: Executor | None = None
+        self._inflight: dict[str, Future[Path]] = {}
+        self._entries: OrderedDict[str, int] | None = None
+        # 正在读取或发送的缩略图，LRU 淘汰时跳过
+        self._pins: Counter[str] = Counter()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def thumbnail(
+        self,
+        source: Path,
+        *,
+        project_root: Path,
+        size: int = DEFAULT_THUMBNAIL_SIZE,
+        image_format: str = "png",
+    ) -> Path:
+        return self.submit(
+            source, project_root=project_root, size=size, image_format=image_format
+        ).result()
+
+    @contextmanager
+    def open(
+        self,
+        source: Path,
+        *,
+        project_root: Path,
+        size: int = DEFAULT_THUMBNAIL_SIZE,
+        image_format: str = "png",
+    ) -> Iterator[Path]:
+        """生成或命中缩略图；``with`` 块内文件不会被 LRU 淘汰，可放心读取或发送。"""
+        name, future = self._submit(
+            source,
+            project_root=project_root,
+            size=size,
+            image_format=image_format,
+            pin=True,
+        )
+        try:
+            yield future.result()
+        finally:
+            self._unpin(name)
+
+    def submit(
+        self,
+        source: Path,
+        *,
+        project_root: Path,
+        size: int = DEFAULT_THUMBNAIL_SIZE,
+        image_format: str = "png",
+    ) -> Future[Path]:
+        return self._submit(
+            source, project_root=project_root, size=size, image_format=image_format
+        )[1]
+
+    def _submit(
+        self,
+        source: Path,
+        *,
+        project_root: Path,
+        size: int,
+        image_format: str,
+        pin: bool = False,
+    ) -> tuple[str, Future[Path]]:
+        source = safe_existing_file_path(
+            source, roots=[project_root], field="media source"
+        )
+        if not source.is_file():
+            raise FileNotFoundError(source.as_posix())
+        image_format = thumbnail_format(image_format)
+        stat = source.stat()
+        target_size = max(32, min(int(size), 512))
+        key = f"{source.resolve()}\0{stat.st_mtime_ns}\0{stat.st_size}\0{target_size}"
+        if image_format != "png":
+            # PNG 沿用旧的键，升级后已有缓存继续有效
+            key += f"\0{image_format}"
+        digest = hashlib.sha256(
+            key.encode("utf-8", errors="surrogatepass")
+        ).hexdigest()
+        name = f"{digest}.{image_format}"
+        cache_path = safe_child_path(self.cache_root, name)
+
+        with self._lock:
+            entries = self._index_locked()
+            if pin:
+                self._pins[name] += 1
+            pending = self._inflight.get(name)
+            if pending is not None:
+                self.coalesced += 1
+                return name, pending
+            if cache_path.is_file():
+                self.hits += 1
+                if name in entries:
+                    entries.move_to_end(name)
+                    _touch(cache_path)
+                else:
+                    self._record_locked(name, cache_path.stat().st_size)
+                done: Future[Path] = Future()
+                done.set_result(cache_path)
+                return name, done
+            self.misses += 1
+            result: Future[Path] = Future()
+            self._inflight[name] = result
+            executor = self._executor_locked()
+
+        if executor is None:
+            try:
+                written = self._renderer(
+                    str(source), str(cache_path), target_size, image_format
+                )
+            except BaseException as exc:
+                self._finish(name, cache_path, result, None, exc)
+                if pin:
+                    self._unpin(name)
+                raise
+            self._finish(name, cache_path, result, written, None)
+            return name, result
+        try:
+            work = executor.submit(
+                self._renderer, str(source), str(cache_path), target_size, image_format
+            )
+        except BaseException as exc:
+            self._finish(name, cache_path, result, None, exc)
+            if pin:
+                self._unpin(name)
+            raise
+        work.add_done_callback(
+            lambda item: self._finish_work(name, cache_path, result, item)
+        )
+        return name, result
+
+    def pregenerate(
+        self,
+        sources: Sequence[Path],
+        *,
+        project_root: Path,
+        size: int = DEFAULT_THUMBNAIL_SIZE,
+        image_format: str = "png",
+    ) -> list[Future[Path]]:
+        """上传后预先生成缩略图；失败只记日志，不影响上传本身。"""
+        futures: list[Future[Path]] = []
+        for source in sources:
+            try:
+                future = self.submit(
+                    source,
+                    project_root=project_root,
+                    size=size,
+                    image_format=image_format,
+                )
+            except Exception as exc:
+                _log_pregenerate_failure(source, exc)
+                continue
+            future.add_done_callback(_PregenerateCallback(source))
+            futures.append(future)
+        return futures
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "entries": len(self._entries or ()),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish_work(
+        self, name: str, cache_path: Path, result: Future[Path], work: Future[int]
+    ) -> None:
+        if work.cancelled():
+            self._finish(name, cache_path, result, None, CancelledError())
+        elif work.exception() is not None:
+            self._finish(name, cache_path, result, None, work.exception())
+        else:
+            self._finish(name, cache_path, result, work.result(), None)
+
+    def _finish(
+        self,
+        name: str,
+        cache_path: Path,
+        result: Future[Path],
+        written: int | None,
+        error: BaseException | None,
+    ) -> None:
+        with self._lock:
+            self._inflight.pop(name, None)
+            if error is None:
+                self._record_locked(name, int(written or 0))
+        if error is None:
+            result.set_result(cache_path)
+        else:
+            result.set_exception(error)
+
+    def _unpin(self, name: str) -> None:
+        with self._lock:
+            self._pins[name] -= 1
+            if self._pins[name] <= 0:
+                del self._pins[name]
+            self._evict_locked()
+
+    def _executor_locked(self) -> Executor | None:
+        if self._shared_executor is not None:
+            return self._shared_executor
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            self._executor = _process_pool(self.workers)
+        return self._executor
+
+    def _index_locked(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            self.cache_root.mkdir(parents=True, exist_ok=True)
+            found: list[tuple[int, str, int]] = []
+            for path in self.cache_root.iterdir():
+                if path.suffix.lstrip(".") not in THUMBNAIL_FORMATS:
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime_ns, path.name, stat.st_size))
+            self._entries = OrderedDict(
+                (name, size) for _mtime, name, size in sorted(found)
+            )
+            self._bytes = sum(self._entries.values())
+            self._evict_locked()
+        return self._entries
+
+    def _record_locked(self, name: str, size: int) -> None:
+        entries = self._index_locked()
+        self._bytes += size - entries.pop(name, 0)
+        entries[name] = size
+        self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        entries = self._entries
+        if entries is None:
+            return
+        # 至少保留最新的一项，刚生成的缩略图要能返回给调用方；钉住的项等释放后再淘汰
+        for name in list(entries)[:-1]:
+            if self._bytes <= self.max_bytes:
+                break
+            if self._pins[name]:
+                continue
+            size = entries.pop(name)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                (self.cache_root / name).unlink(missing_ok=True)
+            except OSError:
+                logger.warning(
+                    "Failed to evict media thumbnail",
+                    extra={"event": "media.thumbnail.evict_failed", "file": name},
+                )
+
+
+def _default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _touch(path: Path) -> None:
+    # 用 mtime 记录最近访问，重启后重建的 LRU 顺序仍然有效
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class _PregenerateCallback:
+    def __init__(self, source: Path) -> None:
+        self.source = source
+
+    def __call__(self, future: Future[Path]) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            _log_pregenerate_failure(self.source, future.exception())
+
+
+def _log_pregenerate_failure(source: Path, exc: BaseException | None) -> None:
+    logger.warning(
+        "Media thumbnail pregeneration failed: %s",
+        exc,
+        extra={
+            "event": "media.thumbnail.pregenerate_failed",
+            "path": Path(source).as_posix(),
+            "error_type": exc.__class__.__name__,
+        },
+    )
+
+
+_SERVICES: dict[Path, ThumbnailService] = {}
+_SERVICES_LOCK = threading.Lock()
+_SHARED_POOL: ProcessPoolExecutor | None = None
+
+
+def thumbnail_service_for(project_root: Path) -> ThumbnailService:
+    """按缓存目录复用服务；所有目录共用一个解码进程池。"""
+    global _SHARED_POOL
+    cache_root = Path(project_root) / THUMBNAIL_CACHE_DIR
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(cache_root)
+        if service is None:
+            if _SHARED_POOL is None:
+                _SHARED_POOL = _process_pool(_default_workers())
+            service = ThumbnailService(cache_root, executor=_SHARED_POOL)
+            _SERVICES[cache_root] = service
+        return service
+
+
+def pregenerate_thumbnails(
+    paths: Sequence[str],
+    *,
+    project_root: Path | None = None,
+) -> list[Future[Path]]:
+    root = (project_root or Path.cwd()).resolve()
+    sources = [root / path for path in paths if str(path or "").strip()]
+    return thumbnail_service_for(root).pregenerate(sources, project_root=root)
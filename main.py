@@ -137,6 +137,7 @@ from application.chat.history_state import (
     get_history,
     history_entry_stage_payload,
     history_entry_plain_text,
+    history_file_present,
     load_chat_history,
     is_user_history_entry,
     pop_last_assistant_turn_payload,
@@ -483,7 +484,11 @@ def main():
                         },
                     ),
                 )
-                tts_manager = TTSManager(tts_server_url=gsv_url)
+                tts_manager = TTSManager(
+                    tts_server_url=gsv_url,
+                    audio_cache_max_bytes=int(config.config.api_config.tts_cache_max_mb or 0) * 1024 * 1024,
+                    resident_models=int(config.config.api_config.tts_resident_models or 1),
+                )
                 tts_manager.set_tts_adapter(adapter=adapter)
                 _voice_lang = str(config.config.system_config.voice_language or "ja").strip() or "ja"
                 tts_manager.set_language(_voice_lang)
@@ -504,13 +509,7 @@ def main():
             print(tr_i18n("main.print_load_history", path=args.history))
             active_history_path = chat_history_active_path(args.history)
             messages = load_chat_history(str(active_history_path))
-            try:
-                active_history_present = isinstance(
-                    json.loads(active_history_path.read_text(encoding="utf-8")),
-                    list,
-                )
-            except (OSError, json.JSONDecodeError):
-                active_history_present = False
+            active_history_present = history_file_present(str(active_history_path))
 
         user_template = ""
         with open(
@@ -55,6 +55,7 @@ __all__ = [
     "InitChatContext",
     "InitChatHookError",
     "InitChatHookFailure",
+    "is_read_only_tool",
     "iter_registered_tools",
     "iter_shutdown_hooks",
     "LLMAdapter",
@@ -192,6 +193,7 @@ _LAZY_EXPORTS: dict[str, tuple[str, str]] = {
     "try_get_chat_ui_context": ("sdk.chat_ui_context", "try_get_chat_ui_context"),
     # ── tools ──
     "apply_registered_tools": ("sdk.tool_registry", "apply_registered_tools"),
+    "is_read_only_tool": ("sdk.tool_registry", "is_read_only_tool"),
     "iter_registered_tools": ("sdk.tool_registry", "iter_registered_tools"),
     "registered_tool_entries": ("sdk.tool_registry", "registered_tool_entries"),
     "tool": ("sdk.tool_registry", "tool"),
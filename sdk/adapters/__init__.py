@@ -3,7 +3,7 @@
 from sdk.adapters.asr import ASRAdapter, TranscriptionCallback
 from sdk.adapters.llm import LLMAdapter
 from sdk.adapters.t2i import T2IAdapter
-from sdk.adapters.tts import TTSAdapter
+from sdk.adapters.tts import PcmFormat, TTSAdapter
 from sdk.adapters.vision import (
     VisionAdapter,
     VisionAdapterFactory,
@@ -14,6 +14,7 @@ from sdk.adapters.vision import (
 __all__ = [
     "ASRAdapter",
     "LLMAdapter",
+    "PcmFormat",
     "T2IAdapter",
     "TTSAdapter",
     "TranscriptionCallback",
@@ -1,6 +1,28 @@
 from __future__ import annotations
 
+import os
+import tempfile
+import wave
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class PcmFormat:
+    """Layout of raw little-endian PCM frames yielded by ``TTSAdapter.stream_speech``."""
+
+    sample_rate: int
+    channels: int = 1
+    sample_width: int = 2
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.sample_width
+
+    def seconds_to_bytes(self, seconds: float) -> int:
+        return max(1, int(self.sample_rate * seconds)) * self.frame_bytes
 
 
 class TTSAdapter(ABC):
@@ -11,8 +33,21 @@ class TTSAdapter(ABC):
           uses the same meta keys as ``LLMAdapter.get_config_schema``.
         - Constructor arguments are defined by ``TTSAdapterFactory`` and each subclass (e.g.
           ``tts_server_url``, ``gpt_sovits_work_path``); this base does not declare them.
+        - ``max_concurrent_requests``: how many ``generate_speech`` calls may overlap. Split
+          sentences are synthesized ahead on a pool of this size; keep ``1`` for backends that
+          serialize requests on a single GPU.
+        - ``supports_streaming``: ``True`` when ``stream_speech()`` is overridden. Streaming
+          adapters hand PCM frames to playback as they arrive instead of writing a WAV first;
+          the base ``stream_speech()`` synthesizes the whole utterance and yields it as one chunk.
+        - ``resident_model_capacity``: how many voices the backend can keep loaded at once.
+          ``TTSManager`` skips ``switch_model()`` for the active voice and keeps up to this many
+          recently used voices resident; evicted ones are passed to ``release_model()``.
     """
 
+    max_concurrent_requests: int = 1
+    supports_streaming: bool = False
+    resident_model_capacity: int = 1
+
     @classmethod
     def get_config_schema(cls) -> dict[str, dict]:
         """Metadata for adapter-specific options; empty ``{}`` means none."""
@@ -35,3 +70,34 @@ class TTSAdapter(ABC):
     @abstractmethod
     def switch_model(self, model_info):
         pass
+
+    def release_model(self, model_info) -> None:
+        """Free a voice that is no longer resident. Default: nothing to free."""
+
+        return None
+
+    def stream_speech(self, text, **kwargs) -> tuple[PcmFormat, Iterator[bytes]]:
+        """Start synthesis and return the PCM format plus an iterator of raw frames.
+
+        Takes the same keyword arguments as ``generate_speech`` (minus ``file_path``).
+        Raise on request failure so the caller can fall back to ``generate_speech``.
+        The default synthesizes the whole utterance to a temporary 16-bit WAV with
+        ``generate_speech`` and yields its frames as a single chunk.
+        """
+
+        fd, file_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            audio_path = self.generate_speech(text, file_path=file_path, **kwargs)
+            if not audio_path:
+                raise RuntimeError(f"{type(self).__name__} produced no audio")
+            with wave.open(str(audio_path), "rb") as wav_file:
+                pcm_format = PcmFormat(
+                    sample_rate=wav_file.getframerate(),
+                    channels=wav_file.getnchannels(),
+                    sample_width=wav_file.getsampwidth(),
+                )
+                frames = wav_file.readframes(wav_file.getnframes())
+        finally:
+            Path(file_path).unlink(missing_ok=True)
+        return pcm_format, iter([frames])
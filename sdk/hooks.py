@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import copy
 import logging
 import math
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 import threading
@@ -72,6 +73,135 @@ class BeforeChatContext:
     stream: bool
 
 
+class _SnapshotOwner:
+    """Dirty flag shared by every container inside one cached snapshot."""
+
+    __slots__ = ("dirty",)
+
+    def __init__(self) -> None:
+        self.dirty = False
+
+
+def _tracked_copy(value: Any, owner: _SnapshotOwner) -> Any:
+    if isinstance(value, dict):
+        return _TrackedDict(owner, ((key, _tracked_copy(item, owner)) for key, item in value.items()))
+    if isinstance(value, list):
+        return _TrackedList(owner, (_tracked_copy(item, owner) for item in value))
+    if isinstance(value, (str, int, float, bool, type(None), tuple, bytes)):
+        return value
+    return copy.deepcopy(value)
+
+
+def _plain_copy(value: Any, memo: dict[int, Any] | None = None) -> Any:
+    if isinstance(value, dict):
+        return {key: _plain_copy(item, memo) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain_copy(item, memo) for item in value]
+    return copy.deepcopy(value, memo)
+
+
+def _dirtying(base: type, name: str) -> Callable[..., Any]:
+    base_method = getattr(base, name)
+
+    def method(self: Any, *args: Any, **kwargs: Any) -> Any:
+        self._owner.dirty = True
+        return base_method(self, *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+class _TrackedDict(dict):
+    """A plain ``dict`` that marks its snapshot dirty on the first write."""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: _SnapshotOwner, items: Iterable[tuple[Any, Any]] = ()) -> None:
+        super().__init__(items)
+        self._owner = owner
+
+    def __copy__(self) -> dict[Any, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[Any, Any]:
+        return _plain_copy(self, memo)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (dict, (dict(self),))
+
+
+class _TrackedList(list):
+    """A plain ``list`` that marks its snapshot dirty on the first write."""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: _SnapshotOwner, items: Iterable[Any] = ()) -> None:
+        super().__init__(items)
+        self._owner = owner
+
+    def __copy__(self) -> list[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list[Any]:
+        return _plain_copy(self, memo)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (list, (list(self),))
+
+
+for _name in ("__setitem__", "__delitem__", "__ior__", "clear", "pop", "popitem", "setdefault", "update"):
+    setattr(_TrackedDict, _name, _dirtying(dict, _name))
+for _name in (
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+    "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse",
+):
+    setattr(_TrackedList, _name, _dirtying(list, _name))
+del _name
+
+
+class HookSnapshotCache:
+    """Share hook snapshots of host dicts until a hook or adapter writes to them.
+
+    Each source dict is deep-copied once into ordinary ``dict``/``list``
+    subclasses. Later snapshots reuse that copy while the source keeps the
+    same top-level values and nobody has written to the copy; the first write
+    anywhere inside a copy only flags it, and the next snapshot copies the
+    source again. Hooks therefore see isolated, mutable data without a deep
+    copy of the full history on every event. Call :meth:`invalidate` after
+    mutating nested source values in place.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[dict[str, Any], tuple, _SnapshotOwner, dict[str, Any]]] = {}
+        self.copied_items = 0
+
+    def snapshot(self, source: dict[str, Any]) -> dict[str, Any]:
+        entry = self._entries.get(id(source))
+        if (
+            entry is not None
+            and entry[0] is source
+            and not entry[2].dirty
+            and entry[1] == tuple(source.items())
+        ):
+            return entry[3]
+        owner = _SnapshotOwner()
+        snapshot = _tracked_copy(source, owner)
+        self.copied_items += 1
+        self._entries[id(source)] = (source, tuple(source.items()), owner, snapshot)
+        return snapshot
+
+    def snapshot_list(self, sources: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Return a new list of shared snapshots; the list itself is always fresh."""
+        snapshots = [self.snapshot(source) for source in sources]
+        if len(self._entries) > 2 * len(sources) + 256:
+            live = {id(source) for source in sources}
+            self._entries = {key: entry for key, entry in self._entries.items() if key in live}
+        return snapshots
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+
 @dataclass
 class ShutdownHookRegistration:
     order: int
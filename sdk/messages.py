@@ -52,3 +52,15 @@ class TTSOutputMessage(BaseModel):
     is_system_message: bool = Field(False, description="是否是系统通知或非对话消息")
     is_final_segment: bool = Field(True, description="是否是多段TTS中的最后一段")
     timeout: Optional[float] = Field(None, description="可选的等待时间（秒）")
+    audio_stream: Optional[Any] = Field(
+        None,
+        exclude=True,
+        repr=False,
+        description="流式合成句柄（ai.tts.pcm_stream.StreamingSpeech）；audio_path 为其最终文件",
+    )
+    synthesis_started_at: Optional[float] = Field(
+        None,
+        exclude=True,
+        repr=False,
+        description="开始合成的 time.monotonic()，用于统计首音延迟",
+    )
@@ -17,6 +17,7 @@ class ToolManager(Protocol):
         description: str | None = None,
         group: str = "default",
         risk: str = "low",
+        read_only: bool = False,
     ) -> None: ...
 
     def get_definitions(
@@ -42,6 +42,8 @@ class ToolNotReady(Exception):
 
 # (callable, name_override | None, description_override | None, group | None, risk | None)
 _Entries: list[tuple[Callable[..., Any], str | None, str | None, str | None, str | None]] = []
+# 声明为只读（无副作用、可与同轮其他只读调用并发）的函数；单独存放以保持条目五元组不变
+_ReadOnly: set[Callable[..., Any]] = set()
 
 
 def tool(
@@ -51,6 +53,7 @@ def tool(
     description: str | None = None,
     group: str | None = None,
     risk: str = "low",
+    read_only: bool = False,
 ) -> F | Callable[[F], F]:
     """
     将函数登记到全局表，供宿主注入 ToolManager。
@@ -59,10 +62,17 @@ def tool(
     - ``@tool(name=..., description=...)``：覆盖对外暴露的名称与说明。
     - ``group``：工具分组，默认 "default"。
     - ``risk``：风险等级 "low" / "medium" / "high"，默认 "low"。
+    - ``read_only``：只读取状态、不产生副作用且与调用顺序无关时设为 True；
+      宿主会让同一轮里这类调用并发执行，结果仍按调用顺序返回。
     """
 
     def _decorator(fn: F) -> F:
         _Entries.append((fn, name, description, group or "default", risk or "low"))
+        # 重复登记同一函数时以最新声明为准，不保留之前的只读标记
+        if read_only:
+            _ReadOnly.add(fn)
+        else:
+            _ReadOnly.discard(fn)
         return fn
 
     if func is None:
@@ -80,12 +90,24 @@ def registered_tool_entries() -> Sequence[tuple[Callable[..., Any], str | None,
     return tuple(_Entries)
 
 
+def is_read_only_tool(func: Callable[..., Any]) -> bool:
+    """``func`` 是否以 ``@tool(read_only=True)`` 登记。"""
+    return func in _ReadOnly
+
+
 def apply_registered_tools(tool_manager: ToolManager) -> None:
     """
     将 :func:`tool` 收集到的函数注册到 ``tool_manager``。
     """
     for fn, nm, desc, group, risk in _Entries:
-        tool_manager.register_function(fn, name=nm, description=desc, group=group, risk=risk)
+        tool_manager.register_function(
+            fn,
+            name=nm,
+            description=desc,
+            group=group,
+            risk=risk,
+            read_only=is_read_only_tool(fn),
+        )
 
 
 # ── 模型就绪通知（插件 → 宿主）──────────────────────────────────────────
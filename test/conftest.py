@@ -40,6 +40,9 @@ def _configure_test_temp_dir() -> None:
     os.environ.setdefault("TEMP", temp_path)
     os.environ.setdefault("TMP", temp_path)
     os.environ.setdefault("SHINSEKAI_CHAT_ATTACHMENTS_ROOT", temp_path)
+    os.environ.setdefault(
+        "SHINSEKAI_IMAGE_BLOB_ROOT", str(temp_root / "image_blobs")
+    )
     tempfile.tempdir = temp_path
 
 
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from ai.llm.compact_manager import CompactManager
+from ai.llm.llm_manager import LLMManager
+from test.mocks import MockLLMAdapter
+
+
+def _history(count: int) -> list[dict]:
+    messages = [{"role": "system", "content": "S"}]
+    for index in range(count):
+        role = "user" if index % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"message {index} " + ("x" * 40)})
+    return messages
+
+
+def test_ledger_total_matches_uncached_count() -> None:
+    cm = CompactManager(MockLLMAdapter(), max_tokens=100000)
+    messages = _history(30)
+
+    expected = sum(
+        cm.count_text_tokens(cm._message_token_text(message)) + 4 for message in messages
+    )
+
+    assert cm.count_tokens(messages) == expected
+    assert cm.token_ledger.total(messages, track=True) == expected
+
+
+def test_ledger_encodes_each_appended_message_once() -> None:
+    cm = CompactManager(MockLLMAdapter(), max_tokens=100000)
+    messages = _history(10)
+    cm.needs_compaction(messages)
+    encoded = cm.token_ledger.encoded_messages
+
+    messages.append({"role": "user", "content": "new"})
+    cm.needs_compaction(messages)
+    cm.needs_compaction(messages)
+
+    assert cm.token_ledger.encoded_messages == encoded + 1
+
+
+def test_ledger_recounts_replaced_and_removed_messages() -> None:
+    cm = CompactManager(MockLLMAdapter(), max_tokens=100000)
+    messages = _history(6)
+    cm.needs_compaction(messages)
+
+    messages[-1]["content"] = "short"
+    cm.needs_compaction(messages)
+    fresh = [dict(message) for message in messages]
+    assert cm.num_tokens == CompactManager(MockLLMAdapter()).count_tokens(fresh)
+
+    del messages[2]
+    cm.needs_compaction(messages)
+    fresh = [dict(message) for message in messages]
+    assert cm.num_tokens == CompactManager(MockLLMAdapter()).count_tokens(fresh)
+
+
+def test_ledger_recounts_replaced_middle_and_edited_old_messages() -> None:
+    cm = CompactManager(MockLLMAdapter(), max_tokens=100000)
+    messages = _history(10)
+    cm.needs_compaction(messages)
+
+    messages[3] = {"role": "assistant", "content": "replaced " * 200}
+    messages.append({"role": "user", "content": "new"})
+    cm.needs_compaction(messages)
+    fresh = [dict(message) for message in messages]
+    assert cm.num_tokens == CompactManager(MockLLMAdapter()).count_tokens(fresh)
+
+    messages[1]["content"] = "edited " * 300
+    cm.needs_compaction(messages)
+    fresh = [dict(message) for message in messages]
+    assert cm.num_tokens == CompactManager(MockLLMAdapter()).count_tokens(fresh)
+
+
+def test_ledger_invalidate_drops_cached_counts() -> None:
+    cm = CompactManager(MockLLMAdapter(), max_tokens=100000)
+    messages = [{"role": "user", "content": [{"type": "text", "text": "a"}]}]
+    before = cm.count_tokens(messages)
+
+    messages[0]["content"][0]["text"] = "a much longer nested text block " * 10
+    cm.token_ledger.invalidate()
+
+    assert cm.count_tokens(messages) > before
+
+
+def test_context_estimate_splits_system_and_history_from_ledger() -> None:
+    mgr = LLMManager(adapter=MockLLMAdapter(), user_template="System prompt")
+    mgr.add_message("user", "Hello")
+    mgr.add_message("assistant", "Hi")
+
+    estimate = mgr._estimate_context_tokens(None)
+    cm = mgr.compact_manager
+
+    assert estimate["system_prompt_tokens"] == cm.count_tokens(mgr.messages[:1])
+    assert estimate["history_tokens"] == cm.count_tokens(mgr.messages[1:])
+
+
+def _encoded_per_appends(history_size: int, appends: int = 50) -> int:
+    mgr = LLMManager(adapter=MockLLMAdapter(), user_template="S", max_tokens=0)
+    mgr.set_messages(_history(history_size))
+    mgr.add_message("user", "warm up")
+    ledger = mgr.compact_manager.token_ledger
+    encoded_before = ledger.encoded_messages
+    for index in range(appends):
+        mgr.add_message("user", f"append {index}")
+    return ledger.encoded_messages - encoded_before
+
+
+def test_appends_encode_only_the_new_message_whatever_the_history_size() -> None:
+    assert _encoded_per_appends(100) == _encoded_per_appends(2_000) == 50
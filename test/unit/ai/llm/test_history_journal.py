@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from ai.llm import history_journal
+from ai.llm.history_journal import HistoryJournal
+from ai.llm.history_manager import HistoryManager
+
+
+def _messages(count: int, start: int = 0) -> list[dict]:
+    return [
+        {"role": "user" if index % 2 == 0 else "assistant", "content": f"消息 {index}"}
+        for index in range(start, start + count)
+    ]
+
+
+def test_write_all_keeps_valid_json_with_one_message_per_line(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    HistoryJournal(path).write_all(_messages(3))
+
+    raw = path.read_text(encoding="utf-8")
+    assert json.loads(raw) == _messages(3)
+    assert raw.splitlines()[1] == json.dumps(_messages(1)[0], ensure_ascii=False) + ","
+    assert Path(str(path) + ".idx").is_file()
+
+
+def test_save_appends_in_place_when_prefix_is_unchanged(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    journal = HistoryJournal(path)
+    messages = _messages(4)
+    assert journal.save(messages) is False
+    before = path.read_bytes()
+
+    messages.extend(_messages(2, start=4))
+    assert journal.save(messages) is True
+
+    after = path.read_bytes()
+    assert after[: len(before) - 3] == before[:-3]
+    assert json.loads(after) == _messages(6)
+    assert HistoryJournal(path).read_tail(3) == _messages(3, start=3)
+
+
+def test_save_rewrites_when_history_was_edited(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    journal = HistoryJournal(path)
+    messages = _messages(4)
+    journal.save(messages)
+
+    messages[1] = {"role": "assistant", "content": "edited"}
+    assert journal.save(messages) is False
+    assert json.loads(path.read_bytes())[1]["content"] == "edited"
+
+    del messages[2:]
+    journal.save(messages)
+    assert json.loads(path.read_bytes()) == messages
+
+
+def test_read_range_and_tail_use_index(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    journal = HistoryJournal(path)
+    journal.write_all(_messages(10))
+
+    assert journal.message_count() == 10
+    assert journal.read_tail(2) == _messages(2, start=8)
+    assert journal.read_range(3, 5) == _messages(2, start=3)
+    assert journal.read_tail(50) == _messages(10)
+    assert journal.read_range(10) == []
+
+
+def test_external_rewrite_invalidates_index(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    HistoryJournal(path).write_all(_messages(5))
+    path.write_text(json.dumps(_messages(2), ensure_ascii=False, indent=4), encoding="utf-8")
+
+    journal = HistoryJournal(path)
+    assert journal.ensure_index() is None
+    assert journal.read_tail(1) == _messages(1, start=1)
+    assert journal.message_count() == 2
+
+
+def test_legacy_indented_file_is_migrated_on_load(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    path.write_text(json.dumps(_messages(3), ensure_ascii=False, indent=4), encoding="utf-8")
+
+    hm = HistoryManager([])
+    assert hm.load_chat_history(str(path)) == _messages(3)
+
+    assert HistoryJournal(path).ensure_index() == (3, path.stat().st_size)
+    assert hm.load_recent_messages(str(path), 1) == _messages(1, start=2)
+
+
+def test_embedded_images_are_externalized_on_load(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    embedded = base64.b64encode(b"legacy-image").decode("ascii")
+    image = {"type": "local_image", "media_type": "image/png", "data": embedded}
+    HistoryJournal(path).write_all([{"role": "user", "content": [image]}])
+
+    (message,) = HistoryManager([]).load_chat_history(str(path))
+
+    assert "data" not in message["content"][0]
+    assert message["content"][0]["sha256"] == hashlib.sha256(b"legacy-image").hexdigest()
+    assert embedded not in path.read_text(encoding="utf-8")
+    assert HistoryJournal(path).read_all() == [message]
+
+
+def test_journal_compaction_skips_messages_already_in_base(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    journal = HistoryJournal(path)
+    journal.write_all(_messages(4))
+    tmp = Path(str(path) + ".tmp")
+    tmp.write_text(
+        "".join(json.dumps(m, ensure_ascii=False) + ",\n" for m in _messages(4, start=2)),
+        encoding="utf-8",
+    )
+
+    assert journal.compact() == 2
+    assert json.loads(path.read_bytes()) == _messages(6)
+    assert not tmp.exists()
+
+
+def test_torn_journal_tail_is_dropped(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    tmp = Path(str(path) + ".tmp")
+    tmp.write_text('{"role": "user", "content": "ok"},\n{"role": "assist', encoding="utf-8")
+
+    assert HistoryManager([]).load_chat_history(str(path)) == [{"role": "user", "content": "ok"}]
+
+
+def test_torn_in_place_append_is_rolled_back(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    HistoryJournal(path).write_all(_messages(3))
+    data = path.read_bytes()
+    path.write_bytes(data[:-3] + b',\n{"role": "user", "con')
+
+    assert HistoryJournal(path).read_all() == _messages(3)
+    assert json.loads(path.read_bytes()) == _messages(3)
+
+
+def test_periodic_compaction_folds_journal(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("ai.llm.history_manager.JOURNAL_COMPACT_EVERY", 3)
+    path = tmp_path / "active.json"
+    for message in _messages(4):
+        HistoryManager.append_message_to_tmp(str(path), message)
+
+    assert json.loads(path.read_bytes()) == _messages(3)
+    tmp_lines = Path(str(path) + ".tmp").read_text(encoding="utf-8").splitlines()
+    assert len(tmp_lines) == 1
+    HistoryManager.delete_tmp(str(path))
+
+
+def test_journal_fsync_is_batched(tmp_path: Path, monkeypatch) -> None:
+    synced = []
+    monkeypatch.setattr(history_journal.os, "fsync", lambda fd: synced.append(fd))
+    monkeypatch.setattr(history_journal, "JOURNAL_FSYNC_INTERVAL", 3600.0)
+    tmp = tmp_path / "active.json.tmp"
+
+    for message in _messages(history_journal.JOURNAL_FSYNC_EVERY * 2):
+        history_journal.append_journal_line(tmp, message)
+    history_journal.forget_journal(tmp)
+
+    # 首条立即落盘，之后每 JOURNAL_FSYNC_EVERY 条一次
+    assert len(synced) == 2
+
+
+def test_history_file_present_treats_cleared_history_as_present(tmp_path: Path) -> None:
+    path = tmp_path / "active.json"
+    assert HistoryManager.history_file_present(str(path)) is False
+
+    HistoryManager([]).clear_chat_history(str(path))
+    assert HistoryManager.history_file_present(str(path)) is True
+
+    path.write_text("{}", encoding="utf-8")
+    assert HistoryManager.history_file_present(str(path)) is False
+
+
+def test_tail_read_parses_only_the_requested_lines(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "active.json"
+    HistoryJournal(path).write_all(_messages(2_000))
+    HistoryJournal(path).ensure_index()
+    parsed: list[bytes] = []
+    loads = history_journal.json.loads
+    monkeypatch.setattr(history_journal.json, "loads", lambda raw: parsed.append(raw) or loads(raw))
+    monkeypatch.setattr(
+        Path, "read_bytes", lambda self: pytest.fail(f"full read of {self.name}")
+    )
+
+    assert HistoryJournal(path).read_tail(20) == _messages(20, start=1_980)
+    assert len(parsed) == 20
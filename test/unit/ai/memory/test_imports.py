@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 
 import pytest
 
@@ -110,6 +112,37 @@ def test_execute_import_counts_duplicate_already_in_memory_store(tmp_path):
     assert result["storedDuplicateCount"] == 1
 
 
+def test_execute_import_writes_memories_concurrently_and_stops_on_failure(tmp_path):
+    source = tmp_path / "history.txt"
+    source.write_text("user: likes tea", encoding="utf-8")
+    memories = [{"character_name": "Mika", "memory": f"fact {index}", "confidence": 0.9} for index in range(8)]
+    adapter = MockLLMAdapter(responses=[json.dumps(memories)])
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def remember(memory, character_name=None):
+        with lock:
+            active.append(memory)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(memory)
+        return {"ok": memory != "fact 5"}
+
+    with pytest.raises(RuntimeError, match="fact 5"):
+        execute_memory_import(
+            [source],
+            character_name="Mika",
+            source_root=tmp_path,
+            llm_adapter=adapter,
+            remember_func=remember,
+            write_concurrency=3,
+        )
+
+    assert 1 < max(peak) <= 3
+
+
 def test_preview_rejects_invalid_json_and_unsupported_files(tmp_path):
     invalid = tmp_path / "broken.json"
     invalid.write_text("{bad", encoding="utf-8")
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 
 import pytest
 
@@ -24,7 +26,9 @@ def test_memory_write_queue_persists_dedupes_and_flushes(tmp_path):
     assert first["queued"] is True
     assert duplicate["duplicate"] is True
     assert len(queue) == 1
-    assert json.loads(path.read_text(encoding="utf-8"))["items"][0]["confidence"] == 1.0
+    wal_lines = (tmp_path / "queue.json.wal").read_text(encoding="utf-8").splitlines()
+    assert len(wal_lines) == 1
+    assert json.loads(wal_lines[0])["item"]["confidence"] == 1.0
 
     reloaded = MemoryWriteQueue(path=path, remember_func=remember)
     assert len(reloaded) == 1
@@ -97,3 +101,89 @@ def test_memory_write_queue_reports_persistence_failure_and_keeps_items(tmp_path
     assert saved == [("Alice", "persist me")]
     assert len(queue) == 1
     assert queue.pending()[0]["memory"] == "persist me"
+
+
+def test_memory_write_queue_replays_log_and_compacts_when_drained(tmp_path):
+    path = tmp_path / "queue.json"
+    queue = MemoryWriteQueue(path=path, remember_func=lambda content, character_name=None: {"ok": True})
+    queue.enqueue_many(["a", "b", "A", ""], character_name="Alice")
+    queue.flush(limit=1)
+
+    reloaded = MemoryWriteQueue(path=path, remember_func=lambda content, character_name=None: {"ok": True})
+    assert [item["memory"] for item in reloaded.pending()] == ["b"]
+
+    assert reloaded.flush()["saved"] == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == {"items": []}
+    assert not (tmp_path / "queue.json.wal").exists()
+
+
+def test_memory_write_queue_ignores_torn_log_tail(tmp_path):
+    path = tmp_path / "queue.json"
+    queue = MemoryWriteQueue(path=path, remember_func=lambda content, character_name=None: {"ok": True})
+    queue.enqueue("kept", character_name="Alice")
+    with open(tmp_path / "queue.json.wal", "a", encoding="utf-8") as handle:
+        handle.write('{"op": "add", "item": {"memory": "torn')
+
+    assert [item["memory"] for item in MemoryWriteQueue(path=path).pending()] == ["kept"]
+
+
+def test_memory_write_queue_appends_after_torn_log_tail(tmp_path):
+    path = tmp_path / "queue.json"
+    queue = MemoryWriteQueue(path=path, remember_func=lambda content, character_name=None: {"ok": True})
+    queue.enqueue("fact one", character_name="Alice")
+    with open(tmp_path / "queue.json.wal", "a", encoding="utf-8") as handle:
+        handle.write('{"op": "add", "item": {"memory": "torn')
+
+    restarted = MemoryWriteQueue(path=path)
+    restarted.enqueue("fact two", character_name="Alice")
+
+    assert [item["memory"] for item in MemoryWriteQueue(path=path).pending()] == ["fact one", "fact two"]
+
+
+def test_memory_write_queue_flushes_concurrently_in_batches(tmp_path):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def remember(_content, character_name=None):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+        return {"ok": True}
+
+    queue = MemoryWriteQueue(
+        path=tmp_path / "queue.json",
+        remember_func=remember,
+        flush_batch_size=5,
+        flush_concurrency=4,
+    )
+    queue.enqueue_many([f"memory {index}" for index in range(12)], character_name="Alice")
+
+    result = queue.flush()
+
+    assert result["saved"] == 12
+    assert 1 < max(peak) <= 4
+    metrics = queue.metrics()
+    assert metrics["saved"] == 12 and metrics["pending"] == 0
+    assert metrics["items_per_second"] > 0
+
+
+def test_memory_write_queue_backs_off_failed_items(tmp_path, monkeypatch):
+    calls = []
+
+    def remember(content, character_name=None):
+        calls.append(content)
+        return {"ok": False}
+
+    queue = MemoryWriteQueue(path=tmp_path / "queue.json", remember_func=remember)
+    queue.enqueue("retry later", character_name="Alice")
+
+    queue.flush()
+    deferred = queue.flush()
+    assert deferred["attempted"] == 0 and deferred["deferred"] == 1
+
+    queue.flush(force=True)
+    assert calls == ["retry later", "retry later"]
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+from ai.tools import mcp_tool_setup
+from ai.tools.mcp_schema_cache import MCPSchemaCache, server_cache_key
+from ai.tools.tool_manager import ToolManager
+
+
+class _FakeServer:
+    def __init__(self, tools: list[str]) -> None:
+        self.tools = [
+            {"name": name, "description": f"{name} tool", "inputSchema": {}}
+            for name in tools
+        ]
+        self.connects = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.bridges: list[_FakeBridge] = []
+
+
+class _FakeBridge:
+    def __init__(self, server: _FakeServer, on_tools_changed) -> None:
+        self.server = server
+        self.on_tools_changed = on_tools_changed
+
+    async def list_tools(self) -> list[dict]:
+        return [dict(tool) for tool in self.server.tools]
+
+    async def call_tool(self, name: str, arguments: dict) -> str:
+        self.server.in_flight += 1
+        self.server.peak = max(self.server.peak, self.server.in_flight)
+        await asyncio.sleep(0.05)
+        self.server.in_flight -= 1
+        return f"{name}:{json.dumps(arguments)}"
+
+    async def close(self) -> None:
+        return None
+
+
+@pytest.fixture
+def fake_server(tmp_path, monkeypatch):
+    server = _FakeServer(["echo", "ping"])
+
+    async def connect(entry, *, on_tools_changed=None):
+        server.connects += 1
+        bridge = _FakeBridge(server, on_tools_changed)
+        server.bridges.append(bridge)
+        return bridge
+
+    monkeypatch.setattr(mcp_tool_setup, "_connect_bridge", connect)
+    monkeypatch.setattr(
+        mcp_tool_setup,
+        "_schema_cache_instance",
+        MCPSchemaCache(tmp_path / "schemas.json"),
+    )
+    monkeypatch.setattr(mcp_tool_setup, "_active_servers", [])
+    monkeypatch.setattr(mcp_tool_setup, "_registered_mcp_full_names", [])
+    yield server
+    ToolManager().unregister_tools(list(mcp_tool_setup._registered_mcp_full_names))
+
+
+def _write_config(path: Path, **server) -> Path:
+    entry = {"transport": "stdio", "command": "fake-mcp", "name_prefix": "unit_mcp_"}
+    entry.update(server)
+    path.write_text(yaml.safe_dump({"servers": [entry]}), encoding="utf-8")
+    return path
+
+
+def test_schema_cache_versions_only_change_with_the_tool_list(tmp_path):
+    cache = MCPSchemaCache(tmp_path / "schemas.json")
+    key = server_cache_key({"transport": "stdio", "command": "x", "group": "a"})
+    tools = [{"name": "echo"}]
+
+    assert cache.get(key) is None
+    assert cache.put(key, tools) == 1
+    assert cache.put(key, tools) == 1
+    assert cache.put(key, tools + [{"name": "ping"}]) == 2
+    assert key == server_cache_key({"transport": "stdio", "command": "x"})
+
+    reloaded = MCPSchemaCache(tmp_path / "schemas.json")
+    assert reloaded.get(key) == [{"name": "echo"}, {"name": "ping"}]
+    assert reloaded.version(key) == 2
+    (tmp_path / "schemas.json").write_text("{broken", encoding="utf-8")
+    assert MCPSchemaCache(tmp_path / "schemas.json").get(key) is None
+
+
+def test_cached_schemas_skip_the_handshake_until_first_call(tmp_path, fake_server):
+    config = _write_config(tmp_path / "mcp.yaml")
+    tm = ToolManager()
+
+    mcp_tool_setup.register_mcp_tools_from_config(tm, config)
+    assert fake_server.connects == 1
+    mcp_tool_setup.reload_mcp_tools_from_config(tm, config)
+
+    assert fake_server.connects == 1
+    (stats,) = mcp_tool_setup.mcp_server_stats()
+    assert stats["schemaSource"] == "cache" and not stats["connected"]
+    assert tm.get_tool_group("unit_mcp_echo") == "mcp"
+
+    fake_server.tools.append({"name": "added", "description": "", "inputSchema": {}})
+    out = json.loads(tm.execute("unit_mcp_echo", '{"text": "hi"}'))
+
+    assert out == {"result": 'echo:{"text": "hi"}'}
+    assert fake_server.connects == 2
+    assert "unit_mcp_added" in mcp_tool_setup._registered_mcp_full_names
+    (stats,) = mcp_tool_setup.mcp_server_stats()
+    assert stats["calls"] == 1 and stats["schemaVersion"] == 2
+
+
+def test_calls_share_the_pool_concurrently(tmp_path, fake_server):
+    config = _write_config(tmp_path / "mcp.yaml", sessions=2)
+    tm = ToolManager()
+    mcp_tool_setup.register_mcp_tools_from_config(tm, config)
+    results: list[str] = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(tm.execute("unit_mcp_ping", "{}"))
+        )
+        for _ in range(4)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(results) == 4
+    assert fake_server.peak >= 2
+    (stats,) = mcp_tool_setup.mcp_server_stats()
+    assert stats["sessions"] == 2
+    assert stats["calls"] == 4 and stats["inFlight"] == 0
+
+
+def test_replace_mcp_tools_swaps_a_server_catalog_atomically():
+    tm = ToolManager()
+    tm.reset()
+    invoke = lambda name, args: name  # noqa: E731
+    first = tm.replace_mcp_tools(
+        "unit_swap_",
+        [{"name": "echo"}, {"name": "ping"}],
+        invoke=invoke,
+    )
+    stop = threading.Event()
+    seen: list[set[str]] = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            seen.append({d["function"]["name"] for d in tm.get_definitions()})
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        for _ in range(50):
+            tm.replace_mcp_tools(
+                "unit_swap_", [{"name": "echo"}], invoke=invoke, replaces=first
+            )
+            first = tm.replace_mcp_tools(
+                "unit_swap_",
+                [{"name": "echo"}, {"name": "ping"}],
+                invoke=invoke,
+                replaces=["unit_swap_echo"],
+            )
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert all("unit_swap_echo" in names for names in seen)
+    assert [r["name"] for r in tm.search_tools("ping")] == ["unit_swap_ping"]
+    tm.unregister_tools(first)
+    assert tm.get_definitions() == []
+
+
+def test_list_changed_notification_reregisters_tools(tmp_path, fake_server):
+    config = _write_config(tmp_path / "mcp.yaml")
+    tm = ToolManager()
+    mcp_tool_setup.register_mcp_tools_from_config(tm, config)
+    fake_server.tools = [{"name": "echo", "description": "v2", "inputSchema": {}}]
+
+    bridge = fake_server.bridges[0]
+    loop = mcp_tool_setup._ensure_mcp_loop()
+    loop.call_soon_threadsafe(bridge.on_tools_changed)
+    for _ in range(100):
+        if "unit_mcp_ping" not in mcp_tool_setup._registered_mcp_full_names:
+            break
+        threading.Event().wait(0.02)
+
+    assert mcp_tool_setup._registered_mcp_full_names == ["unit_mcp_echo"]
+    assert tm.search_tools("v2")[0]["name"] == "unit_mcp_echo"
+    (stats,) = mcp_tool_setup.mcp_server_stats()
+    assert stats["listChanged"] == 1 and stats["schemaVersion"] == 2
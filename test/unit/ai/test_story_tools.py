@@ -15,10 +15,7 @@ from ai.tools.tool_manager import ToolManager
 
 def _reset_tm() -> ToolManager:
     manager = ToolManager()
-    manager._tools_definitions.clear()
-    manager._functions.clear()
-    manager._tool_groups.clear()
-    manager._tool_risks.clear()
+    manager.reset()
     return manager
 
 
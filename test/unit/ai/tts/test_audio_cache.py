@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from ai.tts.audio_cache import AudioCache, cache_key, file_fingerprint, normalize_text
+
+
+def _clip(tmp_path: Path, name: str, size: int) -> Path:
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_key_ignores_whitespace_but_not_model_or_speed() -> None:
+    base = dict(text=normalize_text("こんにちは  世界\n"), model={"gpt": "a.ckpt"}, speed_factor=1.0)
+    assert cache_key(**base) == cache_key(**{**base, "text": normalize_text(" こんにちは 世界")})
+    assert cache_key(**base) != cache_key(**{**base, "model": {"gpt": "b.ckpt"}})
+    assert cache_key(**base) != cache_key(**{**base, "speed_factor": 1.2})
+
+
+def test_replacing_reference_audio_changes_fingerprint(tmp_path: Path) -> None:
+    ref = _clip(tmp_path, "ref.wav", 10)
+    before = file_fingerprint(ref)
+    ref.write_bytes(b"y" * 12)
+    assert file_fingerprint(ref) != before
+
+
+def test_store_and_lookup_survive_restart(tmp_path: Path) -> None:
+    cache = AudioCache(tmp_path / "store", max_bytes=1000)
+    source = _clip(tmp_path, "0.wav", 10)
+    stored = cache.store("k1", source)
+
+    # 环形槽位通过 .part + replace 覆盖，不影响已入库的音频
+    _clip(tmp_path, "0.wav.part", 3).replace(source)
+    assert Path(stored).read_bytes() == b"x" * 10
+
+    reopened = AudioCache(tmp_path / "store", max_bytes=1000)
+    assert reopened.lookup("k1") == stored
+    assert reopened.lookup("k2") is None
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["misses"] == 1
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path: Path) -> None:
+    cache = AudioCache(tmp_path / "store", max_bytes=25)
+    for key in ("a", "b"):
+        cache.store(key, _clip(tmp_path, f"{key}.src", 10))
+    assert cache.lookup("a")  # a 成为最近使用
+
+    cache.store("c", _clip(tmp_path, "c.src", 10))
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") and cache.lookup("c")
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 20
+
+
+def test_lookup_drops_entries_deleted_externally(tmp_path: Path) -> None:
+    cache = AudioCache(tmp_path / "store", max_bytes=100)
+    os.unlink(cache.store("k", _clip(tmp_path, "src", 5)))
+
+    assert cache.lookup("k") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from ai.tts.model_residency import ModelResidencyManager
+
+
+class _Adapter:
+    resident_model_capacity = 2
+
+    def __init__(self, switch_seconds: float = 0.0):
+        self.switch_seconds = switch_seconds
+        self.switched: list[str] = []
+        self.released: list[str] = []
+
+    def switch_model(self, model_info):
+        time.sleep(self.switch_seconds)
+        self.switched.append(model_info["character_name"])
+
+    def release_model(self, model_info):
+        self.released.append(model_info["character_name"])
+
+
+def _voice(name: str) -> dict:
+    return {"character_name": name, "gpt_model_path": f"{name}.ckpt"}
+
+
+def test_switch_to_active_voice_is_skipped() -> None:
+    adapter = _Adapter()
+    residency = ModelResidencyManager(adapter, capacity=2)
+
+    assert residency.activate(_voice("a")) is True
+    assert residency.activate(dict(_voice("a"))) is False
+
+    assert adapter.switched == ["a"]
+    stats = residency.stats()
+    assert (stats["switches"], stats["hits"]) == (1, 1)
+
+
+def test_capacity_is_bounded_by_adapter_and_evicts_lru() -> None:
+    adapter = _Adapter()
+    residency = ModelResidencyManager(adapter, capacity=8)
+    assert residency.capacity == 2
+
+    for name in ("a", "b", "a", "c"):
+        residency.activate(_voice(name))
+
+    # a 最近用过，被淘汰的是 b
+    assert adapter.released == ["b"]
+    stats = residency.stats()
+    assert (stats["switches"], stats["resident_hits"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_prefetch_loads_next_voice_in_background() -> None:
+    adapter = _Adapter(switch_seconds=0.05)
+    residency = ModelResidencyManager(adapter)
+    residency.activate(_voice("a"))
+    try:
+        future = residency.prefetch(_voice("b"))
+        future.result(timeout=2)
+        assert residency.is_active(_voice("b"))
+        assert residency.prefetch(_voice("b")) is None
+        assert residency.stats()["switch_seconds"] >= 0.05
+    finally:
+        residency.shutdown()
+
+
+def test_pinned_voice_is_not_switched_mid_request() -> None:
+    adapter = _Adapter()
+    residency = ModelResidencyManager(adapter)
+    residency.acquire(_voice("a"))
+    try:
+        future = residency.prefetch(_voice("b"))
+        time.sleep(0.05)
+        assert adapter.switched == ["a"]
+    finally:
+        residency.release()
+    future.result(timeout=2)
+    assert adapter.switched == ["a", "b"]
+    residency.shutdown()
+
+
+def test_concurrent_requests_for_same_voice_share_one_switch() -> None:
+    adapter = _Adapter(switch_seconds=0.01)
+    residency = ModelResidencyManager(adapter)
+
+    def speak():
+        with residency.using(_voice("a")):
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=speak) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert adapter.switched == ["a"]
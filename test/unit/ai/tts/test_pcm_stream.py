@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import struct
+import threading
+import time
+import wave
+from pathlib import Path
+
+import pytest
+
+from ai.tts.audio_cache import AudioCache
+from ai.tts.pcm_stream import (
+    PcmConverter,
+    PcmRingBuffer,
+    StreamingSpeech,
+    convert_pcm,
+    open_pcm_stream,
+)
+from ai.tts.tts_manager import TTSManager
+from sdk.adapters.tts import PcmFormat
+from test.mocks import MockTTSAdapter
+
+FORMAT = PcmFormat(sample_rate=16000)
+
+
+def _wav_header(sample_rate: int, channels: int = 1) -> bytes:
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16)
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+class StreamingMockAdapter(MockTTSAdapter):
+    """Streams PCM blocks behind a WAV header; blocks after the first wait for ``release``."""
+
+    supports_streaming = True
+
+    def __init__(self, blocks: int = 4, block_bytes: int = 3200, delay: float = 0.0):
+        super().__init__()
+        self.blocks = blocks
+        self.block_bytes = block_bytes
+        self.delay = delay
+        self.release = threading.Event()
+
+    def _pcm(self):
+        for index in range(self.blocks):
+            if index == 1:
+                self.release.wait(timeout=5)
+            time.sleep(self.delay)
+            yield bytes([index + 1]) * self.block_bytes
+
+    def _wire(self):
+        yield _wav_header(FORMAT.sample_rate)[:10]  # 头部被拆成两块到达
+        yield _wav_header(FORMAT.sample_rate)[10:]
+        yield from self._pcm()
+
+    def stream_speech(self, text, **kwargs):
+        self.call_history.append({"action": "stream", "text": text})
+        return open_pcm_stream(self._wire(), PcmFormat(sample_rate=32000))
+
+    def generate_speech(self, text, file_path=None, **kwargs):
+        self.release.set()
+        with wave.open(file_path, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(FORMAT.sample_rate)
+            wav_file.writeframes(b"".join(self._pcm()))
+        self.call_history.append({"text": text, "file_path": file_path})
+        return file_path
+
+
+def test_ring_buffer_wraps_and_blocks_writer_until_reader_drains() -> None:
+    ring = PcmRingBuffer(8)
+    assert ring.write(b"abcdef")
+    assert ring.read(4) == b"abcd"
+
+    done = threading.Event()
+    writer = threading.Thread(target=lambda: (ring.write(b"0123456789"), done.set()))
+    writer.start()
+    assert not done.wait(0.05)
+    out = ring.read(8) + ring.read(8, timeout=1)
+    writer.join(timeout=1)
+    ring.close()
+
+    assert out == b"ef0123456789"
+    assert ring.read(8) == b""
+
+
+def test_ring_buffer_drops_writes_after_reader_stalls() -> None:
+    ring = PcmRingBuffer(4)
+    assert ring.write(b"abcdefgh", timeout=0.05) is False
+    assert ring.write(b"x") is False
+
+
+def test_open_pcm_stream_parses_split_wav_header_and_raw_default() -> None:
+    fmt, chunks = open_pcm_stream(iter([_wav_header(24000, 2)[:7], _wav_header(24000, 2)[7:] + b"ab", b"cd"]), FORMAT)
+    assert fmt == PcmFormat(sample_rate=24000, channels=2)
+    assert b"".join(chunks) == b"abcd"
+
+    fmt, chunks = open_pcm_stream(iter([b"\x01\x02", b"\x03\x04"]), FORMAT)
+    assert fmt is FORMAT
+    assert b"".join(chunks) == b"\x01\x02\x03\x04"
+
+    with pytest.raises(ValueError):
+        open_pcm_stream(iter([]), FORMAT)
+
+
+def test_streaming_speech_keeps_reads_frame_aligned() -> None:
+    speech = StreamingSpeech("out.wav", PcmFormat(sample_rate=8000, channels=2))
+    speech.feed(b"abc")
+    speech.feed(b"defgh")
+    speech.finish(True)
+
+    assert speech.read(6) == b"abcd"
+    assert speech.read(6) == b"efgh"
+    assert speech.read(6) == b""
+    assert speech.wait_file(0) == "out.wav"
+
+
+def test_convert_pcm_resamples_and_upmixes() -> None:
+    mono = struct.pack("<4h", 0, 100, 200, 300)
+    out = convert_pcm(mono, PcmFormat(sample_rate=8000), 16000, 2)
+    samples = struct.unpack(f"<{len(out) // 2}h", out)
+
+    assert len(samples) == 8 * 2
+    assert samples[0] == samples[1] == 0
+    assert samples[-1] == samples[-2] == 300
+
+
+@pytest.mark.parametrize("sample_rate", [44100, 16000])
+def test_pcm_converter_carries_position_across_blocks(sample_rate: int) -> None:
+    source = PcmFormat(sample_rate=32000)
+    pcm = struct.pack("<960h", *range(0, 9600, 10))
+    whole = PcmConverter(source, sample_rate, 2).convert(pcm)
+    converter = PcmConverter(source, sample_rate, 2)
+    blocks = b"".join(converter.convert(pcm[i:i + 301]) for i in range(0, len(pcm), 301))
+
+    assert blocks == whole
+    samples = struct.unpack(f"<{len(whole) // 2}h", whole)[::2]
+    step = 32000 / sample_rate * 10
+    assert all(abs(b - a - step) <= 1 for a, b in zip(samples, samples[1:]))
+
+
+def test_base_stream_speech_yields_the_whole_utterance_as_one_chunk() -> None:
+    adapter = StreamingMockAdapter(blocks=2, block_bytes=8)
+
+    pcm_format, chunks = MockTTSAdapter.stream_speech(adapter, "hello", character_name="a")
+
+    assert pcm_format == FORMAT
+    assert list(chunks) == [b"\x01" * 8 + b"\x02" * 8]
+    assert not Path(adapter.call_history[-1]["file_path"]).exists()
+
+
+def _manager(adapter, tmp_path: Path) -> tuple[TTSManager, str]:
+    mgr = TTSManager()
+    mgr.set_tts_adapter(adapter)
+    mgr.audio_cache_dir = tmp_path
+    ref = tmp_path / "ref.wav"
+    ref.write_text("fake ref")
+    return mgr, str(ref)
+
+
+def test_stream_tts_delivers_first_block_before_synthesis_finishes(tmp_path: Path) -> None:
+    adapter = StreamingMockAdapter()
+    mgr, ref = _manager(adapter, tmp_path)
+    mgr.audio_cache = AudioCache(tmp_path / "store", max_bytes=1 << 20)
+    try:
+        speech = mgr.stream_tts("こんにちは", ref_audio_path=ref)
+        assert speech.live and speech.format == FORMAT
+
+        assert speech.read(3200, timeout=1) == b"\x01" * 3200
+        assert not speech.done
+        adapter.release.set()
+
+        rest = b""
+        while (data := speech.read(65536, timeout=1)):
+            rest += data
+        assert len(rest) == 3 * 3200
+        path = speech.wait_file(timeout=1)
+        assert path == str(tmp_path / "0.wav")
+        with wave.open(path, "rb") as wav_file:
+            assert wav_file.getnframes() == 4 * 1600
+            assert wav_file.getframerate() == 16000
+
+        again = mgr.stream_tts("こんにちは", ref_audio_path=ref)
+        assert not again.live and again.wait_file(0)
+        assert mgr.cache_stats()["hits"] == 1
+    finally:
+        mgr.shutdown()
+
+
+def test_stream_tts_falls_back_to_file_synthesis_when_stream_request_fails(tmp_path: Path) -> None:
+    adapter = StreamingMockAdapter()
+    adapter.stream_speech = lambda text, **kwargs: (_ for _ in ()).throw(RuntimeError("boom"))
+    mgr, ref = _manager(adapter, tmp_path)
+    try:
+        speech = mgr.stream_tts("hello", ref_audio_path=ref)
+        assert not speech.live
+        assert speech.wait_file(0) == str(tmp_path / "0.wav")
+    finally:
+        mgr.shutdown()
+
+
+def test_stream_tts_is_unavailable_for_non_streaming_adapters(tmp_path: Path) -> None:
+    mgr, ref = _manager(MockTTSAdapter(), tmp_path)
+    try:
+        assert mgr.stream_tts("hello", ref_audio_path=ref) is None
+    finally:
+        mgr.shutdown()
+
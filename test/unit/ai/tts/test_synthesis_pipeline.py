@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai.tts.synthesis_pipeline import synthesize_in_order
+
+
+def test_yields_segments_in_order_even_when_later_ones_finish_first() -> None:
+    delays = {"a": 0.05, "b": 0.0, "c": 0.01}
+
+    def synthesize(text: str) -> str:
+        time.sleep(delays[text])
+        return f"{text}.wav"
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        result = list(synthesize_in_order(["a", "b", "c"], synthesize, executor=executor, lookahead=3))
+
+    assert result == [(0, "a.wav"), (1, "b.wav"), (2, "c.wav")]
+
+
+def test_lookahead_bounds_in_flight_segments() -> None:
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def synthesize(text: str) -> str:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return text
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(synthesize_in_order([str(i) for i in range(8)], synthesize, executor=executor, lookahead=2))
+
+    assert peak <= 2
+
+
+def test_cancel_stops_and_skips_unstarted_segments() -> None:
+    cancel = threading.Event()
+    started: list[str] = []
+
+    def synthesize(text: str) -> str:
+        started.append(text)
+        time.sleep(0.02)
+        return text
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        produced = []
+        for index, path in synthesize_in_order(
+            [str(i) for i in range(10)],
+            synthesize,
+            executor=executor,
+            lookahead=2,
+            cancelled=cancel.is_set,
+        ):
+            produced.append(path)
+            cancel.set()
+
+    assert produced == ["0"]
+    assert len(started) <= 3
+
+
+def test_closing_generator_cancels_pending_segments() -> None:
+    started: list[str] = []
+    gate = threading.Event()
+
+    def synthesize(text: str) -> str:
+        started.append(text)
+        if text == "b":
+            gate.wait(1)
+        return text
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        segments = synthesize_in_order(["a", "b", "c"], synthesize, executor=executor, lookahead=3)
+        assert next(segments) == (0, "a")
+        segments.close()
+        gate.set()
+
+    assert "c" not in started
+
+
+def test_synthesis_errors_propagate() -> None:
+    def synthesize(text: str) -> str:
+        raise TimeoutError("backend timed out")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(TimeoutError):
+            list(synthesize_in_order(["a"], synthesize, executor=executor))
+
+
+def test_next_segment_synthesizes_while_the_current_one_is_consumed() -> None:
+    started = {f"s{i}": threading.Event() for i in range(4)}
+
+    def synthesize(text: str) -> str:
+        started[text].set()
+        return text
+
+    overlapped = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for index, _path in synthesize_in_order(list(started), synthesize, executor=executor, lookahead=2):
+            if index + 1 < len(started):
+                overlapped.append(started[f"s{index + 1}"].wait(1))
+
+    assert overlapped == [True, True, True]
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 from pathlib import Path
 
-from ai.vision.message_content import normalize_anthropic_user_content, normalize_openai_messages
+from ai.vision.message_content import (
+    externalize_embedded_images,
+    normalize_anthropic_user_content,
+    normalize_openai_messages,
+)
 from ai.vision.service import ChatVisionService
 from core.media.chat_attachments import resolve_chat_attachments
+from core.media.image_blobs import image_blob_store
 
 
 class _NativeAdapter:
@@ -45,7 +51,8 @@ def test_chat_vision_service_prefers_native_image_blocks(tmp_path: Path):
     assert prepared.content[0] == {"type": "text", "text": "What is here?\n\nImage attachments: moon.png"}
     assert prepared.content[1]["type"] == "local_image"
     assert prepared.content[1]["path"] == str(image.path)
-    assert prepared.content[1]["data"] == base64.b64encode(b"image-bytes").decode("ascii")
+    assert prepared.content[1]["sha256"] == hashlib.sha256(b"image-bytes").hexdigest()
+    assert "data" not in prepared.content[1]
 
 
 def test_chat_vision_service_falls_back_to_moondream_for_text_only_adapter(tmp_path: Path):
@@ -89,6 +96,57 @@ def test_persisted_image_data_survives_deleted_source_file(tmp_path: Path):
     assert anthropic[1]["source"]["data"] == base64.b64encode(b"image-bytes").decode("ascii")
 
 
+def test_repeated_history_images_share_one_blob_and_one_encoding(tmp_path: Path):
+    image = _image_attachment(tmp_path)
+    turns = [
+        ChatVisionService().prepare(f"Turn {index}", [image], adapter=_NativeAdapter())
+        for index in range(3)
+    ]
+    messages = [{"role": "user", "content": turn.content} for turn in turns]
+
+    assert len({turn.content[1]["sha256"] for turn in turns}) == 1
+    before = image_blob_store().stats()
+    openai = normalize_openai_messages(messages, supports_native_vision=True)
+    after = image_blob_store().stats()
+
+    urls = [message["content"][1]["image_url"]["url"] for message in openai]
+    assert len(set(urls)) == 1
+    lookups = after["hits"] + after["misses"] - before["hits"] - before["misses"]
+    assert lookups == 1
+
+    encoded_blocks: dict = {}
+    anthropic = [
+        normalize_anthropic_user_content(turn.content, encoded_blocks) for turn in turns
+    ]
+    assert len({content[1]["source"]["data"] for content in anthropic}) == 1
+    assert image_blob_store().stats()["hits"] + image_blob_store().stats()["misses"] == (
+        after["hits"] + after["misses"] + 1
+    )
+    assert openai[0] is not messages[0]
+    assert messages[0]["content"][1]["type"] == "local_image"
+
+
+def test_legacy_embedded_image_data_moves_to_the_blob_store(tmp_path: Path):
+    embedded = base64.b64encode(b"legacy-bytes").decode("ascii")
+    block = {
+        "type": "local_image",
+        "media_type": "image/png",
+        "name": "old.png",
+        "path": str(tmp_path / "gone.png"),
+        "data": embedded,
+    }
+    messages = [{"role": "user", "content": [{"type": "text", "text": "Hi"}, block]}]
+
+    assert normalize_anthropic_user_content([block])[0]["source"]["data"] == embedded
+    assert externalize_embedded_images(messages) == 1
+    assert externalize_embedded_images(messages) == 0
+
+    assert "data" not in block
+    assert block["sha256"] == hashlib.sha256(b"legacy-bytes").hexdigest()
+    openai = normalize_openai_messages(messages, supports_native_vision=True)
+    assert openai[0]["content"][1]["image_url"]["url"].endswith(embedded)
+
+
 def test_stale_legacy_image_path_is_safely_omitted(tmp_path: Path):
     missing = tmp_path / "missing.png"
     content = [
@@ -11,6 +11,7 @@ import pytest
 import yaml
 
 from application.runtime.tasks import _create_task, _get_task
+from application.story import generation
 from application.story.coordinator import apply_story_resource_bindings
 from application.story.generation import (
     ConfigStoryAuthorModel,
@@ -535,3 +536,150 @@ def test_failed_eval_includes_spent_cost(tmp_path: Path) -> None:
     assert report["cases"][0]["passed"] is False
     assert report["generationCost"]["requests"] == 4
     assert report["generationCost"]["estimatedTokens"] > 0
+
+
+class ConcurrencyProbeModel(ScriptedModel):
+    def __init__(self, artifacts: Mapping[str, Mapping[str, Any]]) -> None:
+        super().__init__(artifacts)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.requests: dict[str, Mapping[str, Any]] = {}
+
+    def complete(self, request: Mapping[str, Any]) -> Mapping[str, Any]:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.requests[str(request.get("stage"))] = request
+        try:
+            if request.get("stage") == "state":
+                self.barrier.wait()
+            return super().complete(request)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_tasks_share_provider_slots_and_record_stage_cost(
+    tmp_path: Path,
+) -> None:
+    model = ConcurrencyProbeModel(stage_artifacts())
+    service, _ = service_at(tmp_path, model)
+    tasks = [
+        service.create("Overlap two tasks.", task_id=f"dag-task-{index}")
+        for index in range(2)
+    ]
+    results: dict[str, Mapping[str, Any]] = {}
+    threads = [
+        threading.Thread(
+            target=lambda task_id=task["id"]: results.update(
+                {task_id: service.run(task_id)}
+            )
+        )
+        for task in tasks
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    result = results["dag-task-0"]
+    assert {item["status"] for item in results.values()} == {"succeeded"}
+    assert model.peak == 2
+    assert result["completedStages"] == [stage.value for stage in StoryGenerationStage]
+    assert set(model.requests["resources"]["completedArtifacts"]) == {
+        "requirements",
+        "bible",
+        "characters",
+        "state",
+        "narrative",
+        "logic",
+    }
+    stages = result["cost"]["stages"]
+    assert set(stages) == {stage.value for stage in StoryGenerationStage}
+    assert all(
+        item["requests"] == 1 and item["wallMs"] >= 0 for item in stages.values()
+    )
+    assert sum(item["estimatedTokens"] for item in stages.values()) == (
+        result["cost"]["estimatedTokens"]
+    )
+
+
+def test_provider_cap_serializes_stages(tmp_path: Path) -> None:
+    model = ConcurrencyProbeModel(stage_artifacts())
+    model.barrier = threading.Barrier(1)
+    flags = enabled_flags()
+    repository = StoryGenerationRepository(flags, tmp_path)
+    service = StoryGenerationService(flags, repository, model, provider_concurrency=1)
+    task = service.create("One request at a time.", task_id="capped-task")
+
+    assert service.run(task["id"])["status"] == "succeeded"
+    assert model.peak == 1
+    assert model.calls == [stage.value for stage in StoryGenerationStage]
+
+
+def test_incremental_validation_reuses_simulation_for_text_patches(
+    monkeypatch,
+) -> None:
+    source = campus_mystery_source()
+    source["status"] = "draft"
+    source["narrativeGraph"]["nodes"][0]["title"] = "The key is a replica"
+    bible = {"secrets": ["The key is a replica"]}
+    validator = StoryDraftValidator()
+    first = validator.validate(source, story_bible=bible)
+    assert "secret.exposed" in {item.code for item in first.issues}
+
+    repaired, paths = StoryPatchApplier().apply_tracked(
+        source,
+        {
+            "baseVersion": 1,
+            "operations": [
+                {
+                    "op": "replace",
+                    "path": "/narrativeGraph/nodes/0/title",
+                    "value": "An old door",
+                }
+            ],
+        },
+        base_version=1,
+    )
+    assert paths == ("/narrativeGraph/nodes/0/title",)
+
+    def no_simulation(*args, **kwargs):
+        raise AssertionError("text-only patch must reuse the simulation")
+
+    monkeypatch.setattr(generation, "StorySimulator", no_simulation)
+    report = validator.validate(
+        repaired, story_bible=bible, previous=first, changed_paths=paths
+    )
+    monkeypatch.undo()
+
+    assert report == validator.validate(repaired, story_bible=bible)
+    assert report.valid is True
+
+
+def test_patch_reports_containers_for_shifting_operations() -> None:
+    source = campus_mystery_source()
+    _, paths = StoryPatchApplier().apply_tracked(
+        source,
+        {
+            "baseVersion": 1,
+            "operations": [
+                {"op": "remove", "path": "/narrativeGraph/nodes/0/choices/0"},
+                {
+                    "op": "replace-node",
+                    "nodeId": "truth-ending",
+                    "value": source["narrativeGraph"]["nodes"][2],
+                },
+                {"op": "add", "path": "/metadata/a~1b", "value": 1},
+            ],
+        },
+        base_version=1,
+    )
+
+    assert paths == (
+        "/narrativeGraph/nodes/0/choices",
+        "/narrativeGraph/nodes/2",
+        "/metadata/a~1b",
+    )
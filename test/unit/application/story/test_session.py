@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Mapping
 from copy import deepcopy
 import json
 
@@ -12,13 +13,20 @@ from application.story import (
     StoryProgramMismatchError,
     StorySession,
 )
-from application.story.persistence import global_progress_filename
+from application.story.persistence import (
+    GlobalEffectOutboxEntry,
+    _json_value,
+    global_progress_filename,
+    story_state_to_payload,
+)
+from application.story.session import SceneTurnCommand
 from config.feature_flags import (
     FeatureDisabledError,
     FeatureFlag,
     FeatureFlagConfigManager,
 )
 from core.story import (
+    EffectSpec,
     SelectChoice,
     StoryCompiler,
     StoryRuntime,
@@ -346,3 +354,284 @@ def test_long_story_ids_keep_distinct_global_progress_files() -> None:
     assert len(first) <= 128
     assert first[:100] == second[:100]
     assert global_progress_filename(first) != global_progress_filename(second)
+
+
+def test_journaled_session_recovers_same_document_as_memory(tmp_path) -> None:
+    runtime = _runtime()
+    repository = JsonStorySessionRepository(
+        tmp_path / "session", snapshot_interval=1_000
+    )
+    global_store = JsonGlobalStoryProgressStore(tmp_path / "global")
+    session = StorySession.create(
+        runtime,
+        _flags(),
+        command_id="start-1",
+        repository=repository,
+        global_store=global_store,
+        history_entries=({"role": "user", "content": "开始"},),
+    )
+    snapshot_bytes = repository.path.stat().st_size
+    session.execute(
+        _choice(session),
+        history_entries=(
+            {"role": "user", "content": "开始"},
+            {"role": "assistant", "content": "你来到校门口。"},
+        ),
+    )
+    session.record_scene_turn(
+        SceneTurnCommand("scene-1", "message-1", "四处看看"),
+        result_payload={"revision": session.active_branch.state.revision},
+    )
+    session.replace_history_entries(({"role": "user", "content": "重来"},))
+    session.fork("alternate", generation=1)
+    session.execute(_choice(session, "choice-alt"))
+    session.switch_branch("main")
+    session.execute(_enter_with_key(session))
+    session.restore_generation(2)
+
+    assert repository.path.stat().st_size == snapshot_bytes
+    assert len(repository.journal_path.read_text(encoding="utf-8").splitlines()) == 9
+
+    recovered = StorySession.recover(
+        runtime,
+        _flags(),
+        repository=JsonStorySessionRepository(tmp_path / "session"),
+        global_store=global_store,
+    )
+
+    assert _json_value(recovered.to_payload()) == _json_value(session.to_payload())
+
+
+def test_version_2_documents_with_full_checkpoints_still_load(tmp_path) -> None:
+    runtime = _runtime()
+    repository = JsonStorySessionRepository(tmp_path / "session")
+    global_store = JsonGlobalStoryProgressStore(tmp_path / "global")
+    session = StorySession.create(
+        runtime,
+        _flags(),
+        command_id="start-1",
+        repository=repository,
+        global_store=global_store,
+    )
+    session.execute(_choice(session))
+    session.execute(_enter_with_key(session))
+
+    document = _json_value(session.to_payload())
+    with repository.path.open(encoding="utf-8") as file:
+        assert json.load(file)["version"] == 3
+    # v2 wrote every checkpoint with its full lists and state, and had no journal.
+    for branch_id, branch in document["branches"].items():
+        checkpoints = session.branches[branch_id].checkpoints
+        branch["checkpoints"] = [
+            {
+                **_json_value(item.to_payload()),
+                "state": _json_value(story_state_to_payload(item.state)),
+            }
+            for item in checkpoints
+        ]
+    document["version"] = 2
+    repository.journal_path.unlink(missing_ok=True)
+    with repository.path.open("w", encoding="utf-8") as file:
+        json.dump(document, file)
+
+    recovered = StorySession.recover(
+        runtime,
+        _flags(),
+        repository=JsonStorySessionRepository(tmp_path / "session"),
+        global_store=global_store,
+    )
+
+    assert _json_value(recovered.to_payload()) == _json_value(session.to_payload())
+
+
+def test_journal_compacts_into_snapshot_and_ignores_torn_tail(tmp_path) -> None:
+    runtime = _runtime()
+    repository = JsonStorySessionRepository(tmp_path / "session", snapshot_interval=3)
+    global_store = JsonGlobalStoryProgressStore(tmp_path / "global")
+    session = StorySession.create(
+        runtime,
+        _flags(),
+        command_id="start-1",
+        repository=repository,
+        global_store=global_store,
+    )
+    for index in range(3):
+        session.record_scene_turn(
+            SceneTurnCommand(f"scene-{index}", f"message-{index}", "看看"),
+            result_payload={},
+        )
+
+    assert not repository.journal_path.exists()
+    with repository.path.open(encoding="utf-8") as file:
+        assert json.load(file)["journalSeq"] == 3
+
+    session.execute(_choice(session))
+    with repository.journal_path.open("a", encoding="utf-8") as file:
+        file.write('{"op": "switch", "bran')
+
+    recovered = StorySession.recover(
+        runtime,
+        _flags(),
+        repository=repository,
+        global_store=global_store,
+    )
+    assert _json_value(recovered.to_payload()) == _json_value(session.to_payload())
+
+
+def test_appends_after_torn_tail_recovery_stay_loadable(tmp_path) -> None:
+    runtime = _runtime()
+    repository = JsonStorySessionRepository(tmp_path / "session")
+    global_store = JsonGlobalStoryProgressStore(tmp_path / "global")
+    session = StorySession.create(
+        runtime,
+        _flags(),
+        command_id="start-1",
+        repository=repository,
+        global_store=global_store,
+    )
+    session.execute(_choice(session))
+    with repository.journal_path.open("a", encoding="utf-8") as file:
+        file.write('{"op": "switch", "bran')
+
+    reopened = JsonStorySessionRepository(tmp_path / "session")
+    recovered = StorySession.recover(
+        runtime, _flags(), repository=reopened, global_store=global_store
+    )
+    for index in range(2):
+        recovered.record_scene_turn(
+            SceneTurnCommand(f"scene-{index}", f"message-{index}", "看看"),
+            result_payload={},
+        )
+
+    assert repository.journal_path.read_bytes().endswith(b"}\n")
+    reloaded = StorySession.recover(
+        runtime,
+        _flags(),
+        repository=JsonStorySessionRepository(tmp_path / "session"),
+        global_store=global_store,
+    )
+    assert _json_value(reloaded.to_payload()) == _json_value(recovered.to_payload())
+
+
+def test_outbox_flush_writes_global_progress_and_session_once(tmp_path) -> None:
+    runtime = _runtime(global_progress=True)
+    repository = JsonStorySessionRepository(tmp_path / "session")
+    global_store = JsonGlobalStoryProgressStore(tmp_path / "global")
+    session = StorySession.create(
+        runtime,
+        _flags(),
+        command_id="start-1",
+        repository=repository,
+        global_store=global_store,
+    )
+    session.outbox.extend(
+        GlobalEffectOutboxEntry(
+            id=f"manual-{index}",
+            source_branch_id="main",
+            source_command_id=f"manual-{index}",
+            effects=(EffectSpec("increment", ("world.progress", 1)),),
+        )
+        for index in range(5)
+    )
+    saves = []
+    appends = []
+    original_save = global_store.save
+    original_append = repository.append
+    global_store.save = lambda progress: (saves.append(1), original_save(progress))
+    repository.append = lambda record, **kwargs: (
+        appends.append(record["op"]),
+        original_append(record, **kwargs),
+    )
+
+    session.flush_global_outbox()
+
+    assert len(saves) == 1
+    assert appends == ["outbox"]
+    assert global_store.load(runtime.program).variables["world.progress"] == 5
+    assert session.outbox == []
+
+
+def _shallow_json(value: object) -> object:
+    return dict(value) if isinstance(value, Mapping) else list(value)
+
+
+def _scene_turns(session: StorySession, count: int, prefix: str) -> None:
+    for index in range(count):
+        history = list(session.active_branch.history_entries) + [
+            {"role": "user", "content": f"{prefix} 第{index}轮提问"},
+            {"role": "assistant", "content": f"{prefix} 第{index}轮回答" * 2},
+        ]
+        session.record_scene_turn(
+            SceneTurnCommand(f"{prefix}-{index}", f"{prefix}-m{index}", "看看"),
+            result_payload={"turn": index},
+            history_entries=history,
+        )
+
+
+def test_checkpoints_share_history_and_round_trip_as_deltas(tmp_path) -> None:
+    runtime = _runtime()
+    repository = JsonStorySessionRepository(tmp_path / "session")
+    global_store = JsonGlobalStoryProgressStore(tmp_path / "global")
+    session = StorySession.create(
+        runtime,
+        _flags(),
+        command_id="start-1",
+        repository=repository,
+        global_store=global_store,
+    )
+    _scene_turns(session, 6, "main")
+    fork = session.fork("alternate", generation=4)
+    _scene_turns(session, 3, "alt")
+
+    first, last = fork.checkpoints[1], fork.checkpoints[-1]
+    assert last.history_entries[0] is first.history_entries[0]
+    assert last.idempotency[0] is first.idempotency[0]
+    payload = session.to_payload()
+    assert "historyDelta" in payload["branches"]["alternate"]["checkpoints"][-1]
+    assert "state" not in payload["branches"]["alternate"]["checkpoints"][-1]
+
+    repository.save(payload)
+    recovered = StorySession.recover(
+        runtime,
+        _flags(),
+        repository=repository,
+        global_store=global_store,
+    )
+
+    assert _json_value(recovered.to_payload()) == _json_value(payload)
+    checkpoints = recovered.active_branch.checkpoints
+    assert checkpoints[-1].history_entries[0] is checkpoints[1].history_entries[0]
+    recovered.restore_generation(5)
+    expected = session.branches["main"].checkpoints[4].state
+    assert recovered.active_branch.state == expected
+
+
+def test_checkpoints_across_branches_hold_each_turn_once() -> None:
+    session = StorySession.create(_runtime(), _flags(), command_id="start-1")
+    _scene_turns(session, 5, "branch-0")
+    for index in range(1, 4):
+        session.fork(f"branch-{index}")
+        _scene_turns(session, 5, f"branch-{index}")
+
+    checkpoints = list(
+        {
+            id(checkpoint): checkpoint
+            for branch in session.branches.values()
+            for checkpoint in branch.checkpoints
+        }.values()
+    )
+    entries = {id(item) for checkpoint in checkpoints for item in checkpoint.history_entries}
+    records = {id(item) for checkpoint in checkpoints for item in checkpoint.idempotency}
+
+    # 20 scene turns, each adding a user and an assistant entry and one record.
+    assert len(entries) == 2 * 20
+    assert len(records) == len(checkpoints) == 20 + 1
+
+    payload = session.to_payload()
+    delta_bytes = len(json.dumps(payload, ensure_ascii=False, default=_shallow_json))
+    for branch_id, branch in session.branches.items():
+        payload["branches"][branch_id]["checkpoints"] = [
+            checkpoint.to_payload() for checkpoint in branch.checkpoints
+        ]
+    full_bytes = len(json.dumps(payload, ensure_ascii=False, default=_shallow_json))
+    assert delta_bytes * 3 < full_bytes
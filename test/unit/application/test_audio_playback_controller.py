@@ -209,3 +209,83 @@ def test_controller_rejects_terminal_signal_from_a_different_renderer() -> None:
     thread.join(timeout=1)
 
     assert result["value"].state is PlaybackState.FINISHED
+
+
+class _FakeChannel:
+    def __init__(self) -> None:
+        self.played: list[object] = []
+        self.queued: list[object] = []
+        self._lock = threading.Lock()
+
+    def play(self, sound) -> None:
+        with self._lock:
+            self.played.append(sound)
+
+    def queue(self, sound) -> None:
+        with self._lock:
+            self.queued.append(sound)
+
+    def get_queue(self):
+        return None
+
+    def get_busy(self) -> bool:
+        return False
+
+    def stop(self) -> None:
+        pass
+
+
+def test_pygame_backend_starts_streamed_speech_before_synthesis_finishes() -> None:
+    from ai.tts.pcm_stream import StreamingSpeech
+    from application.runtime.audio_playback_controller import PygameVoicePlaybackBackend
+    from sdk.adapters.tts import PcmFormat
+
+    speech = StreamingSpeech("pending.wav", PcmFormat(sample_rate=8000))
+    channel = _FakeChannel()
+    backend = PygameVoicePlaybackBackend(
+        channel=channel,
+        sound_factory=MagicMock(side_effect=AssertionError("file playback")),
+        ui_updates=SimpleNamespace(post_tts_play=MagicMock(), post_tts_skip=MagicMock()),
+        poll_interval_seconds=0.01,
+        pcm_sound_factory=lambda fmt: lambda data: MagicMock(pcm=data),
+    )
+    controller = VoicePlaybackController(backend)
+    on_started = MagicMock()
+    thread, result = _start_playback(controller, on_started=on_started, audio_stream=speech)
+
+    speech.feed(b"\x01\x00" * 4000)
+    deadline = time.monotonic() + 1
+    while not on_started.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    on_started.assert_called_once_with()
+    assert thread.is_alive() and not speech.done
+
+    speech.feed(b"\x02\x00" * 4000)
+    speech.finish(True)
+    thread.join(timeout=1)
+
+    assert result["value"].state is PlaybackState.FINISHED
+    assert [s.pcm for s in channel.played] == [b"\x01\x00" * 2000]
+    assert b"".join(s.pcm for s in channel.played + channel.queued) == (
+        b"\x01\x00" * 4000 + b"\x02\x00" * 4000
+    )
+
+
+def test_frontend_backend_posts_streamed_speech_once_file_is_complete() -> None:
+    from ai.tts.pcm_stream import StreamingSpeech
+    from sdk.adapters.tts import PcmFormat
+
+    speech = StreamingSpeech("alice.wav", PcmFormat(sample_rate=8000))
+    ui_updates = SimpleNamespace(post_tts_play=MagicMock(), post_tts_skip=MagicMock())
+    controller = VoicePlaybackController(FrontendVoicePlaybackBackend(ui_updates))
+    thread, result = _start_playback(controller, audio_stream=speech)
+
+    time.sleep(0.05)
+    ui_updates.post_tts_play.assert_not_called()
+    speech.finish(True)
+    playback_id = _wait_for_post_tts_play(ui_updates)["playback_id"]
+    assert ui_updates.post_tts_play.call_args.args[1] == "alice.wav"
+    assert controller.handle_signal(playback_id, "finished") is True
+    thread.join(timeout=1)
+
+    assert result["value"].state is PlaybackState.FINISHED
@@ -1,6 +1,7 @@
 import unittest
 
 from application.runtime.event_sink import (
+    SnapshotStore,
     fold_event_into_snapshot,
     make_empty_chat_snapshot,
 )
@@ -641,5 +642,60 @@ class StoryEventSinkTests(unittest.TestCase):
         self.assertEqual(snapshot["story"]["currentNodeId"], "gate")
 
 
+class SnapshotStoreTests(unittest.TestCase):
+    def _events(self):
+        return [
+            {"seq": 1, "type": "status.change", "status": "generating"},
+            {"seq": 2, "type": "history.replace", "entries": [{"text": "hi"}]},
+            {"seq": 3, "type": "dialog.end", "fullHtml": "<p>hello</p>", "speaker": "Mio"},
+            {"seq": 4, "type": "tts.play", "playbackId": "v", "url": "/a.wav"},
+            {"seq": 5, "type": "tts.skip", "playbackId": "v"},
+            {"seq": 6, "type": "busy.show", "text": "..."},
+        ]
+
+    def test_store_matches_copying_fold(self):
+        store = SnapshotStore()
+        expected = make_empty_chat_snapshot()
+        for event in self._events():
+            store.apply(event)
+            expected = fold_event_into_snapshot(expected, event)
+            self.assertEqual(store.snapshot(), expected)
+
+    def test_delta_since_patches_an_older_snapshot_to_current(self):
+        store = SnapshotStore()
+        events = self._events()
+        for event in events[:2]:
+            store.apply(event)
+        base = store.snapshot()
+        history = base["historyEntries"]
+        for event in events[2:]:
+            store.apply(event)
+
+        patch = store.delta_since(2)
+        paths = {op["path"] for op in patch}
+        self.assertNotIn("/historyEntries", paths)
+        self.assertIn("/dialogText", paths)
+        for op in patch:
+            base[op["path"][1:]] = op["value"]
+        self.assertEqual(base, store.snapshot())
+        # 未改动的字段与存储共享同一对象
+        self.assertIs(store.snapshot()["historyEntries"], history)
+        self.assertEqual(store.delta_since(6), [])
+        self.assertIsNone(store.delta_since(99))
+
+    def test_replace_emits_remove_ops_and_old_seqs_are_compacted(self):
+        store = SnapshotStore(history_limit=2)
+        store.apply({"seq": 1, "type": "busy.show", "text": "wait"})
+        store.apply({"seq": 2, "type": "snapshot", "snapshot": {"dialogText": "x", "eventSeq": 2}})
+
+        self.assertIn({"op": "remove", "path": "/busyText"}, store.delta_since(1))
+        store.apply({"seq": 3, "type": "cg.show", "url": "a/b"})
+        self.assertIsNone(store.delta_since(1))
+        self.assertEqual(
+            sorted(store.delta_since(2), key=lambda op: op["path"]),
+            [{"op": "add", "path": "/cgPath", "value": "a/b"}, {"op": "add", "path": "/eventSeq", "value": 3}],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,12 @@
 """Unit tests for the application TTS handler chain."""
 
-from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from unittest.mock import ANY, MagicMock
 
 import pytest
 
+from core.messaging.queue import ClearableQueue
 from sdk.messages import LLMDialogMessage
 from application.chat.handlers.registry import TtsMessageDispatcher
 from application.chat.handlers.tts import (
@@ -47,8 +50,89 @@ class TestDefaultCharacterTtsHandler:
             "voice.wav",
             is_system_message=False,
             effect="",
+            audio_stream=None,
+            synthesis_started_at=ANY,
         )
 
+    def test_upcoming_lines_are_prerendered_by_voice_and_next_speaker_prefetched(
+        self, mock_app_runtime, monkeypatch
+    ):
+        runtime = mock_app_runtime
+        runtime.tts_manager = MagicMock()
+        runtime.tts_manager.generate_tts.return_value = "voice.wav"
+        runtime.tts_queue = ClearableQueue()
+        runtime.tts_queue.put(LLMDialogMessage(name="Other", text="Hi", asset_id=None))
+        runtime.tts_queue.put(LLMDialogMessage(name="TestChar", text="Again", asset_id=None))
+        runtime.text_processor.remove_parentheses.side_effect = lambda s: s
+        monkeypatch.setattr("application.chat.handlers.tts._config", runtime.config)
+        monkeypatch.setattr("application.chat.handlers.tts.tts_emit_to_ui_queue", MagicMock())
+
+        DefaultCharacterTtsHandler().handle(
+            LLMDialogMessage(name="TestChar", text="Hello", asset_id=None)
+        )
+
+        runtime.tts_manager.warm_up.assert_not_called()
+        runtime.tts_manager.schedule_warm_up.assert_called_once()
+        assert runtime.tts_manager.schedule_warm_up.call_args.args[0] == ["Again"]
+        assert runtime.tts_manager.schedule_warm_up.call_args.kwargs["model_info"]["character_name"] == "TestChar"
+        prefetched = runtime.tts_manager.prefetch_model.call_args.args[0]
+        assert prefetched["character_name"] == "Other"
+        # 队列中的台词不被消费，发出顺序不变
+        assert runtime.tts_queue.qsize() == 2
+
+
+class _CancelAfterFirstQueue(Queue):
+    def is_cancelled(self) -> bool:
+        return self.qsize() > 0
+
+
+class TestSplitSentencePipeline:
+    @pytest.fixture
+    def split_runtime(self, mock_app_runtime, monkeypatch, tmp_path):
+        runtime = mock_app_runtime
+        runtime.config.config.api_config.tts_split_enabled = True
+        runtime.config.config.api_config.tts_max_sentence_length = 2
+        runtime.text_processor.remove_parentheses.side_effect = lambda s: s
+        monkeypatch.setattr("application.chat.handlers.tts._config", runtime.config)
+        names = {"一。": "one", "二。": "two", "三。": "three"}
+
+        def generate_tts(text, **kwargs):
+            path = tmp_path / f"{names[text]}.wav"
+            path.write_bytes(b"RIFF")
+            return str(path)
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        runtime.tts_manager = MagicMock()
+        runtime.tts_manager.synthesis_executor.return_value = executor
+        runtime.tts_manager.generate_tts.side_effect = generate_tts
+        yield runtime
+        executor.shutdown(wait=True)
+
+    def test_segments_are_emitted_in_order(self, split_runtime):
+        DefaultCharacterTtsHandler().handle(
+            LLMDialogMessage(name="TestChar", text="一。二。三。", asset_id=None)
+        )
+
+        queue = split_runtime.audio_path_queue
+        outputs = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert [o.audio_path.rsplit("/", 1)[-1] for o in outputs] == [
+            "one.wav",
+            "two.wav",
+            "three.wav",
+        ]
+        assert [o.is_final_segment for o in outputs] == [False, False, True]
+        assert outputs[0].text == "一。二。三。"
+
+    def test_turn_cancel_stops_remaining_segments(self, split_runtime):
+        split_runtime.audio_path_queue = _CancelAfterFirstQueue()
+
+        DefaultCharacterTtsHandler().handle(
+            LLMDialogMessage(name="TestChar", text="一。二。三。", asset_id=None)
+        )
+
+        assert split_runtime.audio_path_queue.qsize() == 1
+        assert split_runtime.tts_manager.generate_tts.call_count <= 3
+
 
 class TestSpecializedHandlers:
     def test_bgm_handler_matches_bgm(self, mock_app_runtime):
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+from pathlib import Path
+
+from core.media.image_blobs import ImageBlobStore
+
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path: Path):
+    store = ImageBlobStore(tmp_path / "blobs")
+
+    digest = store.put(b"image-bytes")
+
+    assert digest == hashlib.sha256(b"image-bytes").hexdigest()
+    assert store.put(b"image-bytes") == digest
+    assert store.path_for(digest) == tmp_path / "blobs" / digest[:2] / digest
+    assert [path.name for path in (tmp_path / "blobs").rglob("*") if path.is_file()] == [
+        digest
+    ]
+    assert store.read(digest) == b"image-bytes"
+
+
+def test_encoded_blobs_are_cached_within_a_byte_budget(tmp_path: Path):
+    store = ImageBlobStore(tmp_path / "blobs", encoded_cache_bytes=24)
+    first = store.put(b"a" * 12)
+    second = store.put(b"b" * 12)
+
+    assert store.encoded(first) == base64.b64encode(b"a" * 12).decode("ascii")
+    store.path_for(first).unlink()
+    assert store.encoded(first) == base64.b64encode(b"a" * 12).decode("ascii")
+    store.encoded(second)
+
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["encodedEntries"]) == (1, 2, 1)
+    assert stats["encodedBytes"] <= 24
+    assert store.encoded(first) is None
+
+
+def test_tampered_or_unknown_blobs_are_not_served(tmp_path: Path):
+    store = ImageBlobStore(tmp_path / "blobs")
+    digest = store.put(b"image-bytes")
+    store.path_for(digest).write_bytes(b"other-bytes")
+
+    assert store.encoded(digest) is None
+    assert store.read("0" * 64) is None
+    assert store.read("../escape") is None
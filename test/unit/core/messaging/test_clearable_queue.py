@@ -75,3 +75,12 @@ def test_standard_get_put_works():
     q.task_done()
     assert q.empty()
 
+
+
+def test_peek_does_not_consume_items():
+    q = ClearableQueue()
+    for i in range(4):
+        q.put(i)
+    assert q.peek(2) == [0, 1]
+    assert q.peek() == [0, 1, 2, 3]
+    assert q.qsize() == 4
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pickle
+import random
+
+from core.story.persistent import PersistentVector
+
+
+def test_vector_operations_match_list_semantics() -> None:
+    rng = random.Random(3)
+    for _ in range(300):
+        expected = [rng.randrange(100) for _ in range(rng.randrange(80))]
+        vector = PersistentVector(expected)
+        for _ in range(8):
+            operation = rng.randrange(4)
+            if operation == 0:
+                items = [rng.randrange(100) for _ in range(rng.randrange(70))]
+                vector, expected = vector.extend(items), expected + items
+            elif operation == 1:
+                count = rng.randrange(len(expected) + 2)
+                vector, expected = vector.drop(count), expected[count:]
+            elif operation == 2:
+                count = rng.randrange(len(expected) + 2)
+                vector, expected = vector.take(count), expected[:count]
+            else:
+                items = expected[: rng.randrange(len(expected) + 1)] + [7]
+                vector, expected = vector.rebase(items), items
+            assert list(vector) == expected
+            assert [vector[index] for index in range(-len(expected), 0)] == expected
+
+
+def test_versions_share_storage_and_survive_pickling() -> None:
+    base = PersistentVector(range(100))
+    longer = base.append(100)
+    trimmed = longer.drop(40).take(30)
+
+    assert base._chunks[0] is longer._chunks[0]
+    assert trimmed._chunks[0] is base._chunks[1]
+    assert list(trimmed) == list(range(40, 70))
+    assert len(base) == 100 and longer[-1] == 100
+    assert pickle.loads(pickle.dumps(trimmed)) == trimmed
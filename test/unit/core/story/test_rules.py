@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import random
+from collections import defaultdict, deque
+from dataclasses import replace
+
+import pytest
+
+from core.story import (
+    PortRef,
+    RuleEdge,
+    RuleEvaluator,
+    RuleGraph,
+    RuleNode,
+    StoryCompiler,
+    build_rule_plan,
+    parse_story_project,
+    story_program_json,
+)
+
+from .story_fixtures import campus_mystery_source
+
+
+@pytest.fixture
+def program():
+    return StoryCompiler().compile(parse_story_project(campus_mystery_source()))
+
+
+def _reference_unlocks(graph: RuleGraph, variables) -> frozenset[str]:
+    """The queue-based evaluation the compiled plan replaced."""
+    incoming = defaultdict(lambda: defaultdict(list))
+    outgoing = defaultdict(set)
+    indegree = {node.id: 0 for node in graph.nodes}
+    for edge in graph.edges:
+        incoming[edge.target.node_id][edge.target.port].append(
+            (edge.source.node_id, edge.source.port)
+        )
+        if edge.target.node_id not in outgoing[edge.source.node_id]:
+            outgoing[edge.source.node_id].add(edge.target.node_id)
+            indegree[edge.target.node_id] += 1
+    ready = deque(sorted(node_id for node_id, degree in indegree.items() if degree == 0))
+    nodes = graph.by_id
+    outputs = {}
+    unlocked = set()
+    while ready:
+        node_id = ready.popleft()
+        node = nodes[node_id]
+        values = {
+            port: [outputs[source] for source in sources if source in outputs]
+            for port, sources in incoming[node_id].items()
+        }
+        first = values.get("input") or values.get("when") or [None]
+        if node.type == "metric-ref":
+            outputs[(node_id, "value")] = variables.get(node.config["variable"])
+        elif node.type == "condition.gte":
+            outputs[(node_id, "result")] = first[0] >= node.config["value"]
+        elif node.type == "all":
+            outputs[(node_id, "result")] = all(values.get("input", ()))
+        elif node.type == "any":
+            outputs[(node_id, "result")] = any(values.get("input", ()))
+        elif node.type == "not":
+            outputs[(node_id, "result")] = not bool(first[0])
+        elif node.type == "unlock" and bool(first[0]):
+            unlocked.add(node.config["storyNodeId"])
+        for target in sorted(outgoing.get(node_id, ())):
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                ready.append(target)
+    return frozenset(unlocked)
+
+
+def _synthetic_graph(rng: random.Random, variables: int, conditions: int) -> RuleGraph:
+    nodes = []
+    edges = []
+
+    def link(source: str, port: str, target: str, target_port: str) -> None:
+        edges.append(RuleEdge(PortRef(source, port), PortRef(target, target_port)))
+
+    for index in range(variables):
+        nodes.append(RuleNode(f"ref-{index}", "metric-ref", {"variable": f"v{index}"}))
+    booleans = []
+    for index in range(conditions):
+        node_id = f"gte-{index}"
+        nodes.append(RuleNode(node_id, "condition.gte", {"value": rng.randrange(10)}))
+        link(f"ref-{rng.randrange(variables)}", "value", node_id, "input")
+        booleans.append(node_id)
+    for index in range(conditions):
+        node_type = rng.choice(("all", "any", "not"))
+        node_id = f"{node_type}-{index}"
+        nodes.append(RuleNode(node_id, node_type, {}))
+        for source in rng.sample(booleans, 1 if node_type == "not" else 3):
+            link(source, "result", node_id, "input")
+        booleans.append(node_id)
+        unlock_id = f"unlock-{index}"
+        nodes.append(RuleNode(unlock_id, "unlock", {"storyNodeId": f"story-{index % 50}"}))
+        link(node_id, "result", unlock_id, "when")
+    rng.shuffle(nodes)
+    return RuleGraph(nodes=tuple(nodes), edges=tuple(edges))
+
+
+def test_compiler_emits_topological_plan_outside_program_json(program) -> None:
+    plan = program.rule_plan
+
+    assert plan is not None and plan.graph is program.rule_graph
+    assert plan.node_ids == ("trust-metric", "trust-threshold", "unlock-old-school")
+    assert plan.inputs[2] == (("when", (1,)),)
+    assert plan.dependents == ((1,), (2,), ())
+    assert dict(plan.variable_readers) == {"trust.ling": (0,)}
+    assert "rule_plan" not in story_program_json(program)
+
+
+def test_incremental_evaluation_matches_full_evaluation(program) -> None:
+    rng = random.Random(7)
+    graph = _synthetic_graph(rng, variables=40, conditions=200)
+    synthetic = replace(program, rule_graph=graph, rule_plan=build_rule_plan(graph))
+    evaluator = RuleEvaluator()
+    variables = {f"v{index}": rng.randrange(10) for index in range(40)}
+
+    for _ in range(60):
+        for _ in range(rng.randrange(1, 4)):
+            variables[f"v{rng.randrange(40)}"] = rng.randrange(10)
+        assert evaluator.evaluate_unlocks(synthetic, variables) == _reference_unlocks(
+            graph, variables
+        )
+
+
+def test_program_without_plan_falls_back_to_built_plan(program) -> None:
+    bare = replace(program, rule_plan=None)
+    evaluator = RuleEvaluator()
+
+    assert evaluator.evaluate_unlocks(bare, {"trust.ling": 12}) == {"old-school-gate"}
+    assert evaluator.evaluate_unlocks(bare, {"trust.ling": 3}) == frozenset()
+    assert evaluator.plan_for(bare) is evaluator.plan_for(bare)
+
+
+def test_failed_evaluation_discards_cached_outputs(program) -> None:
+    evaluator = RuleEvaluator()
+    assert evaluator.evaluate_unlocks(program, {"trust.ling": 12}) == {"old-school-gate"}
+
+    with pytest.raises(TypeError):
+        evaluator.evaluate_unlocks(program, {"trust.ling": "high"})
+    assert evaluator.evaluate_unlocks(program, {"trust.ling": 12}) == {"old-school-gate"}
+
+
+def test_incremental_evaluation_visits_only_affected_nodes(program, monkeypatch) -> None:
+    rng = random.Random(11)
+    graph = _synthetic_graph(rng, variables=40, conditions=200)
+    plan = build_rule_plan(graph)
+    synthetic = replace(program, rule_graph=graph, rule_plan=plan)
+    evaluator = RuleEvaluator()
+    variables = {f"v{index}": rng.randrange(10) for index in range(40)}
+    visited: list[str] = []
+    evaluate_node = RuleEvaluator._evaluate_node
+    monkeypatch.setattr(
+        RuleEvaluator,
+        "_evaluate_node",
+        staticmethod(lambda node_type, *args: visited.append(node_type) or evaluate_node(node_type, *args)),
+    )
+
+    evaluator.evaluate_unlocks(synthetic, variables)
+    assert len(visited) == len(plan.node_ids)
+
+    visited.clear()
+    evaluator.evaluate_unlocks(synthetic, variables)
+    assert visited == []
+
+    variable = next(name for name in variables if plan.variable_readers.get(name))
+    affected = set(plan.variable_readers[variable])
+    pending = deque(affected)
+    while pending:
+        for dependent in plan.dependents[pending.popleft()]:
+            if dependent not in affected:
+                affected.add(dependent)
+                pending.append(dependent)
+    variables[variable] += 1
+    result = evaluator.evaluate_unlocks(synthetic, variables)
+
+    assert 0 < len(visited) <= len(affected) < len(plan.node_ids)
+    assert result == _reference_unlocks(graph, variables)
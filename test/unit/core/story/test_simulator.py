@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import multiprocessing
+import pickle
+
 from core.story import (
     CastResolutionContext,
     CharacterRuntimeStatus,
     StartStory,
     StoryCompiler,
+    SelectChoice,
     StoryRuntime,
     StorySimulator,
     StubSceneRenderer,
     parse_story_project,
 )
+from core.story.simulator import _PARALLEL_MIN_FRONTIER, state_digest
 
 from .story_fixtures import campus_mystery_source
 
@@ -89,6 +94,98 @@ def test_simulator_explores_nodes_entered_after_unlock() -> None:
     assert "enter:old-school-gate" in report.ending_paths["truth-ending"]
 
 
+def _grid_runtime(size: int, noise: int) -> StoryRuntime:
+    source = campus_mystery_source()
+    for variable, maximum in (("grid.a", size), ("grid.b", size), ("noise", noise)):
+        source["variables"][variable] = {
+            "type": "integer",
+            "initial": 0,
+            "min": 0,
+            "max": maximum,
+        }
+    start = source["narrativeGraph"]["nodes"][0]
+    start["freeformIntents"] = [
+        {"id": f"step-{name}", "effects": [{"increment": [variable, 1]}]}
+        for name, variable in (("a", "grid.a"), ("b", "grid.b"), ("noise", "noise"))
+    ]
+    start["choices"].append(
+        {
+            "id": "shortcut",
+            "label": "抄近路",
+            "when": {"all": [{"gte": ["grid.a", size]}, {"gte": ["grid.b", size]}]},
+            "goto": "truth-ending",
+        }
+    )
+    return StoryRuntime(StoryCompiler().compile(parse_story_project(source)))
+
+
+def test_dry_run_builds_same_state_without_events() -> None:
+    runtime = _runtime()
+    started = runtime.start(StartStory("start-1")).state
+    command = SelectChoice(
+        command_id="choice-1",
+        expected_revision=started.revision,
+        choice_id="prepare-investigation",
+        expected_node_id="transfer-day",
+    )
+
+    full = runtime.execute(started, command)
+    dry = runtime.execute(started, command, dry_run=True)
+
+    assert dry.events == ()
+    assert dry.state == full.state
+    assert dry.state.event_cursor == started.event_cursor + len(full.events)
+    assert state_digest(pickle.loads(pickle.dumps(dry.state))) == state_digest(full.state)
+
+
+def test_parallel_exploration_agrees_with_serial_under_spawn(monkeypatch) -> None:
+    runtime = _grid_runtime(size=3, noise=2)
+    frontier_sizes: list[int] = []
+    expand_level = StorySimulator._expand_level
+
+    def recording_expand_level(self, frontier, *args):
+        frontier_sizes.append(len(frontier))
+        return expand_level(self, frontier, *args)
+
+    monkeypatch.setattr(StorySimulator, "_expand_level", recording_expand_level)
+
+    serial = StorySimulator(runtime, max_states=10_000).simulate()
+    # spawn (the Windows/macOS default) pickles the runtime into each worker.
+    parallel = StorySimulator(
+        runtime,
+        max_states=10_000,
+        workers=2,
+        mp_context=multiprocessing.get_context("spawn"),
+    ).simulate()
+
+    assert max(frontier_sizes) >= _PARALLEL_MIN_FRONTIER
+    assert parallel == serial
+    assert serial.truncated is False
+    assert serial.ending_paths["truth-ending"][-1] == "choice:old-school-gate/enter-with-key"
+
+
+def test_pruned_exploration_agrees_with_serial() -> None:
+    runtime = _grid_runtime(size=2, noise=2)
+
+    serial = StorySimulator(runtime, max_states=10_000).simulate()
+    pruned = StorySimulator(runtime, max_states=10_000, prune_unobserved=True).simulate()
+
+    assert pruned.reachable_node_ids == serial.reachable_node_ids
+    assert pruned.ending_paths == serial.ending_paths
+    assert pruned.dead_end_node_ids == serial.dead_end_node_ids
+    assert pruned.explored_states * 2 < serial.explored_states
+
+
+def test_exploration_scales_with_distinct_states_not_paths() -> None:
+    quiet = StorySimulator(_grid_runtime(size=2, noise=0), max_states=10_000).simulate()
+    noisy = StorySimulator(_grid_runtime(size=2, noise=2), max_states=10_000).simulate()
+
+    # Three noise values triple the distinct states; without digest
+    # deduplication every interleaving of the extra steps would be explored.
+    assert noisy.explored_states == 3 * quiet.explored_states
+    assert noisy.ending_paths.keys() == quiet.ending_paths.keys()
+
+
 def test_stub_renderer_is_deterministic_and_system_scoped() -> None:
     runtime = _runtime()
     result = runtime.start(StartStory("start-1"))
@@ -497,3 +497,79 @@ class TestClearChatHistory:
         assert hm.get_history() == []
         assert json.loads(history_path.read_text(encoding="utf-8")) == []
         assert not tmp_path.exists()
+
+
+class TestHistoryPaging:
+    """history_page / load_history_page 只渲染可见窗口"""
+
+    def _dialog(self, speech: str) -> dict:
+        return _a(json.dumps({"dialog": [{"character_name": "A", "speech": speech}]}))
+
+    def _messages(self, turns: int) -> list[dict]:
+        messages = []
+        for index in range(turns):
+            messages.append(_u(f"u{index}"))
+            messages.append(self._dialog(f"s{index}"))
+        return messages
+
+    def test_page_renders_only_window(self, monkeypatch):
+        from core.sprite import chat_history_text
+
+        calls = []
+        original = chat_history_text.parse_assistant_dialog_content
+        monkeypatch.setattr(
+            chat_history_text,
+            "parse_assistant_dialog_content",
+            lambda content: calls.append(content) or original(content),
+        )
+        chat_history_text.dialog_parse_cache.clear()
+        messages = self._messages(100)
+
+        page = HistoryManager([]).history_page(messages, limit=4)
+
+        assert (page.start, page.end, page.total, page.has_more) == (196, 200, 200, True)
+        assert len(page.rows) == 4
+        assert "s99" in page.rows[-1]
+        assert len(calls) == 2
+
+        earlier = HistoryManager([]).history_page(messages, before=page.start, limit=4)
+        assert (earlier.start, earlier.end) == (192, 196)
+        assert "s97" in earlier.rows[-1]
+
+    def test_full_rebuild_matches_concatenated_pages(self):
+        tmp_dir = tempfile.mkdtemp()
+        history_file = str(Path(tmp_dir) / "paged.json")
+        messages = self._messages(7)
+        with open(history_file, "w", encoding="utf-8") as f:
+            json.dump(messages, f)
+
+        hm = HistoryManager([])
+        hm.load_chat_history(history_file)
+        full_rows = list(hm.get_history())
+
+        rows = []
+        before = None
+        while True:
+            page = hm.load_history_page(history_file, before=before, limit=3)
+            rows[:0] = page.rows
+            if not page.has_more:
+                break
+            before = page.start
+        assert rows == full_rows
+
+    def test_dialog_cache_reuses_parse_and_returns_copies(self):
+        from core.sprite.chat_history_text import DialogParseCache
+
+        cache = DialogParseCache(max_entries=2)
+        content = json.dumps({"dialog": [{"character_name": "A", "speech": "hi"}]})
+        first = cache.parse(content)
+        first[0]["speech"] = "mutated"
+        first.pop()
+
+        assert cache.parse(content) == [{"character_name": "A", "speech": "hi"}]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.parse(json.dumps({"dialog": []}))
+        cache.parse(json.dumps({"dialog": [{}]}))
+        cache.parse(content)
+        assert cache.misses == 4
@@ -1,7 +1,11 @@
 """Unit tests for LlmResponseStreamParser — JSON extraction from LLM chunks."""
 
+import json
+import random
+
 import pytest
 
+from core.messaging import stream_parser
 from core.messaging.stream_parser import LlmResponseStreamParser
 from sdk.messages import LLMDialogMessage
 
@@ -152,3 +156,128 @@ class TestLlmResponseStreamParser:
         )
         assert len(results) == 1
         assert results[0].name == "Solo"
+
+    def test_whitespace_at_chunk_end_inside_string_is_kept(self):
+        parser = LlmResponseStreamParser()
+        results = list(parser.feed('{"character_name": "A", "speech": "x", "sprite": "0"}{"character_name": "B", "speech": "hello '))
+        results += list(parser.feed('world", "sprite": "0"}'))
+
+        assert [msg.text for msg in results] == ["x", "hello world"]
+
+    def test_escaped_quote_and_backslash_split_across_chunks(self):
+        parser = LlmResponseStreamParser()
+        raw = '{"character_name": "A", "speech": "say \\"}\\" and \\\\", "sprite": "0"}'
+        results = []
+        for char in raw:
+            results += list(parser.feed(char))
+
+        assert [msg.text for msg in results] == ['say "}" and \\']
+        assert parser.buffer == ""
+
+
+def _reference_span(text: str):
+    """The original rescanning implementation, kept as the fuzz oracle."""
+    for start_index in [index for index, char in enumerate(text) if char == "{"]:
+        depth = 0
+        in_string = False
+        escaped = False
+        for index in range(start_index, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+            if char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return start_index, index + 1
+    return None
+
+
+class _ReferenceParser(LlmResponseStreamParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self._raw = ""
+
+    def feed(self, chunk):
+        self._raw += chunk
+        while "}" in self._raw:
+            span = _reference_span(self._raw)
+            if span is None:
+                break
+            json_str = self._raw[span[0]:span[1]]
+            self._raw = self._raw[span[1]:].strip()
+            try:
+                yield from self._dialog_messages(json.loads(json_str))
+            except json.JSONDecodeError:
+                self.parse_failures += 1
+            except Exception:
+                self.parse_failures += 1
+                break
+
+
+_GARBAGE = ["{broken", "}", "{", '"', "\\", "note:", '{"x":', "]", "叙述", '\\"', "{}"]
+
+
+def _random_stream(rng: random.Random, lines: int) -> str:
+    parts = []
+    for index in range(lines):
+        if rng.random() < 0.3:
+            parts.append("".join(rng.choice(_GARBAGE) for _ in range(rng.randint(1, 4))))
+        speech = "".join(rng.choice('台词{}"\\ab') for _ in range(rng.randint(0, 12)))
+        item = {"character_name": f"C{index % 3}", "speech": speech, "sprite": str(index % 4)}
+        if rng.random() < 0.2:
+            item["metadata"] = {"mood": "calm", "nested": {"k": speech}}
+        parts.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+    return "".join(parts)
+
+
+def _run(parser, text: str, rng: random.Random):
+    out = []
+    index = 0
+    while index < len(text):
+        size = rng.choice([1, 2, 3, 7, 16, 64])
+        out += [(msg.name, msg.text) for msg in parser.feed(text[index:index + size])]
+        index += size
+    out += [(msg.name, msg.text) for msg in parser.feed("")]
+    return out, parser.parse_failures
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_incremental_scanner_matches_reference_parser(seed):
+    rng = random.Random(seed)
+    text = _random_stream(rng, rng.randint(1, 25))
+    chunk_seed = rng.random()
+
+    expected = _run(_ReferenceParser(), text, random.Random(chunk_seed))
+    actual = _run(LlmResponseStreamParser(), text, random.Random(chunk_seed))
+
+    assert actual == expected
+
+
+def test_scanner_examines_each_character_once(monkeypatch):
+    rng = random.Random(7)
+    # 未闭合的 `{` 前缀：旧实现每个 chunk 都要从每个起点重扫到末尾
+    text = '"}" ' + "{ " * 100 + _random_stream(rng, 50)
+    scanned = []
+    pattern = stream_parser._SPECIAL_CHARS
+
+    class CountingPattern:
+        def finditer(self, chunk):
+            scanned.append(len(chunk))
+            return pattern.finditer(chunk)
+
+    expected = _run(_ReferenceParser(), text, random.Random(3))
+    monkeypatch.setattr(stream_parser, "_SPECIAL_CHARS", CountingPattern())
+    actual = _run(LlmResponseStreamParser(), text, random.Random(3))
+
+    assert actual == expected
+    assert sum(scanned) == len(text)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from ai.llm.history_journal import HistoryJournal
+from application.chat.runtime_process import _chat_history_entries, _chat_history_page
+
+
+def _messages(turns: int) -> list[dict]:
+    messages: list[dict] = [{"role": "system", "content": "S"}]
+    for index in range(turns):
+        messages.append({"role": "user", "content": f"u{index}"})
+        messages.append(
+            {
+                "role": "assistant",
+                "content": json.dumps(
+                    {"dialog": [{"character_name": "A", "speech": f"s{index}"}]}
+                ),
+            }
+        )
+    return messages
+
+
+def _state(history: Path, **session) -> SimpleNamespace:
+    return SimpleNamespace(
+        chat_session={"historyPath": str(history), **session},
+        chat_stream=None,
+        history_dir=str(history.parent),
+        project_root_dir=str(history.parent),
+    )
+
+
+def test_file_page_reads_only_the_requested_window(tmp_path: Path) -> None:
+    session = tmp_path / "session"
+    session.mkdir()
+    HistoryJournal(session / "active.json").write_all(_messages(10))
+    state = _state(session)
+
+    page = _chat_history_page(state, before=None, limit=4)
+
+    assert (page["start"], page["end"], page["total"], page["hasMore"]) == (17, 21, 21, True)
+    assert [entry["text"] for entry in page["entries"]] == ["你: u8", "A: s8", "你: u9", "A: s9"]
+    assert page["entries"][2]["revertUserIndex"] == 9
+
+    first = _chat_history_page(state, before=3, limit=50)
+    assert first["start"] == 0 and first["hasMore"] is False
+    assert [entry["revertUserIndex"] for entry in first["entries"] if entry["role"] == "user"] == [0]
+
+
+def test_page_texts_match_full_history(tmp_path: Path) -> None:
+    session = tmp_path / "session"
+    session.mkdir()
+    HistoryJournal(session / "active.json").write_all(_messages(6))
+    state = _state(session)
+
+    entries: list[dict] = []
+    before = None
+    while True:
+        page = _chat_history_page(state, before=before, limit=5)
+        entries[:0] = page["entries"]
+        if not page["hasMore"]:
+            break
+        before = page["start"]
+
+    full = _chat_history_entries(state)
+    assert [(e["role"], e["text"], e.get("revertUserIndex")) for e in entries] == [
+        (e["role"], e["text"], e.get("revertUserIndex")) for e in full
+    ]
+    assert len({entry["id"] for entry in entries}) == len(entries)
+
+
+def test_older_pages_do_not_reparse_the_history_prefix(tmp_path: Path, monkeypatch) -> None:
+    session = tmp_path / "session"
+    session.mkdir()
+    journal = HistoryJournal(session / "active.json")
+    journal.write_all(_messages(30))
+    state = _state(session)
+    full_reads: list[int] = []
+    read_all = HistoryJournal.read_all
+
+    def counting_read_all(self):
+        full_reads.append(1)
+        return read_all(self)
+
+    monkeypatch.setattr(HistoryJournal, "read_all", counting_read_all)
+
+    before = None
+    user_indexes: list[int] = []
+    while True:
+        page = _chat_history_page(state, before=before, limit=4)
+        user_indexes[:0] = [e["revertUserIndex"] for e in page["entries"] if e["role"] == "user"]
+        if not page["hasMore"]:
+            break
+        before = page["start"]
+    assert user_indexes == list(range(30))
+    assert len(full_reads) == 1
+
+    _chat_history_entries(state)
+    _chat_history_entries(state)
+    assert len(full_reads) == 2
+
+    journal.append([{"role": "user", "content": "late"}])
+    assert _chat_history_entries(state)[-1]["revertUserIndex"] == 30
+    page = _chat_history_page(state, before=5, limit=2)
+    assert [e["revertUserIndex"] for e in page["entries"] if e["role"] == "user"] == [1]
+
+
+def test_live_snapshot_page_slices_rendered_entries(tmp_path: Path) -> None:
+    entries = [{"id": f"history-{index}", "role": "system", "text": str(index)} for index in range(7)]
+    stream = SimpleNamespace(get_snapshot=lambda session_id: {"historyEntries": entries})
+    state = SimpleNamespace(chat_session={"sessionId": "s1"}, chat_stream=stream)
+
+    page = _chat_history_page(state, before=5, limit=2)
+
+    assert page["source"] == "snapshot"
+    assert [entry["text"] for entry in page["entries"]] == ["3", "4"]
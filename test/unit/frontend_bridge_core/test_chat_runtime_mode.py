@@ -211,6 +211,17 @@ class ChatRuntimeModeTests(unittest.TestCase):
         self.assertFalse(status["chatProcessRunning"])
         self.assertTrue(status["chatRuntimeClosing"])
 
+    def test_chat_runtime_status_includes_chat_stream_viewer_metrics(self):
+        chat_stream = SimpleNamespace(
+            stats=lambda: {"eventBacklog": 0, "viewers": [{"lagMs": 12.5, "dropped": 3}]}
+        )
+        state = SimpleNamespace(chat_runtime_closing=False, chat_stream=chat_stream)
+
+        with patch("application.chat.runtime_process._chat_process_running", return_value=True):
+            status = _chat_runtime_status(state)
+
+        self.assertEqual(status["chatStream"]["viewers"], [{"lagMs": 12.5, "dropped": 3}])
+
     def test_runtime_status_route_does_not_build_chat_snapshot(self):
         handler = FrontendBridgeHandler.__new__(FrontendBridgeHandler)
         handler.path = "/api/chat/runtime-status"
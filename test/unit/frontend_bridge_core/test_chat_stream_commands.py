@@ -6,13 +6,14 @@ import threading
 import time
 import tempfile
 import unittest
+import zlib
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 from urllib.parse import parse_qs, urlencode, urlparse
 
 from application.chat.runtime_process import _handle_chat_command
-from frontend_bridge_core.chat_stream import ChatStreamService
+from frontend_bridge_core.chat_stream import ChatStreamService, _WebSocketConnection
 from application.runtime.event_sink import fold_event_into_snapshot
 from frontend_bridge_core.transport.ws_client import WSClientSink
 from config.schema import ApiConfig
@@ -72,6 +73,9 @@ class _FakeConnection:
     async def send_json(self, payload):
         self.messages.append(dict(payload))
 
+    def enqueue(self, payload):
+        self.messages.append(dict(payload))
+
 
 def _config_manager_with_chat_experiments(*, fork: bool = False, flowchart: bool = False):
     return SimpleNamespace(
@@ -94,7 +98,14 @@ def _free_bridge_port() -> int:
         return sock.getsockname()[1] - 1
 
 
-def _open_ws(url: str, *, session_id: str, role: str) -> socket.socket:
+def _open_ws(
+    url: str,
+    *,
+    session_id: str,
+    role: str,
+    extensions: str = "",
+    responses: list[str] | None = None,
+) -> socket.socket:
     parsed = urlparse(url)
     host = parsed.hostname or "127.0.0.1"
     port = parsed.port or 80
@@ -111,7 +122,8 @@ def _open_ws(url: str, *, session_id: str, role: str) -> socket.socket:
         "Connection: Upgrade\r\n"
         f"Sec-WebSocket-Key: {key}\r\n"
         "Sec-WebSocket-Version: 13\r\n"
-        "\r\n"
+        + (f"Sec-WebSocket-Extensions: {extensions}\r\n" if extensions else "")
+        + "\r\n"
     ).encode("utf-8")
     sock = socket.create_connection((host, port), timeout=5.0)
     sock.settimeout(5.0)
@@ -125,6 +137,8 @@ def _open_ws(url: str, *, session_id: str, role: str) -> socket.socket:
     status_line = response.split(b"\r\n", 1)[0].decode("utf-8", errors="replace")
     if "101" not in status_line:
         raise ConnectionError(f"unexpected websocket handshake response: {status_line}")
+    if responses is not None:
+        responses.append(response.decode("utf-8", errors="replace"))
     return sock
 
 
@@ -775,6 +789,37 @@ class ChatStreamCommandTests(unittest.TestCase):
             "renderer-mobile",
         )
 
+    def test_reconnecting_viewer_receives_patch_since_its_event_seq(self):
+        service = ChatStreamService(host="127.0.0.1", bridge_port=8787)
+        session = service.create_session()
+        session_id = session["sessionId"]
+        asyncio.run(service._publish_event(session_id, {"type": "status.change", "status": "generating"}))
+        hydrated = service.get_snapshot(session_id)
+        asyncio.run(
+            service._publish_event(
+                session_id,
+                {"type": "dialog.end", "fullHtml": "<p>hi</p>", "speaker": "Mio"},
+            )
+        )
+
+        viewer = _FakeConnection(advertised_ws_url="ws://192.168.1.8:8790/ws", session_id=session_id)
+        viewer.since_seq = hydrated["eventSeq"]
+        asyncio.run(service._send_snapshot(viewer))
+
+        message = viewer.messages[-1]
+        self.assertEqual(message["type"], "snapshot.patch")
+        self.assertEqual(message["baseSeq"], 1)
+        self.assertEqual(message["seq"], 2)
+        for op in message["patch"]:
+            hydrated[op["path"][1:]] = op["value"]
+        expected = service.get_snapshot(session_id)
+        expected["wsUrl"] = "ws://192.168.1.8:8790/ws"
+        self.assertEqual(hydrated, expected)
+
+        viewer.since_seq = 99
+        asyncio.run(service._send_snapshot(viewer))
+        self.assertEqual(viewer.messages[-1]["type"], "snapshot")
+
     def test_polling_snapshot_renderer_can_own_and_recover_active_voice(self):
         service = ChatStreamService(host="127.0.0.1", bridge_port=8787)
         session = service.create_session()
@@ -1330,6 +1375,275 @@ class ChatStreamCommandTests(unittest.TestCase):
             if viewer2 is not None:
                 _close_ws(viewer2)
 
+    def test_commands_buffer_until_the_producer_attaches_and_keep_their_order(self):
+        service = ChatStreamService(host="127.0.0.1", bridge_port=_free_bridge_port())
+        service.start()
+        try:
+            session = service.create_session()
+            results: list[bool] = []
+            senders = []
+            for index in range(3):
+                sender = threading.Thread(
+                    target=lambda index=index: results.append(
+                        service.send_command(
+                            session["sessionId"],
+                            {"cmdId": f"cmd-{index}", "type": "pause-asr"},
+                        )
+                    ),
+                    daemon=True,
+                )
+                sender.start()
+                senders.append(sender)
+                _wait_until(lambda: service.stats()["pendingCommands"] == index + 1)
+
+            producer = _open_ws(
+                session["producerEndpoint"],
+                session_id=session["sessionId"],
+                role="producer",
+            )
+            try:
+                received = [
+                    _wait_for_event(producer, lambda event: event.get("type") == "command")["command"]["cmdId"]
+                    for _ in range(3)
+                ]
+                for sender in senders:
+                    sender.join(timeout=5.0)
+                self.assertEqual(received, ["cmd-0", "cmd-1", "cmd-2"])
+                self.assertEqual(results, [True, True, True])
+                stats = service.stats()
+                self.assertEqual(stats["commandsDelivered"], 3)
+                self.assertEqual(stats["pendingCommands"], 0)
+            finally:
+                _close_ws(producer)
+        finally:
+            service.stop()
+
+    def test_expired_command_is_not_delivered_to_a_late_producer(self):
+        service = ChatStreamService(host="127.0.0.1", bridge_port=_free_bridge_port())
+        service.start()
+        try:
+            session = service.create_session()
+            self.assertFalse(
+                service.send_command(
+                    session["sessionId"],
+                    {"cmdId": "cmd-late", "type": "pause-asr"},
+                    timeout=0.05,
+                )
+            )
+            self.assertEqual(service.stats()["commandsExpired"], 1)
+            producer = _open_ws(
+                session["producerEndpoint"],
+                session_id=session["sessionId"],
+                role="producer",
+            )
+            try:
+                self.assertTrue(
+                    service.send_command(
+                        session["sessionId"],
+                        {"cmdId": "cmd-next", "type": "pause-asr"},
+                    )
+                )
+                command_event = _wait_for_event(producer, lambda event: event.get("type") == "command")
+                self.assertEqual(command_event["command"]["cmdId"], "cmd-next")
+            finally:
+                _close_ws(producer)
+        finally:
+            service.stop()
+
+    def test_slow_viewer_is_resynced_without_stalling_other_viewers(self):
+        service = ChatStreamService(host="127.0.0.1", bridge_port=_free_bridge_port())
+        service.start()
+        try:
+            session = service.create_session()
+            slow = _GatedViewer(session["sessionId"], service)
+            fast = _GatedViewer(session["sessionId"], service, open_gate=True)
+            with service._lock:
+                service._sessions[session["sessionId"]].viewers.update({slow.connection, fast.connection})
+
+            started = time.perf_counter()
+            for index in range(300):
+                self.assertTrue(
+                    service.publish_event(
+                        session["sessionId"],
+                        {"type": "dialog.end", "fullHtml": f"<p>{index}</p>", "speaker": "Mio"},
+                    )
+                )
+            self.assertLess(time.perf_counter() - started, 1.0)
+
+            _wait_until(lambda: len(fast.messages()) == 300)
+            self.assertEqual([message["seq"] for message in fast.messages()], list(range(1, 301)))
+            _wait_until(lambda: slow.connection.resync_pending)
+            viewer_stats = {item["rendererId"]: item for item in service.stats()["viewers"]}
+            self.assertEqual(viewer_stats["slow"]["resyncs"], 1)
+            self.assertGreater(viewer_stats["slow"]["dropped"], 0)
+            self.assertEqual(viewer_stats["fast"]["dropped"], 0)
+
+            slow.gate.set()
+            _wait_until(lambda: len(slow.messages()) == 2)
+            first, resync = slow.messages()
+            self.assertEqual(first["seq"], 1)
+            self.assertEqual(resync["type"], "snapshot")
+            self.assertEqual(resync["seq"], 300)
+            self.assertEqual(resync["snapshot"]["dialogText"], "299")
+        finally:
+            service.stop()
+
+    def test_lagging_viewer_coalesces_superseded_and_skips_transient_events(self):
+        viewer = _GatedViewer("session-1", None)
+
+        async def scenario():
+            # the initial snapshot went out at seq 0
+            viewer.connection.last_sent_seq = 0
+            viewer.connection.enqueue({"type": "status.change", "status": "generating", "seq": 1})
+            viewer.connection.enqueue({"type": "dialog.end", "fullHtml": "a", "seq": 2})
+            viewer.connection.enqueue({"type": "status.change", "status": "speaking", "seq": 3})
+            for seq in range(4, 40):
+                viewer.connection.enqueue({"type": "dialog.end", "fullHtml": "b", "seq": seq})
+            viewer.connection.enqueue({"type": "effect.play", "seq": 40})
+            viewer.gate.set()
+            await viewer.connection.pump
+
+        asyncio.run(scenario())
+
+        seqs = [message["seq"] for message in viewer.messages()]
+        self.assertEqual(seqs[:3], [2, 3, 4])
+        self.assertEqual(
+            [message.get("prevSeq") for message in viewer.messages()[:3]],
+            [0, None, None],
+        )
+        self.assertNotIn(1, seqs)
+        self.assertNotIn(40, seqs)
+        stats = viewer.connection.stats()
+        self.assertEqual((stats["coalesced"], stats["dropped"]), (1, 1))
+
+    def test_viewer_negotiates_permessage_deflate_for_large_events(self):
+        service = ChatStreamService(host="127.0.0.1", bridge_port=_free_bridge_port())
+        service.start()
+        try:
+            session = service.create_session()
+            responses: list[str] = []
+            viewer = _open_ws(
+                session["wsUrl"],
+                session_id=session["sessionId"],
+                role="viewer",
+                extensions="permessage-deflate; client_max_window_bits",
+                responses=responses,
+            )
+            try:
+                self.assertIn("permessage-deflate", responses[0])
+                compressed, snapshot = _read_deflated_event(viewer)
+                self.assertEqual(snapshot["type"], "snapshot")
+                text = "ことば" * 400
+                service.publish_event(session["sessionId"], {"type": "notification.change", "text": text})
+
+                compressed, event = _read_deflated_event(viewer)
+                self.assertTrue(compressed)
+                self.assertEqual(event["text"], text)
+                self.assertLess(
+                    service.stats()["viewers"][0]["bytesSent"],
+                    len(text.encode("utf-8")),
+                )
+                self.assertTrue(service.stats()["viewers"][0]["deflate"])
+            finally:
+                _close_ws(viewer)
+        finally:
+            service.stop()
+
+
+def _read_deflated_event(sock: socket.socket) -> tuple[bool, dict]:
+    header = WSClientSink._read_exact(sock, 2)
+    length = header[1] & 0x7F
+    if length == 126:
+        length = int.from_bytes(WSClientSink._read_exact(sock, 2), "big")
+    payload = WSClientSink._read_exact(sock, length)
+    compressed = bool(header[0] & 0x40)
+    if compressed:
+        payload = zlib.decompressobj(-15).decompress(payload + b"\x00\x00\xff\xff")
+    return compressed, json.loads(payload)
+
+
+class _GatedWriter:
+    def __init__(self, gate: threading.Event):
+        self.buffer = bytearray()
+        self.gate = gate
+
+    def write(self, data: bytes) -> None:
+        self.buffer.extend(data)
+
+    async def drain(self) -> None:
+        while not self.gate.is_set():
+            await asyncio.sleep(0.005)
+
+    def close(self) -> None:
+        pass
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+class _GatedViewer:
+    """A real viewer connection whose socket drains only once ``gate`` opens."""
+
+    def __init__(self, session_id: str, service, *, open_gate: bool = False):
+        self.gate = threading.Event()
+        if open_gate:
+            self.gate.set()
+        self.writer = _GatedWriter(self.gate)
+        self.connection = _WebSocketConnection(
+            reader=None,
+            writer=self.writer,
+            role="viewer",
+            session_id=session_id,
+            renderer_id="fast" if open_gate else "slow",
+            resync=service._send_snapshot if service is not None else None,
+        )
+
+    def messages(self) -> list[dict]:
+        data = bytes(self.writer.buffer)
+        messages = []
+        offset = 0
+        while offset < len(data):
+            length = data[offset + 1] & 0x7F
+            offset += 2
+            if length == 126:
+                length = int.from_bytes(data[offset : offset + 2], "big")
+                offset += 2
+            messages.append(json.loads(data[offset : offset + length]))
+            offset += length
+        return messages
+
+
+def test_commands_reach_a_connected_producer_without_polling():
+    service = ChatStreamService(host="127.0.0.1", bridge_port=_free_bridge_port())
+    service.start()
+    try:
+        session = service.create_session()
+        producer = _open_ws(
+            session["producerEndpoint"],
+            session_id=session["sessionId"],
+            role="producer",
+        )
+        try:
+            with patch.object(
+                service, "wait_for_producer", side_effect=AssertionError("polled producer")
+            ):
+                received = []
+                for index in range(20):
+                    assert service.send_command(
+                        session["sessionId"],
+                        {"cmdId": f"cmd-{index}", "type": "send-message"},
+                    )
+                    event = _wait_for_event(producer, lambda event: event.get("type") == "command")
+                    received.append(event["command"]["cmdId"])
+        finally:
+            _close_ws(producer)
+        stats = service.stats()
+    finally:
+        service.stop()
+
+    assert received == [f"cmd-{index}" for index in range(20)]
+    assert (stats["commandsDelivered"], stats["pendingCommands"]) == (20, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
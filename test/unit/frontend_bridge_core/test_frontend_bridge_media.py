@@ -57,3 +57,21 @@ def test_media_thumbnail_batch_can_return_cache_paths_without_data_urls(tmp_path
     assert item["path"] == "data/background.png"
     assert item["cachePath"].startswith(".cache/frontend-media-thumbnails/")
     assert "dataUrl" not in item
+
+
+def test_media_thumbnail_can_emit_webp_alongside_png(tmp_path):
+    features = pytest.importorskip("PIL.features")
+    if not features.check("webp"):
+        pytest.skip("Pillow was built without WebP support")
+    source = tmp_path / "data" / "sprite.png"
+    source.parent.mkdir()
+    Image.new("RGBA", (640, 960), "#33669980").save(source)
+
+    png = _media_thumbnail(source, project_root=tmp_path, size=96)
+    webp = _media_thumbnail(source, project_root=tmp_path, size=96, image_format="webp")
+
+    assert png.suffix == ".png" and webp.suffix == ".webp"
+    assert webp.parent == png.parent
+    with Image.open(webp) as generated:
+        assert generated.format == "WEBP"
+        assert max(generated.size) <= 96
@@ -1,4 +1,14 @@
+import http.client
+import os
+import threading
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
 from application.runtime.state import BridgeState
+from frontend_bridge_core.http_cache import is_hashed_frontend_asset
+from frontend_bridge_core.routes.api import FrontendBridgeHandler
 from frontend_bridge_core.static import _frontend_dist_root
 
 
@@ -13,3 +23,109 @@ def test_frontend_dist_root_resolves_configured_dist(tmp_path):
     state = BridgeState(None, None, None, None, frontend_dist_dir=str(raw_dist))
 
     assert _frontend_dist_root(state) == raw_dist.resolve()
+
+
+@pytest.fixture
+def dist_server(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "web-assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<!doctype html>", encoding="utf-8")
+    (dist / "web-assets" / "index-BvA3xk9Q.js").write_bytes(b"x" * 300_000)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FrontendBridgeHandler)
+    server.state = SimpleNamespace(frontend_dist_dir=str(dist), auth_token="")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield dist, server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(port: int, path: str, headers: dict[str, str] | None = None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_hashed_assets_are_immutable_and_revalidate_with_304(dist_server, monkeypatch):
+    monkeypatch.setattr(FrontendBridgeHandler, "log_message", lambda *args: None)
+    dist, port = dist_server
+
+    status, headers, body = _get(port, "/web-assets/index-BvA3xk9Q.js")
+    assert status == 200 and body == b"x" * 300_000
+    assert headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    etag = headers["ETag"]
+
+    status, headers, body = _get(
+        port, "/web-assets/index-BvA3xk9Q.js", {"If-None-Match": f'W/{etag}, "x"'}
+    )
+    assert (status, body, headers["ETag"]) == (304, b"", etag)
+
+    status, headers, body = _get(port, "/")
+    assert status == 200 and headers["Cache-Control"] == "no-cache"
+    since = headers["Last-Modified"]
+    assert _get(port, "/", {"If-Modified-Since": since})[0] == 304
+
+    index = dist / "index.html"
+    index.write_text("<!doctype html><title>new</title>", encoding="utf-8")
+    os.utime(index, (index.stat().st_atime, index.stat().st_mtime + 5))
+    status, _, body = _get(
+        port, "/", {"If-None-Match": etag, "If-Modified-Since": since}
+    )
+    assert status == 200 and body.endswith(b"<title>new</title>")
+
+
+@pytest.mark.parametrize(
+    ("name", "hashed"),
+    [
+        ("index-BvA3xk9Q.js", True),
+        ("react-vendor-C_-x9a1b.js", True),
+        ("main-component.js", False),
+        ("app.settings.css", False),
+        ("app-settings.css", False),
+    ],
+)
+def test_only_bundler_hashed_names_are_immutable(tmp_path, name, hashed):
+    assert is_hashed_frontend_asset(tmp_path / "web-assets" / name, tmp_path) is hashed
+    assert is_hashed_frontend_asset(tmp_path / name, tmp_path) is False
+
+
+def test_range_is_ignored_when_if_range_is_stale(dist_server, monkeypatch):
+    monkeypatch.setattr(FrontendBridgeHandler, "log_message", lambda *args: None)
+    _, port = dist_server
+    path = "/web-assets/index-BvA3xk9Q.js"
+    etag = _get(port, path)[1]["ETag"]
+
+    status, headers, body = _get(port, path, {"Range": "bytes=10-19", "If-Range": etag})
+    assert (status, headers["Content-Range"], len(body)) == (
+        206,
+        "bytes 10-19/300000",
+        10,
+    )
+    status, _, body = _get(port, path, {"Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert status == 200 and len(body) == 300_000
+
+
+def test_sprite_revalidation_transfers_no_body(dist_server, monkeypatch):
+    monkeypatch.setattr(FrontendBridgeHandler, "log_message", lambda *args: None)
+    dist, port = dist_server
+    sprites = []
+    for index in range(3):
+        sprite = dist / "sprites" / f"sprite-{index}.png"
+        sprite.parent.mkdir(exist_ok=True)
+        sprite.write_bytes(os.urandom(64 * 1024))
+        sprites.append(f"/sprites/{sprite.name}")
+
+    first = [_get(port, path) for path in sprites]
+    again = [
+        _get(port, path, {"If-None-Match": item[1]["ETag"]})
+        for path, item in zip(sprites, first)
+    ]
+
+    assert [len(item[2]) for item in first] == [64 * 1024] * 3
+    assert [(item[0], item[2]) for item in again] == [(304, b"")] * 3
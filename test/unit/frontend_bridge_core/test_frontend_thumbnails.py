@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+from frontend_bridge_core import thumbnails
+from frontend_bridge_core.media import _iter_media_thumbnail_batch
+from frontend_bridge_core.routes.api import FrontendBridgeHandler
+from frontend_bridge_core.thumbnails import ThumbnailService, pregenerate_thumbnails
+
+
+def _fixed_size_renderer(source: str, target: str, size: int, image_format: str) -> int:
+    Path(target).write_bytes(b"t" * 100)
+    return 100
+
+
+def _sources(root: Path, count: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        path = root / "data" / f"sprite-{index}.png"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes([index]) * 64)
+        paths.append(path)
+    return paths
+
+
+def test_concurrent_requests_for_one_thumbnail_render_once(tmp_path):
+    release = threading.Event()
+    calls: list[str] = []
+
+    def slow_renderer(source: str, target: str, size: int, image_format: str) -> int:
+        calls.append(source)
+        release.wait(5)
+        return _fixed_size_renderer(source, target, size, image_format)
+
+    service = ThumbnailService(
+        tmp_path / "cache", workers=0, renderer=slow_renderer
+    )
+    (source,) = _sources(tmp_path, 1)
+    results: list[Path] = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                service.thumbnail(source, project_root=tmp_path, size=96)
+            )
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while service.stats()["coalesced"] < 7:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 8 and len(set(results)) == 1
+    assert results[0].suffix == ".png" and results[0].is_file()
+    stats = service.stats()
+    assert (stats["misses"], stats["coalesced"], stats["inflight"]) == (1, 7, 0)
+
+
+def test_cache_directory_is_bounded_by_an_lru_byte_budget(tmp_path):
+    cache = tmp_path / "cache"
+    service = ThumbnailService(
+        cache, max_bytes=250, workers=0, renderer=_fixed_size_renderer
+    )
+    first, second, third = _sources(tmp_path, 3)
+
+    kept = service.thumbnail(first, project_root=tmp_path)
+    dropped = service.thumbnail(second, project_root=tmp_path)
+    assert service.thumbnail(first, project_root=tmp_path) == kept
+    newest = service.thumbnail(third, project_root=tmp_path)
+
+    assert kept.is_file() and newest.is_file() and not dropped.exists()
+    assert service.stats()["bytes"] == 200
+    assert service.stats()["evictions"] == 1
+
+    rebuilt = ThumbnailService(
+        cache, max_bytes=150, workers=0, renderer=_fixed_size_renderer
+    )
+    assert rebuilt.stats()["entries"] == 0
+    assert rebuilt.thumbnail(third, project_root=tmp_path) == newest
+    assert rebuilt.stats()["hits"] == 1
+    assert sorted(path.name for path in cache.iterdir()) == [newest.name]
+
+
+def test_thumbnails_being_served_are_not_evicted(tmp_path):
+    service = ThumbnailService(
+        tmp_path / "cache", max_bytes=150, workers=0, renderer=_fixed_size_renderer
+    )
+    first, second = _sources(tmp_path, 2)
+
+    with service.open(first, project_root=tmp_path) as served:
+        newest = service.thumbnail(second, project_root=tmp_path)
+        assert served.read_bytes() == b"t" * 100
+        assert service.stats()["evictions"] == 0
+
+    # 释放后超出的预算立即回收
+    assert not served.exists() and newest.is_file()
+    assert service.stats()["bytes"] == 100
+    assert service.stats()["evictions"] == 1
+
+
+def test_process_pool_renders_outside_the_calling_process(tmp_path):
+    service = ThumbnailService(
+        tmp_path / "cache", workers=1, renderer=_fixed_size_renderer
+    )
+    try:
+        (source,) = _sources(tmp_path, 1)
+        thumbnail = service.thumbnail(source, project_root=tmp_path, size=64)
+    finally:
+        service.shutdown()
+
+    assert thumbnail.read_bytes() == b"t" * 100
+
+
+def test_pregeneration_never_raises_for_unreadable_uploads(tmp_path):
+    assert pregenerate_thumbnails(["data/missing.png", ""], project_root=tmp_path) == []
+
+
+def _register_service(monkeypatch, project_root: Path, renderer) -> ThumbnailService:
+    executor = ThreadPoolExecutor(max_workers=4)
+    service = ThumbnailService(
+        project_root / thumbnails.THUMBNAIL_CACHE_DIR,
+        executor=executor,
+        renderer=renderer,
+    )
+    monkeypatch.setattr(thumbnails, "_SERVICES", {service.cache_root: service})
+    return service
+
+
+def test_streamed_batch_yields_items_in_completion_order(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def renderer(source: str, target: str, size: int, image_format: str) -> int:
+        if source.endswith("sprite-0.png"):
+            release.wait(5)
+        return _fixed_size_renderer(source, target, size, image_format)
+
+    _register_service(monkeypatch, tmp_path, renderer)
+    slow, fast = _sources(tmp_path, 2)
+    stream = _iter_media_thumbnail_batch(
+        [
+            ("data/sprite-0.png", slow),
+            ("data/missing.png", tmp_path / "data" / "missing.png"),
+            ("data/sprite-1.png", fast),
+            ("data/sprite-1.png", fast),
+        ],
+        project_root=tmp_path,
+        size=96,
+    )
+
+    missing = next(stream)
+    assert missing["path"] == "data/missing.png"
+    assert missing["type"] == "FileNotFoundError"
+    first = next(stream)
+    assert first["path"] == "data/sprite-1.png"
+    assert first["cachePath"].startswith(".cache/frontend-media-thumbnails/")
+    assert "dataUrl" not in first
+    release.set()
+    assert [item["path"] for item in stream] == ["data/sprite-0.png"]
+
+
+def test_batch_endpoint_streams_ndjson_when_requested(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FrontendBridgeHandler, "log_message", lambda *args: None)
+    _register_service(monkeypatch, tmp_path, _fixed_size_renderer)
+    _sources(tmp_path, 2)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FrontendBridgeHandler)
+    server.state = SimpleNamespace(frontend_dist_dir="", auth_token="")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(
+        "127.0.0.1", server.server_address[1], timeout=5
+    )
+    try:
+        connection.request(
+            "POST",
+            "/api/media/thumbnails",
+            body=json.dumps(
+                {"mode": "stream", "paths": ["data/sprite-0.png", "data/sprite-1.png"]}
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        content_type = response.getheader("Content-Type")
+        lines = [json.loads(line) for line in response.read().splitlines()]
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
+
+    assert content_type == "application/x-ndjson; charset=utf-8"
+    assert lines[-1] == {"count": 2, "done": True}
+    assert sorted(item["path"] for item in lines[:-1]) == [
+        "data/sprite-0.png",
+        "data/sprite-1.png",
+    ]
+    assert all("cachePath" in item and "dataUrl" not in item for item in lines[:-1])
@@ -2,6 +2,7 @@
 
 import copy
 import json
+import threading
 from types import SimpleNamespace
 from unittest.mock import MagicMock
 
@@ -117,6 +118,69 @@ class TestLLMManagerMessageManagement:
 
         assert mgr.messages[-1] == {"role": "user", "content": "Hello"}
 
+    def test_message_added_snapshots_are_reused_until_a_hook_writes(self, mock_llm_adapter):
+        dispatcher = PluginHookDispatcher()
+        calls: list[MessageAddedContext] = []
+        dispatcher.register_message_added(lambda context: calls.append(context))
+        mgr = LLMManager(
+            adapter=mock_llm_adapter,
+            user_template="S",
+            hook_dispatcher=dispatcher,
+        )
+
+        mgr.add_message("user", "Hello")
+        mgr.add_message("assistant", "Hi")
+        calls[1].messages[1]["content"] = "changed by hook"
+        mgr.add_message("user", "Again")
+
+        assert calls[1].messages[0] is calls[0].messages[0]
+        assert calls[2].messages[0] is calls[0].messages[0]
+        assert calls[2].messages[1] is not calls[1].messages[1]
+        assert calls[2].messages[1]["content"] == "Hello"
+        assert mgr.messages[1]["content"] == "Hello"
+
+    def test_message_added_snapshots_drop_history_replaced_through_set_messages(
+        self, mock_llm_adapter
+    ):
+        dispatcher = PluginHookDispatcher()
+        calls: list[MessageAddedContext] = []
+        dispatcher.register_message_added(lambda context: calls.append(context))
+        mgr = LLMManager(
+            adapter=mock_llm_adapter,
+            user_template="S",
+            hook_dispatcher=dispatcher,
+        )
+        mgr.add_message("user", [{"type": "text", "text": "Hello"}])
+
+        history = mgr.get_messages()
+        history[1]["content"][0]["text"] = "Edited"
+        mgr.set_messages(history)
+        mgr.add_message("assistant", "Hi")
+
+        assert calls[1].messages[1] is not calls[0].messages[1]
+        assert calls[1].messages[1]["content"][0]["text"] == "Edited"
+
+    def test_chat_turns_copy_only_the_new_messages_for_hooks(self, mock_llm_adapter):
+        dispatcher = PluginHookDispatcher()
+        dispatcher.register_message_added(lambda context: len(context.messages))
+        dispatcher.register_before_chat(lambda context: len(context.messages))
+        mgr = LLMManager(
+            adapter=mock_llm_adapter,
+            user_template="S",
+            hook_dispatcher=dispatcher,
+        )
+        mgr.chat("warm up", stream=False, include_local_time=False)
+        copies = [mgr._hook_snapshots.copied_items]
+        lengths = [len(mgr.messages)]
+
+        for index in range(3):
+            mgr.chat(f"turn {index}", stream=False, include_local_time=False)
+            copies.append(mgr._hook_snapshots.copied_items)
+            lengths.append(len(mgr.messages))
+
+        new_messages = [after - before for before, after in zip(lengths, lengths[1:])]
+        assert [after - before for before, after in zip(copies, copies[1:])] == new_messages
+
     def test_clear_messages_keeps_system(self, mock_llm_adapter):
         mgr = LLMManager(adapter=mock_llm_adapter, user_template="Keep me")
         mgr.add_message("user", "Hello")
@@ -1151,6 +1215,100 @@ class TestLLMManagerToolCalling:
         finally:
             mgr.tool_executor.clear_cooldown("vision")
 
+    def test_read_only_tool_calls_in_distinct_groups_run_concurrently(self):
+        tm = ToolManager()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def lookup_a() -> str:
+            barrier.wait()
+            return "a"
+
+        def lookup_b() -> str:
+            barrier.wait()
+            return "b"
+
+        tm.register_function(
+            lookup_a, name="unit_ro_lookup_a", group="unit_ro_a", read_only=True
+        )
+        tm.register_function(
+            lookup_b, name="unit_ro_lookup_b", group="unit_ro_b", read_only=True
+        )
+        mgr = LLMManager(adapter=MockLLMAdapter(), user_template="S")
+        calls = [
+            {"id": f"call_{n}", "function": {"name": n, "arguments": "{}"}}
+            for n in ("unit_ro_lookup_b", "unit_ro_lookup_a")
+        ]
+
+        results = mgr._execute_formatted_tool_calls(calls)
+
+        assert [(name, json.loads(result)) for name, result in results] == [
+            ("unit_ro_lookup_b", "b"),
+            ("unit_ro_lookup_a", "a"),
+        ]
+
+    def test_writing_and_same_group_tool_calls_stay_serial(self):
+        tm = ToolManager()
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+        order: list[str] = []
+
+        def tracked(label: str):
+            def run() -> str:
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                threading.Event().wait(0.02)
+                with lock:
+                    state["active"] -= 1
+                    order.append(label)
+                return label
+
+            return run
+
+        tm.register_function(
+            tracked("r1"), name="unit_serial_read_1", group="unit_serial", read_only=True
+        )
+        tm.register_function(
+            tracked("r2"), name="unit_serial_read_2", group="unit_serial", read_only=True
+        )
+        tm.register_function(tracked("w"), name="unit_serial_write", group="unit_other")
+        mgr = LLMManager(adapter=MockLLMAdapter(), user_template="S")
+        names = ["unit_serial_read_1", "unit_serial_read_2", "unit_serial_write"]
+        calls = [
+            {"id": f"call_{i}", "function": {"name": n, "arguments": "{}"}}
+            for i, n in enumerate(names)
+        ]
+
+        results = mgr._execute_formatted_tool_calls(calls)
+
+        assert [name for name, _ in results] == names
+        assert order == ["r1", "r2", "w"]
+        assert state["peak"] == 1
+
+    def test_oversized_tool_list_keeps_most_relevant_definitions(self):
+        tm = ToolManager()
+        topics = ["weather", "stocks", "calendar", "translate", "music", "maps"]
+        for topic in topics:
+            tm.register_function(
+                lambda: 1,
+                name=f"unit_topk_{topic}",
+                group="unit_topk",
+                description=f"Look up {topic} data",
+            )
+        mgr = LLMManager(
+            adapter=MockLLMAdapter(), user_template="S", max_tool_definitions=2
+        )
+        mgr._active_tool_groups = ["unit_topk"]
+        mgr.add_message("user", "明天的 weather 怎么样？要不要带伞")
+
+        names = [d["function"]["name"] for d in mgr._current_tool_definitions()]
+
+        assert len(names) == 2
+        assert "unit_topk_weather" in names
+
+        mgr.max_tool_definitions = 10
+        assert len(mgr._current_tool_definitions()) == len(topics)
+
     def test_register_mcp_tools(self):
         tm = ToolManager()
         mcp_tools = [
@@ -1177,6 +1335,50 @@ class TestLLMManagerToolCalling:
         out = tm.execute("mcp_mcp_search", '{"query": "test"}')
         assert "found" in out
         assert results["mcp_mcp_search"] == {"query": "test"}
+        assert not tm.is_read_only("mcp_mcp_search")
+
+    def test_mcp_read_only_hint_marks_tool_read_only(self):
+        tm = ToolManager()
+        tm.register_mcp_tools(
+            [
+                {
+                    "name": "lookup",
+                    "description": "Look something up",
+                    "inputSchema": {"type": "object", "properties": {}},
+                    "annotations": {"readOnlyHint": True},
+                }
+            ],
+            invoke=lambda name, args: {},
+            name_prefix="unit_hint_",
+        )
+
+        assert tm.is_read_only("unit_hint_lookup")
+
+    def test_read_only_flag_is_cleared_when_tools_are_replaced_or_removed(self):
+        tm = ToolManager()
+        hinted = {
+            "name": "lookup",
+            "description": "Look something up",
+            "inputSchema": {"type": "object", "properties": {}},
+            "annotations": {"readOnlyHint": True},
+        }
+        plain = {key: value for key, value in hinted.items() if key != "annotations"}
+        names = tm.register_mcp_tools(
+            [hinted], invoke=lambda name, args: {}, name_prefix="unit_reload_"
+        )
+        tm.replace_mcp_tools(
+            "unit_reload_", [plain], invoke=lambda name, args: {}, replaces=names
+        )
+        assert not tm.is_read_only("unit_reload_lookup")
+
+        tm.register_function(lambda: 1, name="unit_reload_fn", read_only=True)
+        tm.register_function(lambda: 2, name="unit_reload_fn")
+        assert not tm.is_read_only("unit_reload_fn")
+
+        tm.register_function(lambda: 3, name="unit_reload_gone", read_only=True)
+        tm.unregister_tools(["unit_reload_gone", "unit_reload_lookup"])
+        tm.register_function(lambda: 4, name="unit_reload_gone")
+        assert not tm.is_read_only("unit_reload_gone")
 
     def test_drop_tool_on_reregister(self):
         tm = ToolManager()
@@ -1225,3 +1427,30 @@ class TestLLMAdapterFactory:
         providers = list(LLMAdapterFactory._adapters.keys())
         assert "Deepseek" in providers
         assert "Claude" in providers
+
+
+def test_hook_snapshots_copy_only_new_messages_per_turn(mock_llm_adapter):
+    dispatcher = PluginHookDispatcher()
+    dispatcher.register_message_added(lambda context: len(context.messages))
+    dispatcher.register_before_chat(lambda context: len(context.messages))
+    mgr = LLMManager(
+        adapter=mock_llm_adapter,
+        user_template="S",
+        max_tokens=0,
+        hook_dispatcher=dispatcher,
+    )
+    history = [{"role": "system", "content": "S"}]
+    for index in range(200):
+        history.append({"role": "user" if index % 2 == 0 else "assistant", "content": "x" * 100})
+    mgr.messages = history
+    mgr.add_message("user", "warm up")
+    mgr._before_chat_context(stream=False, tools_defs=None, generation_kwargs={})
+    copied_before = mgr._hook_snapshots.copied_items
+
+    for _ in range(3):
+        mgr.add_message("user", "question")
+        mgr._before_chat_context(stream=False, tools_defs=None, generation_kwargs={})
+        mgr.add_message("assistant", "answer")
+
+    # Six new messages over three turns; the history itself was copied once.
+    assert mgr._hook_snapshots.copied_items - copied_before == 6
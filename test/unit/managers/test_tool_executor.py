@@ -1,6 +1,7 @@
 """Unit tests for ToolExecutor, ToolNotReady, and tool_ready callback."""
 
 import json
+import threading
 import time
 from unittest.mock import patch
 
@@ -18,10 +19,7 @@ from ai.tools.tool_executor import ToolExecutor
 def _reset_tm():
     """Reset the ToolManager singleton for test isolation."""
     tm = ToolManager()
-    tm._tools_definitions.clear()
-    tm._functions.clear()
-    tm._tool_groups.clear()
-    tm._tool_risks.clear()
+    tm.reset()
     return tm
 
 
@@ -289,6 +287,32 @@ class TestToolExecutorExecute:
         parsed = json.loads(result)
         assert "error" in parsed
 
+    def test_execute_many_overlaps_calls_and_keeps_call_order(self):
+        tm = _reset_tm()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def slow_lookup() -> str:
+            barrier.wait()
+            time.sleep(0.05)
+            return "slow"
+
+        def fast_lookup() -> str:
+            barrier.wait()
+            return "fast"
+
+        tm.register_function(slow_lookup, name="slow_lookup", group="a")
+        tm.register_function(fast_lookup, name="fast_lookup", group="b")
+        executor = ToolExecutor(tm)
+        try:
+            results = executor.execute_many(
+                [("slow_lookup", "{}"), ("fast_lookup", "{}"), ("missing", "{}")]
+            )
+        finally:
+            executor.shutdown()
+
+        assert [json.loads(r) for r in results[:2]] == ["slow", "fast"]
+        assert "error" in json.loads(results[2])
+
     def test_tool_result_is_string(self):
         tm = _reset_tm()
 
@@ -10,9 +10,7 @@ from ai.tools.tool_manager import ToolManager
 def _reset_tm():
     """Reset the ToolManager singleton for test isolation."""
     tm = ToolManager()
-    tm._tools_definitions.clear()
-    tm._functions.clear()
-    tm._tool_groups.clear()
+    tm.reset()
     return tm
 
 
@@ -27,6 +25,20 @@ class TestToolDecoratorGroup:
                 found = True
         assert found, "search_tools should be registered with group=default"
 
+    def test_redeclaring_without_read_only_clears_the_flag(self, monkeypatch):
+        import sdk.tool_registry as registry
+
+        monkeypatch.setattr(registry, "_Entries", [])
+        monkeypatch.setattr(registry, "_ReadOnly", set())
+
+        def lookup():
+            return 1
+
+        sdk_tool(lookup, read_only=True)
+        assert registry.is_read_only_tool(lookup)
+        sdk_tool(lookup)
+        assert not registry.is_read_only_tool(lookup)
+
 
 class TestToolManagerGroups:
     def test_register_with_group(self):
@@ -182,6 +194,17 @@ class TestSearchTools:
         assert len(results) >= 1
         assert results[0]["group"] == "character"
 
+    def test_search_partial_word_falls_back_to_substring(self):
+        tm = _reset_tm()
+
+        def shot_fn():
+            """Capture the current desktop."""
+            return 1
+
+        tm.register_function(shot_fn, name="screenshot", group="vision")
+        results = tm.search_tools("shot")
+        assert [r["name"] for r in results] == ["screenshot"]
+
     def test_search_empty_keyword(self):
         tm = _reset_tm()
 
@@ -202,6 +225,57 @@ class TestSearchTools:
         results = tm.search_tools("zzzz_nonexistent")
         assert results == []
 
+    def test_search_ranks_name_matches_first(self):
+        tm = _reset_tm()
+
+        tm.register_function(lambda: 1, name="weather_forecast", group="mcp",
+                             description="Forecast for a city")
+        tm.register_function(lambda: 1, name="calendar_events", group="mcp",
+                             description="List events; can mention weather notes")
+        tm.register_function(lambda: 1, name="unrelated", group="mcp",
+                             description="Does something else")
+
+        names = [r["name"] for r in tm.search_tools("weather")]
+        assert names == ["weather_forecast", "calendar_events"]
+        assert [r["name"] for r in tm.search_tools("weather", limit=1)] == [
+            "weather_forecast"
+        ]
+
+    def test_search_matches_prefixes_and_cjk_bigrams(self):
+        tm = _reset_tm()
+
+        tm.register_function(lambda: 1, name="mem_lookup", group="memory",
+                             description="查询角色的长期记忆")
+        tm.register_function(lambda: 1, name="screen_capture", group="vision",
+                             description="截取当前屏幕")
+
+        assert [r["name"] for r in tm.search_tools("mem")] == ["mem_lookup"]
+        assert [r["name"] for r in tm.search_tools("长期记忆")] == ["mem_lookup"]
+        assert [r["name"] for r in tm.search_tools("屏幕截图")] == ["screen_capture"]
+
+    def test_group_counts_follow_register_and_drop(self):
+        tm = _reset_tm()
+
+        tm.register_function(lambda: 1, name="a", group="g1")
+        tm.register_function(lambda: 1, name="b", group="g1")
+        tm.register_function(lambda: 1, name="c", group="g2")
+        assert tm.get_group_counts() == {"g1": 2, "g2": 1}
+
+        tm.register_function(lambda: 1, name="b", group="g2")
+        tm._drop_tool("a")
+        assert tm.get_group_counts() == {"g2": 2}
+        assert tm.search_tools("a") == []
+
+    def test_reset_clears_the_search_index(self):
+        tm = _reset_tm()
+        tm.register_function(lambda: 1, name="weather", group="g1")
+
+        tm.reset()
+        tm.register_function(lambda: 1, name="calendar", group="g2")
+
+        assert tm.search_tools("weather") == []
+        assert tm.get_group_counts() == {"g2": 1}
+
 
 class TestMCPToolsGroup:
     def test_register_mcp_with_custom_group(self):
@@ -1,11 +1,13 @@
 """Unit tests for TTSManager — factory, queue behavior, adapter switching."""
 
+import threading
 import time
 from pathlib import Path
 
 import pytest
 import requests
 
+from ai.tts.audio_cache import AudioCache
 from ai.tts.tts_adapter import GenieTTSAdapter, GPTSoVitsAdapter, IndexTTSAdapter
 from ai.tts.tts_manager import TTSManager, TTSAdapterFactory
 from test.mocks import MockTTSAdapter
@@ -241,6 +243,19 @@ class TestTTSManagerWithMock:
         mgr.worker_thread.join(timeout=2)
         assert not mgr.worker_thread.is_alive()
 
+    def test_synthesis_executor_follows_adapter_concurrency(self, mock_tts_adapter):
+        mgr = TTSManager()
+        mock_tts_adapter.max_concurrent_requests = 2
+        mgr.set_tts_adapter(mock_tts_adapter)
+        executor = mgr.synthesis_executor()
+        assert executor is mgr.synthesis_executor()
+        assert executor._max_workers == 2
+
+        mgr.set_tts_adapter(MockTTSAdapter())
+        assert mgr.synthesis_executor() is not executor
+        assert mgr.synthesis_executor()._max_workers == 1
+        mgr.shutdown()
+
     def test_init_creates_cache_dir(self):
         mgr = TTSManager()
         assert mgr.audio_cache_dir.exists()
@@ -264,3 +279,142 @@ class TestTTSManagerWithMock:
         time.sleep(0.2)
         assert len(mock_tts_adapter.call_history) >= 1
         mgr.shutdown()
+
+
+class TestTTSAudioCache:
+    @staticmethod
+    def _manager(adapter, tmp_path):
+        mgr = TTSManager()
+        mgr.set_tts_adapter(adapter)
+        mgr.audio_cache_dir = tmp_path
+        mgr.audio_cache = AudioCache(tmp_path / "store", max_bytes=1024 * 1024)
+        ref = tmp_path / "ref.wav"
+        ref.write_text("fake ref")
+        return mgr, str(ref)
+
+    def test_repeated_line_is_served_from_cache(self, mock_tts_adapter, tmp_path):
+        mgr, ref = self._manager(mock_tts_adapter, tmp_path)
+        try:
+            first = mgr.generate_tts("おはよう", ref_audio_path=ref, prompt_text="p", prompt_lang="ja")
+            second = mgr.generate_tts("おはよう ", ref_audio_path=ref, prompt_text="p", prompt_lang="ja")
+
+            assert first == str(tmp_path / "0.wav")
+            assert Path(second).read_bytes() == b"fake audio data"
+            assert len(mock_tts_adapter.call_history) == 1
+            assert mgr.cache_stats()["hits"] == 1
+        finally:
+            mgr.shutdown()
+
+    def test_model_switch_is_deferred_until_a_miss(self, mock_tts_adapter, tmp_path):
+        mgr, ref = self._manager(mock_tts_adapter, tmp_path)
+        model_a = {"gpt_model_path": "a.ckpt", "sovits_model_path": "a.pth"}
+        model_b = {"gpt_model_path": "b.ckpt", "sovits_model_path": "b.pth"}
+        try:
+            mgr.switch_model(model_a)
+            assert mock_tts_adapter.call_history == []
+            mgr.generate_tts("hello", ref_audio_path=ref)
+            mgr.switch_model(model_b)
+            mgr.generate_tts("hello", ref_audio_path=ref)
+            mgr.switch_model(model_a)
+            mgr.generate_tts("hello", ref_audio_path=ref)
+
+            actions = [c.get("action", "speak") for c in mock_tts_adapter.call_history]
+            # 切回 A 后命中缓存，不再触碰 TTS 服务
+            assert actions == ["switch_model", "speak", "switch_model", "speak"]
+        finally:
+            mgr.shutdown()
+
+    def test_warm_up_renders_only_missing_lines(self, mock_tts_adapter, tmp_path):
+        mgr, ref = self._manager(mock_tts_adapter, tmp_path)
+        try:
+            assert mgr.warm_up(["a", "b"], ref_audio_path=ref) == {"cached": 0, "rendered": 2, "failed": 0}
+            assert mgr.warm_up(["a", "b", "c"], ref_audio_path=ref) == {"cached": 2, "rendered": 1, "failed": 0}
+            assert len(mock_tts_adapter.call_history) == 3
+        finally:
+            mgr.shutdown()
+
+    def test_scheduled_warm_up_renders_in_background_and_honours_cancel(
+        self, mock_tts_adapter, tmp_path
+    ):
+        mgr, ref = self._manager(mock_tts_adapter, tmp_path)
+        release = threading.Event()
+        generate = mock_tts_adapter.generate_speech
+        mock_tts_adapter.generate_speech = lambda *a, **kw: (release.wait(5), generate(*a, **kw))[1]
+        try:
+            mgr.schedule_warm_up(["a"], ref_audio_path=ref)
+            mgr.schedule_warm_up(["b"], cancelled=lambda: True, ref_audio_path=ref)
+            assert mock_tts_adapter.call_history == []
+
+            release.set()
+            mgr.warm_up_queue.join()
+            assert [call["text"] for call in mock_tts_adapter.call_history] == ["a"]
+        finally:
+            mgr.shutdown()
+
+    def test_scheduled_warm_up_keeps_the_voice_it_was_queued_with(
+        self, mock_tts_adapter, tmp_path
+    ):
+        mgr, ref = self._manager(mock_tts_adapter, tmp_path)
+        model_a = {"gpt_model_path": "a.ckpt", "sovits_model_path": "a.pth"}
+        model_b = {"gpt_model_path": "b.ckpt", "sovits_model_path": "b.pth"}
+        release = threading.Event()
+        generate = mock_tts_adapter.generate_speech
+        mock_tts_adapter.generate_speech = lambda *a, **kw: (release.wait(5), generate(*a, **kw))[1]
+        try:
+            mgr.switch_model(model_a)
+            mgr.schedule_warm_up(["next line"], ref_audio_path=ref)
+            # 排队期间切换到另一个说话人
+            mgr.switch_model(model_b)
+            release.set()
+            mgr.warm_up_queue.join()
+
+            switches = [c["model_info"] for c in mock_tts_adapter.call_history if c.get("action") == "switch_model"]
+            assert switches == [model_a]
+            key_a = mgr._audio_cache_key("next line", ref, None, None, None, None, model_a)
+            key_b = mgr._audio_cache_key("next line", ref, None, None, None, None, model_b)
+            assert mgr.audio_cache.lookup(key_a)
+            assert mgr.audio_cache.lookup(key_b) is None
+        finally:
+            mgr.shutdown()
+
+    def test_cache_disabled_by_default(self, mock_tts_adapter):
+        mgr = TTSManager()
+        try:
+            assert mgr.audio_cache is None
+            assert mgr.cache_stats() is None
+        finally:
+            mgr.shutdown()
+
+
+class TestTTSModelResidency:
+    def test_repeated_switch_to_same_voice_hits_adapter_once(self, mock_tts_adapter):
+        mgr = TTSManager()
+        mgr.set_tts_adapter(mock_tts_adapter)
+        try:
+            for _ in range(3):
+                mgr.switch_model({"gpt_model_path": "a.ckpt", "sovits_model_path": "a.pth"})
+            switches = [c for c in mock_tts_adapter.call_history if c.get("action") == "switch_model"]
+            assert len(switches) == 1
+            assert mgr.model_stats()["hits"] == 2
+        finally:
+            mgr.shutdown()
+
+    def test_prefetch_model_switches_in_background(self, mock_tts_adapter, tmp_path):
+        mgr = TTSManager()
+        mgr.set_tts_adapter(mock_tts_adapter)
+        mgr.audio_cache_dir = tmp_path
+        ref = tmp_path / "ref.wav"
+        ref.write_text("fake ref")
+        model_a = {"gpt_model_path": "a.ckpt", "sovits_model_path": "a.pth"}
+        model_b = {"gpt_model_path": "b.ckpt", "sovits_model_path": "b.pth"}
+        try:
+            mgr.switch_model(model_a)
+            mgr.generate_tts("hello", ref_audio_path=str(ref))
+            mgr.prefetch_model(model_b).result(timeout=2)
+            mgr.switch_model(model_b)
+
+            actions = [c.get("action", "speak") for c in mock_tts_adapter.call_history]
+            assert actions == ["switch_model", "speak", "switch_model"]
+            assert mgr.model_stats()["prefetches"] == 1
+        finally:
+            mgr.shutdown()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import copy
+import json
 import logging
 from pathlib import Path
 
@@ -9,6 +11,7 @@ from sdk.chat_init import ChatInitService, InitChatContext
 from sdk.hooks import (
     BeforeChatContext,
     BeforeCompactContext,
+    HookSnapshotCache,
     MessageAddedContext,
     InitChatHookError,
     PluginHookDispatcher,
@@ -191,3 +194,55 @@ def test_registry_registers_init_chat_hook_and_validates_weight() -> None:
     for invalid_weight in (0, -1, float("nan"), float("inf")):
         with pytest.raises(ValueError, match="weight"):
             registry.register_init_chat_hook(lambda _context: None, weight=invalid_weight)
+
+
+def test_snapshot_cache_shares_unchanged_snapshots_between_events() -> None:
+    cache = HookSnapshotCache()
+    history = [
+        {"role": "system", "content": "S"},
+        {"role": "user", "content": [{"type": "text", "text": "hi"}]},
+    ]
+
+    first = cache.snapshot_list(history)
+    second = cache.snapshot_list(history)
+
+    assert first == history
+    assert first is not second
+    assert all(a is b for a, b in zip(first, second))
+    assert all(snapshot is not source for snapshot, source in zip(first, history))
+    assert cache.copied_items == 2
+
+
+def test_snapshot_cache_recopies_after_nested_write_without_touching_source() -> None:
+    cache = HookSnapshotCache()
+    source = {"role": "user", "content": [{"type": "text", "text": "hi"}]}
+
+    snapshot = cache.snapshot(source)
+    snapshot["content"][0]["text"] = "changed by hook"
+    fresh = cache.snapshot(source)
+
+    assert source["content"][0]["text"] == "hi"
+    assert fresh is not snapshot
+    assert fresh["content"][0]["text"] == "hi"
+
+
+def test_snapshot_cache_recopies_when_source_top_level_value_changes() -> None:
+    cache = HookSnapshotCache()
+    source = {"role": "assistant", "content": "draft"}
+    snapshot = cache.snapshot(source)
+
+    source["content"] = "final"
+
+    assert cache.snapshot(source) is not snapshot
+    assert cache.snapshot(source)["content"] == "final"
+
+
+def test_snapshot_copies_are_plain_containers() -> None:
+    cache = HookSnapshotCache()
+    snapshot = cache.snapshot({"role": "user", "content": [{"type": "text", "text": "hi"}]})
+
+    thawed = copy.deepcopy(snapshot)
+
+    assert isinstance(snapshot, dict) and isinstance(snapshot["content"], list)
+    assert type(thawed) is dict and type(thawed["content"]) is list
+    assert json.loads(json.dumps(snapshot)) == thawed
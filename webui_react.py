@@ -15,6 +15,7 @@ _repo_root = Path(__file__).resolve().parent
 if str(_repo_root) not in sys.path:
     sys.path.insert(0, str(_repo_root))
 
+from core.bootstrap.process_pool import init_process_pool_support
 from frontend_bridge import run as run_frontend_bridge
 
 
@@ -215,4 +216,5 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    init_process_pool_support()
     main()